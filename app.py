@@ -4,11 +4,510 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import streamlit as st
 import os
+import time
+import contextlib
+import tempfile
+import uuid
+from matplotlib.figure import Figure
 
 # Import fungsi dari calculate.py
-from calculate import calculate_moora, validate_weights, create_result_dataframe
+from calculate import (
+    validate_weights, create_result_dataframe, rank_alternatives, weight_vector,
+    default_criteria_type, DEFAULT_TIE_BREAKER_CRITERIA
+)
+from export import EXPORT_FORMATS, export_results, export_file_info
+from registry import DatasetRegistry, BUNDLED_DATASET_PATH
+from live import LiveRanker, LIVE_TOP_N
+from result_cache import ResultCache, make_cache_key
+from presets import PresetMaterializer, load_profiles, DEFAULT_PRESETS_PATH
+from validation import validate_inputs, validate_weight_values
+from approximate import ProgressiveRanking
+from pipeline import Pipeline, render_png
+from whatif import WhatIfScorer, WHATIF_SELECT_LIMIT
+from inverse import InverseQuery
+from batch import UploadBatch, BATCH_POLL_SECONDS, STATUS_DONE
+from snapshots import SnapshotStore
+from ingest import (
+    ConversionCache, is_spreadsheet, sheet_names, sheet_columns, spreadsheet_shape, register_spreadsheet
+)
+import observability
+from observability import timed, UPLOAD_BYTES
+from governor import (
+    ResourceGovernor, csv_shape, MODE_FULL, MODE_STREAMING, MODE_APPROXIMATE, MODE_LABELS, DEFAULT_TOP_K, CHUNK_ROWS
+)
 
 
+@st.cache_resource
+def get_result_cache():
+    """Cache hasil MOORA di disk, dipakai bersama oleh semua sesi dan proses server"""
+    return ResultCache()
+
+
+@st.cache_resource
+def get_conversion_cache():
+    """Cache konversi spreadsheet di disk, sehingga upload ulang file .xls/.xlsx tidak diparsing lagi"""
+    return ConversionCache()
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """Riwayat snapshot ranking di disk, dipakai bersama oleh semua sesi"""
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_preset_materializer():
+    """Profil preset dari file konfigurasi beserta hasil ranking yang sudah dihitung"""
+    return PresetMaterializer(load_profiles(DEFAULT_PRESETS_PATH), result_cache=get_result_cache(),
+                              governor=get_resource_governor())
+
+
+@st.cache_resource
+def get_dataset_registry():
+    """Registry dataset yang dibagikan ke semua sesi dalam satu proses server"""
+    registry = DatasetRegistry()
+    # Ranking preset dihitung segera setiap kali dataset baru dimuat
+    get_preset_materializer().attach(registry)
+    if os.path.exists(BUNDLED_DATASET_PATH):
+        entry = registry.register_file(BUNDLED_DATASET_PATH, label=os.path.basename(BUNDLED_DATASET_PATH))
+        registry.bundled_key = entry.key
+    return registry
+
+
+@st.cache_resource
+def get_resource_governor():
+    """Governor budget memori dan waktu per sesi, beserta metrik fallback untuk semua sesi"""
+    return ResourceGovernor()
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Server metrik Prometheus lokal, dijalankan sekali per proses server"""
+    if observability.DEFAULT_METRICS_PORT is None:
+        return None
+    governor = get_resource_governor()
+    observability.REGISTRY.gauge('sirekma_governor_in_flight_bytes', "Memori perhitungan yang sedang berjalan",
+                                 lambda: governor.stats()['in_flight_bytes'])
+    try:
+        return observability.start_http_server(observability.DEFAULT_METRICS_PORT)
+    except OSError:
+        # Port sudah dipakai (misalnya oleh proses server lain)
+        return None
+
+
+result_cache = get_result_cache()
+preset_materializer = get_preset_materializer()
+dataset_registry = get_dataset_registry()
+resource_governor = get_resource_governor()
+metrics_server = get_metrics_server()
+
+# ID sesi untuk log request
+session_id = st.session_state.setdefault("session_id", uuid.uuid4().hex[:12])
+
+
+def custom_weight_values(criteria_cols):
+    """Bobot custom saat ini dari state slider (bobot tersimpan atau equal jika slider belum dibuat)"""
+    custom_weights = st.session_state.setdefault("custom_weights", {})
+    return {
+        col: st.session_state.get(f"weight_{col}", custom_weights.get(col, 100/len(criteria_cols)))
+        for col in criteria_cols
+    }
+
+
+def weight_total_status(weights, criteria_cols):
+    """Menampilkan total bobot dan apakah sudah valid (total 100%)"""
+    total_weight = sum(weights.values())
+    if validate_weight_values(weights, criteria_cols, total=100).ok:
+        st.success(f"✅ Total bobot: {total_weight:.2f}%")
+    else:
+        st.error(f"❌ Total bobot: {total_weight:.2f}% (max 100%)")
+
+
+def live_ranking_table(dataset, criteria_type, weights, tie_breakers):
+    """Menampilkan Top-N ranking dari bobot slider saat ini"""
+    criteria_cols = list(dataset.criteria_cols)
+    if not dataset.report.ok:
+        st.warning(f"⚠️ Live ranking tidak tersedia: {dataset.report.messages()[0]}")
+        return
+    
+    total_weight = sum(weights.values())
+    if total_weight <= 0:
+        st.info("Geser slider bobot untuk melihat ranking secara langsung.")
+        return
+    
+    start = time.perf_counter()
+    ranker = LiveRanker(dataset.matrix, criteria_cols, norms=dataset.norms)
+    # Bobot dinormalisasi ke total 1 agar ranking tetap bisa dilihat saat total belum 100%;
+    # tie-breaker sama dengan perhitungan penuh sehingga alternatif kembar di batas Top-N sama
+    indices, rankings, top_yi = ranker.top(
+        criteria_type, {col: w / total_weight for col, w in weights.items()}, n=LIVE_TOP_N,
+        tie_breakers=[(dataset.frame[col].to_numpy(), asc) for col, asc in tie_breakers]
+    )
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    st.dataframe(
+        pd.DataFrame({
+            'Ranking': rankings,
+            'Name': dataset.frame['Name'].to_numpy()[indices],
+            'Yi (Score)': top_yi,
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"✓ Dihitung dalam {elapsed_ms:.1f} ms")
+
+
+# Toggle panel yang memakai bobot saat ini; jika aktif, perubahan slider menjalankan ulang seluruh halaman
+WEIGHT_DEPENDENT_PANELS = ("whatif_enabled", "inverse_enabled")
+
+
+@st.fragment
+def custom_weights_view(dataset, criteria_type, tie_breakers, batch_active=False):
+    """
+    Slider bobot custom, live ranking, dan distribusi bobot.
+
+    Menggeser slider hanya menjalankan ulang fragment ini (bukan tabel dataset
+    dan bagian lain halaman). Seluruh halaman baru dijalankan ulang jika
+    validitas total bobot berubah (tombol Hitung aktif/nonaktif), atau ada
+    panel lain (what-if, query terbalik, multi-file) yang memakai bobot saat ini.
+    """
+    criteria_cols = list(dataset.criteria_cols)
+    st.markdown("### Atur Bobot Manual")
+    st.write("Gunakan slider untuk mengatur bobot setiap kriteria (total harus = 100%)")
+    
+    # Slider untuk setiap kriteria (awalnya bobot equal)
+    initial = custom_weight_values(criteria_cols)
+    weights = {}
+    for col in criteria_cols:
+        weights[col] = st.slider(
+            f"**{col}**",
+            min_value=0.0,
+            max_value=100.0,
+            value=initial[col],
+            step=0.5,
+            key=f"weight_{col}",
+            help=f"Bobot kepentingan untuk kriteria {col}"
+        )
+        st.session_state.custom_weights[col] = weights[col]
+    
+    # Live ranking: Top-N dihitung ulang dari matrix ternormalisasi yang sudah disimpan
+    if st.toggle("⚡ Live Ranking", key="live_ranking", help=f"Tampilkan Top {LIVE_TOP_N} ranking yang diperbarui otomatis saat slider digeser"):
+        st.markdown(f"### ⚡ Live Ranking Top {LIVE_TOP_N}")
+        live_ranking_table(dataset, criteria_type, weights, tie_breakers)
+    
+    weight_total_status(weights, criteria_cols)
+    
+    # Tampilkan distribusi bobot dalam chart
+    st.markdown("### 📊 Distribusi Bobot")
+    fig, ax = plt.subplots(figsize=(10, 4))
+    colors = plt.cm.Set3(range(len(criteria_cols)))
+    ax.bar(criteria_cols, [weights[col] for col in criteria_cols], color=colors)
+    ax.set_ylabel('Bobot (%)')
+    ax.set_title('Distribusi Bobot Kriteria')
+    ax.axhline(y=100/len(criteria_cols), color='r', linestyle='--', label='Equal Weight')
+    ax.legend()
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+    st.pyplot(fig)
+    plt.close()
+    
+    # Bobot yang dipakai bagian lain halaman berasal dari run penuh terakhir
+    applied = st.session_state.get("applied_weights")
+    if applied is not None and applied != weights:
+        was_valid = validate_weight_values(applied, criteria_cols, total=100).ok
+        is_valid = validate_weight_values(weights, criteria_cols, total=100).ok
+        if (was_valid != is_valid or batch_active
+                or any(st.session_state.get(key) for key in WEIGHT_DEPENDENT_PANELS)):
+            st.rerun()
+
+
+@st.fragment
+def whatif_view(dataset, criteria_type, weights_decimal):
+    """Mengubah nilai satu listing lalu menampilkan Yi dan ranking barunya tanpa menghitung ulang seluruh dataset"""
+    criteria_cols = list(dataset.criteria_cols)
+    scorer_key = (
+        dataset.key,
+        tuple(criteria_type[col] for col in criteria_cols),
+        tuple(weights_decimal[col] for col in criteria_cols),
+    )
+    # Scorer dibuat sekali per dataset dan bobot, edit berikutnya diperbarui secara inkremental
+    if st.session_state.get("whatif_key") != scorer_key:
+        st.session_state.whatif_key = scorer_key
+        st.session_state.whatif_scorer = WhatIfScorer(
+            dataset.matrix, criteria_cols, criteria_type, weights_decimal, sum_squares=dataset.sum_squares
+        )
+    scorer = st.session_state.whatif_scorer
+    
+    names = dataset.frame['Name']
+    if dataset.n_rows <= WHATIF_SELECT_LIMIT:
+        row = st.selectbox("Pilih listing:", options=range(dataset.n_rows),
+                           format_func=lambda i: str(names.iat[i]), key="whatif_row")
+    else:
+        name = st.text_input("Nama listing:", key="whatif_name")
+        matches = np.flatnonzero(names.to_numpy() == name)
+        if not len(matches):
+            st.info("Masukkan nama listing yang ada di dataset.")
+            return
+        row = int(matches[0])
+    
+    # Hanya satu listing yang diubah dalam satu waktu
+    for edited_row in scorer.edited_rows():
+        if edited_row != row:
+            scorer.reset_row(edited_row)
+    
+    edited = st.data_editor(
+        dataset.frame.iloc[[row]][['Name'] + criteria_cols],
+        key=f"whatif_editor_{row}",
+        hide_index=True,
+        disabled=['Name'],
+        use_container_width=True
+    )
+    start = time.perf_counter()
+    try:
+        with observability.request('whatif', session=st.session_state.get("session_id"), rows=dataset.n_rows), \
+                timed('whatif'):
+            scorer.set_row(row, {col: edited[col].iloc[0] for col in criteria_cols})
+            new_rank = scorer.rank(row)
+    except ValueError as e:
+        st.error(f"❌ {str(e)}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    
+    old_rank = scorer.original_rank(row)
+    new_yi = scorer.yi_values[row]
+    col_yi, col_rank = st.columns(2)
+    col_yi.metric("Yi (Score)", f"{new_yi:.4f}", delta=f"{new_yi - scorer.original_yi(row):+.4f}")
+    col_rank.metric("Ranking", f"{new_rank:,} dari {dataset.n_rows:,}",
+                    delta=f"{old_rank - new_rank:+,} posisi" if new_rank != old_rank else None)
+    st.caption(f"Ranking awal {old_rank:,} · diperbarui dalam {elapsed_ms:.1f} ms tanpa mengurutkan ulang semua alternatif")
+
+
+@st.fragment
+def inverse_view(dataset, criteria_type, weights_decimal):
+    """Mencari bobot terdekat dengan bobot saat ini yang membuat listing pilihan menjadi peringkat 1 (atau top-K)"""
+    criteria_cols = list(dataset.criteria_cols)
+    query_key = (dataset.key, tuple(criteria_type[col] for col in criteria_cols))
+    # Matrix ternormalisasi bertanda dan Pareto front disimpan per dataset dan tipe kriteria
+    if st.session_state.get("inverse_key") != query_key:
+        st.session_state.inverse_key = query_key
+        st.session_state.inverse_query = InverseQuery(
+            dataset.matrix, criteria_cols, criteria_type, sum_squares=dataset.sum_squares
+        )
+    query = st.session_state.inverse_query
+    
+    names = dataset.frame['Name']
+    col_row, col_k = st.columns([3, 1])
+    with col_row:
+        if dataset.n_rows <= WHATIF_SELECT_LIMIT:
+            row = st.selectbox("Pilih listing:", options=range(dataset.n_rows),
+                               format_func=lambda i: str(names.iat[i]), key="inverse_row")
+        else:
+            name = st.text_input("Nama listing:", key="inverse_name")
+            matches = np.flatnonzero(names.to_numpy() == name)
+            if not len(matches):
+                st.info("Masukkan nama listing yang ada di dataset.")
+                return
+            row = int(matches[0])
+    with col_k:
+        top_k = st.number_input("Target ranking (top-K):", min_value=1, max_value=max(dataset.n_rows, 1),
+                                value=1, key="inverse_k")
+    
+    # Hasil query disimpan sampai listing, bobot, atau target berubah (rerun lain tidak menghitung ulang)
+    result_key = (query_key, row, tuple(weights_decimal[col] for col in criteria_cols), int(top_k))
+    if st.session_state.get("inverse_result_key") != result_key:
+        start = time.perf_counter()
+        with observability.request('inverse', session=st.session_state.get("session_id"), rows=dataset.n_rows,
+                                   top_k=int(top_k)), timed('inverse'):
+            suggestion = query.nearest_weights(row, weights_decimal, top_k=int(top_k))
+            region = query.region(row)
+            current_rank = query.rank(row, weights_decimal) if suggestion is not None else None
+            # Wilayah yang ditampilkan adalah wilayah yang dipakai nearest_weights; tanpa proyeksi
+            # (listing sudah masuk top-K) yang tersedia hanya wilayah peringkat 1
+            shown_region = suggestion.region if suggestion is not None and suggestion.region is not None else region
+            share = shown_region.share() if suggestion is not None else None
+        st.session_state.inverse_result_key = result_key
+        st.session_state.inverse_result = (suggestion, region, shown_region, current_rank, share,
+                                           (time.perf_counter() - start) * 1000)
+    suggestion, region, shown_region, current_rank, share, elapsed_ms = st.session_state.inverse_result
+    
+    name = names.iat[row]
+    target = "menjadi peringkat 1" if top_k == 1 else f"masuk top {int(top_k)}"
+    if suggestion is None:
+        # Pesaing yang sama atau lebih baik di semua kriteria selalu berada di atas listing
+        if len(region.dominated_by) >= top_k:
+            rivals = ", ".join(f"**{names.iat[int(i)]}**" for i in region.dominated_by[:3])
+            st.warning(f"⚠️ Tidak ada bobot yang membuat **{name}** {target}: {len(region.dominated_by):,} "
+                       f"pesaing ({rivals}) sama atau lebih baik di semua kriteria.")
+        else:
+            st.warning(f"⚠️ Tidak ditemukan bobot yang membuat **{name}** {target}.")
+        return
+    
+    col_now, col_new = st.columns(2)
+    col_now.metric("Ranking dengan bobot saat ini", f"{current_rank:,}")
+    col_new.metric("Ranking dengan bobot disarankan", f"{suggestion.rank:,}",
+                   delta=f"{current_rank - suggestion.rank:+,} posisi" if suggestion.rank != current_rank else None)
+    
+    if suggestion.distance == 0:
+        st.success(f"✅ **{name}** sudah masuk top {int(top_k)} dengan bobot saat ini.")
+    else:
+        st.dataframe(pd.DataFrame({
+            'Kriteria': criteria_cols,
+            'Bobot Saat Ini (%)': [weights_decimal[col] * 100 for col in criteria_cols],
+            'Bobot Disarankan (%)': [suggestion.weights[col] * 100 for col in criteria_cols],
+            'Perubahan (%)': [(suggestion.weights[col] - weights_decimal[col]) * 100 for col in criteria_cols],
+        }).round(2), hide_index=True, use_container_width=True)
+    share_text = f'±{share:.1%}' if share >= 0.001 else '< 0.1%'
+    if top_k == 1:
+        region_text = f"**{name}** menjadi peringkat 1 pada {share_text} kombinasi bobot"
+    elif suggestion.region is not None:
+        # Wilayah top-K: mengalahkan semua pesaing kecuali K - 1 pesaing yang dibiarkan di atas
+        region_text = (f"**{name}** {target} pada setidaknya {share_text} kombinasi bobot (wilayah yang "
+                       f"mengalahkan semua pesaing kecuali {len(suggestion.excluded):,} pesaing terkuat)")
+    else:
+        region_text = f"Wilayah peringkat 1: **{name}** menjadi peringkat 1 pada {share_text} kombinasi bobot"
+    st.caption(f"{region_text} · {shown_region.n_constraints:,} pesaing Pareto diperiksa · {elapsed_ms:.1f} ms")
+
+
+@st.fragment
+def history_view(dataset):
+    """Menampilkan snapshot ranking yang tersimpan, ranking satu listing dari waktu ke waktu, dan ranking lama"""
+    store = get_snapshot_store()
+    index = store.snapshots()
+    if not index:
+        st.info("Belum ada snapshot. Aktifkan penyimpanan riwayat di tab Export lalu jalankan perhitungan.")
+        return
+    
+    stats = store.stats()
+    st.caption(f"{stats['snapshots']:,} snapshot ({stats['keyframes']:,} penuh, sisanya delta) · "
+               f"{stats['bytes'] / 1024:,.1f} KB di disk, array mentah {stats['raw_bytes'] / 1024:,.1f} KB")
+    
+    names = dataset.frame['Name']
+    if dataset.n_rows <= WHATIF_SELECT_LIMIT:
+        name = st.selectbox("Pilih listing:", options=names.astype(str).unique(), key="history_name")
+    else:
+        name = st.text_input("Nama listing:", key="history_name_text")
+    if name:
+        start = time.perf_counter()
+        with observability.request('history', session=st.session_state.get("session_id"), snapshots=len(index)):
+            history = store.history(str(name))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if len(history):
+            st.line_chart(history.set_index('Waktu')[['Ranking']])
+            st.dataframe(history, hide_index=True, use_container_width=True)
+            st.caption(f"Ranking **{name}** di {len(history):,} snapshot · {elapsed_ms:.1f} ms")
+        else:
+            st.info(f"**{name}** belum ada di snapshot mana pun.")
+    
+    snapshot_id = st.selectbox(
+        "Lihat ranking snapshot:",
+        options=[info['id'] for info in reversed(index)],
+        format_func=lambda i: f"#{i} · {index[i]['created']} · {index[i]['label']}",
+        key="history_snapshot"
+    )
+    # Rekonstruksi snapshot (sampai KEYFRAME_INTERVAL-1 delta) hanya dilakukan saat pilihan berubah
+    snapshot_key = (store.directory, snapshot_id, index[snapshot_id]['created'])
+    if st.session_state.get("history_snapshot_key") != snapshot_key:
+        st.session_state.history_snapshot_key = snapshot_key
+        st.session_state.history_snapshot_top = store.load(snapshot_id).to_frame(top_n=LIVE_TOP_N)
+    st.dataframe(st.session_state.history_snapshot_top, hide_index=True, use_container_width=True)
+
+
+def batch_results(batch):
+    """Menampilkan progres setiap file, hasil per file yang sudah selesai, dan ranking gabungan"""
+    st.dataframe(
+        batch.summary(),
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'Progres': st.column_config.ProgressColumn("Progres", min_value=0.0, max_value=1.0, format="percent"),
+            'Baca (ms)': st.column_config.NumberColumn(format="%.0f"),
+            'Hitung (ms)': st.column_config.NumberColumn(format="%.0f"),
+        }
+    )
+    
+    done_jobs = batch.done_jobs()
+    for job in done_jobs:
+        with st.expander(f"📄 {job.name} · Top {len(job.top)} dari {job.rows:,} baris"):
+            st.dataframe(job.top, hide_index=True, use_container_width=True)
+    
+    combined = batch.combined()
+    if combined is not None:
+        st.markdown("### 🌐 Ranking Gabungan Semua File")
+        st.dataframe(combined, hide_index=True, use_container_width=True)
+        if len(done_jobs) < len(batch.jobs):
+            st.caption(f"Sementara: dihitung dari {len(done_jobs)} dari {len(batch.jobs)} file. "
+                       "Norma global diperbarui setiap ada file yang selesai.")
+        else:
+            st.caption("Yi dihitung dengan norma global (Σxij² semua file dijumlahkan), "
+                       "sama dengan menghitung gabungan semua file sebagai satu dataset.")
+
+
+@st.fragment(run_every=BATCH_POLL_SECONDS)
+def batch_progress_view(batch):
+    """Memperbarui progres batch secara berkala sampai semua file selesai"""
+    if batch.finished:
+        # Hentikan polling: tampilkan hasil akhir lewat run script penuh
+        st.rerun()
+    batch_results(batch)
+
+
+def top3_yi_figure(top3_yi):
+    """Grafik batang Yi Top 3 (memakai Figure, bukan pyplot, agar aman dirender di worker thread)"""
+    fig = Figure(figsize=(8, 5))
+    ax = fig.subplots()
+    colors = ['#FFD700', '#C0C0C0', '#CD7F32']
+    ax.bar(top3_yi.index, top3_yi['Yi (Score)'].values, color=colors[:len(top3_yi)])
+    ax.set_title('Perbandingan Yi Score Top 3')
+    ax.set_ylabel('Yi Score')
+    ax.set_xlabel('Nama Kost')
+    ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+    ax.grid(axis='y', alpha=0.3)
+    
+    # Label
+    for i, (name, score) in enumerate(zip(top3_yi.index, top3_yi['Yi (Score)'].values)):
+        ax.text(i, score, f'{score:.4f}', ha='center', va='bottom' if score > 0 else 'top')
+    
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    fig.tight_layout()
+    return fig
+
+
+def render_top3_png(top3_yi):
+    """Merender grafik Top 3 ke PNG di worker pipeline"""
+    with timed('render_chart'):
+        return render_png(lambda: top3_yi_figure(top3_yi))
+
+
+def progressive_ranking_view(df, criteria_cols, criteria_type, weights_decimal, k, tie_breakers, sum_squares=None):
+    """Menampilkan top-K sementara yang diperbarui per chunk sampai hasil pasti; mengembalikan hasil akhir"""
+    progress_bar = st.progress(0.0, text="Membaca data...")
+    top_placeholder = st.empty()
+    # Σxij² pasti dari registry dipakai langsung, sehingga norma tidak perlu diestimasi
+    ranking = ProgressiveRanking(df, criteria_cols, chunk_size=CHUNK_ROWS, sum_squares=sum_squares)
+    for result in ranking.iter_results(criteria_type, weights_decimal, k=k, tie_breakers=tie_breakers):
+        if result.exact:
+            progress_bar.progress(1.0, text=f"✅ Hasil pasti dari {result.rows_seen:,} baris")
+        elif sum_squares is not None:
+            # Norma pasti: top-K sementara hanya belum mencakup baris yang belum dibaca
+            progress_bar.progress(
+                result.progress,
+                text=f"⏳ Top-K dari {result.rows_seen:,} / {result.total_rows:,} baris pertama"
+            )
+        else:
+            progress_bar.progress(
+                result.progress,
+                text=f"⏳ {result.rows_seen:,} / {result.total_rows:,} baris dibaca · "
+                     f"error norma maks ±{result.max_relative_error:.2%}"
+            )
+        top_placeholder.dataframe(
+            result.top[['Ranking', 'Name', 'Yi (Score)']],
+            hide_index=True,
+            use_container_width=True
+        )
+    return result
+
 # Konfigurasi halaman
 st.set_page_config(page_title="SIREKMA: Sistem Rekomendasi Kost Mahasiswa", layout="wide")
 st.markdown("""
@@ -142,7 +641,147 @@ st.markdown("""
 st.markdown("---")
 
 st.header("📁 Upload Dataset")
-uploaded_file = st.file_uploader("Upload file CSV", type=['csv'])
+dataset_source = st.radio(
+    "Sumber dataset:",
+    options=["Upload File CSV", "Dataset Bawaan"],
+    horizontal=True,
+    help=f"Dataset bawaan ({os.path.basename(BUNDLED_DATASET_PATH)}) sudah dimuat di server dan tidak perlu diupload"
+)
+
+pipeline_mode = st.toggle(
+    "⚙️ Mode pipeline paralel",
+    # Pipeline hanya menguntungkan jika tahap-tahapnya bisa berjalan di core berbeda
+    value=(os.cpu_count() or 1) > 1,
+    key="pipeline_mode",
+    help="Pembacaan, validasi, dan perhitungan norma berjalan bersamaan per chunk, "
+         "dan grafik dirender di thread terpisah saat tabel ditampilkan"
+)
+
+dataset = None
+upload_batch = None
+if dataset_source == "Upload File CSV":
+    uploaded_files = st.file_uploader("Upload file CSV atau Excel", type=['csv', 'xls', 'xlsx'],
+                                      accept_multiple_files=True,
+                                      help="Pilih beberapa file sekaligus untuk memproses data beberapa region")
+    uploaded_file = uploaded_files[0] if len(uploaded_files) == 1 else None
+    if len(uploaded_files) > 1:
+        # Semua file diparsing dan dihitung di worker pool; satu file dipakai sebagai dataset aktif
+        batch_key = tuple(f.file_id for f in uploaded_files)
+        if st.session_state.get("upload_batch_key") != batch_key:
+            previous_batch = st.session_state.pop("upload_batch", None)
+            if previous_batch is not None:
+                previous_batch.close()
+            for f in uploaded_files:
+                UPLOAD_BYTES.observe(f.size)
+            st.session_state.upload_batch_key = batch_key
+            st.session_state.upload_batch = UploadBatch(
+                [(f.name, f.getvalue()) for f in uploaded_files], dataset_registry,
+                governor=resource_governor, session=session_id, conversion_cache=get_conversion_cache()
+            )
+        upload_batch = st.session_state.upload_batch
+        active_index = st.selectbox(
+            "Dataset aktif:",
+            options=range(len(upload_batch.jobs)),
+            format_func=lambda i: upload_batch.jobs[i].name,
+            key="batch_active",
+            help="Dataset yang dipakai untuk pengaturan kriteria dan perhitungan utama; "
+                 "file lainnya tetap diproses di latar belakang"
+        )
+        active_job = upload_batch.jobs[active_index]
+        with st.spinner(f"Membaca {active_job.name}..."):
+            dataset = upload_batch.entry(active_index)
+        if dataset is None:
+            st.error(f"❌ {active_job.name}: {active_job.error or 'Pemrosesan dibatalkan.'}")
+            st.stop()
+        st.success(f"✅ {len(upload_batch.jobs)} file diupload, **{active_job.name}** dipakai sebagai dataset aktif.")
+    elif uploaded_file is not None:
+        upload_data = uploaded_file.getvalue()
+        # Hanya upload baru yang dicatat, bukan setiap rerun dengan file yang sama
+        is_new_upload = st.session_state.get("observed_upload_id") != uploaded_file.file_id
+        st.session_state.observed_upload_id = uploaded_file.file_id
+        if is_new_upload:
+            UPLOAD_BYTES.observe(len(upload_data))
+        with (observability.request('upload', session=session_id, upload_bytes=len(upload_data))
+              if is_new_upload else contextlib.nullcontext()):
+            # Parsing hanya dilakukan sekali per isi file untuk semua sesi
+            spreadsheet = is_spreadsheet(uploaded_file.name)
+            try:
+                upload_shape = None
+                if spreadsheet:
+                    # Hanya sheet dan kolom yang dipilih yang dibaca dari spreadsheet
+                    sheets = sheet_names(upload_data, uploaded_file.name)
+                    upload_sheet = st.selectbox("Sheet:", options=sheets, key=f"sheet_{uploaded_file.file_id}") \
+                        if len(sheets) > 1 else sheets[0]
+                    sheet_criteria = [col for col in sheet_columns(upload_data, uploaded_file.name, upload_sheet)
+                                      if col != 'Name']
+                    upload_columns = st.multiselect(
+                        "Kolom kriteria yang dibaca:",
+                        options=sheet_criteria,
+                        default=sheet_criteria,
+                        key=f"sheet_columns_{uploaded_file.file_id}_{upload_sheet}",
+                        help="Kolom lain di sheet tidak dibaca sama sekali"
+                    )
+                    if not upload_columns:
+                        st.warning("⚠️ Pilih minimal satu kolom kriteria!")
+                        st.stop()
+                    upload_shape = (spreadsheet_shape(upload_data, uploaded_file.name, upload_sheet)[0],
+                                    len(upload_columns))
+            except Exception as e:
+                st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
+                st.stop()
+            # Tolak file yang diperkirakan melebihi budget memori sebelum parsing
+            upload_decision = resource_governor.plan_upload(upload_data, shape=upload_shape)
+            if not upload_decision.allowed:
+                st.error(f"❌ {upload_decision.reason}")
+                st.stop()
+            try:
+                with timed('parse'):
+                    if spreadsheet:
+                        # Hasil konversi dicache di disk berdasarkan hash isi file, sheet, dan kolom
+                        dataset = register_spreadsheet(
+                            dataset_registry, upload_data, uploaded_file.name, sheet=upload_sheet,
+                            columns=None if upload_columns == sheet_criteria else upload_columns,
+                            cache=get_conversion_cache()
+                        )
+                    elif pipeline_mode:
+                        # Setiap update progress bar adalah titik pemeriksaan Streamlit: jika script
+                        # dijalankan ulang di tengah parsing, script berhenti dan pipeline ikut dibatalkan
+                        parse_status = st.empty()
+                        parse_total_rows = max(csv_shape(upload_data)[0], 1)
+
+                        def show_parse_progress(rows_done):
+                            parse_status.progress(min(rows_done / parse_total_rows, 1.0),
+                                                  text=f"Membaca data... {rows_done:,} baris")
+
+                        with Pipeline().bind_session(st.session_state) as pipeline:
+                            dataset = dataset_registry.register_bytes(upload_data, label=uploaded_file.name,
+                                                                      pipeline=pipeline,
+                                                                      progress=show_parse_progress)
+                        parse_status.empty()
+                    else:
+                        dataset = dataset_registry.register_bytes(upload_data, label=uploaded_file.name)
+                observability.annotate(rows=dataset.n_rows)
+                st.success("✅ Dataset berhasil diupload!")
+            except pd.errors.EmptyDataError:
+                st.error("❌ File CSV kosong atau tidak memiliki kolom!")
+                st.stop()
+            except Exception as e:
+                st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
+                st.stop()
+else:
+    dataset = dataset_registry.get(dataset_registry.bundled_key) if dataset_registry.bundled_key else None
+    if dataset is not None:
+        st.success(f"✅ Menggunakan dataset bawaan: {dataset.label}")
+    else:
+        st.error("❌ Dataset bawaan tidak ditemukan di server!")
+
+if upload_batch is None and st.session_state.get("upload_batch") is not None:
+    # Batch lama tidak dipakai lagi: hentikan worker dan lepas dataset-nya
+    st.session_state.pop("upload_batch").close()
+    st.session_state.pop("upload_batch_key", None)
+
+if dataset is not None:
+    dataset_registry.bind_session(st.session_state, dataset)
 
 
 # Sidebar
@@ -162,24 +801,42 @@ advanced_menu = {
 for label, anchor in basic_menu.items():
     st.sidebar.markdown(f"[{label}]({anchor})", unsafe_allow_html=True)
 
-# Advanced menu jika file sudah diupload
-if uploaded_file is not None:
+# Advanced menu jika dataset sudah tersedia
+if dataset is not None:
     for label, anchor in advanced_menu.items():
         st.sidebar.markdown(f"[{label}]({anchor})", unsafe_allow_html=True)
 
+# Metrik governor: seberapa sering setiap mode fallback dipakai sejak server dimulai
+with st.sidebar.expander("📈 Resource Governor"):
+    governor_stats = resource_governor.stats()
+    st.dataframe(
+        pd.DataFrame({
+            'Mode': [MODE_LABELS[mode] for mode in governor_stats['decisions']],
+            'Jumlah': list(governor_stats['decisions'].values()),
+        }),
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"Fallback: {governor_stats['fallbacks']} · Ditolak: {governor_stats['refusals']} · "
+               f"Upload ditolak: {governor_stats['upload_refusals']}")
+
+# Latensi per tahap sejak server dimulai, terurut dari p99 terbesar
+with st.sidebar.expander("⏱️ Latensi per Tahap"):
+    stage_rows = observability.stage_summary()
+    if stage_rows:
+        st.dataframe(pd.DataFrame(stage_rows).round(2), hide_index=True, use_container_width=True)
+    else:
+        st.caption("Belum ada data.")
+    if metrics_server is not None:
+        host, port = metrics_server.server_address[:2]
+        st.caption(f"Metrik Prometheus: http://{host}:{port}/metrics")
+
 
 # Main content
-if uploaded_file is not None:
-    # Baca file CSV
-    try:
-        df = pd.read_csv(uploaded_file)
-        st.success("✅ Dataset berhasil diupload!")
-    except pd.errors.EmptyDataError:
-        st.error("❌ File CSV kosong atau tidak memiliki kolom!")
-        st.stop()
-    except Exception as e:
-        st.error(f"❌ Terjadi kesalahan saat membaca file: {e}")
-        st.stop()
+if dataset is not None:
+    # Salinan dangkal frame bersama: kolom numeriknya read-only, dan dengan
+    # Copy-on-Write pandas perubahan di sesi ini tidak mengubah data sesi lain
+    df = dataset.frame.copy(deep=False)
     
     # Tampilkan dataset
     st.subheader("📊 Dataset Kost Mahasiswa")
@@ -199,26 +856,37 @@ if uploaded_file is not None:
     # Pengaturan kriteria
     st.subheader("⚙️ Pengaturan Kriteria")
     
-    criteria_cols = [col for col in df.columns if col != 'Name']
+    criteria_cols = list(dataset.criteria_cols)
     
     # Tab untuk pengaturan
-    tab_criteria, tab_weights = st.tabs(["📋 Tipe Kriteria", "⚖️ Bobot Kriteria"])
+    tab_criteria, tab_weights, tab_export = st.tabs(["📋 Tipe Kriteria", "⚖️ Bobot Kriteria", "💾 Format Export"])
     
     with tab_criteria:
         st.write("Tentukan apakah setiap kriteria termasuk **Benefit** (semakin besar semakin baik) atau **Cost** (semakin kecil semakin baik)")
         
         criteria_type = {}
+        default_types = default_criteria_type(criteria_cols)
         cols = st.columns(len(criteria_cols))
         for i, col in enumerate(criteria_cols):
             with cols[i]:
                 # Default setting
-                default = 'cost' if col in ['Price', 'Distance'] else 'benefit'
+                default = default_types[col]
                 criteria_type[col] = st.selectbox(
                     f"**{col}**",
                     options=['benefit', 'cost'],
                     index=0 if default == 'benefit' else 1,
                     key=f"type_{col}"
                 )
+        
+        # Penentu urutan untuk alternatif dengan Yi sama
+        tie_breaker_cols = st.multiselect(
+            "Penentu urutan jika Yi Score sama (sesuai prioritas):",
+            options=criteria_cols,
+            default=[col for col in DEFAULT_TIE_BREAKER_CRITERIA if col in criteria_cols],
+            help="Kriteria cost diurutkan dari nilai terkecil, kriteria benefit dari nilai terbesar",
+            key="tie_breakers"
+        )
+        tie_breakers = [(col, criteria_type[col] == 'cost') for col in tie_breaker_cols]
     
     with tab_weights:
         st.write("Tentukan bobot kepentingan untuk setiap kriteria")
@@ -227,241 +895,351 @@ if uploaded_file is not None:
         st.markdown("### 🔥 Preset Bobot")
         preset_option = st.radio(
             "Pilih preset bobot:",
-            options=["Equal (Sama Rata)", "Recommended (Rekomendasi)", "Custom (Manual)"],
+            options=[profile.label for profile in preset_materializer.profiles] + ["Custom (Manual)"],
             horizontal=True
         )
         
         weights = {}
         
-        if preset_option == "Equal (Sama Rata)":
-            equal_weight = 100 / len(criteria_cols)
-            for col in criteria_cols:
-                weights[col] = equal_weight
-            st.info(f"✓ Setiap kriteria memiliki bobot yang sama: {equal_weight:.2f}%")
-            
-        elif preset_option == "Recommended (Rekomendasi)":
-            # Bobot rekomendasi (sesuaikan dengan kebutuhan)
-            recommended = {
-                'Price': 30,
-                'Distance': 25,
-                'Size': 15,
-                'Wifi': 15,
-                'Security_Score': 15
-            }
-            for col in criteria_cols:
-                weights[col] = recommended.get(col, 100/len(criteria_cols))
+        if preset_option != "Custom (Manual)":
+            profile = next(p for p in preset_materializer.profiles if p.label == preset_option)
+            problems = preset_materializer.problems(dataset.key, profile.id)
             
-            st.info("✓ Menggunakan bobot rekomendasi:")
-            cols = st.columns(len(criteria_cols))
-            for i, col in enumerate(criteria_cols):
-                with cols[i]:
-                    st.metric(col, f"{weights[col]}%")
+            if problems:
+                # Preset tidak cocok dengan kolom dataset: jangan diam-diam diganti bobot lain
+                weights = {col: 0.0 for col in criteria_cols}
+                st.error(f"❌ Preset **{profile.label}** tidak cocok dengan dataset ini:\n" + "\n".join(f"- {p}" for p in problems))
+            elif profile.is_equal:
+                weights = profile.weights_for(criteria_cols)
+                st.info(f"✓ Setiap kriteria memiliki bobot yang sama: {weights[criteria_cols[0]]:.2f}%")
+            else:
+                weights = profile.weights_for(criteria_cols)
+                st.info(f"✓ Menggunakan bobot {profile.label}:")
+                cols = st.columns(len(criteria_cols))
+                for i, col in enumerate(criteria_cols):
+                    with cols[i]:
+                        st.metric(col, f"{weights[col]}%")
         
         else:  # Custom
-            st.markdown("### Atur Bobot Manual")
-            st.write("Gunakan slider untuk mengatur bobot setiap kriteria (total harus = 100%)")
-            
-            # Inisialisasi dengan bobot equal
-            if 'weights_initialized' not in st.session_state:
-                st.session_state.weights_initialized = True
-                st.session_state.custom_weights = {col: 100/len(criteria_cols) for col in criteria_cols}
-            
-            # Slider untuk setiap kriteria
-            for col in criteria_cols:
-                weights[col] = st.slider(
-                    f"**{col}**",
-                    min_value=0.0,
-                    max_value=100.0,
-                    value=st.session_state.custom_weights.get(col, 100/len(criteria_cols)),
-                    step=0.5,
-                    key=f"weight_{col}",
-                    help=f"Bobot kepentingan untuk kriteria {col}"
-                )
-                st.session_state.custom_weights[col] = weights[col]
+            # Bobot pada run penuh ini dicatat sebelum slider dibuat; fragment membandingkannya
+            # dengan bobot slider untuk menentukan kapan seluruh halaman perlu dijalankan ulang
+            st.session_state.applied_weights = custom_weight_values(criteria_cols)
+            custom_weights_view(dataset, criteria_type, tie_breakers, batch_active=upload_batch is not None)
+            weights = custom_weight_values(criteria_cols)
         
-        # Validasi total bobot
-        total_weight = sum(weights.values())
-        if abs(total_weight - 100) < 0.01:  # Toleransi kecil untuk floating point
-            st.success(f"✅ Total bobot: {total_weight:.2f}%")
-        else:
-            st.error(f"❌ Total bobot: {total_weight:.2f}% (max 100%)")
-
+        if preset_option != "Custom (Manual)":
+            # Validasi total bobot preset (bobot custom divalidasi di dalam fragment slider)
+            weight_total_status(weights, criteria_cols)
+    
+    with tab_export:
+        st.write("Tentukan format file hasil yang akan diunduh setelah perhitungan")
         
-        # Tampilkan distribusi bobot dalam chart
-        if preset_option == "Custom (Manual)":
-            st.markdown("### 📊 Distribusi Bobot")
-            fig, ax = plt.subplots(figsize=(10, 4))
-            colors = plt.cm.Set3(range(len(criteria_cols)))
-            ax.bar(criteria_cols, [weights[col] for col in criteria_cols], color=colors)
-            ax.set_ylabel('Bobot (%)')
-            ax.set_title('Distribusi Bobot Kriteria')
-            ax.axhline(y=100/len(criteria_cols), color='r', linestyle='--', label='Equal Weight')
-            ax.legend()
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
+        export_format = st.selectbox(
+            "Format file:",
+            options=list(EXPORT_FORMATS.keys()),
+            format_func=lambda fmt: EXPORT_FORMATS[fmt]['label'],
+            key="export_format"
+        )
+        include_details = st.checkbox(
+            "Sertakan matrix ternormalisasi, matrix terbobot, dan bobot (file .zip)",
+            value=False,
+            key="export_include_details"
+        )
+        save_history = st.checkbox(
+            "Simpan hasil setiap perhitungan ke riwayat ranking",
+            value=False,
+            key="save_history",
+            help="Yi dan urutan ranking disimpan sebagai snapshot ringkas untuk melihat perubahan ranking dari waktu ke waktu"
+        )
     
     st.markdown("---")
     
-    # Tombol untuk menghitung
-    total_weight = sum(weights.values())
-    can_calculate = abs(total_weight - 100) < 0.01
+    # Tombol untuk menghitung: data, bobot (total 100%), dan tipe kriteria divalidasi sekaligus
+    validation_report = validate_inputs(
+        criteria_type=criteria_type, weights=weights, criteria_cols=criteria_cols,
+        weight_total=100, data_report=dataset.report
+    )
+    can_calculate = validation_report.ok
     
     if not can_calculate:
-        st.warning("⚠️ Total bobot harus = 100% untuk melakukan perhitungan!")
+        st.warning("⚠️ Perhitungan belum bisa dilakukan:\n" + "\n".join(f"- {message}" for message in validation_report.messages()))
+    
+    # What-if: ubah nilai satu listing dan lihat perubahan rankingnya
+    with st.expander("✏️ What-If: Ubah Nilai Listing"):
+        st.caption("Ubah harga, WiFi, atau kriteria lain pada satu listing untuk melihat perubahan ranking "
+                   "tanpa mengedit dan mengupload ulang dataset.")
+        # Scorer (Yi seluruh dataset) hanya dibuat setelah panel diaktifkan, lalu disimpan per dataset dan bobot
+        if not can_calculate:
+            st.info("Lengkapi bobot dan tipe kriteria terlebih dahulu.")
+        elif st.toggle("Aktifkan What-If", key="whatif_enabled"):
+            whatif_view(dataset, criteria_type, {k: v/100 for k, v in weights.items()})
+    
+    # Query terbalik: bobot terdekat yang membuat listing pilihan menjadi peringkat teratas
+    with st.expander("🎯 Bobot agar Listing Menang"):
+        st.caption("Pilih listing untuk melihat perubahan bobot terkecil dari bobot saat ini "
+                   "yang membuatnya menjadi peringkat 1 atau masuk top-K.")
+        # Isi expander tetap dijalankan saat tertutup, sehingga Pareto front hanya dihitung setelah diaktifkan
+        if not can_calculate:
+            st.info("Lengkapi bobot dan tipe kriteria terlebih dahulu.")
+        elif st.toggle("Cari bobot", key="inverse_enabled",
+                       help="Pareto front dihitung sekali per dataset dan tipe kriteria saat pertama kali diaktifkan"):
+            inverse_view(dataset, criteria_type, {k: v/100 for k, v in weights.items()})
+    
+    # Riwayat: perubahan ranking antar perhitungan yang disimpan sebagai snapshot
+    with st.expander("📈 Riwayat Ranking"):
+        if st.toggle("Tampilkan riwayat", key="history_enabled"):
+            history_view(dataset)
+    
+    # Multi-file: hasil per file muncul begitu file tersebut selesai, lalu digabung dengan norma global
+    if upload_batch is not None:
+        st.subheader("📦 Hasil Multi-File")
+        if can_calculate:
+            upload_batch.configure(criteria_type, {k: v/100 for k, v in weights.items()}, tie_breakers)
+        else:
+            st.info("Lengkapi bobot dan tipe kriteria untuk menghitung semua file.")
+        if upload_batch.finished:
+            batch_results(upload_batch)
+        else:
+            batch_progress_view(upload_batch)
     
     if st.button("Hitung MOORA", type="primary", use_container_width=True, disabled=not can_calculate):
         # Konversi bobot ke desimal (0-1)
         weights_decimal = {k: v/100 for k, v in weights.items()}
         
-        try:
-            # Hitung MOORA menggunakan fungsi dari calculate.py
-            normalized_matrix, weighted_normalized, yi_values = calculate_moora(df, criteria_type, weights_decimal)
-            
-            # Buat dataframe hasil
-            result_df = create_result_dataframe(df, yi_values)
-            
-            # Tampilkan hasil
-            st.markdown("---")
-            st.markdown("### 📊 Hasil Perhitungan MOORA")
-            
-            # Tampilkan bobot yang digunakan
-            with st.expander("🔍 Lihat Bobot yang Digunakan"):
-                weight_df = pd.DataFrame({
-                    'Kriteria': criteria_cols,
-                    'Bobot (%)': [weights[col] for col in criteria_cols],
-                    'Tipe': [criteria_type[col] for col in criteria_cols]
-                })
-                st.dataframe(weight_df, use_container_width=True)
-            
-            # Tab untuk hasil
-            tab1, tab2, tab3, tab4 = st.tabs(["🏆 Ranking Akhir", "📋 Matrix Ternormalisasi", "⚖️ Matrix Terbobot", "📊 Visualisasi"])
-            
-            with tab1:
-                st.write("**Hasil Ranking Pemilihan Kost:**")
+        # Governor memilih mode paling lengkap yang muat dalam budget memori dan waktu sesi
+        with timed('plan'):
+            decision = resource_governor.plan(dataset.n_rows, len(criteria_cols), k=DEFAULT_TOP_K)
+        full_mode = decision.mode == MODE_FULL
+        if not decision.allowed:
+            st.error(f"❌ {decision.reason}")
+            st.stop()
+        if decision.degraded:
+            st.warning(f"⚠️ Mode {MODE_LABELS[decision.mode]}: {decision.reason}")
+        if decision.mode == MODE_APPROXIMATE:
+            with resource_governor.reserve(decision), \
+                    observability.request('calculate', session=session_id, rows=dataset.n_rows, mode=decision.mode):
+                try:
+                    with timed('approximate'):
+                        progressive_ranking_view(df, criteria_cols, criteria_type, weights_decimal, DEFAULT_TOP_K,
+                                                 tie_breakers, sum_squares=dataset.sum_squares)
+                except ValueError as e:
+                    st.error(f"❌ {str(e)}")
+            st.stop()
+        
+        # Grafik dirender di worker pipeline bersamaan dengan serialisasi tabel hasil;
+        # pipeline dibatalkan jika script dijalankan ulang sebelum selesai
+        with resource_governor.reserve(decision), \
+                observability.request('calculate', session=session_id, rows=dataset.n_rows, mode=decision.mode), \
+                (Pipeline().bind_session(st.session_state) if pipeline_mode else contextlib.nullcontext()) as render_pipeline:
+            try:
+                # Hitung MOORA memakai norma kolom yang sudah disimpan di registry,
+                # atau ambil Yi dan urutan ranking dari cache disk
+                def compute_ranking():
+                    with timed('compute'):
+                        if decision.mode == MODE_STREAMING:
+                            # Yi langsung dari matrix tanpa matrix ternormalisasi/terbobot
+                            yi = dataset.scores(criteria_type, weights_decimal)
+                        else:
+                            _, _, yi = dataset.calculate(criteria_type, weights_decimal)
+                        order, _ = rank_alternatives(yi, [(df[col].to_numpy(), asc) for col, asc in tie_breakers])
+                    return yi, order
                 
-                # Styling untuk top 3
-                def highlight_top3(row):
-                    color = ''
-                    if row['Ranking'] == 1:
-                        color = 'background-color: #FFD700; font-weight: bold; color: #000000;'
-                    elif row['Ranking'] == 2:
-                        color = 'background-color: #C0C0C0; font-weight: bold; color: #000000;'
-                    elif row['Ranking'] == 3:
-                        color = 'background-color: #CD7F32; font-weight: bold; color: #000000;'
-                    return [color] * len(row)
+                cache_key = make_cache_key(dataset.key, criteria_cols, criteria_type, weights, tie_breakers)
+                materialized = preset_materializer.lookup(cache_key)
+                observability.record_cache('preset', materialized is not None)
+                if materialized is not None:
+                    # Ranking preset sudah dihitung saat dataset dimuat
+                    yi_values, ranking_order = materialized
+                    st.caption("⚡ Hasil preset sudah dihitung sebelumnya")
+                else:
+                    yi_values, ranking_order, from_cache = result_cache.get_or_compute(cache_key, compute_ranking)
+                    if from_cache:
+                        st.caption("⚡ Hasil diambil dari cache")
                 
-                styled_df = result_df.style.apply(highlight_top3, axis=1)
-                st.dataframe(styled_df, use_container_width=True)
+                # Matrix untuk ditampilkan dihitung dari matrix dan norma bersama (hanya mode lengkap)
+                if full_mode:
+                    normalized_matrix = dataset.normalized()
+                    weighted_normalized = normalized_matrix * weight_vector(criteria_cols, weights_decimal)
                 
-                # Tampilkan top 3
-                st.markdown("### 🥇 Top 3 Rekomendasi Kost")
-                top3 = result_df.head(3)
+                # Buat dataframe hasil (mode selain lengkap hanya menyimpan Top-K)
+                with timed('result_table'):
+                    result_df = create_result_dataframe(
+                        df, yi_values, order=ranking_order if full_mode else ranking_order[:DEFAULT_TOP_K]
+                    )
+                if save_history:
+                    # Snapshot disimpan sebagai delta terhadap snapshot sebelumnya
+                    snapshot = get_snapshot_store().add(
+                        df['Name'], yi_values, ranking_order, label=dataset.label,
+                        metadata={'dataset': dataset.key, 'criteria_type': criteria_type,
+                                  'weights': {col: float(weights[col]) for col in criteria_cols}}
+                    )
+                    st.caption(f"📈 Disimpan ke riwayat sebagai snapshot #{snapshot['id']}")
+                top3_yi = result_df.head(3).set_index('Name')[['Yi (Score)']]
+                top3_png = render_pipeline.submit(render_top3_png, top3_yi) if render_pipeline else None
                 
-                cols = st.columns(3)
-                medals = ["🥇", "🥈", "🥉"]
-                for i, (idx, row) in enumerate(top3.iterrows()):
-                    with cols[i]:
-                        st.info(f"""
-                        **{medals[i]} Ranking {row['Ranking']}**
-                        
-                        **{row['Name']}**
-                        
-                        - 💰 Harga: Rp{row['Price']:,.0f}k
-                        - 🚶‍♂️ Jarak: {row['Distance']} km
-                        - 📏 Ukuran: {row['Size']} m²
-                        - 🛜 WiFi: {row['Wifi']} Mbps
-                        - 🛡️ Keamanan: {row['Security_Score']}/10
-                        
-                        **Yi Score: {row['Yi (Score)']:.4f}**
-                        """)
-            
-            with tab2:
-                st.write("**Matrix Keputusan Ternormalisasi:**")
-                normalized_df = pd.DataFrame(
-                    normalized_matrix,
-                    columns=criteria_cols,
-                    index=df['Name']
-                )
-                st.dataframe(normalized_df.style.format("{:.4f}"), use_container_width=True)
+                # Tampilkan hasil
+                st.markdown("---")
+                st.markdown("### 📊 Hasil Perhitungan MOORA")
                 
-                st.info("""
-                **Catatan:** 
-                - Matrix ternormalisasi menggunakan rumus: xij / √(Σxij²)
-                - Setiap nilai dinormalisasi terhadap akar kuadrat dari jumlah kuadrat kolom
-                """)
-            
-            with tab3:
-                st.write("**Matrix Ternormalisasi Terbobot:**")
-                weighted_df = pd.DataFrame(
-                    weighted_normalized,
-                    columns=criteria_cols,
-                    index=df['Name']
-                )
-                st.dataframe(weighted_df.style.format("{:.4f}"), use_container_width=True)
+                # Tampilkan bobot yang digunakan
+                with st.expander("🔍 Lihat Bobot yang Digunakan"):
+                    weight_df = pd.DataFrame({
+                        'Kriteria': criteria_cols,
+                        'Bobot (%)': [weights[col] for col in criteria_cols],
+                        'Tipe': [criteria_type[col] for col in criteria_cols]
+                    })
+                    st.dataframe(weight_df, use_container_width=True)
                 
-                st.info("""
-                **Catatan:** 
-                - Matrix terbobot = Matrix ternormalisasi × Bobot kriteria
-                - Bobot mempengaruhi kontribusi setiap kriteria terhadap score akhir
-                """)
-            
-            with tab4:
-                st.write("**Grafik Perbandingan Yi Score:**")
-                chart_data = result_df.set_index('Name')[['Yi (Score)']].sort_values('Yi (Score)', ascending=True)
-                st.bar_chart(chart_data)
-                st.line_chart(chart_data)
+                # Tab untuk hasil
+                tab1, tab2, tab3, tab4 = st.tabs(["🏆 Ranking Akhir", "📋 Matrix Ternormalisasi", "⚖️ Matrix Terbobot", "📊 Visualisasi"])
                 
-                st.write("**Distribusi Kriteria Top 3:**")
-                top3_criteria = result_df.head(3).set_index('Name')[criteria_cols]
-                st.line_chart(top3_criteria.T)
+                with tab1:
+                    st.write("**Hasil Ranking Pemilihan Kost:**")
+                    if not full_mode:
+                        st.caption(f"Menampilkan {len(result_df):,} dari {dataset.n_rows:,} alternatif teratas")
+                    
+                    # Styling untuk top 3
+                    def highlight_top3(row):
+                        color = ''
+                        if row['Ranking'] == 1:
+                            color = 'background-color: #FFD700; font-weight: bold; color: #000000;'
+                        elif row['Ranking'] == 2:
+                            color = 'background-color: #C0C0C0; font-weight: bold; color: #000000;'
+                        elif row['Ranking'] == 3:
+                            color = 'background-color: #CD7F32; font-weight: bold; color: #000000;'
+                        return [color] * len(row)
+                    
+                    with timed('render_table'):
+                        styled_df = result_df.style.apply(highlight_top3, axis=1)
+                        st.dataframe(styled_df, use_container_width=True)
+                    
+                    # Tampilkan top 3
+                    st.markdown("### 🥇 Top 3 Rekomendasi Kost")
+                    top3 = result_df.head(3)
+                    
+                    cols = st.columns(3)
+                    medals = ["🥇", "🥈", "🥉"]
+                    for i, (idx, row) in enumerate(top3.iterrows()):
+                        with cols[i]:
+                            st.info(f"""
+                            **{medals[i]} Ranking {row['Ranking']}**
+                            
+                            **{row['Name']}**
+                            
+                            - 💰 Harga: Rp{row['Price']:,.0f}k
+                            - 🚶‍♂️ Jarak: {row['Distance']} km
+                            - 📏 Ukuran: {row['Size']} m²
+                            - 🛜 WiFi: {row['Wifi']} Mbps
+                            - 🛡️ Keamanan: {row['Security_Score']}/10
+                            
+                            **Yi Score: {row['Yi (Score)']:.4f}**
+                            """)
                 
-                st.write("**Perbandingan Yi Score Top 3:**")
-                top3_yi = result_df.head(3).set_index('Name')[['Yi (Score)']]
-                fig, ax = plt.subplots(figsize=(8, 5))
-                colors = ['#FFD700', '#C0C0C0', '#CD7F32']
-                bars = ax.bar(top3_yi.index, top3_yi['Yi (Score)'].values, color=colors[:len(top3_yi)])
-                ax.set_title('Perbandingan Yi Score Top 3')
-                ax.set_ylabel('Yi Score')
-                ax.set_xlabel('Nama Kost')
-                ax.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-                ax.grid(axis='y', alpha=0.3)
+                with tab2:
+                    st.write("**Matrix Keputusan Ternormalisasi:**")
+                    if full_mode:
+                        normalized_df = pd.DataFrame(
+                            normalized_matrix,
+                            columns=criteria_cols,
+                            index=df['Name']
+                        )
+                        st.dataframe(normalized_df.style.format("{:.4f}"), use_container_width=True)
+                    else:
+                        st.info(f"Matrix tidak ditampilkan pada mode {MODE_LABELS[decision.mode]} untuk menghemat memori.")
+                    
+                    st.info("""
+                    **Catatan:** 
+                    - Matrix ternormalisasi menggunakan rumus: xij / √(Σxij²)
+                    - Setiap nilai dinormalisasi terhadap akar kuadrat dari jumlah kuadrat kolom
+                    """)
                 
-                # Label
-                for i, (name, score) in enumerate(zip(top3_yi.index, top3_yi['Yi (Score)'].values)):
-                    ax.text(i, score, f'{score:.4f}', ha='center', va='bottom' if score > 0 else 'top')
+                with tab3:
+                    st.write("**Matrix Ternormalisasi Terbobot:**")
+                    if full_mode:
+                        weighted_df = pd.DataFrame(
+                            weighted_normalized,
+                            columns=criteria_cols,
+                            index=df['Name']
+                        )
+                        st.dataframe(weighted_df.style.format("{:.4f}"), use_container_width=True)
+                    else:
+                        st.info(f"Matrix tidak ditampilkan pada mode {MODE_LABELS[decision.mode]} untuk menghemat memori.")
+                    
+                    st.info("""
+                    **Catatan:** 
+                    - Matrix terbobot = Matrix ternormalisasi × Bobot kriteria
+                    - Bobot mempengaruhi kontribusi setiap kriteria terhadap score akhir
+                    """)
                 
-                plt.xticks(rotation=45, ha='right')
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                with tab4:
+                    st.write("**Grafik Perbandingan Yi Score:**")
+                    chart_data = result_df.set_index('Name')[['Yi (Score)']].sort_values('Yi (Score)', ascending=True)
+                    st.bar_chart(chart_data)
+                    st.line_chart(chart_data)
+                    
+                    st.write("**Distribusi Kriteria Top 3:**")
+                    top3_criteria = result_df.head(3).set_index('Name')[criteria_cols]
+                    st.line_chart(top3_criteria.T)
+                    
+                    st.write("**Perbandingan Yi Score Top 3:**")
+                    if top3_png is not None:
+                        st.image(top3_png.result(), use_container_width=True)
+                    else:
+                        with timed('render_chart'):
+                            st.pyplot(top3_yi_figure(top3_yi))
 
+                
+                # Download hasil
+                st.markdown("---")
+                st.markdown("### <i class='bx bxs-download'></i> Download Hasil", unsafe_allow_html=True)
+                
+                # Matrix detail hanya tersedia pada mode lengkap; mode lain mengekspor Top-K
+                export_details = include_details and full_mode
+                if include_details and not full_mode:
+                    st.caption(f"Matrix detail tidak disertakan pada mode {MODE_LABELS[decision.mode]}; "
+                               f"file berisi {len(result_df):,} alternatif teratas.")
+                
+                # Export ditulis per chunk ke file sementara di disk saat tombol diklik
+                def build_export():
+                    with observability.request('export', session=session_id, rows=len(result_df), fmt=export_format), \
+                            timed('export'):
+                        return export_file()
+                
+                def export_file():
+                    details = {}
+                    if export_details:
+                        details = dict(
+                            normalized=normalized_matrix,
+                            weighted=weighted_normalized,
+                            criteria_cols=criteria_cols,
+                            names=df['Name'].values,
+                            weights=weights,
+                            criteria_type=criteria_type,
+                        )
+                    # Export ditulis per chunk ke file sementara; download_button tetap membutuhkan
+                    # bytes, jadi file dibaca sekali lalu langsung ditutup (dan dihapus)
+                    with export_results(result_df, fmt=export_format, buffer=tempfile.TemporaryFile(),
+                                        **details) as buffer:
+                        return buffer.read()
+                
+                file_name, mime = export_file_info(export_format, bundle=export_details)
+                st.download_button(
+                    type="primary",
+                    label=f"Download Hasil Ranking ({EXPORT_FORMATS[export_format]['label']})",
+                    data=build_export,
+                    file_name=file_name,
+                    mime=mime,
+                    on_click="ignore",
+                    use_container_width=True
+                )
             
-            # Download hasil
-            st.markdown("---")
-            st.markdown("### <i class='bx bxs-download'></i> Download Hasil", unsafe_allow_html=True)
-            
-            # Tambahkan info bobot ke hasil
-            result_with_weights = result_df.copy()
-            
-            csv = result_with_weights.to_csv(index=False)
-            st.download_button(
-                type="primary",
-                label="Download Hasil Ranking (CSV)",
-                data=csv,
-                file_name="hasil_rekomendasi_kost.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
-        except ValueError as e:
-            st.error(f"❌ {str(e)}")
-        except Exception as e:
-            st.error(f"❌ Terjadi kesalahan dalam perhitungan: {str(e)}")
+            except ValueError as e:
+                st.error(f"❌ {str(e)}")
+            except Exception as e:
+                st.error(f"❌ Terjadi kesalahan dalam perhitungan: {str(e)}")
 
 else:
-    # Tampilan awal jika belum upload file
+    # Tampilan awal jika belum ada dataset
     st.info("👆 Silakan upload file dataset kost untuk memulai analisis MOORA")
     
     st.markdown("### 📝 Format Dataset yang Diperlukan")
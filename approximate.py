@@ -0,0 +1,362 @@
+import numpy as np
+import pandas as pd
+
+from calculate import column_sum_squares, criteria_signs, weight_vector, rank_alternatives
+from federated import RegionDataset
+
+
+# Ukuran default reservoir sample untuk estimasi norma
+DEFAULT_SAMPLE_SIZE = 10_000
+
+# Nilai z untuk interval kepercayaan norma (±3 standard error, ~99.7% per kolom)
+DEFAULT_CONFIDENCE_Z = 3.0
+
+# Batas jumlah kandidat yang disimpan selama streaming
+DEFAULT_MAX_CANDIDATES = 100_000
+
+
+def count_csv_rows(path, block_size=1 << 20):
+    """
+    Menghitung jumlah baris data CSV (tanpa header) dengan membaca byte mentah.
+
+    Hanya dipakai untuk estimasi; jumlah baris sebenarnya diketahui setelah
+    streaming selesai.
+
+    Examples:
+    ---------
+    >>> import tempfile
+    >>> with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as f:
+    ...     _ = f.write('Name,Price\\nA,900\\nB,1200\\n')
+    >>> count_csv_rows(f.name)
+    2
+    """
+    newlines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            newlines += block.count(b'\n')
+            last = block[-1:]
+    # Baris terakhir tanpa newline tetap dihitung, header tidak dihitung
+    return max(newlines + (last != b'\n') - 1, 0)
+
+
+class ReservoirSample:
+    """
+    Reservoir sample (Algorithm R) dari baris matrix yang datang per chunk.
+
+    Setiap baris yang sudah dilihat memiliki peluang yang sama untuk berada di
+    reservoir, berapa pun jumlah chunk-nya.
+
+    Parameters:
+    -----------
+    size : int
+        Jumlah baris maksimal di reservoir
+    n_cols : int
+        Jumlah kolom matrix
+    seed : int, optional
+        Seed random generator
+
+    Examples:
+    ---------
+    >>> sample = ReservoirSample(3, 1, seed=0)
+    >>> sample.update(np.arange(10.0).reshape(-1, 1))
+    >>> sample.rows.shape, sample.seen
+    ((3, 1), 10)
+    """
+
+    def __init__(self, size, n_cols, seed=None):
+        self.size = size
+        self.seen = 0
+        self._rows = np.empty((size, n_cols))
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def rows(self):
+        return self._rows[:min(self.seen, self.size)]
+
+    def update(self, X):
+        """Menambahkan satu chunk baris ke reservoir."""
+        m = X.shape[0]
+        # Slot kosong diisi langsung
+        fill = min(max(self.size - self.seen, 0), m)
+        self._rows[self.seen:self.seen + fill] = X[:fill]
+
+        rest = np.arange(fill, m)
+        if rest.size:
+            # Baris ke-t (0-based) menggantikan slot acak j jika j < size
+            slots = (self._rng.random(rest.size) * (self.seen + rest + 1)).astype(np.int64)
+            replace = slots < self.size
+            rows, slots = rest[replace], slots[replace]
+            # Jika satu slot terpilih beberapa kali, baris terakhir yang menang (sesuai urutan stream)
+            unique_slots, last = np.unique(slots[::-1], return_index=True)
+            self._rows[unique_slots] = X[rows[::-1][last]]
+        self.seen += m
+
+
+class ApproximateResult:
+    """
+    Satu snapshot ranking selama streaming.
+
+    Attributes:
+    -----------
+    top : pandas.DataFrame
+        Top-K sementara dengan kolom 'Yi (Score)' dan 'Ranking'
+    rows_seen : int
+        Jumlah baris yang sudah dibaca
+    total_rows : int
+        Estimasi jumlah seluruh baris
+    norms : numpy.ndarray
+        Estimasi √(Σxij²) per kolom
+    norms_low, norms_high : numpy.ndarray
+        Batas bawah dan atas norma (interval kepercayaan)
+    exact : bool
+        True jika norma dan ranking sudah pasti (seluruh data sudah dibaca)
+    """
+
+    def __init__(self, top, rows_seen, total_rows, norms, norms_low, norms_high, exact):
+        self.top = top
+        self.rows_seen = rows_seen
+        self.total_rows = total_rows
+        self.norms = norms
+        self.norms_low = norms_low
+        self.norms_high = norms_high
+        self.exact = exact
+
+    @property
+    def progress(self):
+        """Fraksi baris yang sudah dibaca (0-1)."""
+        if self.exact or not self.total_rows:
+            return 1.0
+        return min(self.rows_seen / self.total_rows, 1.0)
+
+    @property
+    def max_relative_error(self):
+        """Setengah lebar interval norma terbesar relatif terhadap estimasinya."""
+        return float(np.max((self.norms_high - self.norms_low) / (2 * self.norms)))
+
+
+def estimate_norms(seen_sum_squares, sample, remaining_rows, z=DEFAULT_CONFIDENCE_Z):
+    """
+    Estimasi norma kolom dari jumlah kuadrat baris yang sudah dibaca dan reservoir sample.
+
+    Σxij² = Σ(baris terbaca, pasti) + sisa_baris × rata-rata xij² sample,
+    dengan interval kepercayaan dari standard error rata-rata sample.
+
+    Parameters:
+    -----------
+    seen_sum_squares : numpy.ndarray
+        Σxij² pasti dari baris yang sudah dibaca
+    sample : numpy.ndarray
+        Baris reservoir sample
+    remaining_rows : int
+        Estimasi jumlah baris yang belum dibaca
+    z : float
+        Nilai z interval kepercayaan
+
+    Returns:
+    --------
+    tuple
+        (norms, norms_low, norms_high)
+
+    Examples:
+    ---------
+    >>> norms, low, high = estimate_norms(np.array([9.0]), np.array([[3.0]]), 0)
+    >>> norms, low, high
+    (array([3.]), array([3.]), array([3.]))
+    """
+    if remaining_rows <= 0 or sample.shape[0] == 0:
+        norms = np.sqrt(seen_sum_squares)
+        return norms, norms.copy(), norms.copy()
+
+    squares = sample * sample
+    mean = squares.mean(axis=0)
+    std_error = squares.std(axis=0, ddof=1) / np.sqrt(sample.shape[0]) if sample.shape[0] > 1 else mean
+    # Batas bawah tidak pernah kurang dari jumlah kuadrat yang sudah pasti
+    low = seen_sum_squares + remaining_rows * np.maximum(mean - z * std_error, 0.0)
+    high = seen_sum_squares + remaining_rows * (mean + z * std_error)
+    return np.sqrt(seen_sum_squares + remaining_rows * mean), np.sqrt(low), np.sqrt(high)
+
+
+def coefficient_bounds(criteria_cols, criteria_type, weights, norms_low, norms_high):
+    """
+    Batas koefisien skor (tanda × bobot / norma) untuk norma di dalam interval.
+
+    Karena semua nilai kriteria positif, batas skor setiap baris adalah
+    X @ coef_low dan X @ coef_high.
+
+    Returns:
+    --------
+    tuple
+        (coef_low, coef_high)
+    """
+    signed = criteria_signs(criteria_cols, criteria_type) * weight_vector(criteria_cols, weights)
+    by_low, by_high = signed / norms_low, signed / norms_high
+    return np.minimum(by_low, by_high), np.maximum(by_low, by_high)
+
+
+class ProgressiveRanking(RegionDataset):
+    """
+    Ranking MOORA perkiraan untuk dataset sangat besar yang disempurnakan bertahap.
+
+    Selama data dibaca per chunk:
+    1. Σxij² baris yang sudah dibaca dijumlahkan secara pasti, dan baris
+       disimpan ke reservoir sample untuk mengestimasi sisa data.
+    2. Setiap chunk menghasilkan top-K sementara dari norma estimasi beserta
+       interval kepercayaannya.
+    3. Kandidat yang batas atas skornya di bawah batas bawah skor ke-K dibuang,
+       sehingga hanya sedikit baris yang disimpan.
+
+    Setelah seluruh data dibaca, norma menjadi pasti dan kandidat dihitung
+    ulang. Jika norma pasti ternyata berada di luar interval yang dipakai
+    untuk membuang kandidat (estimasi meleset, misalnya file terurut), atau
+    batas kandidat tercapai, data dibaca sekali lagi dengan norma pasti
+    sehingga hasil akhir selalu sama dengan perhitungan penuh.
+
+    Parameters:
+    -----------
+    source : pandas.DataFrame atau str
+        DataFrame, atau path CSV yang dibaca per chunk
+    criteria_cols : list
+        Urutan kolom kriteria
+    chunk_size : int
+        Jumlah baris per chunk
+    sample_size : int
+        Ukuran reservoir sample
+    total_rows : int, optional
+        Jumlah baris (default: panjang DataFrame atau hitungan baris CSV)
+    seed : int, optional
+        Seed reservoir sample
+    sum_squares : numpy.ndarray, optional
+        Σxij² pasti per kolom jika sudah diketahui (misalnya dari registry);
+        norma tidak diestimasi sehingga setiap top-K sementara sudah memakai
+        norma pasti dan tidak pernah perlu dibaca ulang
+
+    Examples:
+    ---------
+    >>> df = pd.DataFrame({'Name': ['A', 'B', 'C'], 'Price': [900, 1800, 1200], 'Size': [12, 20, 15]})
+    >>> ranking = ProgressiveRanking(df, ['Price', 'Size'], chunk_size=2)
+    >>> results = list(ranking.iter_results({'Price': 'cost', 'Size': 'benefit'},
+    ...                                     {'Price': 0.5, 'Size': 0.5}, k=2))
+    >>> results[-1].exact, results[-1].top['Name'].tolist()
+    (True, ['A', 'C'])
+    """
+
+    def __init__(self, source, criteria_cols, chunk_size=100_000, sample_size=DEFAULT_SAMPLE_SIZE,
+                 total_rows=None, seed=None, sum_squares=None):
+        super().__init__('dataset', source, criteria_cols, chunk_size)
+        self.sample_size = sample_size
+        self.seed = seed
+        self.known_sum_squares = None if sum_squares is None else np.asarray(sum_squares, dtype=float)
+        if total_rows is None:
+            total_rows = len(source) if isinstance(source, pd.DataFrame) else count_csv_rows(source)
+        self.total_rows = total_rows
+        # Jumlah pembacaan ulang dengan norma pasti (0 jika hasil terbukti dari kandidat)
+        self.rescans = 0
+
+    def _top(self, pool, X, coefficients, k, tie_breakers):
+        """Top-K dari kandidat dengan koefisien tertentu."""
+        yi_values = X @ coefficients
+        tie_keys = [(pool[col].to_numpy(), ascending) for col, ascending in tie_breakers]
+        order, rankings = rank_alternatives(yi_values, tie_keys)
+        top = pool.take(order[:k]).reset_index(drop=True)
+        top['Yi (Score)'] = yi_values[order[:k]]
+        top['Ranking'] = rankings[:k]
+        return top
+
+    def iter_results(self, criteria_type, weights, k=10, tie_breakers=None,
+                     z=DEFAULT_CONFIDENCE_Z, max_candidates=DEFAULT_MAX_CANDIDATES):
+        """
+        Menghasilkan ApproximateResult setelah setiap chunk, lalu hasil pasti.
+
+        Parameters:
+        -----------
+        criteria_type : dict
+            Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+        weights : dict
+            Dictionary bobot setiap kriteria dalam bentuk desimal (total = 1.0)
+        k : int
+            Jumlah alternatif teratas
+        tie_breakers : list, optional
+            List (nama_kolom, ascending) untuk Yi yang sama
+        z : float
+            Nilai z interval kepercayaan norma
+        max_candidates : int
+            Batas jumlah kandidat yang disimpan selama streaming
+
+        Yields:
+        -------
+        ApproximateResult
+            Snapshot terakhir selalu memiliki exact=True
+
+        Raises:
+        -------
+        ValueError
+            - Jika k < 1, kolom tidak ada, atau ada nilai nol/negatif
+        """
+        if k < 1:
+            raise ValueError("k harus minimal 1!")
+        tie_breakers = list(tie_breakers or [])
+        columns = ['Name'] + self.criteria_cols
+        sample = ReservoirSample(max(min(self.sample_size, self.total_rows), 1), len(self.criteria_cols), seed=self.seed)
+        seen_sum_squares = np.zeros(len(self.criteria_cols))
+        pool = pd.DataFrame(columns=columns)
+        pool_X = np.empty((0, len(self.criteria_cols)))
+        # Irisan semua interval norma yang dipakai untuk membuang kandidat
+        pruned_low = np.zeros(len(self.criteria_cols))
+        pruned_high = np.full(len(self.criteria_cols), np.inf)
+        certified = True
+
+        rows_seen = 0
+        for chunk in self._chunks():
+            X = self._check_chunk(chunk)
+            rows_seen += len(X)
+            if self.known_sum_squares is None:
+                seen_sum_squares += column_sum_squares(X)
+                sample.update(X)
+                remaining = max(self.total_rows - rows_seen, 0)
+                norms, norms_low, norms_high = estimate_norms(seen_sum_squares, sample.rows, remaining, z)
+            else:
+                # Norma pasti sudah diketahui: interval kepercayaan tidak diperlukan
+                norms = np.sqrt(self.known_sum_squares)
+                norms_low, norms_high = norms, norms
+
+            pool = pd.concat([pool, chunk[columns]], ignore_index=True) if len(pool) else chunk[columns].reset_index(drop=True)
+            pool_X = np.vstack([pool_X, X])
+            if len(pool) > k:
+                coef_low, coef_high = coefficient_bounds(self.criteria_cols, criteria_type, weights, norms_low, norms_high)
+                lower, upper = pool_X @ coef_low, pool_X @ coef_high
+                kth_lower = np.partition(lower, len(lower) - k)[len(lower) - k]
+                keep = upper >= kth_lower
+                if keep.sum() > max_candidates:
+                    # Terlalu banyak kandidat: simpan yang terbaik menurut estimasi, hasil akhir perlu dibaca ulang
+                    estimate = pool_X @ (criteria_signs(self.criteria_cols, criteria_type)
+                                         * weight_vector(self.criteria_cols, weights) / norms)
+                    keep = np.zeros(len(pool), dtype=bool)
+                    keep[np.argpartition(-estimate, max_candidates - 1)[:max_candidates]] = True
+                    certified = False
+                if not keep.all():
+                    pruned_low = np.maximum(pruned_low, norms_low)
+                    pruned_high = np.minimum(pruned_high, norms_high)
+                    pool, pool_X = pool[keep].reset_index(drop=True), pool_X[keep]
+
+            coefficients = criteria_signs(self.criteria_cols, criteria_type) * weight_vector(self.criteria_cols, weights) / norms
+            yield ApproximateResult(self._top(pool, pool_X, coefficients, k, tie_breakers), rows_seen,
+                                    max(self.total_rows, rows_seen), norms, norms_low, norms_high, exact=False)
+
+        # Seluruh data sudah dibaca: norma pasti
+        self.total_rows = rows_seen
+        norms = np.sqrt(seen_sum_squares if self.known_sum_squares is None else self.known_sum_squares)
+        coefficients = criteria_signs(self.criteria_cols, criteria_type) * weight_vector(self.criteria_cols, weights) / norms
+        certified = certified and bool(np.all((pruned_low <= norms) & (norms <= pruned_high)))
+        if certified:
+            top = self._top(pool, pool_X, coefficients, k, tie_breakers)
+        else:
+            # Estimasi meleset: kandidat yang benar mungkin sudah terbuang, baca ulang dengan norma pasti
+            self.rescans += 1
+            candidates = self.local_top_k(coefficients, k).drop(columns='Region')
+            top = self._top(candidates[columns], candidates[self.criteria_cols].to_numpy(dtype=float),
+                            coefficients, k, tie_breakers)
+        yield ApproximateResult(top, rows_seen, rows_seen, norms, norms.copy(), norms.copy(), exact=True)
@@ -0,0 +1,459 @@
+"""
+Upload banyak file CSV atau spreadsheet sekaligus.
+
+Setiap file diparsing, divalidasi, dan diskor di worker pool sehingga hasil
+per file bisa ditampilkan segera setelah file tersebut selesai. Ranking
+gabungan memakai norma global (Σxij² semua file dijumlahkan) seperti ranking
+federasi, sehingga hasilnya sama dengan menghitung gabungan semua file.
+"""
+import concurrent.futures
+import contextlib
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from federated import global_coefficients, merge_top_k
+from ingest import is_spreadsheet, register_spreadsheet, spreadsheet_shape
+from observability import annotate, request, timed
+from pipeline import Pipeline, PipelineCancelled
+
+
+# Jumlah file yang diproses bersamaan
+BATCH_WORKERS = 4
+
+# Interval pembaruan tampilan progres (detik)
+BATCH_POLL_SECONDS = 0.5
+
+# Jumlah alternatif teratas yang ditampilkan per file dan pada ranking gabungan
+BATCH_TOP_N = 10
+
+STATUS_QUEUED = 'queued'
+STATUS_PARSING = 'parsing'
+STATUS_WAITING = 'waiting'
+STATUS_SCORING = 'scoring'
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+STATUS_CANCELLED = 'cancelled'
+
+STATUS_LABELS = {
+    STATUS_QUEUED: "Menunggu",
+    STATUS_PARSING: "Membaca",
+    STATUS_WAITING: "Menunggu bobot",
+    STATUS_SCORING: "Menghitung",
+    STATUS_DONE: "Selesai",
+    STATUS_ERROR: "Gagal",
+    STATUS_CANCELLED: "Dibatalkan",
+}
+
+# Status yang tidak akan berubah lagi selama bobot tidak diganti
+FINAL_STATUSES = (STATUS_DONE, STATUS_ERROR, STATUS_CANCELLED)
+
+
+def _estimate_rows(data):
+    """Perkiraan jumlah baris data dari jumlah baris baru (untuk progres parsing)."""
+    lines = data.count(b'\n') + (0 if data.endswith(b'\n') else 1)
+    return max(lines - 1, 1)
+
+
+class FileJob:
+    """
+    Status pemrosesan satu file dalam batch.
+
+    Attributes:
+    -----------
+    name : str
+        Nama file
+    size : int
+        Ukuran file (byte)
+    status : str
+        Salah satu konstanta STATUS_*
+    progress : float
+        Progres parsing antara 0 dan 1
+    rows : int
+        Jumlah baris yang sudah diparsing
+    entry : DatasetEntry atau None
+        Dataset di registry setelah parsing selesai
+    top : pandas.DataFrame atau None
+        Top-N file ini dengan norma file sendiri
+    error : str atau None
+        Pesan kesalahan jika status STATUS_ERROR
+    parse_ms, score_ms : float atau None
+        Durasi parsing dan perhitungan
+    """
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+        self.size = len(data)
+        self.status = STATUS_QUEUED
+        self.progress = 0.0
+        self.rows = 0
+        self.entry = None
+        self.top = None
+        self.error = None
+        self.parse_ms = None
+        self.score_ms = None
+        # True jika datanya sendiri tidak valid (tidak dihitung ulang saat bobot berubah)
+        self.invalid_data = False
+
+    @property
+    def scorable(self):
+        return self.entry is not None and not self.invalid_data
+
+    def __repr__(self):
+        return f"FileJob({self.name!r}, {self.status!r})"
+
+
+class UploadBatch:
+    """
+    Worker pool untuk parsing, validasi, dan perhitungan beberapa file upload.
+
+    Parsing dimulai saat batch dibuat. Perhitungan dimulai setelah tipe
+    kriteria dan bobot diketahui lewat configure(); file yang selesai
+    diparsing setelahnya langsung dihitung di worker yang sama. Mengganti
+    bobot menghitung ulang file yang sudah diparsing tanpa parsing ulang,
+    dan hasil dari bobot lama dibuang.
+
+    Parameters:
+    -----------
+    files : list
+        List (nama_file, isi_bytes)
+    registry : DatasetRegistry
+        Registry tempat dataset disimpan (file yang sama tidak diparsing dua kali)
+    governor : ResourceGovernor, optional
+        Jika diisi, setiap file diperiksa budget memorinya sebelum parsing
+    session : str, optional
+        ID sesi untuk log request
+    conversion_cache : ConversionCache, optional
+        Cache konversi file spreadsheet (.xls/.xlsx)
+    max_workers : int
+        Jumlah file yang diproses bersamaan
+    top_n : int
+        Jumlah alternatif teratas per file
+
+    Examples:
+    ---------
+    >>> from registry import DatasetRegistry
+    >>> files = [('a.csv', b'Name,Price,Size\\nA,900,12\\nB,1800,20\\n'), ('b.csv', b'Name,Price,Size\\nC,1200,15\\n')]
+    >>> with UploadBatch(files, DatasetRegistry()) as batch:
+    ...     batch.configure({'Price': 'cost', 'Size': 'benefit'}, {'Price': 0.6, 'Size': 0.4})
+    ...     batch.wait()
+    ...     batch.combined()[['File', 'Name', 'Ranking']].values.tolist()
+    [['a.csv', 'A', 1], ['b.csv', 'C', 2], ['a.csv', 'B', 3]]
+    """
+
+    def __init__(self, files, registry, governor=None, session=None, conversion_cache=None,
+                 max_workers=BATCH_WORKERS, top_n=BATCH_TOP_N):
+        self.jobs = [FileJob(name, data) for name, data in files]
+        self.registry = registry
+        self.governor = governor
+        self.session = session
+        self.conversion_cache = conversion_cache
+        self.top_n = top_n
+        self.cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self._config = None
+        self._version = 0
+        self._closed = False
+        # (versi bobot, file yang selesai, k) -> ranking gabungan terakhir
+        self._combined_cache = None
+        self._leases = []
+        self._pipelines = set()
+        self._score_futures = []
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix="sirekma-batch")
+        self._parse_futures = [self._executor.submit(self._parse, job) for job in self.jobs]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def _set_status(self, job, status):
+        with self._lock:
+            job.status = status
+
+    def _fail(self, job, message, invalid_data=False):
+        with self._lock:
+            job.status = STATUS_ERROR
+            job.error = message
+            job.invalid_data = invalid_data
+        annotate(error=message)
+
+    def _parse(self, job):
+        """Worker: parsing dan validasi data satu file, lalu menghitung jika bobot sudah ada."""
+        if self.cancelled.is_set():
+            self._set_status(job, STATUS_CANCELLED)
+            return None
+        with request('batch_file', session=self.session, file=job.name, upload_bytes=job.size):
+            self._set_status(job, STATUS_PARSING)
+            spreadsheet = is_spreadsheet(job.name)
+            total_rows = 1 if spreadsheet else _estimate_rows(job.data)
+
+            def progress(rows):
+                with self._lock:
+                    job.rows = rows
+                    job.progress = min(rows / total_rows, 1.0)
+
+            start = time.perf_counter()
+            try:
+                if self.governor is None:
+                    decision = None
+                else:
+                    shape = spreadsheet_shape(job.data, job.name) if spreadsheet else None
+                    decision = self.governor.plan_upload(job.data, shape=shape)
+                if decision is not None and not decision.allowed:
+                    self._fail(job, decision.reason, invalid_data=True)
+                    return None
+                with (self.governor.reserve(decision) if decision is not None else contextlib.nullcontext()), \
+                        timed('parse'), Pipeline(max_workers=1) as pipeline:
+                    with self._lock:
+                        self._pipelines.add(pipeline)
+                    if self.cancelled.is_set():
+                        pipeline.cancel()
+                    try:
+                        if spreadsheet:
+                            # Spreadsheet dibaca sekaligus (tanpa chunk), atau langsung dari cache konversi
+                            entry = register_spreadsheet(self.registry, job.data, job.name,
+                                                         cache=self.conversion_cache)
+                        else:
+                            entry = self.registry.register_bytes(job.data, label=job.name, pipeline=pipeline,
+                                                                 progress=progress)
+                    finally:
+                        with self._lock:
+                            self._pipelines.discard(pipeline)
+            except PipelineCancelled:
+                self._set_status(job, STATUS_CANCELLED)
+                return None
+            except pd.errors.EmptyDataError:
+                self._fail(job, "File CSV kosong atau tidak memiliki kolom!", invalid_data=True)
+                return None
+            except Exception as e:
+                self._fail(job, f"Terjadi kesalahan saat membaca file: {e}", invalid_data=True)
+                return None
+
+            # close() mungkin sudah melepas semua lease: jangan menahan dataset setelah batch ditutup
+            with self._lock:
+                closed = self._closed
+            if closed:
+                self._set_status(job, STATUS_CANCELLED)
+                return None
+            lease = self.registry.acquire(entry)
+            annotate(rows=entry.n_rows)
+            with self._lock:
+                closed = self._closed
+                if not closed:
+                    self._leases.append(lease)
+                    job.entry = entry
+                    job.data = None
+                    job.rows = entry.n_rows
+                    job.progress = 1.0
+                    job.parse_ms = (time.perf_counter() - start) * 1000
+                    job.status = STATUS_WAITING
+                    # Dibaca dalam lock yang sama dengan job.entry agar tidak terlewat oleh configure()
+                    version = self._version if self._config is not None else None
+                else:
+                    job.status = STATUS_CANCELLED
+            if closed:
+                lease.release()
+                return None
+            if not entry.report.ok:
+                self._fail(job, " ".join(entry.report.messages()), invalid_data=True)
+                return entry
+        if version is not None:
+            self._score(job, version)
+        return entry
+
+    def _score(self, job, version):
+        """Worker: menghitung Yi dan top-N satu file dengan norma file itu sendiri."""
+        with self._lock:
+            if version != self._version or not job.scorable or self.cancelled.is_set():
+                return
+            criteria_type, weights, tie_breakers = self._config
+            job.status = STATUS_SCORING
+        entry = job.entry
+        with request('batch_score', session=self.session, file=job.name, rows=entry.n_rows):
+            missing = [col for col in weights if col not in entry.criteria_cols]
+            extra = [col for col in entry.criteria_cols if col not in weights]
+            if missing or extra:
+                with self._lock:
+                    if version == self._version:
+                        job.status = STATUS_ERROR
+                        job.error = ("Kolom kriteria berbeda dengan dataset aktif: "
+                                     + ", ".join([f"tidak ada {col}" for col in missing]
+                                                 + [f"kolom tambahan {col}" for col in extra]))
+                return
+
+            start = time.perf_counter()
+            try:
+                with timed('score'):
+                    yi_values = entry.scores(criteria_type, weights)
+                    top = merge_top_k(self._candidates(entry, yi_values, list(entry.criteria_cols)),
+                                      self.top_n, tie_breakers)
+            except ValueError as e:
+                with self._lock:
+                    if version == self._version:
+                        job.status = STATUS_ERROR
+                        job.error = str(e)
+                return
+            with self._lock:
+                # Hasil bobot lama dibuang jika bobot sudah diganti selama perhitungan
+                if version == self._version:
+                    job.top = top
+                    job.score_ms = (time.perf_counter() - start) * 1000
+                    job.status = STATUS_DONE
+
+    def _candidates(self, entry, yi_values, criteria_cols):
+        """Baris dengan Yi top-N beserta semua baris yang Yi-nya sama dengan batas bawahnya."""
+        k = self.top_n
+        if len(yi_values) > k:
+            threshold = np.partition(yi_values, len(yi_values) - k)[len(yi_values) - k]
+            keep = np.flatnonzero(yi_values >= threshold)
+        else:
+            keep = np.arange(len(yi_values))
+        return entry.frame.iloc[keep][['Name'] + criteria_cols].assign(**{'Yi (Score)': yi_values[keep]})
+
+    def configure(self, criteria_type, weights, tie_breakers=None):
+        """
+        Mengatur tipe kriteria dan bobot (desimal), lalu menghitung semua file yang sudah diparsing.
+
+        Tidak melakukan apa pun jika konfigurasinya sama dengan sebelumnya.
+        """
+        config = (dict(criteria_type), dict(weights), list(tie_breakers or []))
+        with self._lock:
+            if config == self._config or self.cancelled.is_set():
+                return
+            self._config = config
+            self._version += 1
+            version = self._version
+            ready = [job for job in self.jobs if job.scorable]
+            for job in ready:
+                job.status = STATUS_SCORING
+                job.top = None
+                job.error = None
+        self._score_futures = [self._executor.submit(self._score, job, version) for job in ready]
+
+    @property
+    def finished(self):
+        """True jika semua file sudah mencapai status akhir (atau menunggu bobot jika belum dikonfigurasi)."""
+        with self._lock:
+            waiting_ok = self._config is None
+            return all(job.status in FINAL_STATUSES or (waiting_ok and job.status == STATUS_WAITING)
+                       for job in self.jobs)
+
+    def wait(self, timeout=None):
+        """Menunggu semua parsing dan perhitungan yang sudah dijadwalkan selesai."""
+        concurrent.futures.wait(self._parse_futures, timeout=timeout)
+        concurrent.futures.wait(list(self._score_futures), timeout=timeout)
+
+    def entry(self, index, timeout=None):
+        """
+        Menunggu parsing satu file selesai.
+
+        Returns:
+        --------
+        DatasetEntry atau None
+            None jika file gagal dibaca atau dibatalkan (lihat jobs[index].error)
+        """
+        return self._parse_futures[index].result(timeout=timeout)
+
+    def summary(self):
+        """
+        Ringkasan status setiap file untuk ditampilkan.
+
+        Returns:
+        --------
+        pandas.DataFrame
+        """
+        with self._lock:
+            rows = [{
+                'File': job.name,
+                'Status': STATUS_LABELS[job.status],
+                'Progres': job.progress,
+                'Baris': job.rows,
+                'Baca (ms)': job.parse_ms,
+                'Hitung (ms)': job.score_ms,
+                'Keterangan': job.error or "",
+            } for job in self.jobs]
+        return pd.DataFrame(rows)
+
+    def done_jobs(self):
+        """File yang sudah selesai dihitung dengan bobot saat ini."""
+        with self._lock:
+            return [job for job in self.jobs if job.status == STATUS_DONE]
+
+    def combined(self, k=None):
+        """
+        Ranking gabungan semua file yang sudah selesai, dengan norma global.
+
+        Norma global √(Σ Σxij² semua file) sama dengan norma gabungan seluruh
+        baris, sehingga Yi dan ranking sama dengan menghitung file-file
+        tersebut sebagai satu dataset. Selama masih ada file yang diproses,
+        hasilnya bersifat sementara. Hasil disimpan sampai bobot berubah atau
+        ada file lain yang selesai dihitung.
+
+        Parameters:
+        -----------
+        k : int, optional
+            Jumlah alternatif teratas (default top_n batch)
+
+        Returns:
+        --------
+        pandas.DataFrame atau None
+            Top-K dengan kolom File, Name, kriteria, Yi (Score), dan Ranking;
+            None jika belum ada file yang selesai
+        """
+        k = k or self.top_n
+        with self._lock:
+            config = self._config
+            done_indices = tuple(i for i, job in enumerate(self.jobs) if job.status == STATUS_DONE)
+            done = [self.jobs[i] for i in done_indices]
+            # Tampilan memanggil combined() setiap BATCH_POLL_SECONDS: hitung ulang hanya jika
+            # bobot berubah atau ada file yang baru selesai
+            cache_key = (self._version, done_indices, k)
+            if self._combined_cache is not None and self._combined_cache[0] == cache_key:
+                return self._combined_cache[1]
+        if config is None or not done:
+            return None
+        criteria_type, weights, tie_breakers = config
+        criteria_cols = list(weights)
+        # Urutan kolom bisa berbeda antar file: disamakan dengan urutan bobot
+        columns = [[job.entry.criteria_cols.index(col) for col in criteria_cols] for job in done]
+        coefficients, _ = global_coefficients([job.entry.sum_squares[idx] for job, idx in zip(done, columns)],
+                                              criteria_cols, criteria_type, weights)
+
+        candidates = []
+        for job, idx in zip(done, columns):
+            yi_values = job.entry.matrix[:, idx] @ coefficients
+            candidates.append(self._candidates(job.entry, yi_values, criteria_cols).assign(File=job.name))
+        result_df = merge_top_k(pd.concat(candidates, ignore_index=True), k, tie_breakers)
+        result_df = result_df[['File', 'Name'] + criteria_cols + ['Yi (Score)', 'Ranking']]
+        with self._lock:
+            self._combined_cache = (cache_key, result_df)
+        return result_df
+
+    def cancel(self):
+        """Membatalkan semua file yang belum selesai diparsing atau dihitung."""
+        self.cancelled.set()
+        with self._lock:
+            pipelines = list(self._pipelines)
+            for job in self.jobs:
+                if job.status not in FINAL_STATUSES:
+                    job.status = STATUS_CANCELLED
+        for pipeline in pipelines:
+            pipeline.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        """Membatalkan pekerjaan yang tersisa dan melepas dataset dari registry."""
+        self.cancel()
+        with self._lock:
+            # Worker yang selesai parsing setelah ini melepas lease-nya sendiri
+            self._closed = True
+            leases, self._leases = self._leases, []
+        for lease in leases:
+            lease.release()
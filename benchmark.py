@@ -0,0 +1,435 @@
+"""
+Benchmark performa perhitungan SIREKMA.
+
+Jalankan:
+    python benchmark.py
+    python benchmark.py --rows 100000 1000000 --repeat 5
+    python benchmark.py --only ranking --rows 10000000
+    python benchmark.py --only governor --rows 1000 10000 100000
+"""
+import argparse
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from calculate import calculate_moora, create_result_dataframe, rank_alternatives
+from kernel import available_backends, resolve_backend, score_matrix
+from approximate import ProgressiveRanking
+from pipeline import Pipeline
+from registry import DatasetRegistry
+from differential import generate_case, run_case, warm_up
+from inverse import InverseQuery
+from ingest import ConversionCache, register_spreadsheet
+from snapshots import SnapshotStore
+import governor
+
+
+# Batas jumlah baris satu sheet .xlsx
+EXCEL_MAX_ROWS = 1_048_575
+
+# Batas baris tabel bergaya saat mengukur governor (Styler lambat dan dibatasi styler.render.max_elements)
+STYLED_BENCH_ROWS = 20_000
+
+# Konstanta governor yang diturunkan oleh bench_governor: nama konstanta -> kolom hasil pengukuran
+GOVERNOR_CONSTANTS = {
+    'FRAME_BYTES_PER_CELL': 'frame_bytes_per_cell',
+    'PARSE_SECONDS_PER_CELL': 'parse_s_per_cell',
+    'SCORE_SECONDS_PER_CELL': 'score_s_per_cell',
+    'RANK_SECONDS_PER_ROW': 'rank_s_per_row',
+    'STYLED_BYTES_PER_CELL': 'styled_bytes_per_cell',
+    'STYLED_SECONDS_PER_CELL': 'styled_s_per_cell',
+    'ARROW_BYTES_PER_CELL': 'arrow_bytes_per_cell',
+    'ARROW_SECONDS_PER_CELL': 'arrow_s_per_cell',
+    'APPROXIMATE_BYTES_PER_CELL': 'approximate_bytes_per_cell',
+    'APPROXIMATE_SECONDS_PER_CELL': 'approximate_s_per_cell',
+}
+
+
+CRITERIA_COLS = ['Price', 'Distance', 'Size', 'Wifi', 'Security_Score']
+CRITERIA_TYPE = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit', 'Wifi': 'benefit', 'Security_Score': 'benefit'}
+WEIGHTS = {'Price': 0.30, 'Distance': 0.25, 'Size': 0.15, 'Wifi': 0.15, 'Security_Score': 0.15}
+
+
+def make_dataset(n_rows, seed=0):
+    """Membuat dataset kost acak dengan rentang nilai yang mirip dataset asli."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Name': [f"Kost_{i}" for i in range(n_rows)],
+        'Price': rng.integers(500, 2500, n_rows),
+        'Distance': rng.uniform(0.2, 8.0, n_rows).round(1),
+        'Size': rng.integers(6, 25, n_rows),
+        'Wifi': rng.integers(10, 100, n_rows),
+        'Security_Score': rng.integers(1, 11, n_rows),
+    })
+
+
+def time_call(func, repeat):
+    """Menjalankan func sebanyak repeat kali dan mengembalikan waktu terbaik (detik) beserta hasilnya."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_bytes(func):
+    """Puncak memori Python (tracemalloc) selama func dijalankan, dalam byte."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def round_up(value):
+    """Membulatkan ke atas ke satu angka penting, misalnya 1.3e-05 -> 2e-05."""
+    if value <= 0:
+        return 0.0
+    scale = 10 ** np.floor(np.log10(value))
+    return float(np.ceil(value / scale) * scale)
+
+
+def report(title, rows):
+    """Mencetak tabel hasil benchmark."""
+    print(f"\n== {title} ==")
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+def bench_scoring(row_counts, repeat):
+    """
+    Membandingkan kernel fused NumPy dengan Numba, beserta calculate_moora sebagai jalur produksi.
+
+    Baseline selalu backend 'numpy' eksplisit; calculate_moora memakai backend
+    'auto' sehingga labelnya menyebut backend yang benar-benar dipakai.
+    """
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows)
+        X = df[CRITERIA_COLS].to_numpy(dtype=float)
+        for backend in available_backends():
+            # Panggilan pertama Numba termasuk kompilasi JIT, tidak ikut diukur
+            score_matrix(X[:10], CRITERIA_COLS, CRITERIA_TYPE, WEIGHTS, backend=backend)
+        baseline_time, (yi_baseline, _) = time_call(
+            lambda: score_matrix(X, CRITERIA_COLS, CRITERIA_TYPE, WEIGHTS, backend='numpy'), repeat
+        )
+        rows.append({'rows': n_rows, 'path': 'kernel[numpy]', 'best_ms': baseline_time * 1000,
+                     'speedup': 1.0, 'max_abs_diff': 0.0})
+
+        if 'numba' in available_backends():
+            elapsed, (yi_values, _) = time_call(
+                lambda: score_matrix(X, CRITERIA_COLS, CRITERIA_TYPE, WEIGHTS, backend='numba'), repeat
+            )
+            rows.append({'rows': n_rows, 'path': 'kernel[numba]', 'best_ms': elapsed * 1000,
+                         'speedup': baseline_time / elapsed,
+                         'max_abs_diff': float(np.max(np.abs(yi_values - yi_baseline)))})
+
+        elapsed, (_, _, yi_values) = time_call(lambda: calculate_moora(df, CRITERIA_TYPE, WEIGHTS), repeat)
+        rows.append({'rows': n_rows, 'path': f"calculate_moora[{resolve_backend('auto', n_rows)}]",
+                     'best_ms': elapsed * 1000, 'speedup': baseline_time / elapsed,
+                     'max_abs_diff': float(np.max(np.abs(yi_values - yi_baseline)))})
+    report("Skor MOORA", rows)
+
+
+def bench_ranking(row_counts, repeat):
+    """Membandingkan ranking pandas (rank + sort_values) dengan rank_alternatives."""
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows, seed=1)
+        # Yi dari data acak bernilai diskret, sehingga alternatif kembar tetap muncul
+        yi_values, _ = score_matrix(df[CRITERIA_COLS].to_numpy(dtype=float), CRITERIA_COLS, CRITERIA_TYPE, WEIGHTS)
+        price = df['Price'].to_numpy()
+
+        def pandas_path():
+            result = pd.DataFrame({'Yi (Score)': yi_values})
+            result['Ranking'] = result['Yi (Score)'].rank(ascending=False, method='min').astype(int)
+            return result.sort_values('Ranking')
+
+        pandas_time, pandas_result = time_call(pandas_path, repeat)
+        array_time, (_, rankings) = time_call(lambda: rank_alternatives(yi_values), repeat)
+        tie_time, _ = time_call(lambda: rank_alternatives(yi_values, [(price, True)]), repeat)
+
+        same_ranks = np.array_equal(pandas_result['Ranking'].to_numpy(), rankings)
+        rows.append({'rows': n_rows, 'path': 'pandas rank+sort', 'best_ms': pandas_time * 1000,
+                     'speedup': 1.0, 'same_ranks': True})
+        rows.append({'rows': n_rows, 'path': 'rank_alternatives', 'best_ms': array_time * 1000,
+                     'speedup': pandas_time / array_time, 'same_ranks': same_ranks})
+        rows.append({'rows': n_rows, 'path': 'rank_alternatives+Price', 'best_ms': tie_time * 1000,
+                     'speedup': pandas_time / tie_time, 'same_ranks': same_ranks})
+    report("Ranking", rows)
+
+
+def bench_approximate(row_counts, repeat):
+    """Membandingkan waktu top-K sementara pertama dengan hasil pasti dari ProgressiveRanking."""
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows, seed=2)
+        _, _, yi_values = calculate_moora(df, CRITERIA_TYPE, WEIGHTS)
+        expected, _ = rank_alternatives(yi_values)
+        first_time = exact_time = float('inf')
+        for _ in range(repeat):
+            ranking = ProgressiveRanking(df, CRITERIA_COLS, seed=0)
+            start = time.perf_counter()
+            results = ranking.iter_results(CRITERIA_TYPE, WEIGHTS, k=10)
+            first = next(results)
+            first_time = min(first_time, time.perf_counter() - start)
+            *_, final = results
+            exact_time = min(exact_time, time.perf_counter() - start)
+        rows.append({'rows': n_rows, 'first_top_k_ms': first_time * 1000, 'first_norm_error': first.max_relative_error,
+                     'exact_ms': exact_time * 1000, 'rescans': ranking.rescans,
+                     'same_top_k': df['Name'].values[expected[:10]].tolist() == final.top['Name'].tolist()})
+    report("Ranking perkiraan (top-10)", rows)
+
+
+def bench_pipeline(row_counts, repeat):
+    """Membandingkan parsing upload berurutan dengan pipeline baca/validasi/norma paralel."""
+    rows = []
+    for n_rows in row_counts:
+        data = make_dataset(n_rows, seed=3).to_csv(index=False).encode('utf-8')
+
+        def pipelined():
+            with Pipeline() as pipeline:
+                return DatasetRegistry().register_bytes(data, pipeline=pipeline)
+
+        sequential_time, sequential = time_call(lambda: DatasetRegistry().register_bytes(data), repeat)
+        pipeline_time, entry = time_call(pipelined, repeat)
+        rows.append({'rows': n_rows, 'cpus': os.cpu_count(), 'sequential_ms': sequential_time * 1000,
+                     'pipeline_ms': pipeline_time * 1000, 'speedup': sequential_time / pipeline_time,
+                     'same_norms': bool(np.allclose(entry.norms, sequential.norms))})
+    report("Parsing upload", rows)
+
+
+def bench_differential(row_counts, repeat):
+    """Mengukur semua jalur perhitungan pada input acak yang sama sekaligus memeriksa kesesuaian hasilnya."""
+    warm_up()
+    rows = []
+    for n_rows in row_counts:
+        case = generate_case(n_rows, n_rows=n_rows)
+        results = pd.DataFrame([row for _ in range(repeat) for row in run_case(case)])
+        best = results.groupby('path', sort=False).agg(best_ms=('ms', 'min'), max_abs_diff=('max_abs_diff', 'max'),
+                                                       ok=('ok', 'all'))
+        best['speedup'] = best.loc['reference', 'best_ms'] / best['best_ms']
+        for path, row in best.iterrows():
+            rows.append({'rows': n_rows, 'path': path, 'best_ms': row['best_ms'], 'speedup': row['speedup'],
+                         'max_abs_diff': row['max_abs_diff'], 'ok': row['ok']})
+    report(f"Semua jalur ({repeat}x, kasus acak yang sama)", rows)
+
+
+def bench_inverse(row_counts, repeat):
+    """Mengukur query terbalik: Pareto front pertama kali, lalu query bobot terdekat per listing."""
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows, seed=3)
+        matrix = df[CRITERIA_COLS].to_numpy(dtype=float)
+        front_time = float('inf')
+        for _ in range(repeat):
+            query = InverseQuery(matrix, CRITERIA_COLS, CRITERIA_TYPE)
+            start = time.perf_counter()
+            front = query.front
+            front_time = min(front_time, time.perf_counter() - start)
+        # Target: pemenang pada bobot acak, sehingga wilayah menangnya pasti tidak kosong
+        rng = np.random.default_rng(0)
+        targets = [int(np.argmax(query.signed @ rng.dirichlet(np.ones(len(CRITERIA_COLS))))) for _ in range(5)]
+        query_time, suggestions = time_call(lambda: [query.nearest_weights(t, WEIGHTS) for t in targets], repeat)
+        top_k_time, _ = time_call(lambda: [query.nearest_weights(t, WEIGHTS, top_k=10) for t in targets], repeat)
+        rows.append({'rows': n_rows, 'front_size': len(front), 'front_ms': front_time * 1000,
+                     'query_ms': query_time * 1000 / len(targets), 'top10_query_ms': top_k_time * 1000 / len(targets),
+                     'mean_distance': np.mean([s.distance for s in suggestions]),
+                     'all_rank_1': all(s.rank == 1 for s in suggestions)})
+    report(f"Query terbalik bobot ({repeat}x, per listing)", rows)
+
+
+def bench_ingest(row_counts, repeat):
+    """Membandingkan parsing CSV dengan parsing .xlsx tanpa cache dan dari cache konversi."""
+    rows = []
+    for n_rows in row_counts:
+        if n_rows > EXCEL_MAX_ROWS:
+            print(f"\n(ingest: {n_rows:,} baris dilewati, melebihi batas baris sheet Excel)")
+            continue
+        df = make_dataset(n_rows, seed=3)
+        csv_data = df.to_csv(index=False).encode('utf-8')
+        buffer = io.BytesIO()
+        df.to_excel(buffer, index=False, sheet_name='dataset_kost')
+        xlsx_data = buffer.getvalue()
+
+        with tempfile.TemporaryDirectory() as directory:
+            csv_time, csv_entry = time_call(lambda: DatasetRegistry().register_bytes(csv_data), repeat)
+            # Registry baru setiap pengulangan agar yang diukur adalah parsing, bukan dedup registry
+            cold_time, _ = time_call(
+                lambda: register_spreadsheet(DatasetRegistry(), xlsx_data, 'bench.xlsx'), repeat
+            )
+            cache = ConversionCache(directory)
+            register_spreadsheet(DatasetRegistry(), xlsx_data, 'bench.xlsx', cache=cache)
+            cached_time, entry = time_call(
+                lambda: register_spreadsheet(DatasetRegistry(), xlsx_data, 'bench.xlsx', cache=cache), repeat
+            )
+        rows.append({'rows': n_rows, 'csv_mb': len(csv_data) / 1e6, 'xlsx_mb': len(xlsx_data) / 1e6,
+                     'csv_ms': csv_time * 1000, 'xlsx_ms': cold_time * 1000, 'xlsx_cached_ms': cached_time * 1000,
+                     'cached_vs_csv': csv_time / cached_time,
+                     'same_matrix': bool(np.array_equal(entry.matrix, csv_entry.matrix))})
+    report(f"Parsing CSV vs spreadsheet ({repeat}x)", rows)
+
+
+def bench_snapshots(row_counts, repeat, weeks=8, changed_fraction=0.02):
+    """Mengukur riwayat snapshot mingguan (sebagian harga berubah) dibanding CSV hasil lengkap per minggu."""
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows, seed=3)
+        rng = np.random.default_rng(0)
+        csv_bytes = 0
+        add_times = []
+        with tempfile.TemporaryDirectory() as directory:
+            store = SnapshotStore(directory)
+            for _ in range(weeks):
+                changed = rng.choice(n_rows, max(1, int(n_rows * changed_fraction)), replace=False)
+                df.loc[changed, 'Price'] = (df.loc[changed, 'Price'] * rng.uniform(0.9, 1.1, len(changed))).round()
+                _, _, yi_values = calculate_moora(df, CRITERIA_TYPE, WEIGHTS)
+                order, _ = rank_alternatives(yi_values)
+                csv_bytes += len(create_result_dataframe(df, yi_values, order=order).to_csv(index=False))
+                start = time.perf_counter()
+                store.add(df['Name'], yi_values, order)
+                add_times.append(time.perf_counter() - start)
+            # Rekonstruksi snapshot terakhir dari store baru (tanpa snapshot di memori)
+            load_time, snapshot = time_call(lambda: SnapshotStore(directory).load(weeks - 1), repeat)
+            history_time, history = time_call(lambda: store.history(df['Name'].iat[n_rows // 2]), repeat)
+            stats = store.stats()
+        rows.append({'rows': n_rows, 'weeks': weeks, 'csv_mb': csv_bytes / 1e6, 'snapshot_mb': stats['bytes'] / 1e6,
+                     'vs_csv': csv_bytes / stats['bytes'], 'vs_raw': stats['ratio'],
+                     'add_ms': np.mean(add_times) * 1000, 'load_ms': load_time * 1000,
+                     'history_ms': history_time * 1000,
+                     'exact': bool(np.array_equal(snapshot.yi_values, yi_values)
+                                   and np.array_equal(snapshot.order, order))})
+    report(f"Riwayat snapshot ({weeks} minggu, {changed_fraction:.0%} harga berubah per minggu)", rows)
+
+
+def _highlight_top3(row):
+    """Styling tabel hasil yang sama dengan aplikasi (satu fungsi Python per baris)."""
+    colors = {1: '#FFD700', 2: '#C0C0C0', 3: '#CD7F32'}
+    color = colors.get(row['Ranking'])
+    return [f'background-color: {color}; font-weight: bold; color: #000000;' if color else ''] * len(row)
+
+
+def serialize_dataframe(data):
+    """
+    Serialisasi yang dilakukan st.dataframe (styling pandas lalu Arrow), tanpa server Streamlit.
+
+    Memakai fungsi internal Streamlit yang sama dengan st.dataframe, sehingga
+    bisa berubah antar versi Streamlit.
+    """
+    from streamlit import dataframe_util
+    from streamlit.elements.lib.pandas_styler_utils import marshall_styler
+    from streamlit.proto.ArrowData_pb2 import ArrowData
+
+    proto = ArrowData()
+    if dataframe_util.is_pandas_styler(data):
+        marshall_styler(proto, data, 'benchmark')
+    data_df = dataframe_util.convert_anything_to_pandas_df(data, ensure_copy=False)
+    proto.data = dataframe_util.convert_pandas_df_to_arrow_bytes(data_df)
+    return proto
+
+
+def bench_governor(row_counts, repeat):
+    """
+    Mengukur konstanta model biaya governor.py pada jalur yang dijalankan aplikasi.
+
+    - frame/parse: register_bytes (read_csv, validasi, Σxij²) per sel DataFrame
+    - score/rank: DatasetEntry.scores, lalu rank_alternatives + create_result_dataframe
+    - styled: tabel hasil dengan highlight Top 3 dan matrix .format("{:.4f}") lewat serialisasi st.dataframe
+    - arrow: data grafik Yi tanpa styling lewat serialisasi st.dataframe
+    - approximate: chunk pertama ProgressiveRanking dari DataFrame di memori dengan norma
+      pasti dari registry (sama dengan mode Perkiraan di aplikasi), per sel chunk
+
+    Memori diukur dengan tracemalloc pada pemanggilan terpisah (tidak ikut diukur waktunya).
+    Nilai yang disarankan diambil dari dataset terbesar (overhead tetap dataset kecil
+    tidak ikut terhitung per sel), dibulatkan ke atas.
+    """
+    n_cols = len(CRITERIA_COLS)
+    rows = []
+    for n_rows in row_counts:
+        df = make_dataset(n_rows, seed=4)
+        data = df.to_csv(index=False).encode('utf-8')
+        frame_cells = n_rows * (n_cols + 1)
+
+        parse_time, entry = time_call(lambda: DatasetRegistry().register_bytes(data), repeat)
+        score_time, yi_values = time_call(lambda: entry.scores(CRITERIA_TYPE, WEIGHTS), repeat)
+        rank_time, result_df = time_call(
+            lambda: create_result_dataframe(entry.frame, yi_values, order=rank_alternatives(yi_values)[0]), repeat
+        )
+
+        styled_table = result_df.head(STYLED_BENCH_ROWS)
+        styled_matrix = pd.DataFrame(entry.normalized()[:STYLED_BENCH_ROWS], columns=CRITERIA_COLS)
+        styled_cells = styled_table.size + styled_matrix.size
+
+        def styled():
+            serialize_dataframe(styled_table.style.apply(_highlight_top3, axis=1))
+            serialize_dataframe(styled_matrix.style.format("{:.4f}"))
+
+        styled_time, _ = time_call(styled, repeat)
+        chart_data = result_df.set_index('Name')[['Yi (Score)']]
+        arrow_time, _ = time_call(lambda: serialize_dataframe(chart_data), repeat)
+
+        def first_chunk():
+            ranking = ProgressiveRanking(entry.frame, CRITERIA_COLS, chunk_size=governor.CHUNK_ROWS,
+                                         sum_squares=entry.sum_squares)
+            return next(ranking.iter_results(CRITERIA_TYPE, WEIGHTS, k=governor.DEFAULT_TOP_K))
+
+        approximate_time, _ = time_call(first_chunk, repeat)
+        chunk_cells = min(governor.CHUNK_ROWS, n_rows) * (n_cols + 1)
+
+        rows.append({
+            'rows': n_rows,
+            'frame_bytes_per_cell': entry.frame.memory_usage(deep=True).sum() / frame_cells,
+            'parse_s_per_cell': parse_time / frame_cells,
+            'score_s_per_cell': score_time / (n_rows * n_cols),
+            'rank_s_per_row': rank_time / n_rows,
+            'styled_bytes_per_cell': peak_bytes(styled) / styled_cells,
+            'styled_s_per_cell': styled_time / styled_cells,
+            'arrow_bytes_per_cell': peak_bytes(lambda: serialize_dataframe(chart_data)) / n_rows,
+            'arrow_s_per_cell': arrow_time / n_rows,
+            'approximate_bytes_per_cell': peak_bytes(first_chunk) / chunk_cells,
+            'approximate_s_per_cell': approximate_time / chunk_cells,
+        })
+    report(f"Model biaya governor ({n_cols} kriteria, {repeat}x)", rows)
+
+    largest = max(rows, key=lambda row: row['rows'])
+    report(f"Konstanta governor.py (dari {largest['rows']:,} baris)", [
+        {'constant': name, 'current': getattr(governor, name), 'suggested': round_up(largest[column])}
+        for name, column in GOVERNOR_CONSTANTS.items()
+    ])
+
+
+BENCHMARKS = {
+    'scoring': bench_scoring,
+    'ranking': bench_ranking,
+    'approximate': bench_approximate,
+    'pipeline': bench_pipeline,
+    'differential': bench_differential,
+    'inverse': bench_inverse,
+    'ingest': bench_ingest,
+    'snapshots': bench_snapshots,
+    'governor': bench_governor,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark perhitungan SIREKMA")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000],
+                        help="Jumlah alternatif yang diuji")
+    parser.add_argument('--repeat', type=int, default=3, help="Jumlah pengulangan per pengukuran")
+    parser.add_argument('--only', choices=sorted(BENCHMARKS), nargs='+',
+                        help="Hanya jalankan benchmark tertentu")
+    args = parser.parse_args()
+
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,19 @@
 import numpy as np
 import pandas as pd
 
+from validation import validate_inputs, validate_weight_values, validate_criteria_types
+from observability import timed
+from kernel import row_scores
 
-def calculate_moora(df, criteria_type, weights):
+
+# Kriteria yang secara default bertipe cost
+DEFAULT_COST_CRITERIA = ['Price', 'Distance']
+
+# Kriteria default penentu urutan jika Yi sama
+DEFAULT_TIE_BREAKER_CRITERIA = ['Price', 'Distance']
+
+
+def calculate_moora(df, criteria_type, weights, validate=True):
     """
     Menghitung nilai MOORA dengan normalisasi dan pembobotan.
     
@@ -16,6 +27,8 @@ def calculate_moora(df, criteria_type, weights):
     weights : dict
         Dictionary bobot untuk setiap kriteria dalam bentuk desimal (total = 1.0)
         Contoh: {'Price': 0.3, 'Distance': 0.25, 'Size': 0.15}
+    validate : bool
+        False untuk melewati validasi pada input yang sudah divalidasi sebelumnya
     
     Returns:
     --------
@@ -30,7 +43,9 @@ def calculate_moora(df, criteria_type, weights):
     ValueError
         - Jika dataset kosong
         - Jika tidak ada kriteria selain kolom 'Name'
-        - Jika ada nilai nol atau negatif dalam dataset
+        - Jika ada kolom non-numerik, nilai NaN/inf, atau nilai nol/negatif
+        - Jika key bobot atau tipe kriteria tidak cocok dengan kolom dataset
+        Semua masalah dilaporkan sekaligus (lihat validation.validate_inputs)
     
     Examples:
     ---------
@@ -44,53 +59,143 @@ def calculate_moora(df, criteria_type, weights):
     >>> normalized, weighted, yi = calculate_moora(df, criteria_type, weights)
     """
     
-    # Validasi 1: Dataset tidak boleh kosong
-    if df.empty:
-        raise ValueError("Dataset tidak boleh kosong!")
+    # Validasi data, bobot, dan tipe kriteria sekaligus (total bobot tidak diperiksa
+    # di sini karena bobot hanya dipakai sebagai pengali)
+    if validate:
+        with timed('validate'):
+            validate_inputs(df, criteria_type, weights, require_weight_total=False).raise_for_errors()
     
     # Ambil kolom kriteria (semua kecuali Name)
     criteria_cols = [col for col in df.columns if col != 'Name']
     
-    # Validasi 2: Harus ada minimal 1 kriteria
-    if not criteria_cols:
-        raise ValueError("Dataset harus memiliki minimal 1 kriteria selain kolom Name!")
+    # Matrix keputusan (X)
+    X = df[criteria_cols].to_numpy(dtype=float)
     
-    # Validasi 3: Semua nilai numerik harus positif (tidak boleh nol atau negatif)
-    for col in criteria_cols:
-        if (df[col] <= 0).any():
-            raise ValueError(f"Kolom '{col}' mengandung nilai nol atau negatif! Semua nilai harus positif.")
+    return moora_from_matrix(X, criteria_cols, criteria_type, weights)
+
+
+def column_sum_squares(X):
+    """
+    Menghitung jumlah kuadrat (Σxij²) setiap kolom matrix keputusan.
     
-    # Matrix keputusan (X)
-    X = df[criteria_cols].values
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Matrix keputusan berukuran (jumlah alternatif × jumlah kriteria)
     
-    # Langkah 1: Normalisasi matrix
-    # Rumus: xij / √(Σxij²)
-    normalized = np.zeros_like(X, dtype=float)
-    for j in range(X.shape[1]):
-        denominator = np.sqrt(np.sum(X[:, j] ** 2))
-        normalized[:, j] = X[:, j] / denominator
+    Returns:
+    --------
+    numpy.ndarray
+        Array jumlah kuadrat per kolom
     
-    # Langkah 2: Kalikan dengan bobot
-    # Matrix terbobot = Matrix ternormalisasi × Bobot
-    weighted_normalized = np.zeros_like(normalized)
-    for j, col in enumerate(criteria_cols):
-        weighted_normalized[:, j] = normalized[:, j] * weights[col]
+    Examples:
+    ---------
+    >>> column_sum_squares(np.array([[3.0, 1.0], [4.0, 2.0]]))
+    array([25.,  5.])
+    """
+    X = np.asarray(X, dtype=float)
+    return np.einsum('ij,ij->j', X, X)
+
+
+def criteria_signs(criteria_cols, criteria_type):
+    """
+    Membuat vektor tanda kriteria: +1 untuk benefit dan -1 untuk cost.
     
-    # Langkah 3: Optimasi atribut
-    # Pisahkan indeks kriteria benefit dan cost
-    benefit_indices = [i for i, col in enumerate(criteria_cols) if criteria_type[col] == 'benefit']
-    cost_indices = [i for i, col in enumerate(criteria_cols) if criteria_type[col] == 'cost']
+    Parameters:
+    -----------
+    criteria_cols : list
+        Urutan kolom kriteria
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
     
-    # Langkah 4: Hitung Yi = Σ(benefit × bobot) - Σ(cost × bobot)
-    yi_values = np.zeros(X.shape[0])
+    Returns:
+    --------
+    numpy.ndarray
+        Array tanda kriteria sesuai urutan criteria_cols
     
-    # Sum benefit criteria
-    if benefit_indices:
-        yi_values += np.sum(weighted_normalized[:, benefit_indices], axis=1)
+    Examples:
+    ---------
+    >>> criteria_signs(['Price', 'Size'], {'Price': 'cost', 'Size': 'benefit'})
+    array([-1.,  1.])
+    """
+    sign_map = {'benefit': 1.0, 'cost': -1.0}
+    return np.array([sign_map.get(criteria_type[col], 0.0) for col in criteria_cols])
+
+
+def weight_vector(criteria_cols, weights):
+    """
+    Mengubah dictionary bobot menjadi array sesuai urutan kolom kriteria.
     
-    # Subtract cost criteria
-    if cost_indices:
-        yi_values -= np.sum(weighted_normalized[:, cost_indices], axis=1)
+    Parameters:
+    -----------
+    criteria_cols : list
+        Urutan kolom kriteria
+    weights : dict
+        Dictionary bobot untuk setiap kriteria
+    
+    Returns:
+    --------
+    numpy.ndarray
+        Array bobot sesuai urutan criteria_cols
+    
+    Examples:
+    ---------
+    >>> weight_vector(['Price', 'Size'], {'Size': 0.4, 'Price': 0.6})
+    array([0.6, 0.4])
+    """
+    return np.array([weights[col] for col in criteria_cols], dtype=float)
+
+
+def moora_from_matrix(X, criteria_cols, criteria_type, weights, norms=None):
+    """
+    Menghitung MOORA langsung dari matrix keputusan numerik.
+    
+    Fungsi ini tidak melakukan validasi data sehingga cocok untuk matrix yang
+    sudah divalidasi sebelumnya (misalnya dataset yang disimpan di registry).
+    
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Matrix keputusan berukuran (jumlah alternatif × jumlah kriteria)
+    criteria_cols : list
+        Urutan kolom kriteria sesuai kolom X
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    weights : dict
+        Dictionary bobot untuk setiap kriteria dalam bentuk desimal (total = 1.0)
+    norms : numpy.ndarray, optional
+        Penyebut normalisasi √(Σxij²) per kolom yang sudah dihitung sebelumnya
+    
+    Returns:
+    --------
+    tuple
+        (normalized_matrix, weighted_normalized_matrix, yi_values)
+    
+    Examples:
+    ---------
+    >>> X = np.array([[1800, 2.5], [900, 1.0]])
+    >>> _, _, yi = moora_from_matrix(X, ['Price', 'Distance'],
+    ...                              {'Price': 'cost', 'Distance': 'cost'},
+    ...                              {'Price': 0.5, 'Distance': 0.5})
+    """
+    with timed('moora'):
+        X = np.asarray(X, dtype=float)
+        if norms is None:
+            norms = np.sqrt(column_sum_squares(X))
+        
+        # Langkah 1: Normalisasi matrix
+        # Rumus: xij / √(Σxij²)
+        normalized = X / norms
+        
+        # Langkah 2: Kalikan dengan bobot
+        # Matrix terbobot = Matrix ternormalisasi × Bobot
+        weighted_normalized = normalized * weight_vector(criteria_cols, weights)
+        
+        # Langkah 3 & 4: Optimasi atribut dan hitung Yi
+        # Yi = Σ(benefit × bobot) - Σ(cost × bobot), benefit bertanda +1 dan cost -1
+        # Dihitung lewat kernel skor dengan koefisien gabungan (tanda × bobot / norma)
+        coefficients = criteria_signs(criteria_cols, criteria_type) * weight_vector(criteria_cols, weights) / norms
+        yi_values = row_scores(X, coefficients)
     
     return normalized, weighted_normalized, yi_values
 
@@ -115,8 +220,7 @@ def validate_weights(weights):
     >>> validate_weights(weights)
     True
     """
-    total = sum(weights.values())
-    return abs(total - 1.0) < 0.0001  # Toleransi floating point
+    return validate_weight_values(weights, list(weights), total=1.0).ok
 
 
 def validate_criteria_type(criteria_type):
@@ -139,11 +243,101 @@ def validate_criteria_type(criteria_type):
     >>> validate_criteria_type(criteria_type)
     True
     """
-    valid_types = ['benefit', 'cost']
-    return all(ctype in valid_types for ctype in criteria_type.values())
+    return validate_criteria_types(criteria_type, list(criteria_type)).ok
+
+
+def default_criteria_type(criteria_cols):
+    """
+    Tipe kriteria default: Price dan Distance sebagai cost, sisanya benefit.
+    
+    Examples:
+    ---------
+    >>> default_criteria_type(['Price', 'Size'])
+    {'Price': 'cost', 'Size': 'benefit'}
+    """
+    return {col: 'cost' if col in DEFAULT_COST_CRITERIA else 'benefit' for col in criteria_cols}
+
+
+def rankings_from_order(yi_values, order):
+    """
+    Menghitung ranking metode 'min' dari urutan yang sudah diketahui (satu sweep linear).
+    
+    Examples:
+    ---------
+    >>> rankings_from_order(np.array([0.2, 0.5, 0.2]), np.array([1, 0, 2]))
+    array([1, 2, 2])
+    """
+    sorted_yi = np.asarray(yi_values, dtype=float)[order]
+    n = sorted_yi.shape[0]
+    group_start = np.ones(n, dtype=bool)
+    group_start[1:] = sorted_yi[1:] != sorted_yi[:-1]
+    return np.maximum.accumulate(np.where(group_start, np.arange(1, n + 1), 0))
 
 
-def create_result_dataframe(df, yi_values):
+def rank_alternatives(yi_values, tie_breakers=None):
+    """
+    Mengurutkan alternatif dan menghitung ranking metode 'min' tanpa pandas.
+    
+    Urutan dihitung dengan satu sort stabil pada (−Yi, kunci tie-breaker...),
+    lalu ranking diisi dalam satu sweep linear: alternatif dengan Yi sama
+    mendapat ranking terkecil dari kelompoknya. Tie-breaker hanya menentukan
+    urutan di dalam kelompok Yi yang sama, sisanya mengikuti urutan baris asli
+    sehingga hasilnya selalu deterministik.
+    
+    Parameters:
+    -----------
+    yi_values : numpy.ndarray
+        Array nilai Yi
+    tie_breakers : list, optional
+        List (values, ascending) sesuai prioritas, misalnya
+        [(price_values, True)] agar harga lebih murah didahulukan
+    
+    Returns:
+    --------
+    tuple
+        (order, rankings)
+        - order: numpy.ndarray - Indeks baris terurut dari Yi tertinggi
+        - rankings: numpy.ndarray - Ranking setiap baris sesuai urutan order
+    
+    Examples:
+    ---------
+    >>> yi_values = np.array([0.2, 0.5, 0.2, 0.1])
+    >>> order, rankings = rank_alternatives(yi_values, [(np.array([900, 1000, 500, 700]), True)])
+    >>> order.tolist(), rankings.tolist()
+    ([1, 2, 0, 3], [1, 2, 2, 4])
+    """
+    with timed('rank'):
+        yi_values = np.asarray(yi_values, dtype=float)
+        n = yi_values.shape[0]
+        
+        # Satu sort stabil pada −Yi; Yi sama tetap mengikuti urutan baris asli
+        order = np.argsort(-yi_values, kind='stable')
+        
+        # Ranking 'min': posisi awal setiap kelompok Yi yang sama diteruskan ke anggotanya
+        rankings = rankings_from_order(yi_values, order)
+        group_start = np.ones(n, dtype=bool)
+        group_start[1:] = rankings[1:] != rankings[:-1]
+        
+        if tie_breakers and not group_start.all():
+            # Tie-breaker hanya perlu mengurutkan ulang baris di dalam kelompok Yi yang sama
+            tied = np.ones(n, dtype=bool)
+            tied[:-1] = ~group_start[1:]
+            tied |= ~group_start
+            tied_positions = np.flatnonzero(tied)
+            tied_rows = order[tied_positions]
+            
+            # np.lexsort memakai kunci terakhir sebagai kunci utama
+            keys = []
+            for values, ascending in reversed(tie_breakers):
+                values = np.asarray(values)[tied_rows]
+                keys.append(values if ascending else -values)
+            keys.append(rankings[tied_positions])
+            order[tied_positions] = tied_rows[np.lexsort(keys)]
+    
+    return order, rankings
+
+
+def create_result_dataframe(df, yi_values, tie_breakers=None, order=None):
     """
     Membuat DataFrame hasil dengan Yi Score dan Ranking
     
@@ -153,6 +347,12 @@ def create_result_dataframe(df, yi_values):
         DataFrame original
     yi_values : numpy.ndarray
         Array nilai Yi
+    tie_breakers : list, optional
+        List (nama_kolom, ascending) untuk mengurutkan alternatif dengan Yi sama,
+        misalnya [('Price', True), ('Distance', True)]
+    order : numpy.ndarray, optional
+        Urutan baris yang sudah dihitung sebelumnya (misalnya dari cache hasil),
+        sehingga pengurutan dilewati
     
     Returns:
     --------
@@ -167,8 +367,14 @@ def create_result_dataframe(df, yi_values):
     >>> result.columns.tolist()
     ['Name', 'Price', 'Yi (Score)', 'Ranking']
     """
-    result_df = df.copy()
-    result_df['Yi (Score)'] = yi_values
-    result_df['Ranking'] = result_df['Yi (Score)'].rank(ascending=False, method='min').astype(int)
-    result_df = result_df.sort_values('Ranking')
+    yi_values = np.asarray(yi_values, dtype=float)
+    if order is None:
+        tie_keys = [(df[col].to_numpy(), ascending) for col, ascending in (tie_breakers or [])]
+        order, rankings = rank_alternatives(yi_values, tie_keys)
+    else:
+        rankings = rankings_from_order(yi_values, order)
+    
+    result_df = df.take(order)
+    result_df['Yi (Score)'] = yi_values[order]
+    result_df['Ranking'] = rankings
     return result_df
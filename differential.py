@@ -0,0 +1,497 @@
+"""
+Differential testing semua jalur perhitungan MOORA terhadap implementasi referensi.
+
+Setiap kasus berisi dataset acak (ukuran, tipe data, nilai kembar, dan skala
+nilai ekstrem yang bervariasi) beserta bobot dan tipe kriteria acak. Semua
+jalur skor dijalankan pada input yang sama, lalu Yi dan ranking-nya
+dibandingkan dengan implementasi referensi sekaligus diukur waktunya.
+Referensi ditulis ulang di modul ini (loop per kolom seperti rumus aslinya)
+dan tidak memakai kernel yang sedang diuji.
+
+Jalankan:
+    python differential.py
+    python differential.py --cases 500 --max-rows 20000 --seed 7
+"""
+import argparse
+import functools
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from calculate import moora_from_matrix, rank_alternatives, rankings_from_order
+from kernel import available_backends, score_matrix
+from approximate import ProgressiveRanking
+from federated import RegionDataset, federated_top_k
+from inverse import InverseQuery
+from live import LiveRanker
+from pipeline import Pipeline, parse_csv
+from registry import DatasetEntry, content_hash
+from result_cache import ResultCache, make_cache_key
+from whatif import WhatIfScorer
+
+
+# Toleransi selisih absolut Yi antar jalur (Yi selalu berada di rentang [-1, 1])
+DEFAULT_ATOL = 1e-9
+
+# Jumlah alternatif teratas untuk jalur yang hanya menghasilkan top-K
+DEFAULT_TOP_K = 10
+
+# Batas jumlah baris dataset acak
+DEFAULT_MAX_ROWS = 2_000
+
+# Tipe data kolom kriteria yang diuji
+COLUMN_DTYPES = ('int64', 'int32', 'float64', 'float32')
+
+
+class DifferentialCase:
+    """
+    Satu input acak untuk semua jalur perhitungan.
+
+    Attributes:
+    -----------
+    seed : int
+        Seed pembuat kasus (kasus yang sama bisa dibuat ulang dari seed-nya)
+    frame : pandas.DataFrame
+        Dataset dengan kolom 'Name' dan kriteria
+    criteria_cols : list
+        Kolom kriteria
+    criteria_type : dict
+        Dictionary tipe setiap kriteria
+    weights : dict
+        Dictionary bobot setiap kriteria (total = 1.0)
+    k : int
+        Jumlah alternatif teratas untuk jalur top-K
+    """
+
+    def __init__(self, seed, frame, criteria_type, weights, k=DEFAULT_TOP_K):
+        self.seed = seed
+        self.frame = frame
+        self.criteria_cols = [col for col in frame.columns if col != 'Name']
+        self.criteria_type = criteria_type
+        self.weights = weights
+        self.k = k
+
+    @property
+    def n_rows(self):
+        return len(self.frame)
+
+    @functools.cached_property
+    def csv_bytes(self):
+        """Isi dataset sebagai file CSV (float32 dilebarkan agar nilainya tidak berubah saat dibaca ulang)."""
+        widened = self.frame.astype({col: float for col in self.criteria_cols if self.frame[col].dtype == np.float32})
+        return widened.to_csv(index=False).encode('utf-8')
+
+    def __repr__(self):
+        dtypes = ','.join(str(self.frame[col].dtype) for col in self.criteria_cols)
+        return f"DifferentialCase(seed={self.seed}, rows={self.n_rows}, dtypes=[{dtypes}])"
+
+
+def _random_column(rng, n_rows, dtype):
+    """Membuat satu kolom kriteria positif dengan skala acak, kadang hanya berisi sedikit nilai berbeda."""
+    if dtype.startswith('int'):
+        limit = np.iinfo(np.int32).max if dtype == 'int32' else 10 ** 12
+        high = int(min(10 ** rng.uniform(0.3, 12), limit))
+        values = rng.integers(1, high, n_rows, endpoint=True)
+    else:
+        # Skala 1e-6 sampai 1e9, dengan rentang nilai dalam satu kolom sampai 1e6 kali
+        spread = rng.uniform(0, np.log(1e6))
+        values = 10 ** rng.uniform(-6, 9) * np.exp(rng.uniform(-spread, spread, n_rows))
+    if rng.random() < 0.3:
+        # Sedikit nilai berbeda: banyak alternatif kembar pada kolom ini
+        values = rng.choice(values[:rng.integers(1, 6)], n_rows)
+    return values.astype(dtype)
+
+
+def generate_case(seed, n_rows=None, max_rows=DEFAULT_MAX_ROWS, k=DEFAULT_TOP_K):
+    """
+    Membuat satu kasus acak yang valid (semua nilai positif dan berhingga).
+
+    Parameters:
+    -----------
+    seed : int
+        Seed random generator
+    n_rows : int, optional
+        Jumlah baris (default: acak, termasuk dataset 1-3 baris)
+    max_rows : int
+        Batas jumlah baris acak
+    k : int
+        Jumlah alternatif teratas untuk jalur top-K
+
+    Returns:
+    --------
+    DifferentialCase
+
+    Examples:
+    ---------
+    >>> case = generate_case(0, n_rows=5)
+    >>> case.n_rows, round(sum(case.weights.values()), 9)
+    (5, 1.0)
+    """
+    rng = np.random.default_rng(seed)
+    if n_rows is None:
+        n_rows = int(rng.choice([1, 2, 3, rng.integers(4, 50), rng.integers(50, max(max_rows, 50) + 1)]))
+    n_cols = int(rng.integers(1, 8))
+    criteria_cols = [f"K{j + 1}" for j in range(n_cols)]
+
+    frame = pd.DataFrame({'Name': [f"Alt_{i}" for i in range(n_rows)]})
+    for col in criteria_cols:
+        frame[col] = _random_column(rng, n_rows, str(rng.choice(COLUMN_DTYPES)))
+    if n_rows > 1 and rng.random() < 0.3:
+        # Baris kembar persis (nama tetap berbeda)
+        copies = rng.integers(0, n_rows, n_rows // 4 + 1)
+        targets = rng.integers(0, n_rows, copies.shape[0])
+        for col in criteria_cols:
+            values = frame[col].to_numpy(copy=True)
+            values[targets] = values[copies]
+            frame[col] = values
+
+    weights = rng.dirichlet(np.ones(n_cols))
+    if rng.random() < 0.2:
+        weights = np.full(n_cols, 1.0 / n_cols)
+    elif n_cols > 1 and rng.random() < 0.2:
+        weights[rng.integers(n_cols)] = 0.0
+        weights /= weights.sum()
+    criteria_type = {col: str(rng.choice(['benefit', 'cost'])) for col in criteria_cols}
+    return DifferentialCase(seed, frame, criteria_type, dict(zip(criteria_cols, weights.tolist())), k=k)
+
+
+def reference_scores(case):
+    """
+    Implementasi referensi: rumus MOORA per kolom dan ranking metode 'min' dari pandas.
+
+    Sengaja tidak memakai kernel atau calculate_moora (yang sekarang juga
+    memakai kernel), agar regresi pada kernel tetap terdeteksi.
+
+    Returns:
+    --------
+    tuple
+        (yi_values, order, rankings) - order dan rankings mengikuti urutan ranking
+    """
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+    yi_values = np.zeros(X.shape[0])
+    for j, col in enumerate(case.criteria_cols):
+        # xij / √(Σxij²), dikali bobot, lalu ditambah (benefit) atau dikurangi (cost)
+        weighted = X[:, j] / np.sqrt(np.sum(X[:, j] ** 2)) * case.weights[col]
+        if case.criteria_type[col] == 'benefit':
+            yi_values += weighted
+        else:
+            yi_values -= weighted
+    order = np.argsort(-yi_values, kind='stable')
+    rankings = pd.Series(yi_values).rank(ascending=False, method='min').to_numpy(dtype=int)[order]
+    return yi_values, order, rankings
+
+
+def _ranked(yi_values):
+    """Mengubah array Yi semua baris menjadi (order, yi_terurut, rankings)."""
+    order, rankings = rank_alternatives(yi_values)
+    return order, yi_values[order], rankings
+
+
+def _top_frame(case, top):
+    """Mengubah DataFrame top-K (kolom Name, Yi (Score), Ranking) menjadi (order, yi_terurut, rankings)."""
+    row_of_name = pd.Series(np.arange(case.n_rows), index=case.frame['Name'])
+    order = row_of_name[top['Name']].to_numpy()
+    return order, top['Yi (Score)'].to_numpy(dtype=float), top['Ranking'].to_numpy(dtype=int)
+
+
+def _path_moora_from_matrix(case):
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+    _, _, yi_values = moora_from_matrix(X, case.criteria_cols, case.criteria_type, case.weights)
+    return _ranked(yi_values)
+
+
+def _kernel_path(backend):
+    def path(case):
+        X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+        yi_values, _ = score_matrix(X, case.criteria_cols, case.criteria_type, case.weights, backend=backend)
+        return _ranked(yi_values)
+    return path
+
+
+def _path_registry_calculate(case):
+    entry = DatasetEntry('differential', '', case.frame)
+    _, _, yi_values = entry.calculate(case.criteria_type, case.weights)
+    return _ranked(yi_values)
+
+
+def _path_registry_scores(case):
+    entry = DatasetEntry('differential', '', case.frame)
+    return _ranked(entry.scores(case.criteria_type, case.weights))
+
+
+def _path_pipeline(case):
+    data = case.csv_bytes
+    with Pipeline() as pipeline:
+        # Chunk kecil agar akumulasi norma antar chunk ikut teruji
+        parsed = parse_csv(data, pipeline, chunk_size=max(case.n_rows // 3, 1))
+    entry = DatasetEntry(content_hash(data), '', parsed.frame, parsed=parsed)
+    _, _, yi_values = entry.calculate(case.criteria_type, case.weights)
+    return _ranked(yi_values)
+
+
+def _path_result_cache(case):
+    key = make_cache_key('differential', case.criteria_cols, case.criteria_type, case.weights)
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+
+    def compute():
+        yi_values, _ = score_matrix(X, case.criteria_cols, case.criteria_type, case.weights)
+        return yi_values, rank_alternatives(yi_values)[0]
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ResultCache(directory)
+        cache.get_or_compute(key, compute)
+        # Hasil kedua dibaca dari file cache
+        yi_values, order, _ = cache.get_or_compute(key, compute)
+    return order, yi_values[order], rankings_from_order(yi_values, order)
+
+
+def _path_live_top(case):
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+    ranker = LiveRanker(X, case.criteria_cols)
+    indices, rankings, yi_values = ranker.top(case.criteria_type, case.weights, n=case.k)
+    return indices, yi_values, rankings
+
+
+def _path_federated_top(case):
+    bounds = np.linspace(0, case.n_rows, 4).astype(int)
+    regions = [RegionDataset(f"region_{i}", case.frame.iloc[start:stop], case.criteria_cols)
+               for i, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))]
+    return _top_frame(case, federated_top_k(regions, case.criteria_type, case.weights, k=case.k))
+
+
+def _path_progressive_top(case):
+    ranking = ProgressiveRanking(case.frame, case.criteria_cols, chunk_size=max(case.n_rows // 4, 1),
+                                 sample_size=max(case.n_rows // 10, 1), seed=case.seed)
+    *_, final = ranking.iter_results(case.criteria_type, case.weights, k=case.k)
+    return _top_frame(case, final.top)
+
+
+def _path_whatif(case):
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+    scorer = WhatIfScorer(X, case.criteria_cols, case.criteria_type, case.weights)
+    # Edit lalu kembalikan satu nilai agar pembaruan inkremental ikut teruji
+    col = case.criteria_cols[0]
+    scorer.edit(0, col, scorer.value(0, col) * 2)
+    scorer.reset_row(0)
+    order = np.argsort(-scorer.yi_values, kind='stable')
+    rankings = np.array([scorer.rank(row) for row in order], dtype=int)
+    return order, scorer.yi_values[order], rankings
+
+
+def _path_inverse(case):
+    X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+    query = InverseQuery(X, case.criteria_cols, case.criteria_type)
+    yi_values = query.yi_values(case.weights)
+    order = np.argsort(-yi_values, kind='stable')
+    rankings = np.array([query.rank(row, case.weights) for row in order], dtype=int)
+    return order, yi_values[order], rankings
+
+
+def scoring_paths():
+    """
+    Semua jalur perhitungan yang tersedia di environment ini.
+
+    Setiap jalur menerima DifferentialCase dan mengembalikan (order, yi_terurut,
+    rankings): indeks baris terurut dari Yi tertinggi, Yi-nya, dan ranking
+    metode 'min'. Jalur top-K hanya mengembalikan K baris pertama.
+
+    Returns:
+    --------
+    dict
+        Nama jalur -> fungsi
+    """
+    paths = {'moora_from_matrix': _path_moora_from_matrix}
+    for backend in available_backends():
+        paths[f"kernel[{backend}]"] = _kernel_path(backend)
+    paths.update({
+        'registry.calculate': _path_registry_calculate,
+        'registry.scores': _path_registry_scores,
+        'pipeline': _path_pipeline,
+        'result_cache': _path_result_cache,
+        'live.top': _path_live_top,
+        'federated.top': _path_federated_top,
+        'progressive.top': _path_progressive_top,
+        'whatif': _path_whatif,
+        'inverse': _path_inverse,
+    })
+    return paths
+
+
+def compare_ranking(reference_yi, order, yi_sorted, rankings, atol=DEFAULT_ATOL):
+    """
+    Membandingkan hasil satu jalur dengan Yi referensi.
+
+    Alternatif yang Yi-nya berselisih <= atol dianggap kembar, sehingga urutan
+    dan ranking di antara mereka boleh berbeda antar jalur (selisih pembulatan
+    floating point).
+
+    Parameters:
+    -----------
+    reference_yi : numpy.ndarray
+        Yi referensi untuk semua baris
+    order : numpy.ndarray
+        Indeks baris terurut dari jalur yang diuji (semua baris atau K pertama)
+    yi_sorted : numpy.ndarray
+        Yi dari jalur yang diuji sesuai order
+    rankings : numpy.ndarray
+        Ranking dari jalur yang diuji sesuai order
+    atol : float
+        Toleransi selisih absolut Yi
+
+    Returns:
+    --------
+    tuple
+        (max_abs_diff, problems) - problems berupa list pesan (kosong jika sesuai)
+
+    Examples:
+    ---------
+    >>> compare_ranking(np.array([0.2, 0.5, 0.2]), np.array([1, 2, 0]), np.array([0.5, 0.2, 0.2]),
+    ...                 np.array([1, 2, 2]))
+    (0.0, [])
+    >>> compare_ranking(np.array([0.2, 0.5]), np.array([0, 1]), np.array([0.2, 0.5]), np.array([2, 1]))[1]
+    ['urutan tidak sesuai referensi']
+    """
+    reference_yi = np.asarray(reference_yi, dtype=float)
+    order = np.asarray(order, dtype=np.intp)
+    n = reference_yi.shape[0]
+    if len(np.unique(order)) != len(order) or (len(order) and (order.min() < 0 or order.max() >= n)):
+        return float('inf'), ['indeks baris tidak valid']
+
+    problems = []
+    expected_yi = reference_yi[order]
+    max_abs_diff = float(np.max(np.abs(np.asarray(yi_sorted, dtype=float) - expected_yi))) if len(order) else 0.0
+    if not max_abs_diff <= atol:
+        problems.append(f"Yi berselisih {max_abs_diff:.3g} (> {atol:g})")
+
+    descending = np.sort(reference_yi)[::-1]
+    if not np.all(np.abs(expected_yi - descending[:len(order)]) <= atol):
+        problems.append("urutan tidak sesuai referensi")
+
+    # Ranking 'min' boleh berada di antara batas kelompok kembar (dalam toleransi)
+    ascending_negated = -descending
+    low = np.searchsorted(ascending_negated, -(expected_yi + atol), side='left') + 1
+    high = np.searchsorted(ascending_negated, -(expected_yi - atol), side='left') + 1
+    rankings = np.asarray(rankings)
+    if rankings.shape != expected_yi.shape or not np.all((low <= rankings) & (rankings <= high)):
+        problems.append("ranking tidak sesuai referensi")
+    return max_abs_diff, problems
+
+
+def run_case(case, paths=None, atol=DEFAULT_ATOL):
+    """
+    Menjalankan referensi dan semua jalur pada satu kasus.
+
+    Returns:
+    --------
+    list
+        Satu dict per jalur: case, rows, path, ms, speedup, max_abs_diff, ok, problems
+    """
+    paths = scoring_paths() if paths is None else paths
+    # Serialisasi CSV untuk jalur pipeline tidak ikut diukur
+    case.csv_bytes
+    start = time.perf_counter()
+    reference_yi, reference_order, reference_rankings = reference_scores(case)
+    reference_ms = (time.perf_counter() - start) * 1000
+    rows = [{'case': case.seed, 'rows': case.n_rows, 'path': 'reference', 'ms': reference_ms,
+             'speedup': 1.0, 'max_abs_diff': 0.0, 'ok': True, 'problems': ''}]
+
+    for name, path in paths.items():
+        start = time.perf_counter()
+        try:
+            order, yi_sorted, rankings = path(case)
+        except Exception as e:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            max_abs_diff, problems = float('inf'), [f"{type(e).__name__}: {e}"]
+        else:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            max_abs_diff, problems = compare_ranking(reference_yi, order, yi_sorted, rankings, atol)
+            if len(order) not in (case.n_rows, min(case.k, case.n_rows)):
+                problems.append(f"jumlah baris {len(order)} tidak sesuai")
+        rows.append({'case': case.seed, 'rows': case.n_rows, 'path': name, 'ms': elapsed_ms,
+                     'speedup': reference_ms / elapsed_ms if elapsed_ms > 0 else float('inf'),
+                     'max_abs_diff': max_abs_diff, 'ok': not problems, 'problems': '; '.join(problems)})
+    return rows
+
+
+def warm_up(paths=None):
+    """Menjalankan semua jalur sekali pada kasus kecil agar kompilasi JIT Numba tidak ikut terukur."""
+    run_case(generate_case(0, n_rows=20), paths)
+
+
+def run_differential(n_cases=50, seed=0, max_rows=DEFAULT_MAX_ROWS, paths=None, atol=DEFAULT_ATOL):
+    """
+    Menjalankan differential test pada banyak kasus acak.
+
+    Parameters:
+    -----------
+    n_cases : int
+        Jumlah kasus
+    seed : int
+        Seed kasus pertama (kasus ke-i memakai seed + i)
+    max_rows : int
+        Batas jumlah baris setiap kasus
+    paths : dict, optional
+        Jalur yang diuji (default: scoring_paths())
+    atol : float
+        Toleransi selisih absolut Yi
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Hasil per kasus dan jalur (lihat run_case)
+    """
+    paths = scoring_paths() if paths is None else paths
+    warm_up(paths)
+    rows = []
+    for case_seed in range(seed, seed + n_cases):
+        rows.extend(run_case(generate_case(case_seed, max_rows=max_rows), paths, atol))
+    return pd.DataFrame(rows)
+
+
+def summarize(results):
+    """
+    Ringkasan per jalur: total waktu, speedup terhadap referensi, dan jumlah kasus gagal.
+
+    Speedup dihitung dari total waktu semua kasus, sehingga semua jalur
+    dibandingkan pada input yang sama persis.
+    """
+    total_ms = results.groupby('path', sort=False)['ms'].sum()
+    summary = pd.DataFrame({
+        'total_ms': total_ms,
+        'speedup': total_ms['reference'] / total_ms,
+        'max_abs_diff': results.groupby('path', sort=False)['max_abs_diff'].max(),
+        'failures': (~results['ok']).groupby(results['path'], sort=False).sum(),
+    })
+    return summary.reset_index()
+
+
+def assert_agreement(results):
+    """
+    Raises:
+    -------
+    AssertionError
+        Jika ada jalur yang tidak sesuai referensi, berisi seed kasus dan masalahnya
+    """
+    failures = results[~results['ok']]
+    if len(failures):
+        lines = [f"seed={row.case} rows={row.rows} {row.path}: {row.problems}" for row in failures.itertuples()]
+        raise AssertionError("Jalur perhitungan tidak sesuai referensi:\n" + "\n".join(lines))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Differential test jalur perhitungan SIREKMA")
+    parser.add_argument('--cases', type=int, default=100, help="Jumlah kasus acak")
+    parser.add_argument('--seed', type=int, default=0, help="Seed kasus pertama")
+    parser.add_argument('--max-rows', type=int, default=DEFAULT_MAX_ROWS, help="Batas jumlah baris per kasus")
+    args = parser.parse_args()
+
+    results = run_differential(args.cases, args.seed, args.max_rows)
+    print(summarize(results).to_string(index=False))
+    assert_agreement(results)
+    print(f"\n{args.cases} kasus: semua jalur sesuai referensi.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+import gzip
+import io
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+# Format export yang didukung beserta ekstensi file dan MIME type-nya
+EXPORT_FORMATS = {
+    'csv': {'label': 'CSV', 'extension': 'csv', 'mime': 'text/csv'},
+    'csv.gz': {'label': 'CSV (gzip)', 'extension': 'csv.gz', 'mime': 'application/gzip'},
+    'parquet': {'label': 'Parquet', 'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'},
+    'jsonl': {'label': 'JSON Lines', 'extension': 'jsonl', 'mime': 'application/x-ndjson'},
+}
+
+# Jumlah baris yang ditulis per chunk
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Buffer sementara disimpan di memori sampai ukuran ini, setelah itu pindah ke disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+def _iter_frame_chunks(df, chunk_size):
+    """Menghasilkan potongan DataFrame tanpa membuat salinan penuh."""
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def _iter_matrix_chunks(matrix, columns, names, chunk_size):
+    """Menghasilkan potongan matrix numpy sebagai DataFrame kecil per chunk."""
+    for start in range(0, matrix.shape[0], chunk_size):
+        stop = start + chunk_size
+        chunk = pd.DataFrame(matrix[start:stop], columns=columns)
+        chunk.insert(0, 'Name', np.asarray(names[start:stop]))
+        yield chunk
+
+
+def _write_csv_chunks(chunks, binary_stream):
+    """Menulis chunk ke stream biner dalam format CSV (header hanya sekali)."""
+    text = io.TextIOWrapper(binary_stream, encoding='utf-8', newline='', write_through=True)
+    try:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(text, index=False, header=(i == 0))
+        text.flush()
+    finally:
+        # Lepaskan stream tanpa menutupnya agar bisa dipakai pemanggil
+        text.detach()
+
+
+def _write_jsonl_chunks(chunks, binary_stream):
+    """Menulis chunk ke stream biner dalam format JSON Lines."""
+    for chunk in chunks:
+        if len(chunk) == 0:
+            continue
+        payload = chunk.to_json(orient='records', lines=True, force_ascii=False)
+        if not payload.endswith('\n'):
+            payload += '\n'
+        binary_stream.write(payload.encode('utf-8'))
+
+
+def _write_parquet_chunks(chunks, binary_stream):
+    """Menulis chunk ke stream biner sebagai row group Parquet (butuh pyarrow)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Export Parquet membutuhkan library 'pyarrow'. Jalankan: pip install pyarrow") from e
+
+    writer = None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(binary_stream, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _write_chunks(chunks, binary_stream, fmt):
+    """Menulis chunk ke stream sesuai format yang dipilih."""
+    if fmt == 'csv':
+        _write_csv_chunks(chunks, binary_stream)
+    elif fmt == 'csv.gz':
+        with gzip.GzipFile(fileobj=binary_stream, mode='wb') as gz:
+            _write_csv_chunks(chunks, gz)
+    elif fmt == 'jsonl':
+        _write_jsonl_chunks(chunks, binary_stream)
+    elif fmt == 'parquet':
+        _write_parquet_chunks(chunks, binary_stream)
+    else:
+        raise ValueError(f"Format export '{fmt}' tidak didukung! Pilih salah satu: {', '.join(EXPORT_FORMATS)}")
+
+
+def _weights_frame(criteria_cols, weights, criteria_type):
+    """Membuat tabel metadata bobot (ukurannya sebanding jumlah kriteria, bukan jumlah baris)."""
+    return pd.DataFrame({
+        'Kriteria': list(criteria_cols),
+        'Bobot (%)': [weights[col] for col in criteria_cols],
+        'Tipe': [criteria_type[col] for col in criteria_cols],
+    })
+
+
+def export_results(result_df, fmt='csv', normalized=None, weighted=None, criteria_cols=None,
+                   names=None, weights=None, criteria_type=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                   buffer=None):
+    """
+    Menulis hasil ranking secara bertahap (per chunk) ke buffer sementara.
+
+    Jika salah satu dari matrix ternormalisasi, matrix terbobot, atau metadata bobot
+    disertakan, hasil export berupa arsip ZIP yang berisi satu file per bagian.
+    Setiap bagian ditulis langsung dari sumber aslinya per chunk sehingga tidak ada
+    salinan DataFrame penuh yang dibuat.
+
+    Parameters:
+    -----------
+    result_df : pandas.DataFrame
+        DataFrame hasil dari create_result_dataframe
+    fmt : str
+        Format export: 'csv', 'csv.gz', 'parquet', atau 'jsonl'
+    normalized : numpy.ndarray, optional
+        Matrix ternormalisasi (urutan baris sama dengan dataset asli)
+    weighted : numpy.ndarray, optional
+        Matrix ternormalisasi terbobot (urutan baris sama dengan dataset asli)
+    criteria_cols : list, optional
+        Nama kolom kriteria, wajib jika matrix atau bobot disertakan
+    names : array-like, optional
+        Nama alternatif sesuai urutan baris matrix, wajib jika matrix disertakan
+    weights : dict, optional
+        Bobot setiap kriteria (dalam persen), disertakan sebagai metadata
+    criteria_type : dict, optional
+        Tipe setiap kriteria, wajib jika weights disertakan
+    chunk_size : int
+        Jumlah baris per chunk
+    buffer : file-like, optional
+        Stream biner tujuan. Default: SpooledTemporaryFile yang pindah ke disk
+        setelah melewati SPOOL_MAX_SIZE
+
+    Returns:
+    --------
+    file-like
+        Buffer berisi hasil export dengan posisi kursor di awal
+
+    Raises:
+    -------
+    ValueError
+        - Jika format tidak didukung
+        - Jika matrix atau bobot disertakan tanpa criteria_cols/names
+    ImportError
+        - Jika format Parquet dipilih tetapi pyarrow tidak terpasang
+
+    Examples:
+    ---------
+    >>> result_df = pd.DataFrame({'Name': ['A', 'B'], 'Yi (Score)': [0.5, 0.3], 'Ranking': [1, 2]})
+    >>> buffer = export_results(result_df, fmt='jsonl')
+    >>> buffer.readline()
+    b'{"Name":"A","Yi (Score)":0.5,"Ranking":1}\\n'
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export '{fmt}' tidak didukung! Pilih salah satu: {', '.join(EXPORT_FORMATS)}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size harus minimal 1!")
+
+    has_matrix = normalized is not None or weighted is not None
+    if (has_matrix or weights is not None) and criteria_cols is None:
+        raise ValueError("criteria_cols wajib diisi untuk export matrix atau bobot!")
+    if has_matrix and names is None:
+        raise ValueError("names wajib diisi untuk export matrix!")
+    if weights is not None and criteria_type is None:
+        raise ValueError("criteria_type wajib diisi untuk export bobot!")
+
+    if buffer is None:
+        buffer = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode='w+b')
+
+    extension = EXPORT_FORMATS[fmt]['extension']
+
+    if not has_matrix and weights is None:
+        _write_chunks(_iter_frame_chunks(result_df, chunk_size), buffer, fmt)
+    else:
+        # Beberapa bagian: bungkus dalam ZIP, setiap entry ditulis secara streaming
+        parts = [('ranking', _iter_frame_chunks(result_df, chunk_size))]
+        if normalized is not None:
+            parts.append(('matrix_ternormalisasi', _iter_matrix_chunks(normalized, criteria_cols, names, chunk_size)))
+        if weighted is not None:
+            parts.append(('matrix_terbobot', _iter_matrix_chunks(weighted, criteria_cols, names, chunk_size)))
+        if weights is not None:
+            parts.append(('bobot', iter([_weights_frame(criteria_cols, weights, criteria_type)])))
+
+        # File dalam ZIP sudah dikompresi, jadi csv.gz tidak perlu dikompresi dua kali
+        compression = zipfile.ZIP_STORED if fmt in ('csv.gz', 'parquet') else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buffer, mode='w', compression=compression) as archive:
+            for part_name, chunks in parts:
+                with archive.open(f"{part_name}.{extension}", mode='w', force_zip64=True) as entry:
+                    _write_chunks(chunks, entry, fmt)
+
+    buffer.seek(0)
+    return buffer
+
+
+def export_file_info(fmt, bundle=False, base_name='hasil_rekomendasi_kost'):
+    """
+    Menentukan nama file dan MIME type untuk hasil export.
+
+    Parameters:
+    -----------
+    fmt : str
+        Format export (lihat EXPORT_FORMATS)
+    bundle : bool
+        True jika hasil export berupa arsip ZIP berisi beberapa bagian
+    base_name : str
+        Nama dasar file tanpa ekstensi
+
+    Returns:
+    --------
+    tuple
+        (file_name, mime)
+
+    Examples:
+    ---------
+    >>> export_file_info('csv.gz')
+    ('hasil_rekomendasi_kost.csv.gz', 'application/gzip')
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format export '{fmt}' tidak didukung! Pilih salah satu: {', '.join(EXPORT_FORMATS)}")
+    if bundle:
+        return f"{base_name}_{fmt.replace('.', '_')}.zip", 'application/zip'
+    info = EXPORT_FORMATS[fmt]
+    return f"{base_name}.{info['extension']}", info['mime']
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+
+from calculate import column_sum_squares, criteria_signs, weight_vector, rank_alternatives
+from validation import matrix_flags, report_from_flags
+
+
+class RegionDataset:
+    """
+    Dataset kost satu kota/region yang ikut dalam ranking federasi.
+
+    Region tidak pernah mengirim seluruh barisnya ke koordinator. Region hanya
+    mempublikasikan (1) jumlah kuadrat per kolom dan (2) top-K lokal yang
+    dihitung memakai norma global dari koordinator.
+
+    Parameters:
+    -----------
+    name : str
+        Nama region
+    source : pandas.DataFrame atau str
+        DataFrame, atau path CSV yang dibaca per chunk
+    criteria_cols : list
+        Urutan kolom kriteria yang dipakai semua region
+    chunk_size : int
+        Jumlah baris per chunk saat membaca CSV
+
+    Examples:
+    ---------
+    >>> df = pd.DataFrame({'Name': ['A', 'B'], 'Price': [900, 1800]})
+    >>> region = RegionDataset('Bandung', df, ['Price'])
+    >>> region.sum_squares()
+    array([4050000.])
+    """
+
+    def __init__(self, name, source, criteria_cols, chunk_size=100_000):
+        self.name = name
+        self.source = source
+        self.criteria_cols = list(criteria_cols)
+        self.chunk_size = chunk_size
+
+    def _chunks(self):
+        """Membaca data region per chunk (DataFrame dipotong, CSV dibaca bertahap)."""
+        if isinstance(self.source, pd.DataFrame):
+            for start in range(0, len(self.source), self.chunk_size):
+                yield self.source.iloc[start:start + self.chunk_size]
+        else:
+            yield from pd.read_csv(self.source, chunksize=self.chunk_size)
+
+    def _check_chunk(self, chunk):
+        """Validasi kolom serta nilai NaN, inf, dan nol/negatif untuk satu chunk."""
+        missing = [col for col in ['Name'] + self.criteria_cols if col not in chunk.columns]
+        if missing:
+            raise ValueError(f"Region '{self.name}' tidak memiliki kolom: {', '.join(missing)}")
+        X = chunk[self.criteria_cols].to_numpy(dtype=float)
+        report = report_from_flags(self.criteria_cols, *matrix_flags(X))
+        if not report.ok:
+            raise ValueError("\n".join(f"Region '{self.name}': {message}" for message in report.messages()))
+        return X
+
+    def sum_squares(self):
+        """
+        Tahap 1: menghitung Σxij² per kolom dan jumlah baris region.
+
+        Returns:
+        --------
+        numpy.ndarray
+            Jumlah kuadrat per kolom kriteria
+        """
+        total = np.zeros(len(self.criteria_cols))
+        self.n_rows = 0
+        for chunk in self._chunks():
+            total += column_sum_squares(self._check_chunk(chunk))
+            self.n_rows += len(chunk)
+        return total
+
+    def local_top_k(self, coefficients, k):
+        """
+        Tahap 2: top-K lokal dengan koefisien global (tanda × bobot / norma global).
+
+        Karena koefisiennya sama untuk semua region, Yi lokal sama persis dengan
+        Yi global, sehingga gabungan top-K semua region pasti memuat top-K global.
+
+        Parameters:
+        -----------
+        coefficients : numpy.ndarray
+            Koefisien per kolom dari koordinator
+        k : int
+            Jumlah kandidat yang dikirim
+
+        Returns:
+        --------
+        pandas.DataFrame
+            k baris kandidat teratas (ditambah baris yang Yi-nya sama dengan
+            kandidat ke-k) beserta kolom 'Yi (Score)'
+        """
+        best = None
+        for chunk in self._chunks():
+            X = self._check_chunk(chunk)
+            candidates = chunk[['Name'] + self.criteria_cols].assign(**{'Yi (Score)': X @ coefficients})
+            if best is not None:
+                candidates = pd.concat([best, candidates], ignore_index=True)
+            # Hanya k baris terbaik beserta semua baris yang Yi-nya sama dengan batas bawahnya
+            # yang disimpan antar chunk, agar tie-breaker di koordinator tidak kehilangan kandidat
+            if len(candidates) > k:
+                yi_values = candidates['Yi (Score)'].to_numpy()
+                threshold = np.partition(yi_values, len(yi_values) - k)[len(yi_values) - k]
+                candidates = candidates[yi_values >= threshold]
+            best = candidates.reset_index(drop=True)
+        if best is None:
+            best = pd.DataFrame(columns=['Name'] + self.criteria_cols + ['Yi (Score)'])
+        return best.assign(Region=self.name)
+
+
+def global_coefficients(sum_squares_list, criteria_cols, criteria_type, weights):
+    """
+    Menggabungkan jumlah kuadrat semua region menjadi koefisien skor global.
+
+    Parameters:
+    -----------
+    sum_squares_list : list
+        Array Σxij² dari setiap region
+    criteria_cols : list
+        Urutan kolom kriteria
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    weights : dict
+        Dictionary bobot setiap kriteria dalam bentuk desimal (total = 1.0)
+
+    Returns:
+    --------
+    tuple
+        (coefficients, norms)
+
+    Examples:
+    ---------
+    >>> coef, norms = global_coefficients([np.array([9.0]), np.array([16.0])],
+    ...                                   ['Price'], {'Price': 'cost'}, {'Price': 1.0})
+    >>> norms
+    array([5.])
+    """
+    norms = np.sqrt(np.sum(sum_squares_list, axis=0))
+    coefficients = criteria_signs(criteria_cols, criteria_type) * weight_vector(criteria_cols, weights) / norms
+    return coefficients, norms
+
+
+def federated_top_k(regions, criteria_type, weights, k=10, tie_breakers=None):
+    """
+    Menghitung top-K global dari beberapa dataset region tanpa menggabungkan semua baris.
+
+    Protokol dua tahap:
+    1. Setiap region mengirim Σxij² per kolom; koordinator menjumlahkannya
+       menjadi norma global √(Σ semua region).
+    2. Setiap region mengirim top-K lokal yang diskor dengan norma global;
+       koordinator mengurutkan paling banyak K × jumlah region kandidat.
+
+    Hasilnya sama persis dengan menjalankan calculate_moora pada gabungan
+    seluruh dataset lalu mengambil K teratas.
+
+    Parameters:
+    -----------
+    regions : list
+        List RegionDataset dengan criteria_cols yang sama
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    weights : dict
+        Dictionary bobot setiap kriteria dalam bentuk desimal (total = 1.0)
+    k : int
+        Jumlah alternatif teratas
+    tie_breakers : list, optional
+        List (nama_kolom, ascending) untuk Yi yang sama (lihat create_result_dataframe)
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Top-K global dengan kolom Region, Yi (Score), dan Ranking. Ranking berlaku
+        untuk gabungan semua region (alternatif kembar di batas K bisa terpotong).
+
+    Raises:
+    -------
+    ValueError
+        - Jika tidak ada region, k < 1, atau kolom kriteria region berbeda
+    """
+    if not regions:
+        raise ValueError("Minimal harus ada 1 region!")
+    if k < 1:
+        raise ValueError("k harus minimal 1!")
+    criteria_cols = regions[0].criteria_cols
+    for region in regions[1:]:
+        if region.criteria_cols != criteria_cols:
+            raise ValueError(f"Kolom kriteria region '{region.name}' berbeda dengan region '{regions[0].name}'!")
+
+    # Tahap 1: norma global dari jumlah kuadrat setiap region
+    coefficients, _ = global_coefficients(
+        [region.sum_squares() for region in regions], criteria_cols, criteria_type, weights
+    )
+
+    # Tahap 2: gabungkan kandidat top-K lokal, lalu urutkan ulang
+    candidates = pd.concat([region.local_top_k(coefficients, k) for region in regions], ignore_index=True)
+    result_df = merge_top_k(candidates, k, tie_breakers)
+    return result_df[['Region', 'Name'] + criteria_cols + ['Yi (Score)', 'Ranking']]
+
+
+def merge_top_k(candidates, k, tie_breakers=None):
+    """
+    Mengurutkan gabungan kandidat top-K lokal yang sudah diskor dengan koefisien global.
+
+    Parameters:
+    -----------
+    candidates : pandas.DataFrame
+        Kandidat dari semua sumber dengan kolom 'Yi (Score)'
+    k : int
+        Jumlah alternatif teratas
+    tie_breakers : list, optional
+        List (nama_kolom, ascending) untuk Yi yang sama
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Maksimal k baris teratas dengan kolom 'Ranking'
+    """
+    yi_values = candidates['Yi (Score)'].to_numpy(dtype=float)
+    tie_keys = [(candidates[col].to_numpy(), ascending) for col, ascending in (tie_breakers or [])]
+    order, rankings = rank_alternatives(yi_values, tie_keys)
+
+    result_df = candidates.take(order[:k]).reset_index(drop=True)
+    result_df['Ranking'] = rankings[:k]
+    return result_df
@@ -0,0 +1,380 @@
+"""
+Governor sumber daya: estimasi memori dan waktu sebelum menghitung, lalu
+memilih mode perhitungan yang muat dalam budget sesi.
+
+Budget bisa diatur lewat environment variable:
+    SIREKMA_SESSION_MEMORY_MB   (default 512)
+    SIREKMA_SESSION_SECONDS     (default 10)
+    SIREKMA_TOTAL_MEMORY_MB     (default 2048, total semua sesi yang sedang menghitung)
+"""
+import contextlib
+import os
+import threading
+
+import pandas as pd
+
+from observability import GOVERNOR_DECISIONS
+
+
+MODE_FULL = 'full'
+MODE_TOP_K = 'top_k'
+MODE_STREAMING = 'streaming'
+MODE_APPROXIMATE = 'approximate'
+MODE_REFUSE = 'refuse'
+
+# Urutan mode dari yang paling lengkap; mode pertama yang muat dalam budget dipilih
+FALLBACK_ORDER = (MODE_FULL, MODE_TOP_K, MODE_STREAMING, MODE_APPROXIMATE)
+
+MODE_LABELS = {
+    MODE_FULL: "Lengkap",
+    MODE_TOP_K: "Top-K saja",
+    MODE_STREAMING: "Streaming",
+    MODE_APPROXIMATE: "Perkiraan",
+    MODE_REFUSE: "Ditolak",
+}
+
+# Jumlah baris yang ditampilkan pada mode selain lengkap
+DEFAULT_TOP_K = 100
+
+# Konstanta model biaya, diukur dengan `python benchmark.py --only governor` (dibulatkan ke atas);
+# ukur ulang setelah mengubah jalur perhitungan atau tampilan hasil di aplikasi
+FLOAT_BYTES = 8
+FRAME_BYTES_PER_CELL = 10           # DataFrame hasil read_csv, termasuk kolom Name
+STYLED_BYTES_PER_CELL = 700         # pandas Styler + serialisasi st.dataframe
+ARROW_BYTES_PER_CELL = 30           # st.dataframe / chart tanpa styling
+PARSE_SECONDS_PER_CELL = 2e-7
+SCORE_SECONDS_PER_CELL = 1e-9
+RANK_SECONDS_PER_ROW = 3e-7         # sort + membuat DataFrame hasil
+STYLED_SECONDS_PER_CELL = 2e-5
+ARROW_SECONDS_PER_CELL = 2e-8
+APPROXIMATE_BYTES_PER_CELL = 20     # satu chunk ProgressiveRanking (salinan chunk, matrix, dan kandidat)
+APPROXIMATE_SECONDS_PER_CELL = 2e-8
+
+# Jumlah baris per chunk pada mode perkiraan
+CHUNK_ROWS = 100_000
+
+
+def _env_mb(name, default):
+    return int(float(os.environ.get(name, default)) * 1024 * 1024)
+
+
+class Budget:
+    """
+    Budget memori dan waktu untuk satu perhitungan dalam satu sesi.
+
+    Parameters:
+    -----------
+    memory_bytes : int
+        Memori tambahan maksimal yang boleh dipakai
+    seconds : float
+        Perkiraan waktu maksimal sampai hasil pertama tampil
+    """
+
+    def __init__(self, memory_bytes, seconds):
+        self.memory_bytes = memory_bytes
+        self.seconds = seconds
+
+    @classmethod
+    def from_env(cls):
+        return cls(_env_mb('SIREKMA_SESSION_MEMORY_MB', 512),
+                   float(os.environ.get('SIREKMA_SESSION_SECONDS', 10)))
+
+
+class CostEstimate:
+    """
+    Perkiraan biaya satu mode perhitungan.
+
+    Attributes:
+    -----------
+    memory_bytes : int
+        Memori tambahan yang dialokasikan
+    seconds : float
+        Waktu sampai hasil pertama tampil
+    """
+
+    def __init__(self, memory_bytes, seconds):
+        self.memory_bytes = int(memory_bytes)
+        self.seconds = float(seconds)
+
+    def fits(self, memory_bytes, seconds):
+        return self.memory_bytes <= memory_bytes and self.seconds <= seconds
+
+    def __repr__(self):
+        return f"CostEstimate({self.memory_bytes / 1e6:.1f} MB, {self.seconds:.2f} s)"
+
+
+def estimate_cost(mode, n_rows, n_cols, k=DEFAULT_TOP_K):
+    """
+    Memperkirakan memori dan waktu satu mode dari jumlah baris dan kolom kriteria.
+
+    - full: matrix ternormalisasi dan terbobot, tabel bergaya untuk semua baris,
+      serta grafik semua alternatif
+    - top_k: perhitungan lengkap, tetapi hanya K baris teratas yang ditampilkan
+    - streaming: Yi dihitung langsung dari matrix (X · koefisien) tanpa matrix antara
+    - approximate: top-K sementara dari chunk pertama DataFrame yang sudah dimuat (norma pasti)
+
+    Parameters:
+    -----------
+    mode : str
+        Salah satu FALLBACK_ORDER
+    n_rows : int
+        Jumlah alternatif
+    n_cols : int
+        Jumlah kolom kriteria
+    k : int
+        Jumlah baris yang ditampilkan pada mode selain full
+
+    Returns:
+    --------
+    CostEstimate
+
+    Examples:
+    ---------
+    >>> estimate_cost('full', 1_000_000, 5).memory_bytes > estimate_cost('streaming', 1_000_000, 5).memory_bytes
+    True
+    """
+    cells = n_rows * n_cols
+    result_cells = n_rows * (n_cols + 3)  # Name, kriteria, Yi, Ranking
+    top_cells = min(k, n_rows) * (n_cols + 3)
+    score_seconds = cells * SCORE_SECONDS_PER_CELL + n_rows * RANK_SECONDS_PER_ROW
+
+    if mode == MODE_FULL:
+        styled_cells = result_cells + 2 * cells
+        memory = (2 * cells * FLOAT_BYTES + result_cells * FRAME_BYTES_PER_CELL
+                  + styled_cells * STYLED_BYTES_PER_CELL + 4 * n_rows * ARROW_BYTES_PER_CELL)
+        seconds = (score_seconds + styled_cells * STYLED_SECONDS_PER_CELL
+                   + 4 * n_rows * ARROW_SECONDS_PER_CELL)
+    elif mode == MODE_TOP_K:
+        memory = (2 * cells * FLOAT_BYTES + 2 * n_rows * FLOAT_BYTES
+                  + result_cells * FRAME_BYTES_PER_CELL + top_cells * STYLED_BYTES_PER_CELL)
+        seconds = score_seconds + top_cells * STYLED_SECONDS_PER_CELL
+    elif mode == MODE_STREAMING:
+        memory = 2 * n_rows * FLOAT_BYTES + top_cells * (FRAME_BYTES_PER_CELL + STYLED_BYTES_PER_CELL)
+        seconds = score_seconds + top_cells * STYLED_SECONDS_PER_CELL
+    elif mode == MODE_APPROXIMATE:
+        # Sama dengan aplikasi: DataFrame yang sudah dimuat dibaca per chunk dengan norma pasti dari
+        # registry, sehingga hanya satu chunk dan top-K yang ada di memori sekaligus
+        chunk_cells = min(CHUNK_ROWS, n_rows) * (n_cols + 1)
+        memory = chunk_cells * APPROXIMATE_BYTES_PER_CELL + top_cells * (FRAME_BYTES_PER_CELL + ARROW_BYTES_PER_CELL)
+        # Hanya sampai top-K sementara pertama; sisanya diperbarui bertahap
+        seconds = chunk_cells * APPROXIMATE_SECONDS_PER_CELL + top_cells * ARROW_SECONDS_PER_CELL
+    else:
+        raise ValueError(f"Mode '{mode}' tidak dikenal!")
+    return CostEstimate(memory, seconds)
+
+
+def estimate_upload(n_rows, n_cols):
+    """Perkiraan biaya memuat dataset (DataFrame + matrix float) dari jumlah baris dan kolom kriteria."""
+    cells = n_rows * n_cols
+    return CostEstimate(n_rows * (n_cols + 1) * FRAME_BYTES_PER_CELL + cells * FLOAT_BYTES,
+                        n_rows * (n_cols + 1) * PARSE_SECONDS_PER_CELL)
+
+
+def styler_fits(n_rows, n_cols):
+    """
+    Apakah tabel hasil mode lengkap masih di bawah batas sel pandas Styler.
+
+    st.dataframe menolak Styler yang melebihi opsi styler.render.max_elements,
+    berapa pun budget memori dan waktunya.
+
+    Examples:
+    ---------
+    >>> styler_fits(1_000, 5), styler_fits(1_000_000, 5)
+    (True, False)
+    """
+    return n_rows * (n_cols + 3) <= pd.get_option('styler.render.max_elements')
+
+
+def csv_shape(data):
+    """
+    Perkiraan (jumlah baris, jumlah kolom kriteria) dari isi CSV tanpa parsing.
+
+    Examples:
+    ---------
+    >>> csv_shape(b'Name,Price,Size\\nA,900,12\\nB,1200,15\\n')
+    (2, 2)
+    """
+    header_end = data.find(b'\n')
+    header = data if header_end < 0 else data[:header_end]
+    columns = [col.strip().strip(b'"') for col in header.split(b',')] if header.strip() else []
+    n_rows = data.count(b'\n') + (not data.endswith(b'\n') and header_end >= 0) - 1
+    return max(n_rows, 0), len([col for col in columns if col != b'Name'])
+
+
+def _format_mb(n_bytes):
+    return f"{n_bytes / (1024 * 1024):,.1f} MB"
+
+
+class Decision:
+    """
+    Mode perhitungan yang dipilih governor.
+
+    Attributes:
+    -----------
+    mode : str
+        Mode terpilih (MODE_REFUSE jika tidak ada yang muat)
+    estimate : CostEstimate atau None
+        Perkiraan biaya mode terpilih
+    reason : str
+        Penjelasan untuk pengguna
+    """
+
+    def __init__(self, mode, estimate, reason):
+        self.mode = mode
+        self.estimate = estimate
+        self.reason = reason
+
+    @property
+    def allowed(self):
+        return self.mode != MODE_REFUSE
+
+    @property
+    def degraded(self):
+        return self.mode not in (MODE_FULL, MODE_REFUSE)
+
+    def __repr__(self):
+        return f"Decision({self.mode!r}, {self.estimate!r})"
+
+
+class ResourceGovernor:
+    """
+    Memilih mode perhitungan per sesi dan mencatat metrik fallback.
+
+    Memori yang sedang dipakai perhitungan semua sesi dicatat lewat reserve(),
+    sehingga saat server sibuk budget efektif satu sesi ikut mengecil.
+
+    Parameters:
+    -----------
+    budget : Budget, optional
+        Budget per sesi (default dari environment variable)
+    total_memory_bytes : int, optional
+        Batas memori semua perhitungan yang berjalan bersamaan
+
+    Examples:
+    ---------
+    >>> governor = ResourceGovernor(Budget(memory_bytes=50 * 1024 * 1024, seconds=5))
+    >>> governor.plan(20, 5).mode
+    'full'
+    >>> governor.plan(2_000_000, 5).mode
+    'streaming'
+    >>> governor.stats()['fallbacks']
+    1
+    """
+
+    def __init__(self, budget=None, total_memory_bytes=None):
+        self.budget = budget or Budget.from_env()
+        self.total_memory_bytes = (_env_mb('SIREKMA_TOTAL_MEMORY_MB', 2048)
+                                   if total_memory_bytes is None else total_memory_bytes)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._counts = {mode: 0 for mode in FALLBACK_ORDER + (MODE_REFUSE,)}
+        self._upload_refusals = 0
+
+    def available_memory(self):
+        """Budget memori efektif: budget sesi, dibatasi sisa memori total."""
+        with self._lock:
+            return max(min(self.budget.memory_bytes, self.total_memory_bytes - self._in_flight), 0)
+
+    def plan(self, n_rows, n_cols, k=DEFAULT_TOP_K, allowed_modes=FALLBACK_ORDER):
+        """
+        Memilih mode paling lengkap yang muat dalam budget memori dan waktu.
+
+        Parameters:
+        -----------
+        n_rows : int
+            Jumlah alternatif
+        n_cols : int
+            Jumlah kolom kriteria
+        k : int
+            Jumlah baris yang ditampilkan pada mode selain full
+        allowed_modes : tuple
+            Mode yang didukung pemanggil, sesuai urutan preferensi
+
+        Returns:
+        --------
+        Decision
+        """
+        memory_limit = self.available_memory()
+        estimates = {mode: estimate_cost(mode, n_rows, n_cols, k) for mode in allowed_modes}
+        full_renderable = styler_fits(n_rows, n_cols)
+        for mode in allowed_modes:
+            if mode == MODE_FULL and not full_renderable:
+                continue
+            if estimates[mode].fits(memory_limit, self.budget.seconds):
+                if mode == MODE_FULL:
+                    reason = "Perhitungan lengkap muat dalam budget sesi."
+                elif not full_renderable:
+                    reason = (f"Tabel hasil {n_rows:,} baris melebihi batas sel tabel bergaya "
+                              f"({pd.get_option('styler.render.max_elements'):,} sel), "
+                              f"sehingga dipakai mode {MODE_LABELS[mode]}.")
+                else:
+                    full = estimate_cost(MODE_FULL, n_rows, n_cols, k)
+                    reason = (f"Perhitungan lengkap diperkirakan butuh {_format_mb(full.memory_bytes)} "
+                              f"dan {full.seconds:,.1f} detik (budget {_format_mb(memory_limit)}, "
+                              f"{self.budget.seconds:g} detik), sehingga dipakai mode {MODE_LABELS[mode]}.")
+                decision = Decision(mode, estimates[mode], reason)
+                break
+        else:
+            cheapest = min(estimates.values(), key=lambda estimate: estimate.memory_bytes)
+            decision = Decision(MODE_REFUSE, cheapest, (
+                f"Dataset {n_rows:,} baris × {n_cols} kriteria terlalu besar: mode paling hemat pun "
+                f"diperkirakan butuh {_format_mb(cheapest.memory_bytes)} dan {cheapest.seconds:,.1f} detik, "
+                f"melebihi budget sesi {_format_mb(memory_limit)} / {self.budget.seconds:g} detik."
+            ))
+        with self._lock:
+            self._counts[decision.mode] += 1
+        GOVERNOR_DECISIONS.inc(mode=decision.mode)
+        return decision
+
+    def plan_upload(self, data, shape=None):
+        """
+        Memeriksa apakah file upload boleh dimuat sebelum parsing.
+
+        Parameters:
+        -----------
+        data : bytes
+            Isi file
+        shape : tuple, optional
+            (jumlah baris, jumlah kolom kriteria) jika sudah diketahui, misalnya
+            dari dimensi sheet spreadsheet (default: diperkirakan dari isi CSV)
+
+        Returns:
+        --------
+        Decision
+            MODE_FULL jika boleh dimuat, MODE_REFUSE jika melebihi budget memori
+        """
+        n_rows, n_cols = csv_shape(data) if shape is None else shape
+        estimate = estimate_upload(n_rows, n_cols)
+        memory_limit = self.available_memory()
+        if estimate.memory_bytes <= memory_limit:
+            return Decision(MODE_FULL, estimate, "Dataset muat dalam budget sesi.")
+        with self._lock:
+            self._upload_refusals += 1
+        return Decision(MODE_REFUSE, estimate, (
+            f"File terlalu besar untuk dimuat: sekitar {n_rows:,} baris × {n_cols} kriteria diperkirakan "
+            f"butuh {_format_mb(estimate.memory_bytes)}, melebihi budget sesi {_format_mb(memory_limit)}."
+        ))
+
+    @contextlib.contextmanager
+    def reserve(self, decision):
+        """Mencatat memori perhitungan yang sedang berjalan selama blok with."""
+        reserved = decision.estimate.memory_bytes if decision.allowed else 0
+        with self._lock:
+            self._in_flight += reserved
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._in_flight -= reserved
+
+    def stats(self):
+        """Jumlah keputusan per mode, total fallback dan penolakan, serta memori yang sedang dipakai."""
+        with self._lock:
+            counts = dict(self._counts)
+            return {
+                'decisions': counts,
+                'fallbacks': sum(counts[mode] for mode in FALLBACK_ORDER if mode != MODE_FULL),
+                'refusals': counts[MODE_REFUSE],
+                'upload_refusals': self._upload_refusals,
+                'in_flight_bytes': self._in_flight,
+            }
@@ -0,0 +1,328 @@
+"""
+Membaca dataset dari spreadsheet (.xls / .xlsx) dengan cache hasil konversi.
+
+Parsing spreadsheet jauh lebih lambat daripada CSV. Blok data hasil parsing
+(nama dan kolom kriteria numerik) disimpan sebagai file .npz biner dengan
+key dari hash isi file, sheet, dan kolom, sehingga upload ulang file yang
+sama langsung dimuat dari .npz tanpa membuka spreadsheet lagi.
+
+Membaca .xls membutuhkan paket xlrd, .xlsx membutuhkan openpyxl:
+    pip install xlrd openpyxl
+
+Lokasi cache bisa diganti lewat environment variable SIREKMA_INGEST_CACHE_DIR.
+"""
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from calculate import column_sum_squares
+from observability import record_cache, timed
+from pipeline import ParsedChunks
+from registry import DatasetEntry, content_hash
+from result_cache import ResultCache
+from validation import validate_data
+
+
+# Engine pandas untuk setiap ekstensi spreadsheet
+SPREADSHEET_ENGINES = {
+    '.xls': 'xlrd',
+    '.xlsx': 'openpyxl',
+    '.xlsm': 'openpyxl',
+}
+
+# Lokasi default cache konversi
+DEFAULT_INGEST_DIR = os.environ.get('SIREKMA_INGEST_CACHE_DIR', os.path.join('.cache', 'sirekma', 'ingest'))
+
+# Batas total ukuran cache konversi sebelum entry lama dibuang
+DEFAULT_INGEST_MAX_BYTES = 512 * 1024 * 1024
+
+# Dinaikkan setiap format file cache berubah agar cache lama tidak terbaca
+INGEST_FORMAT_VERSION = 1
+
+
+def is_spreadsheet(filename):
+    """
+    Apakah nama file merupakan spreadsheet yang didukung.
+
+    Examples:
+    ---------
+    >>> is_spreadsheet('data/dataset_kost_mahasiswa.xls'), is_spreadsheet('dataset.CSV')
+    (True, False)
+    """
+    return os.path.splitext(filename)[1].lower() in SPREADSHEET_ENGINES
+
+
+def spreadsheet_engine(filename):
+    """
+    Engine pandas untuk file spreadsheet.
+
+    Raises:
+    -------
+    ValueError
+        Jika ekstensi file tidak didukung
+    ImportError
+        Jika paket pembaca spreadsheet belum terpasang
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in SPREADSHEET_ENGINES:
+        raise ValueError(f"Format file '{extension}' tidak didukung!")
+    engine = SPREADSHEET_ENGINES[extension]
+    if importlib.util.find_spec(engine) is None:
+        raise ImportError(f"Membaca file {extension} membutuhkan paket {engine} (pip install {engine})")
+    return engine
+
+
+def sheet_names(data, filename):
+    """Daftar nama sheet tanpa membaca isi sheet."""
+    with pd.ExcelFile(io.BytesIO(data), engine=spreadsheet_engine(filename)) as book:
+        return list(book.sheet_names)
+
+
+def sheet_columns(data, filename, sheet=0):
+    """Nama kolom (baris judul) satu sheet tanpa membaca baris data."""
+    return [str(col) for col in pd.read_excel(io.BytesIO(data), sheet_name=sheet, nrows=0,
+                                              engine=spreadsheet_engine(filename)).columns]
+
+
+def spreadsheet_shape(data, filename, sheet=0):
+    """
+    Perkiraan (jumlah baris, jumlah kolom kriteria) satu sheet tanpa membaca isinya.
+
+    Untuk .xlsx diambil dari dimensi yang tercatat di sheet (0 jika tidak
+    tercatat); untuk .xls hanya sheet tersebut yang dimuat.
+
+    Returns:
+    --------
+    tuple
+        (n_rows, n_cols) untuk ResourceGovernor.plan_upload
+    """
+    engine = spreadsheet_engine(filename)
+    if engine == 'xlrd':
+        import xlrd
+        book = xlrd.open_workbook(file_contents=data, on_demand=True)
+        try:
+            worksheet = book.sheet_by_name(sheet) if isinstance(sheet, str) else book.sheet_by_index(sheet)
+            n_rows, n_cols = worksheet.nrows, worksheet.ncols
+        finally:
+            book.release_resources()
+    else:
+        import openpyxl
+        book = openpyxl.load_workbook(io.BytesIO(data), read_only=True)
+        try:
+            worksheet = book[sheet] if isinstance(sheet, str) else book.worksheets[sheet]
+            n_rows, n_cols = worksheet.max_row or 0, worksheet.max_column or 0
+        finally:
+            book.close()
+    return max(n_rows - 1, 0), max(n_cols - 1, 0)
+
+
+def read_spreadsheet(data, filename, sheet=0, columns=None):
+    """
+    Membaca satu sheet spreadsheet menjadi DataFrame.
+
+    Parameters:
+    -----------
+    data : bytes
+        Isi file
+    filename : str
+        Nama file (menentukan engine)
+    sheet : str atau int
+        Nama atau indeks sheet; hanya sheet ini yang dibaca
+    columns : list, optional
+        Kolom kriteria yang dibaca (selain 'Name'); default semua kolom
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Baris dan kolom tanpa judul yang seluruhnya kosong sudah dibuang
+    """
+    usecols = None if columns is None else ['Name'] + [col for col in columns if col != 'Name']
+    frame = pd.read_excel(io.BytesIO(data), sheet_name=sheet, usecols=usecols, engine=spreadsheet_engine(filename))
+    # Sel yang pernah diformat sering terbaca sebagai baris/kolom kosong di akhir sheet
+    blank_columns = [col for col in frame.columns
+                     if str(col).startswith('Unnamed:') and frame[col].isna().all()]
+    frame = frame.drop(columns=blank_columns).dropna(how='all')
+    return frame.reset_index(drop=True)
+
+
+def conversion_key(data, sheet=0, columns=None):
+    """
+    Key cache konversi dari hash isi file, sheet, kolom, dan versi format.
+
+    Examples:
+    ---------
+    >>> conversion_key(b'isi', 0) == conversion_key(b'isi', 0), conversion_key(b'isi', 0) == conversion_key(b'isi', 1)
+    (True, False)
+    """
+    payload = {
+        'content': content_hash(data),
+        'sheet': sheet,
+        'columns': None if columns is None else list(columns),
+        'version': INGEST_FORMAT_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _cacheable(frame):
+    """Hanya blok data yang bisa disimpan tanpa pickle: nama berupa teks dan semua kriteria numerik."""
+    if 'Name' not in frame.columns:
+        return False
+    criteria_cols = [col for col in frame.columns if col != 'Name']
+    return (all(pd.api.types.is_numeric_dtype(frame[col]) and not pd.api.types.is_bool_dtype(frame[col])
+                for col in criteria_cols)
+            and frame['Name'].map(type).eq(str).all())
+
+
+class ConversionCache(ResultCache):
+    """
+    Cache hasil konversi spreadsheet di disk (format .npz tanpa pickle).
+
+    Memakai penulisan atomik dan eviction LRU yang sama dengan ResultCache.
+    Setiap entry menyimpan nama kolom, nama alternatif, dan satu array per
+    kolom kriteria dengan dtype aslinya (integer tetap integer).
+
+    Examples:
+    ---------
+    >>> cache = ConversionCache(tempfile.mkdtemp())
+    >>> cache.put_frame('abc', pd.DataFrame({'Name': ['A', 'B'], 'Price': [900, 1800]}))
+    True
+    >>> cache.get_frame('abc')['Price'].tolist()
+    [900, 1800]
+    """
+
+    def __init__(self, directory=DEFAULT_INGEST_DIR, max_bytes=DEFAULT_INGEST_MAX_BYTES):
+        super().__init__(directory, max_bytes)
+
+    def get_frame(self, key):
+        """
+        Mengambil DataFrame hasil konversi.
+
+        Returns:
+        --------
+        pandas.DataFrame atau None
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = data['columns'].tolist()
+                frame = pd.DataFrame({'Name': data['Name'].astype(object),
+                                      **{col: data[f"col_{i}"] for i, col in enumerate(columns)}})
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            self.misses += 1
+            record_cache('ingest', False)
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self.hits += 1
+        record_cache('ingest', True)
+        return frame
+
+    def put_frame(self, key, frame):
+        """
+        Menyimpan DataFrame hasil konversi jika bisa disimpan tanpa pickle.
+
+        Returns:
+        --------
+        bool
+            True jika tersimpan
+        """
+        if not _cacheable(frame):
+            return False
+        columns = [col for col in frame.columns if col != 'Name']
+        arrays = {f"col_{i}": frame[col].to_numpy() for i, col in enumerate(columns)}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, columns=np.array(columns, dtype=str), Name=frame['Name'].to_numpy(dtype=str), **arrays)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return False
+        self.evict()
+        return True
+
+
+def load_spreadsheet(data, filename, sheet=0, columns=None, cache=None):
+    """
+    Membaca spreadsheet, memakai cache konversi jika tersedia.
+
+    Parameters:
+    -----------
+    data : bytes
+        Isi file
+    filename : str
+        Nama file (menentukan engine)
+    sheet : str atau int
+        Nama atau indeks sheet
+    columns : list, optional
+        Kolom kriteria yang dibaca (default semua)
+    cache : ConversionCache, optional
+        Cache konversi; tanpa cache spreadsheet selalu diparsing
+
+    Returns:
+    --------
+    tuple
+        (frame, from_cache)
+
+    Examples:
+    ---------
+    >>> with open('data/dataset_kost_mahasiswa.xls', 'rb') as f:
+    ...     data = f.read()
+    >>> cache = ConversionCache(tempfile.mkdtemp())
+    >>> frame, from_cache = load_spreadsheet(data, 'dataset_kost_mahasiswa.xls', cache=cache)
+    >>> frame.shape, from_cache
+    ((30, 6), False)
+    >>> load_spreadsheet(data, 'dataset_kost_mahasiswa.xls', cache=cache)[1]
+    True
+    """
+    key = conversion_key(data, sheet, columns)
+    if cache is not None:
+        frame = cache.get_frame(key)
+        if frame is not None:
+            return frame, True
+    with timed('spreadsheet'):
+        frame = read_spreadsheet(data, filename, sheet=sheet, columns=columns)
+    if cache is not None:
+        cache.put_frame(key, frame)
+    return frame, False
+
+
+def register_spreadsheet(registry, data, filename, sheet=0, columns=None, cache=None, pin=False):
+    """
+    Mendaftarkan dataset spreadsheet ke registry (lihat DatasetRegistry.register_bytes).
+
+    Key dataset sama dengan key cache konversi, sehingga sheet atau kolom
+    yang berbeda dari file yang sama menjadi dataset yang berbeda.
+
+    Returns:
+    --------
+    DatasetEntry
+
+    Raises:
+    -------
+    ImportError
+        Jika paket pembaca spreadsheet belum terpasang
+    ValueError
+        Jika sheet atau kolom tidak ditemukan
+    """
+    key = conversion_key(data, sheet, columns)
+
+    def load():
+        frame, _ = load_spreadsheet(data, filename, sheet=sheet, columns=columns, cache=cache)
+        criteria_cols = [col for col in frame.columns if col != 'Name']
+        if not _cacheable(frame):
+            # Data tidak seragam (teks di kolom kriteria, nama kosong): validasi lengkap dari DataFrame
+            return DatasetEntry(key, filename, frame)
+        matrix = frame[criteria_cols].to_numpy(dtype=float)
+        parsed = ParsedChunks(frame, matrix, column_sum_squares(matrix), validate_data(frame, criteria_cols))
+        return DatasetEntry(key, filename, frame, parsed=parsed)
+
+    return registry.register_loader(key, load, pin=pin)
@@ -0,0 +1,446 @@
+"""
+Query terbalik MOORA: bobot apa yang membuat satu kost menjadi peringkat 1 (atau masuk top-K)?
+
+Yi = Σ wj × sj × xij / √Σxij² linear terhadap bobot, sehingga syarat
+"target mengalahkan alternatif i" adalah satu half-space (St - Si) · w > 0
+pada simplex bobot (w ≥ 0, Σw = 1). Wilayah menang adalah irisan semua
+half-space tersebut, dan bobot terdekat dengan bobot pengguna adalah
+proyeksi Euclidean bobot pengguna ke wilayah itu.
+"""
+import functools
+import math
+
+import numpy as np
+
+from calculate import column_sum_squares, criteria_signs, weight_vector
+
+
+# Selisih Yi minimum (relatif terhadap norma kendala) agar hasil pembulatan tidak membuat target seri/kalah
+MARGIN_RATIO = 1e-9
+
+# Toleransi pelanggaran kendala saat memeriksa apakah bobot sudah berada di dalam wilayah
+FEASIBILITY_TOLERANCE = 1e-12
+
+# Batas elemen perbandingan (kandidat × front × kriteria) per blok saat mencari Pareto front
+PRUNE_BLOCK_ELEMENTS = 4_000_000
+
+# Batas iterasi solver; setiap iterasi menambah atau melepas satu kendala aktif
+MAX_ITERATIONS = 10_000
+
+# Jumlah sampel bobot acak untuk memperkirakan luas wilayah menang
+SHARE_SAMPLES = 20_000
+
+
+def pareto_front(points):
+    """
+    Mencari baris yang tidak didominasi baris lain (semua kolom dimaksimalkan).
+
+    Baris yang identik hanya disimpan sekali. Baris diproses terurut dari
+    jumlah terbesar sehingga sebuah baris hanya bisa didominasi baris yang
+    diproses sebelumnya, lalu dibandingkan per blok secara vektor.
+
+    Parameters:
+    -----------
+    points : numpy.ndarray
+        Matrix berukuran (jumlah titik × jumlah dimensi)
+
+    Returns:
+    --------
+    numpy.ndarray
+        Indeks baris Pareto front, terurut dari jumlah terbesar
+
+    Examples:
+    ---------
+    >>> pareto_front(np.array([[1.0, 0.0], [0.5, 0.5], [0.4, 0.4], [0.0, 1.0], [0.5, 0.5]])).tolist()
+    [0, 1, 3]
+    """
+    points = np.asarray(points, dtype=float)
+    n_points, n_dims = points.shape
+    order = np.argsort(-points.sum(axis=1), kind='stable')
+    front = np.empty((0, n_dims))
+    front_index = []
+    start = 0
+    while start < n_points:
+        # Blok dibandingkan dengan front (blok × front) dan dengan dirinya sendiri (blok × blok)
+        budget = PRUNE_BLOCK_ELEMENTS // max(n_dims, 1)
+        block_size = max(16, min(math.isqrt(budget), budget // max(len(front), 1)))
+        block_index = order[start:start + block_size]
+        block = points[block_index]
+        start += block_size
+
+        # Didominasi (atau sama dengan) titik front yang sudah ditemukan
+        dominated = (front[None, :, :] >= block[:, None, :]).all(axis=2).any(axis=1)
+        block_index, block = block_index[~dominated], block[~dominated]
+        # Didominasi titik yang lebih dulu di blok yang sama
+        within = np.tril((block[None, :, :] >= block[:, None, :]).all(axis=2), k=-1).any(axis=1)
+        new_front = block[~within]
+        front = np.vstack([front, new_front])
+        front_index.extend(block_index[~within].tolist())
+
+        # Titik sisanya yang didominasi front baru langsung dibuang (biasanya sebagian besar data)
+        rest = order[start:]
+        keep = np.ones(len(rest), dtype=bool)
+        chunk = max(1, budget // max(len(new_front), 1))
+        for begin in range(0, len(rest), chunk):
+            candidates = points[rest[begin:begin + chunk]]
+            keep[begin:begin + chunk] = ~(new_front[None, :, :] >= candidates[:, None, :]).all(axis=2).any(axis=1)
+        order = np.concatenate([order[:start], rest[keep]])
+    return np.array(front_index, dtype=np.intp)
+
+
+def project_onto_polytope(point, normals, offsets, n_equalities=0, tolerance=FEASIBILITY_TOLERANCE):
+    """
+    Proyeksi Euclidean titik ke polytope {x : normals @ x ≥ offsets}.
+
+    Menggunakan metode dual active-set (Goldfarb-Idnani) dengan Hessian
+    identitas: dimulai dari titik tanpa kendala, lalu kendala yang paling
+    dilanggar ditambahkan satu per satu (kendala aktif yang multiplier-nya
+    menjadi nol dilepas). Setiap iterasi hanya menyelesaikan sistem linear
+    seukuran jumlah dimensi, sehingga cepat walaupun kendalanya ribuan.
+
+    Parameters:
+    -----------
+    point : numpy.ndarray
+        Titik yang diproyeksikan
+    normals : numpy.ndarray
+        Normal kendala berukuran (jumlah kendala × jumlah dimensi)
+    offsets : numpy.ndarray
+        Batas bawah setiap kendala
+    n_equalities : int
+        Jumlah baris pertama yang merupakan kendala persamaan (normals @ x = offsets)
+    tolerance : float
+        Toleransi pelanggaran kendala
+
+    Returns:
+    --------
+    numpy.ndarray atau None
+        Titik terdekat di dalam polytope, atau None jika polytope kosong
+
+    Raises:
+    -------
+    RuntimeError
+        Jika solver tidak selesai dalam MAX_ITERATIONS iterasi
+
+    Examples:
+    ---------
+    >>> normals = np.array([[1.0, 1.0], [1.0, 0.0], [0.0, 1.0]])
+    >>> project_onto_polytope(np.array([2.0, 0.0]), normals, np.array([1.0, 0.0, 0.0]), n_equalities=1).round(12).tolist()
+    [1.0, 0.0]
+    >>> project_onto_polytope(np.zeros(2), normals[1:], np.array([1.0, 1.0])).tolist()
+    [1.0, 1.0]
+    >>> project_onto_polytope(np.zeros(1), np.array([[1.0], [-1.0]]), np.array([1.0, 0.0])) is None
+    True
+    """
+    x = np.array(point, dtype=float)
+    normals = np.asarray(normals, dtype=float)
+    offsets = np.asarray(offsets, dtype=float)
+    n_dims = x.shape[0]
+
+    # Kendala persamaan langsung diaktifkan: proyeksi ke subruang affine-nya
+    active = list(range(n_equalities))
+    multipliers = np.zeros(0)
+    if n_equalities:
+        N = normals[:n_equalities].T
+        multipliers = np.linalg.solve(N.T @ N, offsets[:n_equalities] - N.T @ x)
+        x = x + N @ multipliers
+
+    inequality_mask = np.ones(len(offsets), dtype=bool)
+    inequality_mask[:n_equalities] = False
+    for _ in range(MAX_ITERATIONS):
+        slack = normals @ x - offsets
+        slack[~inequality_mask] = np.inf
+        slack[active] = np.inf
+        p = int(np.argmin(slack))
+        if slack[p] >= -tolerance:
+            return x
+
+        normal_p = normals[p]
+        multiplier_p = 0.0
+        while True:
+            if active:
+                N = normals[active].T
+                N_star = np.linalg.pinv(N)
+                dual_step = N_star @ normal_p
+                primal_step = normal_p - N @ dual_step
+            else:
+                dual_step = np.zeros(0)
+                primal_step = normal_p
+
+            # Langkah parsial: kendala aktif (bukan persamaan) yang multiplier-nya habis lebih dulu
+            partial, drop = np.inf, None
+            droppable = np.flatnonzero((np.array(active) >= n_equalities) & (dual_step > tolerance))
+            if len(droppable):
+                ratios = multipliers[droppable] / dual_step[droppable]
+                drop = int(droppable[np.argmin(ratios)])
+                partial = float(ratios.min())
+
+            # Langkah penuh: sampai kendala p tepat terpenuhi
+            curvature = float(primal_step @ normal_p)
+            full = np.inf
+            if np.linalg.norm(primal_step) > tolerance * max(np.linalg.norm(normal_p), 1.0) and curvature > 0:
+                full = -(normal_p @ x - offsets[p]) / curvature
+
+            step = min(partial, full)
+            if step == np.inf:
+                # Kendala p tidak bisa dipenuhi bersama kendala aktif
+                return None
+            if full != np.inf:
+                x = x + step * primal_step
+            multipliers = multipliers - step * dual_step
+            multiplier_p += step
+            if full <= partial:
+                active.append(p)
+                multipliers = np.append(multipliers, multiplier_p)
+                break
+            del active[drop]
+            multipliers = np.delete(multipliers, drop)
+    raise RuntimeError("Solver bobot tidak konvergen")
+
+
+class WeightRegion:
+    """
+    Wilayah pada simplex bobot tempat target mengalahkan semua pesaing yang tersisa.
+
+    Attributes:
+    -----------
+    criteria_cols : list
+        Urutan kriteria sesuai kolom kendala
+    normals : numpy.ndarray
+        Normal half-space (St - Si) / ||St - Si|| untuk pesaing di Pareto front
+    competitors : numpy.ndarray
+        Indeks baris pesaing untuk setiap half-space
+    dominated_by : numpy.ndarray
+        Indeks baris pesaing yang lebih baik atau sama di semua kriteria (wilayah kosong jika ada)
+    """
+
+    def __init__(self, criteria_cols, normals, competitors, dominated_by):
+        self.criteria_cols = list(criteria_cols)
+        self.normals = normals
+        self.competitors = competitors
+        self.dominated_by = dominated_by
+
+    @property
+    def n_constraints(self):
+        return len(self.competitors)
+
+    @property
+    def empty(self):
+        return len(self.dominated_by) > 0
+
+    def _weight_array(self, weights):
+        if isinstance(weights, dict):
+            weights = weight_vector(self.criteria_cols, weights)
+        weights = np.asarray(weights, dtype=float)
+        return weights / weights.sum(axis=-1, keepdims=True)
+
+    def contains(self, weights):
+        """Apakah bobot (dictionary atau array, skala bebas) berada di wilayah menang."""
+        if self.empty:
+            return False
+        return bool((self.normals @ self._weight_array(weights) > 0).all())
+
+    def share(self, samples=SHARE_SAMPLES, seed=0):
+        """
+        Perkiraan fraksi simplex bobot yang termasuk wilayah menang (sampel bobot acak seragam).
+
+        Returns:
+        --------
+        float
+            Nilai antara 0 dan 1
+        """
+        if self.empty:
+            return 0.0
+        rng = np.random.default_rng(seed)
+        sample = rng.dirichlet(np.ones(len(self.criteria_cols)), size=samples)
+        inside = np.ones(samples, dtype=bool)
+        # Diperiksa per blok kendala agar memori tetap kecil walaupun front-nya besar
+        for start in range(0, self.n_constraints, 256):
+            inside &= (sample @ self.normals[start:start + 256].T > 0).all(axis=1)
+        return float(inside.mean())
+
+    def __repr__(self):
+        return f"WeightRegion({self.n_constraints} kendala, empty={self.empty})"
+
+
+class WeightSuggestion:
+    """
+    Bobot terdekat dengan bobot pengguna yang membuat target masuk top-K.
+
+    Attributes:
+    -----------
+    weights : dict
+        Bobot desimal setiap kriteria (total 1)
+    distance : float
+        Jarak Euclidean dari bobot pengguna (dalam skala desimal)
+    rank : int
+        Ranking target dengan bobot ini (metode 'min')
+    excluded : list
+        Indeks baris pesaing yang dibiarkan tetap di atas target (hanya untuk top-K > 1)
+    region : WeightRegion
+        Wilayah yang dipakai untuk proyeksi
+    """
+
+    def __init__(self, weights, distance, rank, excluded, region):
+        self.weights = weights
+        self.distance = distance
+        self.rank = rank
+        self.excluded = excluded
+        self.region = region
+
+    def __repr__(self):
+        return f"WeightSuggestion(rank={self.rank}, distance={self.distance:.4f})"
+
+
+class InverseQuery:
+    """
+    Query terbalik di atas matrix ternormalisasi bertanda yang dihitung sekali per dataset.
+
+    Parameters:
+    -----------
+    matrix : numpy.ndarray
+        Matrix keputusan (misalnya dari registry)
+    criteria_cols : list
+        Urutan kolom kriteria sesuai kolom matrix
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    sum_squares : numpy.ndarray, optional
+        Σxij² per kolom yang sudah dihitung sebelumnya
+
+    Examples:
+    ---------
+    >>> X = np.array([[900.0, 12.0], [1800.0, 20.0], [1200.0, 15.0]])
+    >>> query = InverseQuery(X, ['Price', 'Size'], {'Price': 'cost', 'Size': 'benefit'})
+    >>> query.rank(1, {'Price': 0.6, 'Size': 0.4})
+    3
+    >>> suggestion = query.nearest_weights(1, {'Price': 0.6, 'Size': 0.4})
+    >>> suggestion.rank, {col: round(w, 3) for col, w in suggestion.weights.items()}
+    (1, {'Price': 0.413, 'Size': 0.587})
+    """
+
+    def __init__(self, matrix, criteria_cols, criteria_type, sum_squares=None):
+        self.criteria_cols = list(criteria_cols)
+        sum_squares = column_sum_squares(matrix) if sum_squares is None else np.asarray(sum_squares, dtype=float)
+        # Sij = sj × xij / √Σxij², sehingga Yi = S @ w
+        self.signed = np.asarray(matrix, dtype=float) * (criteria_signs(self.criteria_cols, criteria_type)
+                                                         / np.sqrt(sum_squares))
+
+    @property
+    def n_rows(self):
+        return self.signed.shape[0]
+
+    @functools.cached_property
+    def front(self):
+        """Pareto front seluruh dataset, dihitung sekali dan dipakai ulang untuk setiap target."""
+        return np.sort(pareto_front(self.signed))
+
+    def yi_values(self, weights):
+        """Yi semua alternatif untuk bobot desimal (dictionary)."""
+        return self.signed @ weight_vector(self.criteria_cols, weights)
+
+    def rank(self, row, weights):
+        """Ranking metode 'min' alternatif row untuk bobot tertentu."""
+        yi_values = self.yi_values(weights)
+        return int(np.count_nonzero(yi_values > yi_values[row])) + 1
+
+    def region(self, row, exclude=()):
+        """
+        Menyusun wilayah bobot tempat alternatif row mengalahkan semua alternatif lain (kecuali exclude).
+
+        Pesaing yang tidak pernah lebih unggul dari target di kriteria mana pun
+        diabaikan (paling banyak seri), dan pesaing yang didominasi pesaing lain
+        juga diabaikan karena kendalanya sudah tercakup. Yang tersisa hanya
+        Pareto front pesaing (front seluruh dataset di-cache per query).
+
+        Parameters:
+        -----------
+        row : int
+            Indeks baris target
+        exclude : iterable, optional
+            Indeks baris pesaing yang boleh tetap di atas target
+
+        Returns:
+        --------
+        WeightRegion
+        """
+        lead = self.signed[row] - self.signed
+        candidate = lead.min(axis=1) < 0
+        candidate[row] = False
+        candidate[list(exclude)] = False
+        candidates = np.flatnonzero(candidate)
+
+        dominated_by = candidates[(lead[candidates] <= 0).all(axis=1)]
+        if len(dominated_by):
+            return WeightRegion(self.criteria_cols, np.empty((0, len(self.criteria_cols))),
+                                np.empty(0, dtype=np.intp), dominated_by)
+
+        if len(exclude):
+            # Pesaing yang dikecualikan bisa menutupi alternatif lain: front dihitung ulang
+            competitors = candidates[pareto_front(self.signed[candidates])]
+        else:
+            # Pesaing yang tidak didominasi pesaing lain pasti berada di front seluruh dataset
+            # (alternatif yang hanya didominasi target tidak pernah lebih unggul dari target)
+            competitors = self.front[candidate[self.front]]
+        normals = lead[competitors]
+        normals = normals / np.linalg.norm(normals, axis=1, keepdims=True)
+        return WeightRegion(self.criteria_cols, normals, competitors, dominated_by)
+
+    def nearest_weights(self, row, weights, top_k=1):
+        """
+        Mencari bobot terdekat dengan bobot pengguna yang membuat alternatif row masuk top-K.
+
+        Untuk top_k = 1 hasilnya proyeksi tepat ke wilayah menang. Wilayah
+        top-K > 1 tidak konveks, sehingga dipakai pendekatan: pesaing yang
+        mendominasi target, lalu pesaing dengan selisih Yi terbesar pada bobot
+        pengguna, dibiarkan tetap di atas target (total K - 1) dan bobot
+        diproyeksikan ke wilayah yang mengalahkan sisanya. Hasilnya selalu
+        valid (ranking ≤ K), tetapi belum tentu yang paling dekat.
+
+        Parameters:
+        -----------
+        row : int
+            Indeks baris target
+        weights : dict
+            Bobot pengguna saat ini dalam bentuk desimal
+        top_k : int
+            Ranking terendah yang masih diterima
+
+        Returns:
+        --------
+        WeightSuggestion atau None
+            None jika tidak ada bobot yang membuat target masuk top-K
+        """
+        current = weight_vector(self.criteria_cols, weights)
+        yi_values = self.signed @ current
+        ahead = np.flatnonzero(yi_values > yi_values[row])
+
+        excluded = []
+        if top_k > 1:
+            if len(ahead) < top_k:
+                return WeightSuggestion(dict(zip(self.criteria_cols, current.tolist())), 0.0, len(ahead) + 1,
+                                        excluded, None)
+            lead = self.signed[row] - self.signed
+            dominating = np.flatnonzero((lead <= 0).all(axis=1) & (lead < 0).any(axis=1))
+            if len(dominating) >= top_k:
+                return None
+            others = np.setdiff1d(ahead, dominating)
+            strongest = others[np.argsort(-yi_values[others], kind='stable')[:top_k - 1 - len(dominating)]]
+            excluded = sorted(dominating.tolist() + strongest.tolist())
+
+        region = self.region(row, exclude=excluded)
+        if region.empty:
+            return None
+
+        # Kendala: Σw = 1 (persamaan), w ≥ 0, dan (St - Si) · w ≥ margin untuk setiap pesaing
+        n_cols = len(self.criteria_cols)
+        normals = np.vstack([np.ones((1, n_cols)), np.eye(n_cols), region.normals])
+        offsets = np.concatenate([[1.0], np.zeros(n_cols), np.full(region.n_constraints, MARGIN_RATIO)])
+        projected = project_onto_polytope(current, normals, offsets, n_equalities=1)
+        if projected is None:
+            return None
+        projected = np.clip(projected, 0.0, None)
+        projected /= projected.sum()
+
+        yi_values = self.signed @ projected
+        rank = int(np.count_nonzero(yi_values > yi_values[row])) + 1
+        return WeightSuggestion(dict(zip(self.criteria_cols, projected.tolist())),
+                                float(np.linalg.norm(projected - current)), rank, excluded, region)
@@ -0,0 +1,196 @@
+import numpy as np
+
+from validation import matrix_flags, report_from_flags
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:  # pragma: no cover - tergantung environment
+    numba = None
+    HAS_NUMBA = False
+
+
+# Jumlah baris per blok saat mengakumulasi jumlah kuadrat secara paralel
+NUMBA_BLOCK_ROWS = 16_384
+
+# Di bawah jumlah baris ini backend 'auto' memakai NumPy (overhead thread Numba lebih besar)
+NUMBA_MIN_ROWS = 100_000
+
+
+if HAS_NUMBA:
+    @numba.njit(parallel=True, fastmath=False, cache=True)
+    def _numba_sum_squares(X, block_rows):
+        """Pass 1: validasi nilai positif dan hingga sekaligus akumulasi Σxij² per blok baris."""
+        n_rows, n_cols = X.shape
+        n_blocks = (n_rows + block_rows - 1) // block_rows
+        partial = np.zeros((n_blocks, n_cols))
+        bad = np.zeros(n_cols, dtype=np.bool_)
+        bad_blocks = np.zeros((n_blocks, n_cols), dtype=np.bool_)
+        for b in numba.prange(n_blocks):
+            start = b * block_rows
+            stop = min(start + block_rows, n_rows)
+            for i in range(start, stop):
+                for j in range(n_cols):
+                    x = X[i, j]
+                    # Perbandingan dengan NaN selalu False, jadi NaN, inf, dan <= 0 tertandai di sini
+                    if not (x > 0.0 and x < np.inf):
+                        bad_blocks[b, j] = True
+                    partial[b, j] += x * x
+        sum_squares = np.zeros(n_cols)
+        for b in range(n_blocks):
+            for j in range(n_cols):
+                sum_squares[j] += partial[b, j]
+                if bad_blocks[b, j]:
+                    bad[j] = True
+        return sum_squares, bad
+
+    @numba.njit(parallel=True, fastmath=False, cache=True)
+    def _numba_scores(X, coefficients):
+        """Pass 2: Yi = Σj xij × (tanda × bobot / norma) untuk setiap baris secara paralel."""
+        n_rows, n_cols = X.shape
+        yi_values = np.empty(n_rows)
+        for i in numba.prange(n_rows):
+            total = 0.0
+            for j in range(n_cols):
+                total += X[i, j] * coefficients[j]
+            yi_values[i] = total
+        return yi_values
+
+
+def available_backends():
+    """
+    Daftar backend kernel skor yang tersedia di environment ini.
+
+    Returns:
+    --------
+    list
+        ['numpy'] atau ['numpy', 'numba']
+    """
+    return ['numpy', 'numba'] if HAS_NUMBA else ['numpy']
+
+
+def resolve_backend(backend, n_rows):
+    """
+    Memilih backend nyata untuk 'auto' berdasarkan ketersediaan Numba dan jumlah baris.
+
+    Examples:
+    ---------
+    >>> resolve_backend('numpy', 10)
+    'numpy'
+    >>> resolve_backend('auto', 10)
+    'numpy'
+    """
+    if backend == 'auto':
+        return 'numba' if HAS_NUMBA and n_rows >= NUMBA_MIN_ROWS else 'numpy'
+    if backend not in ('numpy', 'numba'):
+        raise ValueError(f"Backend '{backend}' tidak dikenal! Pilih 'auto', 'numba', atau 'numpy'.")
+    if backend == 'numba' and not HAS_NUMBA:
+        raise ValueError("Backend 'numba' membutuhkan library numba. Jalankan: pip install numba")
+    return backend
+
+
+def _numpy_sum_squares(X):
+    """Jalur NumPy: validasi (NaN, inf, nilai <= 0) dan jumlah kuadrat per kolom."""
+    nan_cols, inf_cols, nonpositive_cols = matrix_flags(X)
+    sum_squares = np.einsum('ij,ij->j', X, X)
+    return sum_squares, nan_cols | inf_cols | nonpositive_cols
+
+
+def row_scores(X, coefficients, backend='auto'):
+    """
+    Menghitung Yi = X · koefisien untuk setiap baris.
+
+    Dipakai jalur produksi (registry, calculate) untuk matrix yang sudah
+    divalidasi. Untuk matrix besar dengan Numba terpasang, skor dihitung
+    paralel per baris; selain itu memakai perkalian matrix NumPy.
+
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Matrix keputusan berukuran (jumlah alternatif × jumlah kriteria)
+    coefficients : numpy.ndarray
+        Koefisien per kolom (tanda × bobot / norma)
+    backend : str
+        'auto' (Numba untuk matrix besar jika tersedia), 'numba', atau 'numpy'
+
+    Returns:
+    --------
+    numpy.ndarray
+        Array Yi
+
+    Examples:
+    ---------
+    >>> row_scores(np.array([[1.0, 2.0], [3.0, 4.0]]), np.array([0.5, -1.0]))
+    array([-1.5, -2.5])
+    """
+    X = np.asarray(X, dtype=float)
+    coefficients = np.asarray(coefficients, dtype=float)
+    if resolve_backend(backend, X.shape[0]) == 'numba':
+        return _numba_scores(X, coefficients)
+    return X @ coefficients
+
+
+def score_matrix(X, criteria_cols, criteria_type, weights, backend='auto'):
+    """
+    Menghitung Yi MOORA dari matrix keputusan dengan kernel yang digabung (fused).
+
+    Normalisasi dan pembobotan digabung menjadi satu koefisien per kolom
+    (tanda × bobot / √(Σxij²)), sehingga Yi = X · koefisien tanpa membuat
+    matrix ternormalisasi maupun matrix terbobot. Jika Numba tersedia, validasi
+    dan akumulasi norma dilakukan dalam satu pass paralel per blok baris, lalu
+    skor dihitung dalam pass kedua yang juga paralel.
+
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Matrix keputusan berukuran (jumlah alternatif × jumlah kriteria)
+    criteria_cols : list
+        Urutan kolom kriteria sesuai kolom X
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    weights : dict
+        Dictionary bobot untuk setiap kriteria dalam bentuk desimal (total = 1.0)
+    backend : str
+        'auto' (Numba untuk matrix besar jika tersedia), 'numba', atau 'numpy'
+
+    Returns:
+    --------
+    tuple
+        (yi_values, sum_squares)
+
+    Raises:
+    -------
+    ValueError
+        - Jika backend tidak dikenal atau 'numba' diminta tetapi tidak terpasang
+        - Jika matrix kosong atau ada nilai NaN, inf, atau nol/negatif
+
+    Examples:
+    ---------
+    >>> X = np.array([[1800, 2.5], [900, 1.0]])
+    >>> yi, _ = score_matrix(X, ['Price', 'Distance'],
+    ...                      {'Price': 'cost', 'Distance': 'cost'},
+    ...                      {'Price': 0.5, 'Distance': 0.5}, backend='numpy')
+    """
+    # Import lokal: calculate memakai row_scores dari modul ini
+    from calculate import criteria_signs, weight_vector
+
+    X = np.ascontiguousarray(X, dtype=float)
+    backend = resolve_backend(backend, X.shape[0])
+    if X.shape[0] == 0:
+        raise ValueError("Dataset tidak boleh kosong!")
+
+    if backend == 'numba':
+        sum_squares, bad = _numba_sum_squares(X, NUMBA_BLOCK_ROWS)
+    else:
+        sum_squares, bad = _numpy_sum_squares(X)
+
+    if bad.any():
+        # Jalur cepat hanya menandai kolom; jenis masalahnya diklasifikasi ulang pada kolom tersebut saja
+        bad_cols = [col for col, flagged in zip(criteria_cols, bad) if flagged]
+        report_from_flags(bad_cols, *matrix_flags(X[:, bad])).raise_for_errors()
+
+    coefficients = (criteria_signs(criteria_cols, criteria_type)
+                    * weight_vector(criteria_cols, weights)
+                    / np.sqrt(sum_squares))
+
+    return row_scores(X, coefficients, backend=backend), sum_squares
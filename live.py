@@ -0,0 +1,128 @@
+import numpy as np
+
+from calculate import column_sum_squares, criteria_signs, rank_alternatives, weight_vector
+
+# Jumlah alternatif teratas yang ditampilkan pada mode live
+LIVE_TOP_N = 10
+
+
+def top_n_ranking(yi_values, n, tie_breakers=None):
+    """
+    Mengambil n alternatif teratas tanpa mengurutkan seluruh array.
+
+    Ranking memakai metode 'min' (nilai sama mendapat ranking sama) dan
+    urutan yang sama dengan rank_alternatives: alternatif yang Yi-nya sama
+    dengan Yi ke-n ikut menjadi kandidat, lalu kandidat diurutkan dengan
+    tie-breaker dan urutan baris asli, sehingga alternatif kembar di batas
+    top-n sama dengan hasil perhitungan penuh.
+
+    Parameters:
+    -----------
+    yi_values : numpy.ndarray
+        Nilai Yi untuk semua alternatif
+    n : int
+        Jumlah alternatif teratas
+    tie_breakers : list, optional
+        List (values, ascending) sesuai prioritas, sama seperti rank_alternatives
+
+    Returns:
+    --------
+    tuple
+        (indices, rankings) - indeks baris terurut dari Yi tertinggi dan rankingnya
+
+    Examples:
+    ---------
+    >>> top_n_ranking(np.array([0.1, 0.5, 0.3, 0.5]), 3)
+    (array([1, 3, 2]), array([1, 1, 3]))
+    >>> top_n_ranking(np.array([0.5, 0.3, 0.3]), 2, [(np.array([900, 1200, 700]), True)])
+    (array([0, 2]), array([1, 2]))
+    """
+    yi_values = np.asarray(yi_values, dtype=float)
+    n = min(n, yi_values.shape[0])
+    if n <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=int)
+
+    # O(N) untuk memilih kandidat (termasuk semua yang kembar dengan Yi ke-n),
+    # lalu hanya kandidat yang diurutkan
+    if n < yi_values.shape[0]:
+        kth = np.partition(yi_values, yi_values.shape[0] - n)[yi_values.shape[0] - n]
+        candidates = np.flatnonzero(yi_values >= kth)
+    else:
+        candidates = np.arange(yi_values.shape[0])
+    tie_keys = [(np.asarray(values)[candidates], ascending) for values, ascending in (tie_breakers or [])]
+    # Semua nilai yang lebih besar dari anggota top-n pasti ada di antara kandidat,
+    # sehingga ranking 'min' cukup dihitung dari kandidat saja
+    order, rankings = rank_alternatives(yi_values[candidates], tie_keys)
+    return candidates[order[:n]], rankings[:n]
+
+
+class LiveRanker:
+    """
+    Menghitung ulang Yi dengan satu perkalian matrix-vektor dari matrix
+    keputusan dan norma kolom yang sudah disimpan.
+
+    Tipe kriteria (+1 benefit, -1 cost) dan norma kolom digabung ke vektor
+    bobot, sehingga setiap perubahan bobot hanya membutuhkan
+    Yi = X · (tanda × bobot / √Σxij²) tanpa menyimpan matrix ternormalisasi.
+
+    Parameters:
+    -----------
+    matrix : numpy.ndarray
+        Matrix keputusan (baris = alternatif, kolom = kriteria)
+    criteria_cols : list
+        Nama kolom kriteria sesuai urutan kolom matrix
+    norms : numpy.ndarray, optional
+        √(Σxij²) per kolom; dihitung dari matrix jika tidak diberikan
+
+    Examples:
+    ---------
+    >>> matrix = np.array([[3.0, 8.0], [4.0, 6.0]])
+    >>> ranker = LiveRanker(matrix, ['Price', 'Size'])
+    >>> ranker.scores({'Price': 'cost', 'Size': 'benefit'}, {'Price': 0.5, 'Size': 0.5})
+    array([ 0.1, -0.1])
+    """
+
+    def __init__(self, matrix, criteria_cols, norms=None):
+        self.matrix = matrix
+        self.criteria_cols = list(criteria_cols)
+        self.norms = np.sqrt(column_sum_squares(matrix)) if norms is None else norms
+
+    def scores(self, criteria_type, weights):
+        """
+        Menghitung Yi untuk semua alternatif.
+
+        Parameters:
+        -----------
+        criteria_type : dict
+            Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+        weights : dict
+            Dictionary bobot setiap kriteria (skala bebas, hanya rasio yang berpengaruh
+            terhadap urutan ranking)
+
+        Returns:
+        --------
+        numpy.ndarray
+            Nilai Yi untuk setiap alternatif
+        """
+        coefficients = (criteria_signs(self.criteria_cols, criteria_type)
+                        * weight_vector(self.criteria_cols, weights) / self.norms)
+        return self.matrix @ coefficients
+
+    def top(self, criteria_type, weights, n=LIVE_TOP_N, tie_breakers=None):
+        """
+        Menghitung Yi lalu mengambil n alternatif teratas.
+
+        Parameters:
+        -----------
+        tie_breakers : list, optional
+            List (values, ascending) untuk Yi yang sama (lihat rank_alternatives)
+
+        Returns:
+        --------
+        tuple
+            (indices, rankings, yi_values_top)
+        """
+        yi_values = self.scores(criteria_type, weights)
+        indices, rankings = top_n_ranking(yi_values, n, tie_breakers)
+        return indices, rankings, yi_values[indices]
+
@@ -0,0 +1,502 @@
+"""
+Metrik dan log request SIREKMA.
+
+- Counter dan histogram latensi dengan overhead rendah (satu lock per metrik)
+- Eksposisi format teks Prometheus lewat HTTP lokal (default http://127.0.0.1:9464/metrics)
+- Log request JSON lines, satu baris per aksi pengguna beserta durasi setiap tahap
+
+Konfigurasi lewat environment variable:
+    SIREKMA_METRICS_PORT    (default 9464, kosong untuk menonaktifkan server metrik)
+    SIREKMA_REQUEST_LOG     (default .cache/sirekma/requests.jsonl, kosong untuk menonaktifkan log)
+
+Ringkasan tahap yang mendominasi p99 dari log:
+    python observability.py .cache/sirekma/requests.jsonl
+"""
+import argparse
+import bisect
+import contextlib
+import contextvars
+import datetime
+import http.server
+import json
+import math
+import os
+import threading
+import time
+
+import pandas as pd
+
+
+# Batas bucket histogram durasi (detik)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Batas bucket histogram ukuran upload (byte): 1 KB sampai 1 GB
+SIZE_BUCKETS = tuple(1024 * 4 ** i for i in range(11))
+
+DEFAULT_METRICS_HOST = '127.0.0.1'
+_METRICS_PORT_ENV = os.environ.get('SIREKMA_METRICS_PORT', '9464')
+DEFAULT_METRICS_PORT = int(_METRICS_PORT_ENV) if _METRICS_PORT_ENV else None
+DEFAULT_REQUEST_LOG = os.environ.get('SIREKMA_REQUEST_LOG', os.path.join('.cache', 'sirekma', 'requests.jsonl'))
+
+# Request yang sedang berjalan di thread/context ini (lihat request())
+_current_request = contextvars.ContextVar('sirekma_request', default=None)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Counter:
+    """
+    Counter yang hanya bertambah, opsional dengan label.
+
+    Examples:
+    ---------
+    >>> counter = Counter('sirekma_demo_total', 'Contoh', ('result',))
+    >>> counter.inc(result='hit'); counter.inc(2, result='miss')
+    >>> counter.value(result='miss')
+    2.0
+    """
+
+    kind = 'counter'
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        """Baris eksposisi (nama, label, nilai)."""
+        with self._lock:
+            values = sorted(self._values.items())
+        return [(self.name, _format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Histogram:
+    """
+    Histogram dengan bucket tetap (kumulatif saat diekspos, seperti Prometheus).
+
+    Examples:
+    ---------
+    >>> histogram = Histogram('sirekma_demo_seconds', 'Contoh', buckets=(0.1, 1.0))
+    >>> for value in (0.05, 0.5, 0.7, 2.0):
+    ...     histogram.observe(value)
+    >>> histogram.count(), histogram.quantile(0.5)
+    (4, 0.55)
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Label -> [jumlah per bucket (tidak kumulatif), total nilai]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def count(self, **labels):
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return sum(state[0]) if state else 0
+
+    def label_values(self):
+        """Semua kombinasi label yang pernah diobservasi."""
+        with self._lock:
+            return sorted(self._values)
+
+    def quantile(self, q, **labels):
+        """
+        Estimasi kuantil dari bucket (interpolasi linear di dalam bucket, sama seperti histogram_quantile Prometheus).
+
+        Returns:
+        --------
+        float atau None
+            None jika belum ada observasi
+        """
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            counts = list(state[0]) if state else None
+        if not counts or not sum(counts):
+            return None
+        rank = q * sum(counts)
+        cumulative = 0
+        for i, bucket_count in enumerate(counts):
+            if cumulative + bucket_count >= rank and bucket_count:
+                upper = self.buckets[i]
+                lower = self.buckets[i - 1] if i else 0.0
+                if upper == math.inf:
+                    # Di atas bucket terakhir: batas atas tidak diketahui
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / bucket_count
+            cumulative += bucket_count
+        return self.buckets[-2]
+
+    def samples(self):
+        with self._lock:
+            values = sorted((key, (list(state[0]), state[1])) for key, state in self._values.items())
+        rows = []
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                rows.append((f"{self.name}_bucket",
+                             _format_labels(self.labelnames, key, [('le', _format_value(bound))]), cumulative))
+            rows.append((f"{self.name}_sum", _format_labels(self.labelnames, key), total))
+            rows.append((f"{self.name}_count", _format_labels(self.labelnames, key), cumulative))
+        return rows
+
+
+class Gauge:
+    """Nilai yang dibaca saat diekspos dari fungsi callback (misalnya stats() governor)."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, help, read):
+        self.name = name
+        self.help = help
+        self.read = read
+
+    def samples(self):
+        return [(self.name, '', self.read())]
+
+
+class MetricsRegistry:
+    """Kumpulan metrik yang diekspos bersama."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        """
+        Raises:
+        -------
+        ValueError
+            Jika nama metrik sudah dipakai
+        """
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metrik '{metric.name}' sudah terdaftar!")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self.register(Counter(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, help, labelnames, buckets))
+
+    def gauge(self, name, help, read):
+        """Mendaftarkan gauge callback, menggantikan gauge lama dengan nama yang sama."""
+        with self._lock:
+            self._metrics[name] = Gauge(name, help, read)
+
+    def render(self):
+        """
+        Eksposisi format teks Prometheus (version 0.0.4).
+
+        Returns:
+        --------
+        str
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram('sirekma_stage_seconds', "Durasi setiap tahap pemrosesan", ('stage',))
+STAGE_ERRORS = REGISTRY.counter('sirekma_stage_errors_total', "Jumlah tahap yang gagal", ('stage',))
+REQUEST_SECONDS = REGISTRY.histogram('sirekma_request_seconds', "Durasi total setiap aksi pengguna", ('kind',))
+REQUESTS = REGISTRY.counter('sirekma_requests_total', "Jumlah aksi pengguna per jenis dan status", ('kind', 'status'))
+UPLOAD_BYTES = REGISTRY.histogram('sirekma_upload_bytes', "Ukuran file yang diupload", buckets=SIZE_BUCKETS)
+CACHE_REQUESTS = REGISTRY.counter('sirekma_cache_requests_total', "Lookup cache per jenis cache dan hasil",
+                                  ('cache', 'result'))
+GOVERNOR_DECISIONS = REGISTRY.counter('sirekma_governor_decisions_total', "Mode yang dipilih resource governor",
+                                      ('mode',))
+
+
+class RequestLogger:
+    """
+    Penulis log JSON lines yang aman dipakai dari banyak thread.
+
+    Setiap record ditulis sebagai satu baris dengan satu write() dalam mode
+    append, sehingga beberapa proses server bisa menulis ke file yang sama.
+    """
+
+    def __init__(self, path=DEFAULT_REQUEST_LOG):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+
+    def write(self, record):
+        if not self.path:
+            return
+        line = json.dumps(record, default=str, ensure_ascii=False) + '\n'
+        with self._lock:
+            try:
+                if self._file is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+                self._file.write(line)
+            except OSError:
+                # Log tidak boleh menggagalkan request
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+REQUEST_LOGGER = RequestLogger()
+
+
+@contextlib.contextmanager
+def request(kind, session=None, logger=None, **fields):
+    """
+    Mencatat satu aksi pengguna (upload, hitung, export, ...) beserta durasi setiap tahapnya.
+
+    Tahap yang diukur dengan timed() di dalam blok (termasuk dari worker
+    Pipeline) ikut tercatat di record. Keluar karena RerunException/
+    StopException Streamlit dicatat dengan status 'stopped'.
+
+    Parameters:
+    -----------
+    kind : str
+        Jenis aksi
+    session : str, optional
+        ID sesi pengguna
+    logger : RequestLogger, optional
+        Tujuan log (default: REQUEST_LOGGER)
+    **fields
+        Field tambahan untuk record
+
+    Yields:
+    -------
+    dict
+        Record yang bisa ditambah field-nya selama request (lihat annotate())
+    """
+    record = {'ts': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='milliseconds'),
+              'kind': kind, 'session': session, **fields, 'stages': {}}
+    token = _current_request.set(record)
+    start = time.perf_counter()
+    status = 'ok'
+    try:
+        yield record
+    except Exception as e:
+        status = 'error'
+        record['error'] = f"{type(e).__name__}: {e}"
+        raise
+    except BaseException:
+        status = 'stopped'
+        raise
+    finally:
+        _current_request.reset(token)
+        elapsed = time.perf_counter() - start
+        record['status'] = status
+        record['total_ms'] = round(elapsed * 1000, 3)
+        REQUEST_SECONDS.observe(elapsed, kind=kind)
+        REQUESTS.inc(kind=kind, status=status)
+        (REQUEST_LOGGER if logger is None else logger).write(record)
+
+
+def annotate(**fields):
+    """Menambahkan field ke record request yang sedang berjalan (tidak melakukan apa pun di luar request)."""
+    record = _current_request.get()
+    if record is not None:
+        record.update(fields)
+
+
+class timed:
+    """
+    Mengukur durasi satu tahap ke histogram sirekma_stage_seconds dan record request aktif.
+
+    Durasi tahap yang sama dalam satu request dijumlahkan.
+
+    Examples:
+    ---------
+    >>> with request('demo', logger=RequestLogger('')) as record:
+    ...     with timed('parse'):
+    ...         pass
+    >>> list(record['stages']), record['status']
+    (['parse'], 'ok')
+    """
+
+    __slots__ = ('stage', 'start', 'record')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.record = _current_request.get()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        STAGE_SECONDS.observe(elapsed, stage=self.stage)
+        if exc_type is not None and issubclass(exc_type, Exception):
+            STAGE_ERRORS.inc(stage=self.stage)
+        if self.record is not None:
+            stages = self.record['stages']
+            stages[self.stage] = round(stages.get(self.stage, 0.0) + elapsed * 1000, 3)
+        return False
+
+
+def record_cache(cache, hit):
+    """Mencatat satu lookup cache (hit atau miss) ke metrik dan record request aktif."""
+    result = 'hit' if hit else 'miss'
+    CACHE_REQUESTS.inc(cache=cache, result=result)
+    annotate(**{f"{cache}_cache": result})
+
+
+def stage_summary(quantiles=(0.5, 0.99)):
+    """
+    Estimasi kuantil durasi setiap tahap dari histogram, terurut dari p99 terbesar.
+
+    Returns:
+    --------
+    list
+        Dict per tahap: stage, count, p50_ms, p99_ms (sesuai quantiles)
+    """
+    rows = []
+    for (stage,) in STAGE_SECONDS.label_values():
+        row = {'stage': stage, 'count': STAGE_SECONDS.count(stage=stage)}
+        for q in quantiles:
+            row[f"p{round(q * 100):g}_ms"] = STAGE_SECONDS.quantile(q, stage=stage) * 1000
+        rows.append(row)
+    last = f"p{round(quantiles[-1] * 100):g}_ms"
+    return sorted(rows, key=lambda row: row[last], reverse=True)
+
+
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrape metrik tidak perlu ditulis ke stderr
+        pass
+
+
+def start_http_server(port=DEFAULT_METRICS_PORT, host=DEFAULT_METRICS_HOST, registry=REGISTRY):
+    """
+    Menjalankan server metrik di thread daemon.
+
+    Parameters:
+    -----------
+    port : int
+        Port server (0 untuk port acak)
+    host : str
+        Alamat bind (default hanya lokal)
+    registry : MetricsRegistry
+        Metrik yang diekspos
+
+    Returns:
+    --------
+    http.server.ThreadingHTTPServer
+        Server yang berjalan (alamatnya di server.server_address)
+
+    Raises:
+    -------
+    OSError
+        Jika port sudah dipakai (misalnya oleh proses server lain)
+    """
+    handler = type('MetricsHandler', (_MetricsHandler,), {'registry': registry})
+    server = http.server.ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='sirekma-metrics', daemon=True).start()
+    return server
+
+
+def summarize_log(path, quantile=0.99):
+    """
+    Menghitung kuantil durasi setiap tahap dari log JSON lines (nilai pasti, bukan estimasi bucket).
+
+    Returns:
+    --------
+    pandas.DataFrame
+        Satu baris per (kind, stage), terurut dari kuantil terbesar
+    """
+    rows = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            rows.append((record['kind'], 'total', record['total_ms']))
+            rows.extend((record['kind'], stage, ms) for stage, ms in record['stages'].items())
+    frame = pd.DataFrame(rows, columns=['kind', 'stage', 'ms'])
+    summary = frame.groupby(['kind', 'stage'])['ms'].agg(
+        count='count', p50_ms='median', **{f"p{round(quantile * 100):g}_ms": lambda ms: ms.quantile(quantile)}
+    )
+    return summary.sort_values(summary.columns[-1], ascending=False).reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan latensi per tahap dari log request SIREKMA")
+    parser.add_argument('path', nargs='?', default=DEFAULT_REQUEST_LOG, help="File log JSON lines")
+    parser.add_argument('--quantile', type=float, default=0.99, help="Kuantil yang dibandingkan")
+    args = parser.parse_args()
+    print(summarize_log(args.path, args.quantile).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+import concurrent.futures
+import contextvars
+import io
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+from calculate import column_sum_squares
+from validation import matrix_flags, validate_data
+
+
+# Jumlah worker thread pipeline
+PIPELINE_WORKERS = 4
+
+# Jumlah baris per chunk saat parsing CSV
+PIPELINE_CHUNK_SIZE = 50_000
+
+# Jumlah chunk yang boleh menunggu di antrian antar tahap
+PIPELINE_QUEUE_SIZE = 4
+
+# Key di session_state untuk pipeline yang sedang berjalan
+SESSION_PIPELINE_KEY = "_pipeline"
+
+# Penanda akhir stream chunk
+_END = object()
+
+
+class PipelineCancelled(Exception):
+    """Pipeline dibatalkan (misalnya karena Streamlit menjalankan ulang script)."""
+
+
+class Pipeline:
+    """
+    Thread pool dengan satu sinyal pembatalan untuk semua tahap.
+
+    Dipakai sebagai context manager: jika blok keluar karena exception
+    (termasuk RerunException/StopException Streamlit saat pengguna mengubah
+    input di tengah proses), semua tahap yang belum selesai dibatalkan dan
+    worker berhenti di pemeriksaan chunk berikutnya.
+
+    Parameters:
+    -----------
+    max_workers : int
+        Jumlah worker thread
+
+    Examples:
+    ---------
+    >>> with Pipeline() as pipeline:
+    ...     future = pipeline.submit(sum, [1, 2, 3])
+    ...     future.result()
+    6
+    """
+
+    def __init__(self, max_workers=PIPELINE_WORKERS):
+        self.cancelled = threading.Event()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                               thread_name_prefix="sirekma-pipeline")
+        self._futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.cancel()
+        self.close()
+        return False
+
+    def _run(self, fn, args, kwargs):
+        self.check()
+        return fn(*args, **kwargs)
+
+    def submit(self, fn, *args, **kwargs):
+        """Menjalankan fn di worker; tidak dijalankan sama sekali jika pipeline sudah dibatalkan."""
+        self.check()
+        # Context disalin agar tahap yang diukur di worker tercatat pada request pemanggil
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, self._run, fn, args, kwargs)
+        self._futures.append(future)
+        return future
+
+    def check(self):
+        """
+        Raises:
+        -------
+        PipelineCancelled
+            Jika pipeline sudah dibatalkan
+        """
+        if self.cancelled.is_set():
+            raise PipelineCancelled("Pipeline dibatalkan")
+
+    def cancel(self):
+        """Membatalkan semua tahap yang belum selesai."""
+        self.cancelled.set()
+        for future in self._futures:
+            future.cancel()
+
+    def close(self):
+        """Menutup thread pool tanpa menunggu tahap yang sudah dibatalkan."""
+        self._executor.shutdown(wait=not self.cancelled.is_set(), cancel_futures=True)
+
+    def bind_session(self, session_state):
+        """
+        Mencatat pipeline di session_state dan membatalkan pipeline sebelumnya milik sesi.
+
+        Pipeline lama yang masih berjalan (misalnya dari run script yang
+        terputus) tidak perlu ditunggu karena hasilnya tidak akan dipakai.
+        """
+        previous = session_state.get(SESSION_PIPELINE_KEY)
+        if previous is not None and previous is not self:
+            previous.cancel()
+        session_state[SESSION_PIPELINE_KEY] = self
+        return self
+
+
+class ParsedChunks:
+    """
+    Hasil parsing CSV per chunk.
+
+    Attributes:
+    -----------
+    frame : pandas.DataFrame
+        Gabungan semua chunk
+    matrix : numpy.ndarray
+        Matrix kriteria float (nilai non-numerik menjadi NaN)
+    sum_squares : numpy.ndarray
+        Σxij² per kolom kriteria, dijumlahkan per chunk
+    report : ValidationReport
+        Hasil validasi data, sama dengan validate_data(frame)
+    """
+
+    def __init__(self, frame, matrix, sum_squares, report):
+        self.frame = frame
+        self.matrix = matrix
+        self.sum_squares = sum_squares
+        self.report = report
+
+
+def _read_chunks(data, chunk_size, chunks, pipeline):
+    """Tahap baca: mengirim chunk CSV ke antrian sampai selesai atau dibatalkan."""
+    try:
+        with pd.read_csv(io.BytesIO(data), chunksize=chunk_size) as reader:
+            for chunk in reader:
+                while not pipeline.cancelled.is_set():
+                    try:
+                        chunks.put(chunk, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if pipeline.cancelled.is_set():
+                    return
+    except Exception as e:
+        chunks.put(e)
+        return
+    chunks.put(_END)
+
+
+def parse_csv(data, pipeline, chunk_size=PIPELINE_CHUNK_SIZE, progress=None):
+    """
+    Parsing CSV dengan pembacaan, validasi, dan akumulasi norma yang berjalan bersamaan.
+
+    Worker membaca chunk berikutnya sementara thread pemanggil memvalidasi
+    chunk sebelumnya dan menjumlahkan Σxij²-nya, sehingga total waktu
+    mendekati tahap terlama, bukan jumlah semua tahap.
+
+    Parameters:
+    -----------
+    data : bytes
+        Isi file CSV
+    pipeline : Pipeline
+        Pipeline yang menjalankan tahap baca
+    chunk_size : int
+        Jumlah baris per chunk
+    progress : callable, optional
+        Dipanggil dengan jumlah baris yang sudah diproses setelah setiap chunk
+
+    Returns:
+    --------
+    ParsedChunks
+
+    Raises:
+    -------
+    PipelineCancelled
+        Jika pipeline dibatalkan di tengah proses
+    pandas.errors.EmptyDataError
+        Jika file tidak memiliki kolom
+
+    Examples:
+    ---------
+    >>> with Pipeline() as pipeline:
+    ...     parsed = parse_csv(b'Name,Price\\nA,900\\nB,0\\n', pipeline, chunk_size=1)
+    >>> parsed.sum_squares, parsed.report.codes()
+    (array([810000.]), ['nonpositive'])
+    """
+    chunks = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+    pipeline.submit(_read_chunks, data, chunk_size, chunks, pipeline)
+
+    frames, matrices = [], []
+    sum_squares = flags = criteria_cols = None
+    n_rows = 0
+    while True:
+        pipeline.check()
+        try:
+            chunk = chunks.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if chunk is _END:
+            break
+        if isinstance(chunk, Exception):
+            raise chunk
+
+        if criteria_cols is None:
+            criteria_cols = [col for col in chunk.columns if col != 'Name']
+            sum_squares = np.zeros(len(criteria_cols))
+        # Nilai non-numerik menjadi NaN agar chunk tetap bisa dijumlahkan
+        X = chunk[criteria_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        chunk_flags = matrix_flags(X)
+        flags = chunk_flags if flags is None else tuple(a | b for a, b in zip(flags, chunk_flags))
+        sum_squares += column_sum_squares(X)
+        frames.append(chunk)
+        matrices.append(X)
+        n_rows += len(chunk)
+        # Referensi loop dilepas agar chunk hanya hidup di daftar frames/matrices
+        del chunk, X
+        if progress is not None:
+            progress(n_rows)
+
+    if not frames:
+        # File hanya berisi header
+        frame = pd.read_csv(io.BytesIO(data), nrows=0)
+        criteria_cols = [col for col in frame.columns if col != 'Name']
+        return ParsedChunks(frame, np.empty((0, len(criteria_cols))), np.zeros(len(criteria_cols)),
+                            validate_data(frame, criteria_cols))
+
+    # Chunk dilepas segera setelah digabung agar puncak memori tidak memuat salinan ganda
+    frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    frames.clear()
+    matrix = np.vstack(matrices) if len(matrices) > 1 else matrices[0]
+    matrices.clear()
+    return ParsedChunks(frame, matrix, sum_squares, validate_data(frame, criteria_cols, flags=flags))
+
+
+def render_png(build_figure, dpi=100):
+    """
+    Membuat figure matplotlib lalu merender ke PNG (dijalankan di worker).
+
+    build_figure harus memakai matplotlib.figure.Figure, bukan pyplot, karena
+    state global pyplot tidak aman dipakai dari beberapa thread.
+
+    Returns:
+    --------
+    bytes
+        Gambar PNG
+    """
+    fig = build_figure()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    return buffer.getvalue()
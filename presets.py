@@ -0,0 +1,297 @@
+"""
+Profil preset bobot dan hasil ranking preset yang dihitung lebih dulu.
+
+Warm-up cache disk untuk semua profil preset:
+    python presets.py warmup data/dataset_kost_mahasiswa.csv
+"""
+import argparse
+import contextlib
+import json
+import threading
+
+from calculate import rank_alternatives, default_criteria_type, DEFAULT_TIE_BREAKER_CRITERIA
+from governor import MODE_FULL
+from registry import DatasetRegistry
+from result_cache import ResultCache, make_cache_key, DEFAULT_CACHE_DIR
+
+
+# File konfigurasi profil preset bobot
+DEFAULT_PRESETS_PATH = "data/presets.json"
+
+# Nilai khusus "weights" untuk bobot sama rata pada semua kriteria dataset
+EQUAL_WEIGHTS = "equal"
+
+# Toleransi total bobot preset (dalam persen)
+WEIGHT_TOTAL_TOLERANCE = 0.01
+
+
+class PresetProfile:
+    """
+    Profil preset bobot dari file konfigurasi.
+
+    Attributes:
+    -----------
+    id : str
+        Identitas unik profil
+    label : str
+        Nama profil yang ditampilkan di aplikasi
+    weights : dict atau str
+        Bobot per kriteria dalam persen, atau "equal" untuk bobot sama rata
+    """
+
+    def __init__(self, id, label, weights):
+        self.id = id
+        self.label = label
+        self.weights = weights
+
+    @property
+    def is_equal(self):
+        return self.weights == EQUAL_WEIGHTS
+
+    def schema_problems(self, criteria_cols):
+        """
+        Mencocokkan kriteria profil dengan kolom dataset.
+
+        Parameters:
+        -----------
+        criteria_cols : list
+            Kolom kriteria dataset
+
+        Returns:
+        --------
+        list
+            Daftar masalah (kosong jika profil bisa dipakai untuk dataset ini)
+
+        Examples:
+        ---------
+        >>> profile = PresetProfile('p', 'P', {'Price': 50, 'Wifi': 50})
+        >>> profile.schema_problems(['Price', 'WiFi'])
+        ["Kriteria 'Wifi' tidak ada di dataset", "Kolom dataset 'WiFi' tidak memiliki bobot"]
+        """
+        if not criteria_cols:
+            return ["Dataset tidak memiliki kolom kriteria"]
+        if self.is_equal:
+            return []
+        problems = [f"Kriteria '{col}' tidak ada di dataset" for col in self.weights if col not in criteria_cols]
+        problems += [f"Kolom dataset '{col}' tidak memiliki bobot" for col in criteria_cols if col not in self.weights]
+        return problems
+
+    def weights_for(self, criteria_cols):
+        """
+        Bobot profil (persen) sesuai urutan kolom dataset.
+
+        Examples:
+        ---------
+        >>> PresetProfile('equal', 'Equal', 'equal').weights_for(['Price', 'Size'])
+        {'Price': 50.0, 'Size': 50.0}
+        """
+        if self.is_equal:
+            equal_weight = 100 / len(criteria_cols)
+            return {col: equal_weight for col in criteria_cols}
+        return {col: self.weights[col] for col in criteria_cols}
+
+
+def _profile_problems(raw, index):
+    """Validasi struktur satu profil dari file konfigurasi."""
+    name = raw.get('id', f"#{index + 1}") if isinstance(raw, dict) else f"#{index + 1}"
+    if not isinstance(raw, dict):
+        return [f"Profil {name}: harus berupa object"]
+    problems = [f"Profil {name}: field '{field}' wajib diisi" for field in ('id', 'label', 'weights') if field not in raw]
+    weights = raw.get('weights')
+    if weights is None or weights == EQUAL_WEIGHTS:
+        return problems
+    if not isinstance(weights, dict) or not weights:
+        return problems + [f"Profil {name}: 'weights' harus berupa \"{EQUAL_WEIGHTS}\" atau object bobot per kriteria"]
+    for col, value in weights.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            problems.append(f"Profil {name}: bobot '{col}' harus berupa angka >= 0")
+    if not problems:
+        total = sum(weights.values())
+        if abs(total - 100) >= WEIGHT_TOTAL_TOLERANCE:
+            problems.append(f"Profil {name}: total bobot {total:.2f}% (harus 100%)")
+    return problems
+
+
+def load_profiles(path=DEFAULT_PRESETS_PATH):
+    """
+    Membaca dan memvalidasi profil preset dari file JSON.
+
+    Parameters:
+    -----------
+    path : str
+        Path file konfigurasi
+
+    Returns:
+    --------
+    list
+        List PresetProfile sesuai urutan di file
+
+    Raises:
+    -------
+    ValueError
+        Jika struktur file tidak valid (semua masalah ditampilkan sekaligus)
+    """
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    raw_profiles = config.get('profiles') if isinstance(config, dict) else None
+    if not isinstance(raw_profiles, list) or not raw_profiles:
+        raise ValueError(f"File preset '{path}' harus berisi list 'profiles' yang tidak kosong!")
+
+    problems = []
+    for i, raw in enumerate(raw_profiles):
+        problems += _profile_problems(raw, i)
+    ids = [raw.get('id') for raw in raw_profiles if isinstance(raw, dict)]
+    problems += [f"Profil '{pid}' didefinisikan lebih dari sekali" for pid in sorted(set(ids), key=str) if ids.count(pid) > 1]
+    if problems:
+        raise ValueError(f"File preset '{path}' tidak valid:\n- " + "\n- ".join(problems))
+
+    return [PresetProfile(raw['id'], raw['label'], raw['weights']) for raw in raw_profiles]
+
+
+class PresetMaterializer:
+    """
+    Menyimpan hasil ranking setiap pasangan (dataset, profil preset) di memori.
+
+    Hasil dihitung segera setelah dataset masuk ke registry dan dibuang saat
+    dataset dibuang, sehingga menampilkan ranking preset cukup dengan lookup.
+    Perhitungan memakai tipe kriteria dan tie-breaker default aplikasi; jika
+    pengguna mengubahnya, key cache berbeda dan lookup mengembalikan None.
+
+    Parameters:
+    -----------
+    profiles : list
+        List PresetProfile
+    result_cache : ResultCache, optional
+        Jika diisi, hasil juga disimpan ke cache disk untuk proses lain
+    governor : ResourceGovernor, optional
+        Jika diisi, dataset yang tidak muat dihitung lengkap tidak
+        dimaterialisasi; ranking preset-nya dihitung saat diminta
+    """
+
+    def __init__(self, profiles, result_cache=None, governor=None):
+        self.profiles = list(profiles)
+        self.result_cache = result_cache
+        self.governor = governor
+        self._lock = threading.Lock()
+        self._results = {}
+        self._by_dataset = {}
+
+    def attach(self, registry):
+        """Menghubungkan materializer dengan registry dataset."""
+        registry.add_listener(on_register=self.materialize, on_evict=self.discard)
+
+    def materialize(self, entry):
+        """
+        Menghitung ranking semua profil yang cocok dengan skema dataset.
+
+        Parameters:
+        -----------
+        entry : DatasetEntry
+            Dataset dari registry
+        """
+        criteria_cols = list(entry.criteria_cols)
+        criteria_type = default_criteria_type(criteria_cols)
+        tie_breakers = [(col, criteria_type[col] == 'cost') for col in DEFAULT_TIE_BREAKER_CRITERIA if col in criteria_cols]
+        tie_keys = [(entry.frame[col].to_numpy(), ascending) for col, ascending in tie_breakers]
+
+        decision = None if self.governor is None else self.governor.plan(entry.n_rows, len(criteria_cols))
+        deferred = decision is not None and decision.mode != MODE_FULL
+
+        results = {}
+        status = {}
+        with contextlib.nullcontext() if decision is None or deferred else self.governor.reserve(decision):
+            for profile in self.profiles:
+                problems = profile.schema_problems(criteria_cols)
+                if problems:
+                    status[profile.id] = {'cache_key': None, 'problems': problems}
+                    continue
+                if deferred:
+                    # Tanpa masalah skema: preset tetap bisa dipilih, ranking dihitung saat diminta
+                    status[profile.id] = {'cache_key': None, 'problems': []}
+                    continue
+                weights = profile.weights_for(criteria_cols)
+                cache_key = make_cache_key(entry.key, criteria_cols, criteria_type, weights, tie_breakers)
+                try:
+                    # Hanya Yi yang dibutuhkan, tanpa matrix ternormalisasi maupun terbobot
+                    yi_values = entry.scores(criteria_type, {col: w / 100 for col, w in weights.items()})
+                except ValueError as e:
+                    status[profile.id] = {'cache_key': None, 'problems': [str(e)]}
+                    continue
+                order, _ = rank_alternatives(yi_values, tie_keys)
+                results[cache_key] = (yi_values, order)
+                status[profile.id] = {'cache_key': cache_key, 'problems': []}
+                if self.result_cache is not None:
+                    self.result_cache.put(cache_key, yi_values, order)
+
+        with self._lock:
+            self._discard_locked(entry.key)
+            self._results.update(results)
+            self._by_dataset[entry.key] = status
+
+    def _discard_locked(self, dataset_key):
+        for state in self._by_dataset.pop(dataset_key, {}).values():
+            if state['cache_key'] is not None:
+                self._results.pop(state['cache_key'], None)
+
+    def discard(self, dataset_key):
+        """Membuang semua hasil milik dataset."""
+        with self._lock:
+            self._discard_locked(dataset_key)
+
+    def lookup(self, cache_key):
+        """
+        Mengambil hasil yang sudah dihitung.
+
+        Returns:
+        --------
+        tuple atau None
+            (yi_values, order) atau None jika tidak ada
+        """
+        with self._lock:
+            return self._results.get(cache_key)
+
+    def problems(self, dataset_key, profile_id):
+        """Masalah skema profil untuk dataset (list kosong jika valid atau belum dihitung)."""
+        with self._lock:
+            return list(self._by_dataset.get(dataset_key, {}).get(profile_id, {}).get('problems', []))
+
+
+def warmup(cache, path, profiles):
+    """
+    Menghitung ranking semua profil preset untuk satu dataset CSV dan
+    menyimpannya ke cache disk.
+
+    Returns:
+    --------
+    dict
+        Masalah skema per profil yang dilewati (kosong jika semua tersimpan)
+    """
+    materializer = PresetMaterializer(profiles, result_cache=cache)
+    registry = DatasetRegistry()
+    materializer.attach(registry)
+    entry = registry.register_file(path)
+    return {profile.id: materializer.problems(entry.key, profile.id)
+            for profile in profiles if materializer.problems(entry.key, profile.id)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profil preset bobot SIREKMA")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    warmup_parser = subparsers.add_parser('warmup', help="Hitung semua profil preset untuk dataset CSV")
+    warmup_parser.add_argument('datasets', nargs='+', help="Path file CSV")
+    warmup_parser.add_argument('--presets', default=DEFAULT_PRESETS_PATH, help="File konfigurasi preset")
+    warmup_parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+
+    profiles = load_profiles(args.presets)
+    cache = ResultCache(args.cache_dir)
+    for path in args.datasets:
+        skipped = warmup(cache, path, profiles)
+        print(f"✓ {path}: {len(profiles) - len(skipped)} preset disimpan")
+        for profile_id, problems in skipped.items():
+            print(f"  ✗ {profile_id}: {'; '.join(problems)}")
+    print(cache.stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,474 @@
+import functools
+import hashlib
+import io
+import threading
+import time
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from calculate import column_sum_squares, moora_from_matrix, criteria_signs, weight_vector
+from kernel import row_scores
+from validation import validate_data, validate_inputs
+from pipeline import parse_csv
+
+
+# Dataset bawaan yang dimuat sekali saat registry dibuat
+BUNDLED_DATASET_PATH = "data/dataset_kost_mahasiswa.csv"
+
+# Key di session_state untuk menyimpan lease dataset milik sesi
+SESSION_LEASE_KEY = "_dataset_lease"
+
+# Dataset tanpa sesi aktif (misalnya diupload lalu tidak pernah dipakai) dibuang
+# setelah sekian detik, diperiksa setiap kali dataset baru didaftarkan
+UNUSED_ENTRY_TTL_SECONDS = 300
+
+
+def content_hash(data):
+    """
+    Menghitung hash SHA-256 dari isi file dataset.
+
+    Parameters:
+    -----------
+    data : bytes
+        Isi file mentah
+
+    Returns:
+    --------
+    str
+        Hash heksadesimal
+
+    Examples:
+    ---------
+    >>> content_hash(b'Name,Price')[:12]
+    '320c0f461352'
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def _read_only(array):
+    """Menandai array numpy sebagai read-only agar aman dibagi antar sesi."""
+    array.setflags(write=False)
+    return array
+
+
+def _shared_frame(frame, criteria_cols, matrix):
+    """
+    Membuat ulang frame dataset agar aman dibagikan antar sesi.
+
+    Kolom kriteria float64 memakai memori kolom matrix (tidak disalin dua
+    kali) dan kolom numerik lain dibuat read-only, sehingga penulisan
+    in-place ke frame bersama gagal dengan ValueError alih-alih mengubah data
+    sesi lain. Sesi yang perlu mengubah data memakai frame.copy(deep=False);
+    dengan Copy-on-Write pandas, kolom baru disalin saat benar-benar ditulis.
+
+    Returns:
+    --------
+    tuple
+        (frame, shared_cols) - shared_cols berisi kolom yang memakai memori matrix
+    """
+    column_index = {col: j for j, col in enumerate(criteria_cols)}
+    columns = {}
+    shared_cols = []
+    for col in frame.columns:
+        column = frame[col]
+        if col in column_index and column.dtype == np.float64:
+            columns[col] = matrix[:, column_index[col]]
+            shared_cols.append(col)
+        elif column.dtype.kind in 'biuf':
+            columns[col] = _read_only(column.to_numpy())
+        else:
+            columns[col] = column
+    return pd.DataFrame(columns, index=frame.index, copy=False), tuple(shared_cols)
+
+
+class DatasetEntry:
+    """
+    Dataset yang sudah diparsing dan dibagikan ke semua sesi (read-only).
+
+    Attributes:
+    -----------
+    key : str
+        Hash isi dataset
+    label : str
+        Nama dataset untuk ditampilkan
+    frame : pandas.DataFrame
+        DataFrame dataset dengan kolom numerik read-only; kolom kriteria
+        float64 memakai memori matrix. Sesi yang ingin mengubah data memakai
+        frame.copy(deep=False)
+    criteria_cols : tuple
+        Nama kolom kriteria (semua kolom kecuali 'Name')
+    matrix : numpy.ndarray
+        Matrix keputusan float read-only. Kolom kriteria yang bukan float64
+        (misalnya integer) tetap tersimpan terpisah di frame; lihat
+        DatasetRegistry.stats()
+    sum_squares : numpy.ndarray
+        Σxij² per kolom kriteria
+    norms : numpy.ndarray
+        √(Σxij²) per kolom kriteria
+    report : ValidationReport
+        Hasil validasi data (kosong, non-numerik, NaN, inf, nilai <= 0)
+    """
+
+    def __init__(self, key, label, frame, parsed=None):
+        self.key = key
+        self.label = label
+        self.criteria_cols = tuple(col for col in frame.columns if col != 'Name')
+        if parsed is not None:
+            # Matrix, Σxij², dan validasi sudah dihitung per chunk oleh pipeline.parse_csv
+            self.matrix = _read_only(parsed.matrix)
+            self.sum_squares = _read_only(parsed.sum_squares)
+            self.report = parsed.report
+        else:
+            # Nilai non-numerik menjadi NaN agar dataset tetap bisa dimuat dan dilaporkan
+            self.matrix = _read_only(
+                frame[list(self.criteria_cols)].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+            )
+            self.sum_squares = _read_only(column_sum_squares(self.matrix))
+            # Validasi data dilakukan sekali saat dataset dimuat
+            self.report = validate_data(frame, list(self.criteria_cols))
+        self.norms = _read_only(np.sqrt(self.sum_squares))
+        self.frame, self.shared_cols = _shared_frame(frame, self.criteria_cols, self.matrix)
+
+    @property
+    def n_rows(self):
+        return self.matrix.shape[0]
+
+    @functools.cached_property
+    def frame_bytes(self):
+        """Perkiraan memori frame di luar kolom yang memakai memori matrix (dihitung sekali)."""
+        usage = self.frame.memory_usage(index=True, deep=True)
+        return int(usage.drop(list(self.shared_cols)).sum())
+
+    def normalized(self):
+        """Matrix ternormalisasi xij / √(Σxij²), dihitung saat diminta dan tidak disimpan."""
+        return self.matrix / self.norms
+
+    def calculate(self, criteria_type, weights):
+        """
+        Menghitung MOORA memakai norma kolom yang sudah disimpan.
+
+        Validasi sama dengan calculate_moora, tetapi data tidak diperiksa ulang:
+        hanya bobot dan tipe kriteria yang dicek terhadap laporan data yang
+        sudah dihitung saat dataset dimuat.
+
+        Parameters:
+        -----------
+        criteria_type : dict
+            Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+        weights : dict
+            Dictionary bobot setiap kriteria dalam bentuk desimal (total = 1.0)
+
+        Returns:
+        --------
+        tuple
+            (normalized_matrix, weighted_normalized_matrix, yi_values)
+
+        Raises:
+        -------
+        ValueError
+            - Jika data, bobot, atau tipe kriteria tidak valid (semua masalah sekaligus)
+        """
+        validate_inputs(criteria_type=criteria_type, weights=weights, criteria_cols=list(self.criteria_cols),
+                        require_weight_total=False, data_report=self.report).raise_for_errors()
+        return moora_from_matrix(self.matrix, self.criteria_cols, criteria_type, weights, norms=self.norms)
+
+    def scores(self, criteria_type, weights):
+        """
+        Menghitung Yi saja langsung dari matrix (X · koefisien) tanpa membuat
+        matrix ternormalisasi maupun terbobot (memori tambahan hanya satu array Yi).
+
+        Returns:
+        --------
+        numpy.ndarray
+            Array Yi
+
+        Raises:
+        -------
+        ValueError
+            - Jika data, bobot, atau tipe kriteria tidak valid (semua masalah sekaligus)
+        """
+        criteria_cols = list(self.criteria_cols)
+        validate_inputs(criteria_type=criteria_type, weights=weights, criteria_cols=criteria_cols,
+                        require_weight_total=False, data_report=self.report).raise_for_errors()
+        coefficients = criteria_signs(criteria_cols, criteria_type) * weight_vector(criteria_cols, weights) / self.norms
+        return row_scores(self.matrix, coefficients)
+
+
+class DatasetLease:
+    """
+    Penanda bahwa sebuah sesi sedang memakai dataset di registry.
+
+    Reference count dikurangi saat release() dipanggil atau saat objek lease
+    dibuang oleh garbage collector (misalnya sesi browser ditutup).
+    """
+
+    def __init__(self, registry, key):
+        self.key = key
+        self._finalizer = weakref.finalize(self, registry._release, key)
+
+    def release(self):
+        self._finalizer()
+
+    @property
+    def active(self):
+        return self._finalizer.alive
+
+
+class DatasetRegistry:
+    """
+    Registry dataset tingkat proses yang dibagikan ke semua sesi Streamlit.
+
+    Dataset dengan isi yang sama hanya diparsing dan disimpan sekali. Dataset
+    tanpa sesi aktif dibuang, kecuali dataset yang di-pin (misalnya dataset bawaan).
+    Dataset yang tidak pernah dipakai sesi dibuang saat dataset baru didaftarkan
+    setelah tidak dipakai selama unused_ttl detik.
+
+    Parameters:
+    -----------
+    unused_ttl : float
+        Batas waktu (detik) dataset tanpa sesi aktif sebelum boleh dibuang
+
+    Examples:
+    ---------
+    >>> registry = DatasetRegistry()
+    >>> entry = registry.register_bytes(b'Name,Price\\nKost_A,900\\n', label='contoh.csv')
+    >>> lease = registry.acquire(entry)
+    >>> registry.ref_count(entry.key)
+    1
+    """
+
+    def __init__(self, unused_ttl=UNUSED_ENTRY_TTL_SECONDS):
+        self.unused_ttl = unused_ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._ref_counts = {}
+        self._pinned = set()
+        # Waktu (monotonic) sejak dataset tanpa pin tidak memiliki sesi aktif
+        self._idle_since = {}
+        # Hash dataset bawaan (diisi oleh pemanggil setelah register_file)
+        self.bundled_key = None
+        self._register_listeners = []
+        self._evict_listeners = []
+
+    def add_listener(self, on_register=None, on_evict=None):
+        """
+        Mendaftarkan callback saat dataset baru masuk atau dibuang dari registry.
+
+        Parameters:
+        -----------
+        on_register : callable, optional
+            Dipanggil dengan DatasetEntry setiap kali dataset baru diparsing
+        on_evict : callable, optional
+            Dipanggil dengan hash dataset setelah dataset dibuang
+        """
+        if on_register is not None:
+            self._register_listeners.append(on_register)
+        if on_evict is not None:
+            self._evict_listeners.append(on_evict)
+
+    def register_bytes(self, data, label="", pin=False, pipeline=None, progress=None):
+        """
+        Mendaftarkan dataset CSV dari isi file mentah.
+
+        Parameters:
+        -----------
+        data : bytes
+            Isi file CSV
+        label : str
+            Nama dataset untuk ditampilkan
+        pin : bool
+            True agar dataset tidak pernah dibuang dari registry
+        pipeline : Pipeline, optional
+            Jika diisi, file dibaca per chunk sambil divalidasi dan dijumlahkan
+            normanya secara bersamaan (lihat pipeline.parse_csv)
+        progress : callable, optional
+            Dipanggil dengan jumlah baris yang sudah diparsing (hanya dengan pipeline)
+
+        Returns:
+        --------
+        DatasetEntry
+            Entry yang sudah ada jika isi file sama, atau entry baru
+
+        Raises:
+        -------
+        pandas.errors.EmptyDataError
+            Jika file CSV kosong
+        PipelineCancelled
+            Jika pipeline dibatalkan sebelum parsing selesai
+        """
+        key = content_hash(data)
+
+        def load():
+            if pipeline is not None:
+                parsed = parse_csv(data, pipeline, progress=progress)
+                return DatasetEntry(key, label, parsed.frame, parsed=parsed)
+            return DatasetEntry(key, label, pd.read_csv(io.BytesIO(data)))
+
+        return self.register_loader(key, load, pin=pin)
+
+    def register_loader(self, key, load, pin=False):
+        """
+        Mendaftarkan dataset yang dibuat oleh load() jika key belum ada di registry.
+
+        Parameters:
+        -----------
+        key : str
+            Key unik isi dataset
+        load : callable
+            Fungsi tanpa argumen yang mengembalikan DatasetEntry dengan key tersebut
+        pin : bool
+            True agar dataset tidak pernah dibuang dari registry
+
+        Returns:
+        --------
+        DatasetEntry
+            Entry yang sudah ada, atau entry baru dari load()
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._touch_locked(key, pin)
+                return entry
+
+        # Parsing di luar lock agar sesi lain tidak ikut menunggu
+        entry = load()
+
+        with self._lock:
+            # Sesi lain mungkin sudah mendaftarkan dataset yang sama lebih dulu
+            registered = self._entries.setdefault(key, entry)
+            self._ref_counts.setdefault(key, 0)
+            self._touch_locked(key, pin)
+            expired = self._sweep_locked(exclude=key) if registered is entry else []
+
+        for expired_key in expired:
+            for listener in self._evict_listeners:
+                listener(expired_key)
+        if registered is entry:
+            for listener in self._register_listeners:
+                listener(entry)
+        return registered
+
+    def _touch_locked(self, key, pin):
+        """Mencatat pin, atau memulai ulang waktu tunggu dataset tanpa sesi aktif."""
+        if pin:
+            self._pinned.add(key)
+            self._idle_since.pop(key, None)
+        elif key not in self._pinned and self._ref_counts.get(key, 0) == 0:
+            self._idle_since[key] = time.monotonic()
+
+    def _sweep_locked(self, exclude=None):
+        """Membuang dataset yang tidak dipakai sesi lebih lama dari unused_ttl; mengembalikan key-nya."""
+        now = time.monotonic()
+        expired = [key for key, since in self._idle_since.items()
+                   if key != exclude and now - since >= self.unused_ttl]
+        for key in expired:
+            del self._idle_since[key]
+            del self._entries[key]
+            self._ref_counts.pop(key, None)
+        return expired
+
+    def register_file(self, path, label=None, pin=True):
+        """Mendaftarkan dataset CSV dari path file di server (default di-pin)."""
+        with open(path, "rb") as f:
+            data = f.read()
+        return self.register_bytes(data, label=label or path, pin=pin)
+
+    def get(self, key):
+        """Mengambil entry berdasarkan hash, atau None jika tidak ada."""
+        with self._lock:
+            return self._entries.get(key)
+
+    def acquire(self, entry):
+        """
+        Menambah reference count dataset untuk satu sesi.
+
+        Entry didaftarkan ulang jika sempat dibuang oleh sesi lain di antara
+        register_bytes() dan acquire().
+
+        Parameters:
+        -----------
+        entry : DatasetEntry
+            Dataset yang akan dipakai
+
+        Returns:
+        --------
+        DatasetLease
+            Lease yang harus disimpan di state sesi
+        """
+        with self._lock:
+            readded = entry.key not in self._entries
+            self._entries.setdefault(entry.key, entry)
+            self._ref_counts[entry.key] = self._ref_counts.get(entry.key, 0) + 1
+            self._idle_since.pop(entry.key, None)
+
+        if readded:
+            for listener in self._register_listeners:
+                listener(entry)
+        return DatasetLease(self, entry.key)
+
+    def _release(self, key):
+        with self._lock:
+            if key not in self._ref_counts:
+                return
+            self._ref_counts[key] = max(self._ref_counts[key] - 1, 0)
+            evicted = self._ref_counts[key] == 0 and key not in self._pinned
+            if evicted:
+                del self._entries[key]
+                del self._ref_counts[key]
+                self._idle_since.pop(key, None)
+
+        if evicted:
+            for listener in self._evict_listeners:
+                listener(key)
+
+    def bind_session(self, session_state, entry):
+        """
+        Menghubungkan sesi dengan dataset, melepas dataset sebelumnya jika berbeda.
+
+        Parameters:
+        -----------
+        session_state : MutableMapping
+            State per sesi (misalnya st.session_state)
+        entry : DatasetEntry
+            Dataset yang dipakai sesi saat ini
+        """
+        lease = session_state.get(SESSION_LEASE_KEY)
+        if lease is not None and lease.active and lease.key == entry.key:
+            return
+        new_lease = self.acquire(entry)
+        session_state[SESSION_LEASE_KEY] = new_lease
+        if lease is not None:
+            lease.release()
+
+    def ref_count(self, key):
+        """Jumlah sesi yang sedang memakai dataset."""
+        with self._lock:
+            return self._ref_counts.get(key, 0)
+
+    def stats(self):
+        """
+        Ringkasan isi registry.
+
+        Kolom kriteria float64 di frame memakai memori matrix, sehingga
+        frame_bytes hanya menghitung kolom lain (Name, kolom integer) dan
+        memori sebenarnya adalah matrix_bytes + frame_bytes.
+
+        Returns:
+        --------
+        dict
+            Jumlah dataset, total baris, perkiraan memori matrix, frame, dan
+            totalnya (byte)
+        """
+        with self._lock:
+            entries = list(self._entries.values())
+        matrix_bytes = sum(entry.matrix.nbytes for entry in entries)
+        frame_bytes = sum(entry.frame_bytes for entry in entries)
+        return {
+            'datasets': len(entries),
+            'rows': sum(entry.n_rows for entry in entries),
+            'matrix_bytes': matrix_bytes,
+            'frame_bytes': frame_bytes,
+            'total_bytes': matrix_bytes + frame_bytes,
+        }
@@ -0,0 +1,229 @@
+"""
+Cache hasil MOORA di disk yang bisa dipakai bersama oleh beberapa proses server.
+
+Warm-up preset untuk dataset tertentu (lihat presets.py):
+    python presets.py warmup data/dataset_kost_mahasiswa.csv
+"""
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from observability import record_cache
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# Lokasi default cache, bisa diganti lewat environment variable
+DEFAULT_CACHE_DIR = os.environ.get('SIREKMA_CACHE_DIR', os.path.join('.cache', 'sirekma', 'results'))
+
+# Batas total ukuran file cache sebelum entry lama dibuang
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_SUFFIX = '.npz'
+
+
+# Modul yang menentukan isi Yi dan urutan ranking yang disimpan di cache
+SCORING_MODULES = ('calculate.py', 'kernel.py', 'validation.py', 'registry.py')
+
+
+def code_version(modules=SCORING_MODULES):
+    """
+    Versi kode perhitungan, diambil dari hash isi semua modul jalur skor.
+
+    Setiap perubahan rumus, kernel, validasi, atau cara registry menghitung Yi
+    otomatis membuat key cache baru sehingga hasil lama tidak pernah terpakai.
+
+    Parameters:
+    -----------
+    modules : tuple
+        Nama file modul (relatif terhadap folder ini)
+
+    Returns:
+    --------
+    str
+        Hash heksadesimal 12 karakter
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for name in modules:
+        with open(os.path.join(directory, name), 'rb') as f:
+            digest.update(name.encode('utf-8') + b'\0' + f.read())
+    return digest.hexdigest()[:12]
+
+
+_CODE_VERSION = code_version()
+
+
+def make_cache_key(dataset_key, criteria_cols, criteria_type, weights, tie_breakers=None):
+    """
+    Membuat key cache dari hash dataset, bobot, tipe kriteria, dan versi kode.
+
+    Bobot dinormalisasi ke total 1 dan dibulatkan agar perbedaan floating point
+    kecil (misalnya 33.333...% vs 0.3333...) tetap menghasilkan key yang sama.
+
+    Parameters:
+    -----------
+    dataset_key : str
+        Hash isi dataset (lihat registry.content_hash)
+    criteria_cols : list
+        Urutan kolom kriteria
+    criteria_type : dict
+        Dictionary tipe setiap kriteria
+    weights : dict
+        Dictionary bobot setiap kriteria (persen atau desimal)
+    tie_breakers : list, optional
+        List (nama_kolom, ascending) yang ikut menentukan urutan
+
+    Returns:
+    --------
+    str
+        Key heksadesimal
+    """
+    total = sum(weights[col] for col in criteria_cols) or 1.0
+    payload = {
+        'dataset': dataset_key,
+        'criteria': [[col, criteria_type[col], round(weights[col] / total, 10)] for col in criteria_cols],
+        'tie_breakers': [[col, bool(ascending)] for col, ascending in (tie_breakers or [])],
+        'version': _CODE_VERSION,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """
+    Cache hasil MOORA (array Yi dan permutasi ranking) di disk.
+
+    - Setiap entry adalah satu file .npz biner (float64 Yi + int32/int64 urutan).
+    - Penulisan atomik (file sementara lalu os.replace), sehingga proses lain
+      tidak pernah membaca file setengah jadi.
+    - Eviction LRU berdasarkan waktu akses file saat total ukuran melewati
+      max_bytes, dilindungi file lock antar proses (jika tersedia).
+
+    Examples:
+    ---------
+    >>> import tempfile
+    >>> cache = ResultCache(tempfile.mkdtemp())
+    >>> cache.put('abc', np.array([0.2, 0.5]), np.array([1, 0]))
+    >>> yi_values, order = cache.get('abc')
+    >>> order.tolist()
+    [1, 0]
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    @contextlib.contextmanager
+    def _lock(self):
+        """File lock antar proses untuk eviction (no-op jika fcntl tidak tersedia)."""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """
+        Mengambil hasil dari cache.
+
+        Returns:
+        --------
+        tuple atau None
+            (yi_values, order) jika ada, selain itu None
+        """
+        path = self._path(key)
+        try:
+            with np.load(path) as data:
+                yi_values, order = data['yi'], data['order']
+        except (FileNotFoundError, OSError, ValueError, KeyError):
+            # File tidak ada, sedang dibuang proses lain, atau rusak
+            self.misses += 1
+            record_cache('result', False)
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)  # Tandai sebagai baru dipakai untuk LRU
+        self.hits += 1
+        record_cache('result', True)
+        return yi_values, order
+
+    def put(self, key, yi_values, order):
+        """Menyimpan hasil ke cache secara atomik lalu menjalankan eviction."""
+        order = np.asarray(order)
+        index_dtype = np.int32 if order.shape[0] < np.iinfo(np.int32).max else np.int64
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, yi=np.asarray(yi_values, dtype=np.float64), order=order.astype(index_dtype))
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Membuang entry yang paling lama tidak dipakai sampai total ukuran <= max_bytes."""
+        with self._lock():
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(CACHE_SUFFIX):
+                    continue
+                with contextlib.suppress(FileNotFoundError):
+                    stat = os.stat(os.path.join(self.directory, name))
+                    entries.append((stat.st_mtime, stat.st_size, name))
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.directory, name))
+                total -= size
+
+    def get_or_compute(self, key, compute):
+        """
+        Mengambil hasil dari cache, atau menghitung lalu menyimpannya.
+
+        Parameters:
+        -----------
+        key : str
+            Key dari make_cache_key
+        compute : callable
+            Fungsi tanpa argumen yang mengembalikan (yi_values, order)
+
+        Returns:
+        --------
+        tuple
+            (yi_values, order, from_cache)
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached[0], cached[1], True
+        yi_values, order = compute()
+        self.put(key, yi_values, order)
+        return yi_values, order, False
+
+    def stats(self):
+        """Jumlah hit/miss di proses ini serta jumlah dan ukuran entry di disk."""
+        sizes = []
+        for name in os.listdir(self.directory):
+            if name.endswith(CACHE_SUFFIX):
+                with contextlib.suppress(FileNotFoundError):
+                    sizes.append(os.path.getsize(os.path.join(self.directory, name)))
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(sizes), 'bytes': sum(sizes)}
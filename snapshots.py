@@ -0,0 +1,508 @@
+"""
+Riwayat hasil ranking (snapshot) dengan penyimpanan delta yang ringkas.
+
+Setiap snapshot menyimpan Yi dan posisi setiap alternatif dalam urutan
+ranking (permutasi) dalam bentuk biner terkompresi, bukan CSV hasil lengkap.
+Snapshot disimpan sebagai selisih terhadap snapshot sebelumnya (Yi di-XOR per
+bit, posisi dikurangkan) sehingga nilai yang tidak berubah menjadi nol dan
+terkompresi hampir tanpa biaya. Ranking metode 'min' disimpan sebagai selisih
+terhadap posisinya, yang hanya bukan nol untuk alternatif dengan Yi kembar.
+Snapshot penuh (keyframe) ditulis setiap KEYFRAME_INTERVAL snapshot atau saat
+daftar alternatif berubah, sehingga rekonstruksi tidak pernah menerapkan
+terlalu banyak delta.
+
+Data setiap snapshot dipotong per blok baris yang dikompresi terpisah, sehingga
+query "ranking listing X dari waktu ke waktu" hanya membuka satu blok kecil per
+snapshot tanpa merekonstruksi snapshot penuh.
+
+Jalankan:
+    python snapshots.py list
+    python snapshots.py history "Kost Melati"
+"""
+import argparse
+import collections
+import contextlib
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from calculate import rankings_from_order
+from observability import timed
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+# Lokasi default riwayat snapshot, bisa diganti lewat environment variable
+DEFAULT_SNAPSHOT_DIR = os.environ.get('SIREKMA_SNAPSHOT_DIR', os.path.join('.cache', 'sirekma', 'snapshots'))
+
+# Snapshot penuh ditulis setiap sekian snapshot (rekonstruksi menerapkan paling banyak sekian-1 delta)
+KEYFRAME_INTERVAL = 8
+
+# Jumlah baris per blok terkompresi; query satu listing hanya membuka satu blok per snapshot
+BLOCK_ROWS = 16_384
+
+# Level kompresi zlib (1 paling cepat, 9 paling kecil); setelah byte dikelompokkan,
+# level yang lebih tinggi hanya memperkecil file sedikit tetapi beberapa kali lebih lambat
+COMPRESSION_LEVEL = 1
+
+# Jumlah daftar nama keyframe yang disimpan di memori untuk query riwayat
+NAMES_CACHE_SIZE = 4
+
+INDEX_FILE = 'index.json'
+SNAPSHOT_SUFFIX = '.npz'
+KIND_KEYFRAME = 'key'
+KIND_DELTA = 'delta'
+
+# Kolom yang disimpan per snapshot beserta dtype-nya: bit Yi, posisi dalam urutan
+# ranking, dan selisih posisi + 1 dengan ranking 'min' (nol kecuali untuk Yi kembar)
+FIELDS = {'yi': np.uint64, 'position': np.int32, 'ties': np.int32}
+
+
+def _pack(values):
+    """
+    Kompresi array dengan byte dikelompokkan per tingkat signifikansi.
+
+    Byte atas nilai yang mirip (misalnya hasil XOR dua Yi yang berdekatan)
+    hampir selalu nol; mengelompokkannya membuat deretan nol panjang yang
+    jauh lebih mudah dikompresi zlib.
+    """
+    values = np.ascontiguousarray(values)
+    shuffled = values.view(np.uint8).reshape(-1, values.itemsize).T
+    return np.frombuffer(zlib.compress(np.ascontiguousarray(shuffled).tobytes(), COMPRESSION_LEVEL), dtype=np.uint8)
+
+
+def _unpack(packed, dtype, n):
+    """Kebalikan dari _pack."""
+    itemsize = np.dtype(dtype).itemsize
+    shuffled = np.frombuffer(zlib.decompress(packed.tobytes()), dtype=np.uint8).reshape(itemsize, n)
+    return np.ascontiguousarray(shuffled.T).view(dtype).reshape(n)
+
+
+def _delta(field, values, previous):
+    """Selisih terhadap snapshot sebelumnya: XOR untuk bit Yi, pengurangan untuk posisi."""
+    if field == 'yi':
+        return values ^ previous
+    if field == 'position':
+        return np.subtract(values, previous, dtype=FIELDS[field])
+    # Kolom ties hampir seluruhnya nol sehingga disimpan apa adanya
+    return values
+
+
+def _apply_delta(field, delta, previous):
+    """Kebalikan dari _delta."""
+    if field == 'yi':
+        return delta ^ previous
+    if field == 'position':
+        return np.add(previous, delta, dtype=FIELDS[field])
+    return delta
+
+
+def _read_only(values):
+    """Array snapshot dibagikan antar pemanggil (dan dipakai sebagai dasar delta), sehingga dibuat read-only."""
+    for array in values.values():
+        array.setflags(write=False)
+    return values
+
+
+def _names_digest(names):
+    """Hash daftar nama langsung dari buffer array unicode (tanpa membuat string gabungan)."""
+    return hashlib.sha256(names.dtype.str.encode('ascii') + names.tobytes()).hexdigest()
+
+
+class RankingSnapshot:
+    """
+    Hasil ranking satu snapshot yang sudah direkonstruksi.
+
+    Attributes:
+    -----------
+    info : dict
+        Metadata snapshot dari index (id, waktu, label, jenis, metadata)
+    names : numpy.ndarray
+        Nama setiap alternatif sesuai urutan baris dataset
+    yi_values : numpy.ndarray
+        Yi setiap alternatif
+    rankings : numpy.ndarray
+        Ranking metode 'min' setiap alternatif (per baris)
+    order : numpy.ndarray
+        Indeks baris terurut dari ranking teratas (termasuk tie-breaker)
+    """
+
+    def __init__(self, info, names, yi_values, rankings, order):
+        self.info = info
+        self.names = names
+        self.yi_values = yi_values
+        self.rankings = rankings
+        self.order = order
+
+    def to_frame(self, top_n=None):
+        """DataFrame Name, Yi (Score), Ranking terurut dari ranking teratas."""
+        order = self.order if top_n is None else self.order[:top_n]
+        return pd.DataFrame({
+            'Name': self.names[order],
+            'Yi (Score)': self.yi_values[order],
+            'Ranking': self.rankings[order],
+        })
+
+
+class SnapshotStore:
+    """
+    Riwayat hasil ranking di disk dengan penyimpanan delta per blok.
+
+    - Setiap snapshot adalah satu file .npz berisi blok terkompresi (dan daftar
+      nama untuk keyframe); index.json mencatat urutan dan metadata snapshot.
+    - Penulisan atomik (file sementara lalu os.replace) dan dilindungi file
+      lock antar proses (jika tersedia).
+
+    Parameters:
+    -----------
+    directory : str
+        Direktori penyimpanan
+    keyframe_interval : int
+        Jumlah snapshot per keyframe
+    block_rows : int
+        Jumlah baris per blok terkompresi (hanya berlaku untuk keyframe baru)
+
+    Examples:
+    ---------
+    >>> store = SnapshotStore(tempfile.mkdtemp())
+    >>> names = ['Kost A', 'Kost B', 'Kost C']
+    >>> store.add(names, np.array([0.30, 0.50, 0.10]), np.array([1, 0, 2]), label='minggu 1')['kind']
+    'key'
+    >>> store.add(names, np.array([0.60, 0.50, 0.10]), np.array([0, 1, 2]), label='minggu 2')['kind']
+    'delta'
+    >>> store.history('Kost A')[['Label', 'Ranking']].values.tolist()
+    [['minggu 1', 2], ['minggu 2', 1]]
+    >>> store.load(0).to_frame()['Name'].tolist()
+    ['Kost B', 'Kost A', 'Kost C']
+    """
+
+    def __init__(self, directory=DEFAULT_SNAPSHOT_DIR, keyframe_interval=KEYFRAME_INTERVAL, block_rows=BLOCK_ROWS):
+        self.directory = directory
+        self.keyframe_interval = keyframe_interval
+        self.block_rows = block_rows
+        self._thread_lock = threading.Lock()
+        # Store dibagikan ke semua sesi: cache di bawah dilindungi lock terpisah (bukan lock penulisan,
+        # yang dipegang add() selama merekonstruksi snapshot sebelumnya)
+        self._cache_lock = threading.Lock()
+        # Snapshot terakhir yang ditulis/dibaca: (id, {field: array}) sebagai dasar delta berikutnya
+        self._latest = None
+        self._names_cache = collections.OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, snapshot_id):
+        return os.path.join(self.directory, f"{snapshot_id:06d}{SNAPSHOT_SUFFIX}")
+
+    @contextlib.contextmanager
+    def _lock(self):
+        """Lock antar thread dan antar proses untuk penulisan snapshot."""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _write_atomic(self, path, write):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write(f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def snapshots(self):
+        """
+        Metadata semua snapshot, dari yang paling lama.
+
+        Returns:
+        --------
+        list
+            List dictionary (id, created, label, kind, n_rows, bytes, metadata, ...)
+        """
+        try:
+            with open(os.path.join(self.directory, INDEX_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _info(self, index, snapshot_id):
+        if not 0 <= snapshot_id < len(index):
+            raise ValueError(f"Snapshot {snapshot_id} tidak ditemukan!")
+        return index[snapshot_id]
+
+    def add(self, names, yi_values, order, label='', metadata=None, created=None):
+        """
+        Menyimpan satu hasil ranking sebagai snapshot baru.
+
+        Parameters:
+        -----------
+        names : array-like
+            Nama setiap alternatif (urutan baris dataset)
+        yi_values : numpy.ndarray
+            Yi setiap alternatif
+        order : numpy.ndarray
+            Urutan baris dari ranking teratas (lihat rank_alternatives)
+        label : str
+            Keterangan snapshot, misalnya nama file dataset
+        metadata : dict, optional
+            Informasi tambahan yang bisa diserialisasi JSON (bobot, tipe kriteria, ...)
+        created : datetime.datetime, optional
+            Waktu snapshot (default: sekarang)
+
+        Returns:
+        --------
+        dict
+            Metadata snapshot yang disimpan
+
+        Raises:
+        -------
+        ValueError
+            Jika panjang nama, Yi, dan urutan tidak sama
+        """
+        names = np.asarray(names).astype(str)
+        # Disalin karena menjadi dasar delta snapshot berikutnya
+        yi_values = np.array(yi_values, dtype=np.float64)
+        order = np.asarray(order, dtype=np.int64)
+        n_rows = yi_values.shape[0]
+        if names.shape[0] != n_rows or order.shape[0] != n_rows:
+            raise ValueError("Jumlah nama, Yi, dan urutan ranking harus sama!")
+
+        position = np.empty(n_rows, dtype=np.int32)
+        position[order] = np.arange(n_rows, dtype=np.int32)
+        ties = np.empty(n_rows, dtype=np.int32)
+        ties[order] = np.arange(1, n_rows + 1) - rankings_from_order(yi_values, order)
+        values = _read_only({'yi': yi_values.view(np.uint64), 'position': position, 'ties': ties})
+        names_digest = _names_digest(names)
+
+        with timed('snapshot'), self._lock():
+            index = self.snapshots()
+            previous = index[-1] if index else None
+            is_keyframe = (previous is None or previous['names_digest'] != names_digest
+                           or previous['chain'] + 1 >= self.keyframe_interval)
+            info = {
+                'id': len(index),
+                'created': (created or datetime.datetime.now()).isoformat(timespec='seconds'),
+                'label': label,
+                'kind': KIND_KEYFRAME if is_keyframe else KIND_DELTA,
+                'keyframe': len(index) if is_keyframe else previous['keyframe'],
+                'chain': 0 if is_keyframe else previous['chain'] + 1,
+                'n_rows': n_rows,
+                'block_rows': self.block_rows if is_keyframe else previous['block_rows'],
+                'names_digest': names_digest,
+                'metadata': metadata or {},
+            }
+
+            if is_keyframe:
+                stored = values
+            else:
+                base = self._values(index, previous['id'])
+                stored = {field: _delta(field, values[field], base[field]) for field in FIELDS}
+            block_rows = info['block_rows']
+            arrays = {
+                f"{field}_{b}": _pack(stored[field][start:start + block_rows])
+                for field in FIELDS
+                for b, start in enumerate(range(0, n_rows, block_rows))
+            }
+            if is_keyframe:
+                arrays['names'] = np.frombuffer(
+                    zlib.compress('\0'.join(names).encode('utf-8'), COMPRESSION_LEVEL), dtype=np.uint8
+                )
+
+            path = self._path(info['id'])
+            self._write_atomic(path, lambda f: np.savez(f, **arrays))
+            info['bytes'] = os.path.getsize(path)
+            index.append(info)
+            self._write_atomic(os.path.join(self.directory, INDEX_FILE),
+                               lambda f: f.write(json.dumps(index, indent=1).encode('utf-8')))
+            with self._cache_lock:
+                self._latest = (info['id'], values)
+        return info
+
+    def _chain(self, index, snapshot_id):
+        """Id keyframe sampai snapshot_id (delta selalu relatif terhadap snapshot tepat sebelumnya)."""
+        info = self._info(index, snapshot_id)
+        return range(info['keyframe'], snapshot_id + 1)
+
+    def _values(self, index, snapshot_id):
+        """Merekonstruksi semua kolom satu snapshot dengan menerapkan delta dari keyframe-nya."""
+        with self._cache_lock:
+            latest = self._latest
+        if latest is not None and latest[0] == snapshot_id:
+            return latest[1]
+        values = None
+        for chain_id in self._chain(index, snapshot_id):
+            info = index[chain_id]
+            n_rows, block_rows = info['n_rows'], info['block_rows']
+            # Kolom ties tidak disimpan sebagai delta, sehingga cukup dibaca dari snapshot terakhir
+            fields = FIELDS if chain_id == snapshot_id else ('yi', 'position')
+            with np.load(self._path(chain_id), allow_pickle=False) as data:
+                decoded = {
+                    field: np.concatenate([
+                        _unpack(data[f"{field}_{b}"], FIELDS[field], min(block_rows, n_rows - start))
+                        for b, start in enumerate(range(0, n_rows, block_rows))
+                    ]) if n_rows else np.empty(0, dtype=FIELDS[field])
+                    for field in fields
+                }
+            values = decoded if values is None else {
+                field: _apply_delta(field, decoded[field], values.get(field)) for field in fields
+            }
+        values = _read_only(values)
+        with self._cache_lock:
+            self._latest = (snapshot_id, values)
+        return values
+
+    def _names(self, keyframe_id, n_rows):
+        """Daftar nama alternatif sebuah keyframe (disimpan di memori untuk beberapa keyframe terakhir)."""
+        with self._cache_lock:
+            names = self._names_cache.get(keyframe_id)
+            if names is not None:
+                self._names_cache.move_to_end(keyframe_id)
+                return names
+        # Dekompresi di luar lock agar sesi lain tidak ikut menunggu
+        with np.load(self._path(keyframe_id), allow_pickle=False) as data:
+            text = zlib.decompress(data['names'].tobytes()).decode('utf-8')
+        names = np.array(text.split('\0'), dtype=object) if n_rows else np.empty(0, dtype=object)
+        with self._cache_lock:
+            self._names_cache[keyframe_id] = names
+            while len(self._names_cache) > NAMES_CACHE_SIZE:
+                self._names_cache.popitem(last=False)
+        return names
+
+    def load(self, snapshot_id):
+        """
+        Merekonstruksi hasil ranking satu snapshot.
+
+        Returns:
+        --------
+        RankingSnapshot
+
+        Raises:
+        -------
+        ValueError
+            Jika snapshot tidak ditemukan
+        """
+        with timed('snapshot_load'):
+            index = self.snapshots()
+            info = self._info(index, snapshot_id)
+            values = self._values(index, snapshot_id)
+            order = np.empty(info['n_rows'], dtype=np.int64)
+            order[values['position']] = np.arange(info['n_rows'])
+            rankings = values['position'].astype(np.int64) + 1 - values['ties']
+            return RankingSnapshot(info, self._names(info['keyframe'], info['n_rows']), values['yi'].view(np.float64),
+                                   rankings, order)
+
+    def history(self, name):
+        """
+        Yi dan ranking satu listing di setiap snapshot tempat listing tersebut ada.
+
+        Hanya blok yang memuat listing tersebut yang dibuka di setiap snapshot;
+        delta blok diterapkan berurutan dari keyframe-nya.
+
+        Parameters:
+        -----------
+        name : str
+            Nama listing (jika ada nama kembar, baris pertama yang dipakai)
+
+        Returns:
+        --------
+        pandas.DataFrame
+            Kolom Snapshot, Waktu, Label, Yi (Score), Ranking, Jumlah Alternatif
+        """
+        rows = []
+        with timed('snapshot_history'):
+            state = None
+            for info in self.snapshots():
+                if info['kind'] == KIND_KEYFRAME:
+                    matches = np.flatnonzero(self._names(info['id'], info['n_rows']) == name)
+                    state = None
+                    if len(matches):
+                        row = int(matches[0])
+                        block, offset = divmod(row, info['block_rows'])
+                        state = {'block': block, 'offset': offset, 'values': None}
+                if state is None:
+                    continue
+                start = state['block'] * info['block_rows']
+                n_block = min(info['block_rows'], info['n_rows'] - start)
+                with np.load(self._path(info['id']), allow_pickle=False) as data:
+                    decoded = {field: _unpack(data[f"{field}_{state['block']}"], FIELDS[field], n_block)
+                               for field in FIELDS}
+                state['values'] = decoded if state['values'] is None else {
+                    field: _apply_delta(field, decoded[field], state['values'][field]) for field in decoded
+                }
+                offset = state['offset']
+                rows.append({
+                    'Snapshot': info['id'],
+                    'Waktu': pd.Timestamp(info['created']),
+                    'Label': info['label'],
+                    'Yi (Score)': float(state['values']['yi'][offset:offset + 1].view(np.float64)[0]),
+                    'Ranking': int(state['values']['position'][offset]) + 1 - int(state['values']['ties'][offset]),
+                    'Jumlah Alternatif': info['n_rows'],
+                })
+        return pd.DataFrame(rows, columns=['Snapshot', 'Waktu', 'Label', 'Yi (Score)', 'Ranking',
+                                           'Jumlah Alternatif'])
+
+    def stats(self):
+        """
+        Statistik penyimpanan: ukuran di disk dibanding ukuran array mentah.
+
+        Returns:
+        --------
+        dict
+        """
+        index = self.snapshots()
+        stored = sum(info['bytes'] for info in index)
+        # Yi float64 + urutan ranking int32 + ranking int32 per alternatif
+        raw = sum(info['n_rows'] * 16 for info in index)
+        return {
+            'snapshots': len(index),
+            'keyframes': sum(info['kind'] == KIND_KEYFRAME for info in index),
+            'bytes': stored,
+            'raw_bytes': raw,
+            'ratio': raw / stored if stored else 0.0,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Riwayat snapshot ranking SIREKMA")
+    parser.add_argument('--dir', default=DEFAULT_SNAPSHOT_DIR, help="Direktori snapshot")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help="Tampilkan semua snapshot")
+    history_parser = subparsers.add_parser('history', help="Ranking satu listing dari waktu ke waktu")
+    history_parser.add_argument('name', help="Nama listing")
+    show_parser = subparsers.add_parser('show', help="Tampilkan ranking satu snapshot")
+    show_parser.add_argument('id', type=int, help="Id snapshot")
+    show_parser.add_argument('--top', type=int, default=10, help="Jumlah alternatif teratas")
+    args = parser.parse_args()
+
+    store = SnapshotStore(args.dir)
+    if args.command == 'list':
+        index = store.snapshots()
+        columns = ['id', 'created', 'label', 'kind', 'n_rows', 'bytes']
+        print(pd.DataFrame(index, columns=columns).to_string(index=False) if index else "Belum ada snapshot.")
+        print(store.stats())
+    elif args.command == 'history':
+        history = store.history(args.name)
+        print(history.to_string(index=False) if len(history) else f"'{args.name}' tidak ada di snapshot mana pun.")
+    else:
+        print(store.load(args.id).to_frame(top_n=args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
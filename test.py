@@ -4,9 +4,36 @@ import numpy as np
 from unittest.mock import Mock, patch
 import sys
 import os
+import io
+import json
+import tempfile
+import zipfile
+import threading
 
 # Import fungsi dari calculate.py
-from calculate import calculate_moora, validate_weights, validate_criteria_type, create_result_dataframe
+from calculate import calculate_moora, validate_weights, validate_criteria_type, create_result_dataframe, rank_alternatives
+from export import export_results, export_file_info
+from registry import DatasetRegistry, content_hash
+from live import LiveRanker, top_n_ranking
+import kernel
+from kernel import score_matrix, HAS_NUMBA
+from federated import RegionDataset, federated_top_k, merge_top_k
+from result_cache import ResultCache, SCORING_MODULES, code_version, make_cache_key
+from presets import PresetMaterializer, PresetProfile, load_profiles, warmup
+from approximate import ProgressiveRanking, ReservoirSample, estimate_norms
+from pipeline import Pipeline, PipelineCancelled, parse_csv, render_png
+from differential import (generate_case, run_case, run_differential, assert_agreement,
+                          compare_ranking, scoring_paths)
+from whatif import WhatIfScorer
+from inverse import InverseQuery, pareto_front, project_onto_polytope
+from batch import UploadBatch, STATUS_CANCELLED, STATUS_DONE, STATUS_ERROR
+import snapshots
+from snapshots import SnapshotStore
+from ingest import ConversionCache, load_spreadsheet, read_spreadsheet, register_spreadsheet, spreadsheet_shape
+import observability
+from observability import Histogram, MetricsRegistry, RequestLogger, summarize_log, timed
+from governor import ResourceGovernor, Budget, estimate_cost, csv_shape
+from validation import validate_data, validate_weight_values, validate_criteria_types, validate_inputs
 
 
 class TestCalculateMoora(unittest.TestCase):
@@ -438,6 +465,1761 @@ class TestResultInterpretation(unittest.TestCase):
         yi_scores = result_df['Yi (Score)'].tolist()
         self.assertEqual(yi_scores, sorted(yi_scores, reverse=True),
                         "Ranking harus descending berdasarkan Yi Score")
+    
+    def test_tied_alternatives_keep_original_order(self):
+        """Test: Alternatif dengan Yi sama mendapat ranking sama dan urutan deterministik"""
+        df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C', 'Kost_D'],
+            'Price': [1800, 900, 2000, 700]
+        })
+        yi_values = np.array([0.10, 0.25, 0.10, 0.10])
+        
+        result_df = create_result_dataframe(df, yi_values)
+        
+        self.assertEqual(result_df['Name'].tolist(), ['Kost_B', 'Kost_A', 'Kost_C', 'Kost_D'])
+        self.assertEqual(result_df['Ranking'].tolist(), [1, 2, 2, 2])
+    
+    def test_tie_breaker_lower_price_first(self):
+        """Test: Tie-breaker harga mendahulukan kost yang lebih murah"""
+        df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C', 'Kost_D'],
+            'Price': [1800, 900, 2000, 700],
+            'Size': [12, 12, 20, 12]
+        })
+        yi_values = np.array([0.10, 0.25, 0.10, 0.10])
+        
+        result_df = create_result_dataframe(df, yi_values, tie_breakers=[('Size', False), ('Price', True)])
+        
+        self.assertEqual(result_df['Name'].tolist(), ['Kost_B', 'Kost_C', 'Kost_D', 'Kost_A'])
+        self.assertEqual(result_df['Ranking'].tolist(), [1, 2, 2, 2],
+                        "Tie-breaker tidak boleh mengubah ranking, hanya urutan")
+    
+    def test_rank_alternatives_matches_pandas_rank(self):
+        """Test: Ranking metode 'min' sama dengan Series.rank pandas"""
+        rng = np.random.default_rng(3)
+        yi_values = rng.integers(0, 20, 500) / 10
+        
+        order, rankings = rank_alternatives(yi_values)
+        expected = pd.Series(yi_values).rank(ascending=False, method='min').astype(int).to_numpy()
+        
+        np.testing.assert_array_equal(rankings, expected[order])
+        self.assertTrue(np.all(np.diff(yi_values[order]) <= 0), "Yi harus terurut menurun")
+
+
+
+class TestExport(unittest.TestCase):
+    """Test suite untuk export hasil ranking"""
+    
+    def setUp(self):
+        """Setup hasil perhitungan untuk di-export"""
+        self.df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C'],
+            'Price': [1800, 900, 2000],
+            'Size': [15, 12, 18]
+        })
+        self.criteria_type = {'Price': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.5, 'Size': 0.5}
+        self.normalized, self.weighted, yi_values = calculate_moora(
+            self.df, self.criteria_type, self.weights
+        )
+        self.result_df = create_result_dataframe(self.df, yi_values)
+    
+    def test_csv_export_matches_to_csv(self):
+        """Test: Export CSV per chunk sama dengan to_csv sekaligus"""
+        buffer = export_results(self.result_df, fmt='csv', chunk_size=2)
+        
+        self.assertEqual(buffer.read().decode('utf-8'), self.result_df.to_csv(index=False),
+                        "Export CSV per chunk harus identik dengan to_csv")
+    
+    def test_compressed_csv_export(self):
+        """Test: Export CSV gzip dapat dibaca kembali"""
+        buffer = export_results(self.result_df, fmt='csv.gz', chunk_size=1)
+        exported = pd.read_csv(buffer, compression='gzip')
+        
+        self.assertEqual(exported['Name'].tolist(), self.result_df['Name'].tolist(),
+                        "Urutan ranking hasil export gzip tidak sesuai")
+    
+    def test_jsonl_export(self):
+        """Test: Export JSON Lines menghasilkan satu baris per alternatif"""
+        buffer = export_results(self.result_df, fmt='jsonl', chunk_size=2)
+        exported = pd.read_json(buffer, lines=True)
+        
+        self.assertEqual(len(exported), len(self.result_df),
+                        "Jumlah baris JSON Lines harus sama dengan jumlah alternatif")
+    
+    def test_bundle_export_contains_matrices_and_weights(self):
+        """Test: Export lengkap berisi ranking, kedua matrix, dan bobot"""
+        criteria_cols = ['Price', 'Size']
+        buffer = export_results(
+            self.result_df, fmt='csv',
+            normalized=self.normalized, weighted=self.weighted,
+            criteria_cols=criteria_cols, names=self.df['Name'].values,
+            weights={'Price': 50, 'Size': 50}, criteria_type=self.criteria_type,
+            chunk_size=2
+        )
+        
+        with zipfile.ZipFile(buffer) as archive:
+            self.assertEqual(archive.namelist(),
+                             ['ranking.csv', 'matrix_ternormalisasi.csv', 'matrix_terbobot.csv', 'bobot.csv'])
+            weighted_df = pd.read_csv(archive.open('matrix_terbobot.csv'))
+        
+        np.testing.assert_array_almost_equal(
+            weighted_df[criteria_cols].values, self.weighted,
+            err_msg="Matrix terbobot hasil export tidak sesuai"
+        )
+    
+    def test_invalid_format(self):
+        """Test: Format tidak dikenal harus raise error"""
+        with self.assertRaises(ValueError):
+            export_results(self.result_df, fmt='xml')
+    
+    def test_export_file_info(self):
+        """Test: Nama file dan MIME type sesuai format"""
+        self.assertEqual(export_file_info('csv'), ('hasil_rekomendasi_kost.csv', 'text/csv'))
+        self.assertEqual(export_file_info('jsonl', bundle=True)[1], 'application/zip')
+
+
+class TestDatasetRegistry(unittest.TestCase):
+    """Test suite untuk registry dataset bersama antar sesi"""
+    
+    def setUp(self):
+        """Setup registry dan isi file CSV"""
+        self.registry = DatasetRegistry()
+        self.data = (b"Name,Price,Distance,Size\n"
+                     b"Kost_A,1800,2.5,15\n"
+                     b"Kost_B,900,1.0,12\n"
+                     b"Kost_C,2000,3.5,18\n")
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.4, 'Distance': 0.3, 'Size': 0.3}
+    
+    def test_same_content_shares_entry(self):
+        """Test: Isi file yang sama hanya diparsing sekali"""
+        first = self.registry.register_bytes(self.data, label='a.csv')
+        second = self.registry.register_bytes(self.data, label='b.csv')
+        
+        self.assertIs(first, second, "Dataset dengan isi sama harus memakai entry yang sama")
+        self.assertEqual(self.registry.stats()['datasets'], 1)
+    
+    def test_matrix_is_read_only(self):
+        """Test: Matrix keputusan yang dibagikan tidak bisa diubah"""
+        entry = self.registry.register_bytes(self.data)
+        
+        with self.assertRaises(ValueError):
+            entry.matrix[0, 0] = 1.0
+    
+    def test_shared_frame_is_read_only(self):
+        """Test: Frame bersama tidak bisa diubah in-place, salinan dangkal sesi tetap bisa"""
+        entry = self.registry.register_bytes(self.data)
+        
+        with self.assertRaises(ValueError):
+            entry.frame.loc[0, 'Price'] = 1.0
+        with self.assertRaises(ValueError):
+            entry.frame['Distance'].to_numpy()[0] = 1.0
+        
+        session_frame = entry.frame.copy(deep=False)
+        session_frame.loc[0, 'Distance'] = 9.9
+        self.assertEqual(entry.frame.loc[0, 'Distance'], 2.5, "Perubahan sesi tidak boleh mengubah frame bersama")
+        self.assertEqual(entry.matrix[0, 1], 2.5)
+    
+    def test_float_columns_share_matrix_memory(self):
+        """Test: Kolom kriteria float tidak disimpan dua kali dan matrix ternormalisasi tidak disimpan"""
+        entry = self.registry.register_bytes(self.data)
+        
+        self.assertEqual(entry.shared_cols, ('Distance',))
+        self.assertTrue(np.shares_memory(entry.frame['Distance'].to_numpy(), entry.matrix))
+        np.testing.assert_array_almost_equal(entry.normalized(), entry.matrix / entry.norms)
+        self.assertNotIn('normalized', vars(entry), "Matrix ternormalisasi tidak boleh disimpan di entry")
+    
+    def test_calculate_matches_calculate_moora(self):
+        """Test: Perhitungan dengan norma tersimpan sama dengan calculate_moora"""
+        entry = self.registry.register_bytes(self.data)
+        _, _, yi_expected = calculate_moora(entry.frame, self.criteria_type, self.weights)
+        _, _, yi_values = entry.calculate(self.criteria_type, self.weights)
+        
+        np.testing.assert_array_almost_equal(yi_values, yi_expected)
+    
+    def test_nonpositive_values_rejected(self):
+        """Test: Dataset dengan nilai nol tetap ditolak saat dihitung"""
+        entry = self.registry.register_bytes(b"Name,Price\nKost_A,0\nKost_B,900\n")
+        
+        with self.assertRaises(ValueError) as context:
+            entry.calculate({'Price': 'cost'}, {'Price': 1.0})
+        
+        self.assertIn("nol", str(context.exception).lower())
+    
+    def test_release_evicts_unpinned_dataset(self):
+        """Test: Dataset dibuang saat tidak ada sesi yang memakainya"""
+        entry = self.registry.register_bytes(self.data)
+        session_a, session_b = {}, {}
+        self.registry.bind_session(session_a, entry)
+        self.registry.bind_session(session_b, entry)
+        self.assertEqual(self.registry.ref_count(entry.key), 2)
+        
+        session_a.clear()  # Sesi ditutup, lease dibuang garbage collector
+        self.assertEqual(self.registry.ref_count(entry.key), 1)
+        
+        other = self.registry.register_bytes(b"Name,Price\nKost_A,900\n")
+        self.registry.bind_session(session_b, other)
+        self.assertIsNone(self.registry.get(entry.key),
+                          "Dataset tanpa sesi aktif harus dibuang dari registry")
+    
+    def test_unused_dataset_is_swept_on_register(self):
+        """Test: Dataset yang tidak pernah dipakai sesi dibuang saat dataset baru didaftarkan"""
+        registry = DatasetRegistry(unused_ttl=0)
+        evicted = []
+        registry.add_listener(on_evict=evicted.append)
+        unused = registry.register_bytes(self.data)
+        used = registry.register_bytes(b"Name,Price\nKost_A,900\n")
+        session = {}
+        registry.bind_session(session, used)
+        
+        registry.register_bytes(b"Name,Price\nKost_B,1200\n")
+        
+        self.assertIsNone(registry.get(unused.key))
+        self.assertIs(registry.get(used.key), used, "Dataset dengan sesi aktif tidak boleh dibuang")
+        self.assertEqual(evicted, [unused.key])
+    
+    def test_unused_dataset_kept_within_ttl(self):
+        """Test: Dataset yang baru didaftarkan tidak dibuang sebelum TTL habis"""
+        entry = self.registry.register_bytes(self.data)
+        self.registry.register_bytes(b"Name,Price\nKost_A,900\n")
+        
+        self.assertIs(self.registry.get(entry.key), entry)
+    
+    def test_stats_count_frame_and_matrix(self):
+        """Test: Statistik memori mencakup frame selain matrix tanpa menghitung kolom bersama dua kali"""
+        entry = self.registry.register_bytes(self.data)
+        stats = self.registry.stats()
+        
+        self.assertEqual(stats['matrix_bytes'], entry.matrix.nbytes)
+        self.assertGreater(stats['frame_bytes'], 0)
+        self.assertEqual(stats['total_bytes'], stats['matrix_bytes'] + stats['frame_bytes'])
+        self.assertLess(stats['frame_bytes'], int(entry.frame.memory_usage(index=True, deep=True).sum()))
+    
+    def test_pinned_dataset_is_kept(self):
+        """Test: Dataset yang di-pin tetap ada walau tidak dipakai sesi"""
+        entry = self.registry.register_bytes(self.data, pin=True)
+        session = {}
+        self.registry.bind_session(session, entry)
+        session.clear()
+        
+        self.assertIs(self.registry.get(entry.key), entry)
+
+
+class TestLiveRanking(unittest.TestCase):
+    """Test suite untuk live ranking dari matrix ternormalisasi tersimpan"""
+    
+    def setUp(self):
+        """Setup dataset dan ranker"""
+        self.df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C', 'Kost_D'],
+            'Price': [1800, 900, 2000, 900],
+            'Size': [15, 12, 18, 12]
+        })
+        self.criteria_type = {'Price': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.6, 'Size': 0.4}
+        self.normalized, _, self.yi_values = calculate_moora(self.df, self.criteria_type, self.weights)
+        self.ranker = LiveRanker(self.normalized, ['Price', 'Size'])
+    
+    def test_scores_match_calculate_moora(self):
+        """Test: Satu dot product menghasilkan Yi yang sama dengan calculate_moora"""
+        np.testing.assert_array_almost_equal(
+            self.ranker.scores(self.criteria_type, self.weights), self.yi_values
+        )
+    
+    def test_top_n_matches_full_ranking(self):
+        """Test: Top-N (dengan nilai kembar) sama dengan ranking penuh"""
+        result_df = create_result_dataframe(self.df, self.yi_values)
+        indices, rankings, _ = self.ranker.top(self.criteria_type, self.weights, n=3)
+        
+        self.assertEqual(rankings.tolist(), result_df['Ranking'].tolist()[:3])
+        self.assertEqual(set(self.df['Name'].values[indices[:2]]), {'Kost_B', 'Kost_D'},
+                        "Alternatif kembar harus berada di ranking teratas bersama")
+    
+    def test_top_n_larger_than_dataset(self):
+        """Test: n lebih besar dari jumlah alternatif mengembalikan semua alternatif"""
+        indices, rankings = top_n_ranking(np.array([0.2, 0.1]), 10)
+        
+        self.assertEqual(indices.tolist(), [0, 1])
+        self.assertEqual(rankings.tolist(), [1, 2])
+    
+    def test_ties_at_boundary_match_rank_alternatives(self):
+        """Test: Alternatif kembar di batas top-N dipilih dengan urutan yang sama seperti ranking penuh"""
+        rng = np.random.default_rng(3)
+        yi_values = rng.integers(0, 5, 200).astype(float)
+        price = rng.integers(500, 2500, 200)
+        
+        for tie_breakers in (None, [(price, True)]):
+            order, rankings = rank_alternatives(yi_values, tie_breakers)
+            indices, top_rankings = top_n_ranking(yi_values, 25, tie_breakers)
+            
+            self.assertEqual(indices.tolist(), order[:25].tolist())
+            self.assertEqual(top_rankings.tolist(), rankings[:25].tolist())
+
+
+class TestScoringKernel(unittest.TestCase):
+    """Test suite untuk kernel skor fused (NumPy dan Numba)"""
+    
+    def setUp(self):
+        """Setup dataset acak"""
+        rng = np.random.default_rng(7)
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.df = pd.DataFrame({
+            'Name': [f"Kost_{i}" for i in range(50)],
+            'Price': rng.integers(500, 2500, 50),
+            'Distance': rng.uniform(0.2, 8.0, 50),
+            'Size': rng.integers(6, 25, 50)
+        })
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.5, 'Distance': 0.3, 'Size': 0.2}
+        _, _, self.yi_expected = calculate_moora(self.df, self.criteria_type, self.weights)
+        self.X = self.df[self.criteria_cols].to_numpy(dtype=float)
+    
+    def test_numpy_backend_matches_reference(self):
+        """Test: Kernel NumPy sama dengan calculate_moora"""
+        yi_values, _ = score_matrix(self.X, self.criteria_cols, self.criteria_type, self.weights, backend='numpy')
+        
+        np.testing.assert_allclose(yi_values, self.yi_expected, rtol=1e-12, atol=1e-15)
+    
+    @unittest.skipUnless(HAS_NUMBA, "numba tidak terpasang")
+    def test_numba_backend_matches_reference(self):
+        """Test: Kernel Numba sama dengan calculate_moora"""
+        yi_values, _ = score_matrix(self.X, self.criteria_cols, self.criteria_type, self.weights, backend='numba')
+        
+        np.testing.assert_allclose(yi_values, self.yi_expected, rtol=1e-12, atol=1e-15)
+    
+    def test_nonpositive_value_rejected(self):
+        """Test: Kernel menolak nilai nol/negatif dan menyebut kolomnya"""
+        X = self.X.copy()
+        X[10, 1] = 0.0
+        
+        with self.assertRaises(ValueError) as context:
+            score_matrix(X, self.criteria_cols, self.criteria_type, self.weights)
+        
+        self.assertIn("Distance", str(context.exception))
+    
+    def test_nan_and_inf_rejected_by_all_backends(self):
+        """Test: NaN dan inf tidak lolos validasi kernel di backend mana pun"""
+        X = self.X.copy()
+        X[3, 0] = np.nan
+        X[7, 2] = np.inf
+        
+        for backend in kernel.available_backends():
+            with self.subTest(backend=backend):
+                with self.assertRaises(ValueError) as context:
+                    score_matrix(X, self.criteria_cols, self.criteria_type, self.weights, backend=backend)
+                
+                message = str(context.exception)
+                self.assertIn("'Price' mengandung nilai kosong (NaN)", message)
+                self.assertIn("'Size' mengandung nilai tak hingga (inf)", message)
+    
+    @unittest.skipUnless(HAS_NUMBA, "numba tidak terpasang")
+    def test_production_scoring_uses_kernel(self):
+        """Test: Skor registry dan calculate_moora memakai kernel Numba untuk matrix besar"""
+        entry = DatasetRegistry().register_bytes(self.df.to_csv(index=False).encode("utf-8"))
+        
+        with patch.object(kernel, 'NUMBA_MIN_ROWS', 1), \
+             patch.object(kernel, '_numba_scores', wraps=kernel._numba_scores) as numba_scores:
+            yi_entry = entry.scores(self.criteria_type, self.weights)
+            _, _, yi_calculate = calculate_moora(self.df, self.criteria_type, self.weights)
+        
+        self.assertEqual(numba_scores.call_count, 2)
+        np.testing.assert_allclose(yi_entry, self.yi_expected, rtol=1e-12, atol=1e-15)
+        np.testing.assert_allclose(yi_calculate, self.yi_expected, rtol=1e-12, atol=1e-15)
+    
+    def test_unknown_backend(self):
+        """Test: Backend tidak dikenal harus raise error"""
+        with self.assertRaises(ValueError):
+            score_matrix(self.X, self.criteria_cols, self.criteria_type, self.weights, backend='cuda')
+
+
+class TestFederatedRanking(unittest.TestCase):
+    """Test suite untuk ranking gabungan beberapa region"""
+    
+    def setUp(self):
+        """Setup tiga region dengan ukuran berbeda"""
+        rng = np.random.default_rng(11)
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.4, 'Distance': 0.35, 'Size': 0.25}
+        self.frames = [
+            pd.DataFrame({
+                'Name': [f"Kost_{region}_{i}" for i in range(n)],
+                'Price': rng.integers(500, 2500, n),
+                'Distance': rng.uniform(0.2, 8.0, n).round(1),
+                'Size': rng.integers(6, 25, n)
+            })
+            for region, n in [('A', 40), ('B', 7), ('C', 25)]
+        ]
+    
+    def test_matches_concatenated_calculation(self):
+        """Test: Top-K federasi sama dengan calculate_moora pada gabungan dataset"""
+        regions = [RegionDataset(f"R{i}", frame, self.criteria_cols, chunk_size=6)
+                   for i, frame in enumerate(self.frames)]
+        result_df = federated_top_k(regions, self.criteria_type, self.weights, k=10)
+        
+        combined = pd.concat(self.frames, ignore_index=True)
+        _, _, yi_values = calculate_moora(combined, self.criteria_type, self.weights)
+        expected = create_result_dataframe(combined, yi_values).head(10)
+        
+        self.assertEqual(result_df['Name'].tolist(), expected['Name'].tolist())
+        np.testing.assert_allclose(result_df['Yi (Score)'], expected['Yi (Score)'], rtol=1e-12)
+        self.assertEqual(result_df['Ranking'].tolist(), expected['Ranking'].tolist())
+    
+    def test_csv_region_is_streamed(self):
+        """Test: Region berbasis file CSV dibaca per chunk"""
+        regions = [RegionDataset('Template', 'data/dataset_template.csv',
+                                 ['Price', 'Distance', 'Size', 'Wifi', 'Security_Score'], chunk_size=4)]
+        criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit', 'Wifi': 'benefit', 'Security_Score': 'benefit'}
+        weights = {col: 0.2 for col in criteria_type}
+        
+        result_df = federated_top_k(regions, criteria_type, weights, k=3)
+        
+        df = pd.read_csv('data/dataset_template.csv')
+        _, _, yi_values = calculate_moora(df, criteria_type, weights)
+        self.assertEqual(result_df['Name'].tolist(), create_result_dataframe(df, yi_values)['Name'].tolist()[:3])
+    
+    def test_ties_straddling_k_are_kept(self):
+        """Test: Alternatif kembar di batas K tidak dipilih acak sebelum diurutkan"""
+        # Harga 900 kembar di batas K=9: semua harus dikirim, lalu yang pertama menang
+        prices = [700, 900, 900, 900, 900, 900, 900, 500, 700, 500, 700, 700, 500, 500]
+        frame = pd.DataFrame({
+            'Name': [f"Kost_{i}" for i in range(len(prices))],
+            'Price': prices,
+            'Distance': [2.0] * len(prices),
+            'Size': [12] * len(prices)
+        })
+        # Koefisien bulat agar Yi kembar persis sama (Yi = -Price)
+        coefficients = np.array([-1.0, 0.0, 0.0])
+        
+        for chunk_size in (len(prices), 5):
+            with self.subTest(chunk_size=chunk_size):
+                candidates = RegionDataset('A', frame, self.criteria_cols, chunk_size=chunk_size).local_top_k(coefficients, 9)
+                result_df = merge_top_k(candidates, 9)
+                
+                self.assertEqual(sorted(candidates['Name']), sorted(frame['Name']))
+                self.assertEqual(result_df['Name'].iloc[-1], 'Kost_1')
+                self.assertEqual(result_df['Ranking'].iloc[-1], 9)
+    
+    def test_mismatched_columns_rejected(self):
+        """Test: Region dengan kolom kriteria berbeda harus raise error"""
+        regions = [RegionDataset('A', self.frames[0], self.criteria_cols),
+                   RegionDataset('B', self.frames[1], ['Price', 'Size'])]
+        
+        with self.assertRaises(ValueError):
+            federated_top_k(regions, self.criteria_type, self.weights)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test suite untuk cache hasil MOORA di disk"""
+    
+    def setUp(self):
+        """Setup direktori cache sementara"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.tmp_dir.name)
+        self.criteria_cols = ['Price', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Size': 'benefit'}
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_round_trip(self):
+        """Test: Yi dan urutan ranking tersimpan dan terbaca kembali persis"""
+        yi_values = np.array([0.1, 0.3, 0.2])
+        order, _ = rank_alternatives(yi_values)
+        self.cache.put('key', yi_values, order)
+        
+        cached_yi, cached_order = self.cache.get('key')
+        
+        np.testing.assert_array_equal(cached_yi, yi_values)
+        np.testing.assert_array_equal(cached_order, order)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+    
+    def test_key_ignores_weight_scale(self):
+        """Test: Bobot persen dan desimal yang setara menghasilkan key yang sama"""
+        key_percent = make_cache_key('data', self.criteria_cols, self.criteria_type, {'Price': 60, 'Size': 40})
+        key_decimal = make_cache_key('data', self.criteria_cols, self.criteria_type, {'Price': 0.6, 'Size': 0.4})
+        key_other = make_cache_key('data', self.criteria_cols, self.criteria_type, {'Price': 0.5, 'Size': 0.5})
+        
+        self.assertEqual(key_percent, key_decimal)
+        self.assertNotEqual(key_percent, key_other)
+    
+    def test_code_version_covers_scoring_modules(self):
+        """Test: Versi kode berubah jika salah satu modul jalur skor (termasuk kernel) berubah"""
+        self.assertIn('kernel.py', SCORING_MODULES)
+        self.assertIn('validation.py', SCORING_MODULES)
+        
+        self.assertNotEqual(code_version(), code_version(('calculate.py',)))
+        self.assertNotEqual(code_version(('calculate.py', 'kernel.py')), code_version(('calculate.py', 'validation.py')))
+    
+    def test_get_or_compute_only_computes_once(self):
+        """Test: Fungsi hitung hanya dipanggil saat cache miss"""
+        calls = []
+        
+        def compute():
+            calls.append(1)
+            return np.array([0.5, 0.1]), np.array([0, 1])
+        
+        _, _, first_cached = self.cache.get_or_compute('key', compute)
+        _, _, second_cached = self.cache.get_or_compute('key', compute)
+        
+        self.assertEqual((first_cached, second_cached, len(calls)), (False, True, 1))
+    
+    def test_eviction_respects_size_limit(self):
+        """Test: Entry paling lama dibuang saat melewati batas ukuran"""
+        cache = ResultCache(self.tmp_dir.name, max_bytes=3000)
+        for i in range(5):
+            cache.put(f"key_{i}", np.arange(100, dtype=float), np.arange(100))
+            os.utime(os.path.join(self.tmp_dir.name, f"key_{i}.npz"), (i, i))
+        cache.evict()
+        
+        self.assertLessEqual(cache.stats()['bytes'], 3000)
+        self.assertIsNotNone(cache.get('key_4'), "Entry terbaru harus tetap ada")
+        self.assertIsNone(cache.get('key_0'), "Entry terlama harus dibuang")
+    
+    def test_warmup_populates_presets(self):
+        """Test: Warm-up menyimpan hasil untuk semua profil preset"""
+        skipped = warmup(self.cache, 'data/dataset_kost_mahasiswa.csv', load_profiles())
+        
+        self.assertEqual(skipped, {})
+        self.assertEqual(self.cache.stats()['entries'], 2)
+
+
+class TestPresetProfiles(unittest.TestCase):
+    """Test suite untuk profil preset bobot dan hasil yang dihitung lebih dulu"""
+    
+    def setUp(self):
+        """Setup registry dengan materializer preset"""
+        self.profiles = load_profiles()
+        self.materializer = PresetMaterializer(self.profiles)
+        self.registry = DatasetRegistry()
+        self.materializer.attach(self.registry)
+    
+    def write_config(self, config):
+        """Menulis konfigurasi preset ke file sementara"""
+        tmp = tempfile.NamedTemporaryFile('w', suffix='.json', delete=False)
+        with tmp:
+            json.dump(config, tmp)
+        self.addCleanup(os.remove, tmp.name)
+        return tmp.name
+    
+    def test_bundled_config_is_valid(self):
+        """Test: File preset bawaan valid dan berisi Equal serta Recommended"""
+        self.assertEqual([profile.id for profile in self.profiles], ['equal', 'recommended'])
+    
+    def test_invalid_config_reports_all_problems(self):
+        """Test: Semua kesalahan konfigurasi dilaporkan sekaligus"""
+        path = self.write_config({'profiles': [
+            {'id': 'a', 'label': 'A', 'weights': {'Price': 60, 'Size': 30}},
+            {'id': 'a', 'label': 'B', 'weights': {'Price': -10, 'Size': 110}},
+        ]})
+        
+        with self.assertRaises(ValueError) as context:
+            load_profiles(path)
+        
+        message = str(context.exception)
+        self.assertIn("total bobot 90.00%", message)
+        self.assertIn(">= 0", message)
+        self.assertIn("lebih dari sekali", message)
+    
+    def test_schema_mismatch_is_reported(self):
+        """Test: Nama kolom yang berbeda tidak diam-diam diganti bobot sama rata"""
+        entry = self.registry.register_bytes(b"Name,Price,Distance,Size,WiFi,Security_Score\nKost_A,900,1.0,12,50,8\n")
+        
+        problems = self.materializer.problems(entry.key, 'recommended')
+        
+        self.assertIn("Kriteria 'Wifi' tidak ada di dataset", problems)
+        self.assertEqual(self.materializer.problems(entry.key, 'equal'), [])
+    
+    def test_materialized_ranking_matches_calculation(self):
+        """Test: Ranking preset yang tersimpan sama dengan perhitungan langsung"""
+        entry = self.registry.register_file('data/dataset_kost_mahasiswa.csv')
+        criteria_cols = list(entry.criteria_cols)
+        criteria_type = {col: 'cost' if col in ['Price', 'Distance'] else 'benefit' for col in criteria_cols}
+        weights = self.profiles[1].weights_for(criteria_cols)
+        tie_breakers = [('Price', True), ('Distance', True)]
+        
+        cache_key = make_cache_key(entry.key, criteria_cols, criteria_type, weights, tie_breakers)
+        yi_values, order = self.materializer.lookup(cache_key)
+        
+        _, _, yi_expected = calculate_moora(entry.frame, criteria_type, {col: w / 100 for col, w in weights.items()})
+        expected = create_result_dataframe(entry.frame, yi_expected, tie_breakers=tie_breakers)
+        np.testing.assert_allclose(yi_values, yi_expected)
+        self.assertEqual(entry.frame['Name'].values[order].tolist(), expected['Name'].tolist())
+    
+    def test_evicted_dataset_is_discarded(self):
+        """Test: Hasil preset dibuang bersama datasetnya"""
+        entry = self.registry.register_bytes(b"Name,Price,Size\nKost_A,900,12\nKost_B,1200,20\n")
+        cache_key = make_cache_key(entry.key, ['Price', 'Size'], {'Price': 'cost', 'Size': 'benefit'},
+                                   {'Price': 50.0, 'Size': 50.0}, [('Price', True)])
+        self.assertIsNotNone(self.materializer.lookup(cache_key))
+        
+        session = {}
+        self.registry.bind_session(session, entry)
+        session.clear()
+        
+        self.assertIsNone(self.materializer.lookup(cache_key))
+    
+    def test_oversized_dataset_is_deferred(self):
+        """Test: Dataset yang tidak muat mode lengkap tidak dimaterialisasi, tetapi preset tetap bisa dipilih"""
+        governor = ResourceGovernor(Budget(memory_bytes=1024, seconds=5))
+        materializer = PresetMaterializer(self.profiles, governor=governor)
+        registry = DatasetRegistry()
+        materializer.attach(registry)
+        
+        entry = registry.register_file('data/dataset_kost_mahasiswa.csv')
+        criteria_cols = list(entry.criteria_cols)
+        criteria_type = {col: 'cost' if col in ['Price', 'Distance'] else 'benefit' for col in criteria_cols}
+        cache_key = make_cache_key(entry.key, criteria_cols, criteria_type, self.profiles[1].weights_for(criteria_cols),
+                                   [('Price', True), ('Distance', True)])
+        
+        self.assertIsNone(materializer.lookup(cache_key))
+        self.assertEqual(materializer.problems(entry.key, 'recommended'), [])
+        self.assertEqual(governor.stats()['decisions']['full'], 0)
+        self.assertEqual(governor.stats()['in_flight_bytes'], 0)
+
+
+class TestValidation(unittest.TestCase):
+    """Test suite untuk modul validasi data, bobot, dan tipe kriteria"""
+    
+    def setUp(self):
+        """Setup dataset, tipe kriteria, dan bobot yang valid"""
+        self.df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C'],
+            'Price': [1800, 900, 2000],
+            'Distance': [2.5, 1.0, 3.5],
+            'Size': [15, 12, 18]
+        })
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.4, 'Distance': 0.3, 'Size': 0.3}
+    
+    def test_valid_inputs(self):
+        """Test: Input valid tidak menghasilkan masalah"""
+        report = validate_inputs(self.df, self.criteria_type, self.weights)
+        
+        self.assertTrue(report.ok)
+        self.assertEqual(report.codes(), [])
+    
+    def test_empty_dataset(self):
+        """Test: Dataset kosong dilaporkan"""
+        report = validate_data(pd.DataFrame(columns=['Name', 'Price']))
+        
+        self.assertEqual(report.codes(), ['empty'])
+    
+    def test_no_criteria(self):
+        """Test: Dataset tanpa kolom kriteria dilaporkan"""
+        report = validate_data(pd.DataFrame({'Name': ['Kost_A']}))
+        
+        self.assertEqual(report.codes(), ['no_criteria'])
+    
+    def test_non_numeric_column(self):
+        """Test: Kolom berisi teks dilaporkan sebagai non-numerik"""
+        df = self.df.assign(Size=['besar', 'kecil', 'sedang'])
+        report = validate_data(df)
+        
+        self.assertEqual(report.codes(), ['non_numeric'])
+        self.assertEqual(report.columns_with('non_numeric'), ['Size'])
+    
+    def test_nan_values(self):
+        """Test: Nilai kosong (NaN) dilaporkan"""
+        df = self.df.assign(Distance=[2.5, np.nan, 3.5])
+        report = validate_data(df)
+        
+        self.assertEqual(report.columns_with('nan'), ['Distance'])
+    
+    def test_inf_values(self):
+        """Test: Nilai tak hingga dilaporkan"""
+        df = self.df.assign(Price=[1800, np.inf, 2000])
+        report = validate_data(df)
+        
+        self.assertEqual(report.columns_with('inf'), ['Price'])
+    
+    def test_nonpositive_values(self):
+        """Test: Nilai nol dan negatif dilaporkan per kolom"""
+        df = self.df.assign(Price=[1800, 0, 2000], Size=[15, -1, 18])
+        report = validate_data(df)
+        
+        self.assertEqual(report.columns_with('nonpositive'), ['Price', 'Size'])
+    
+    def test_weight_missing(self):
+        """Test: Kriteria tanpa bobot dilaporkan"""
+        report = validate_weight_values({'Price': 0.5, 'Distance': 0.5}, self.criteria_cols)
+        
+        self.assertEqual(report.columns_with('weight_missing'), ['Size'])
+    
+    def test_weight_unknown(self):
+        """Test: Bobot untuk kolom yang tidak ada dilaporkan"""
+        weights = dict(self.weights, Wifi=0.0)
+        report = validate_weight_values(weights, self.criteria_cols)
+        
+        self.assertEqual(report.codes(), ['weight_unknown'])
+        self.assertEqual(report.columns_with('weight_unknown'), ['Wifi'])
+    
+    def test_weight_invalid(self):
+        """Test: Bobot negatif, NaN, atau bukan angka dilaporkan"""
+        weights = {'Price': -0.1, 'Distance': float('nan'), 'Size': 'tinggi'}
+        report = validate_weight_values(weights, self.criteria_cols)
+        
+        self.assertEqual(report.columns_with('weight_invalid'), ['Price', 'Distance', 'Size'])
+        self.assertNotIn('weight_total', report.codes())
+    
+    def test_weight_total(self):
+        """Test: Total bobot dicek sesuai skala (desimal atau persen)"""
+        self.assertEqual(validate_weight_values({'Price': 0.5, 'Distance': 0.3, 'Size': 0.3},
+                                                self.criteria_cols).codes(), ['weight_total'])
+        self.assertTrue(validate_weight_values({'Price': 40, 'Distance': 30, 'Size': 30},
+                                               self.criteria_cols, total=100).ok)
+        self.assertTrue(validate_weight_values({'Price': 0.5, 'Distance': 0.3, 'Size': 0.3},
+                                               self.criteria_cols, require_total=False).ok)
+    
+    def test_criteria_type_missing_and_unknown(self):
+        """Test: Tipe kriteria yang kurang atau tidak dikenal dilaporkan"""
+        report = validate_criteria_types({'Price': 'cost', 'Size': 'benefit', 'Wifi': 'benefit'}, self.criteria_cols)
+        
+        self.assertEqual(report.columns_with('type_missing'), ['Distance'])
+        self.assertEqual(report.columns_with('type_unknown'), ['Wifi'])
+    
+    def test_criteria_type_invalid(self):
+        """Test: Tipe selain benefit/cost dilaporkan"""
+        report = validate_criteria_types(dict(self.criteria_type, Size='luas'), self.criteria_cols)
+        
+        self.assertEqual(report.columns_with('type_invalid'), ['Size'])
+    
+    def test_report_collects_all_problems(self):
+        """Test: Semua masalah dilaporkan sekaligus, tidak berhenti di masalah pertama"""
+        df = self.df.assign(Price=[1800, 0, 2000], Distance=[2.5, np.nan, 3.5])
+        report = validate_inputs(df, dict(self.criteria_type, Size='luas'), {'Price': 0.4, 'Distance': 0.3})
+        
+        self.assertEqual(report.codes(), ['nan', 'nonpositive', 'weight_missing', 'weight_total', 'type_invalid'])
+        with self.assertRaises(ValueError) as context:
+            report.raise_for_errors()
+        self.assertEqual(str(context.exception).count("\n"), 4)
+    
+    def test_calculate_moora_reports_all_problems(self):
+        """Test: calculate_moora menampilkan semua masalah dalam satu error"""
+        df = self.df.assign(Price=[1800, 0, 2000])
+        
+        with self.assertRaises(ValueError) as context:
+            calculate_moora(df, self.criteria_type, {'Price': 0.4, 'Distance': 0.3})
+        
+        self.assertIn("'Price'", str(context.exception))
+        self.assertIn("'Size' belum memiliki bobot", str(context.exception))
+    
+    def test_calculate_moora_skip_validation(self):
+        """Test: validate=False memberi hasil yang sama untuk input yang sudah divalidasi"""
+        _, _, yi_checked = calculate_moora(self.df, self.criteria_type, self.weights)
+        _, _, yi_trusted = calculate_moora(self.df, self.criteria_type, self.weights, validate=False)
+        
+        np.testing.assert_array_equal(yi_checked, yi_trusted)
+    
+    def test_registry_validates_once(self):
+        """Test: Dataset dengan kolom teks tetap bisa dimuat dan masalahnya dilaporkan"""
+        entry = DatasetRegistry().register_bytes(b"Name,Price,Size\nKost_A,900,besar\nKost_B,1200,12\n")
+        
+        self.assertEqual(entry.report.columns_with('non_numeric'), ['Size'])
+        with self.assertRaises(ValueError):
+            entry.calculate({'Price': 'cost', 'Size': 'benefit'}, {'Price': 0.5, 'Size': 0.5})
+
+
+
+class TestApproximateRanking(unittest.TestCase):
+    """Test suite untuk ranking perkiraan dengan estimasi norma dari reservoir sample"""
+    
+    def setUp(self):
+        """Setup dataset acak yang cukup besar untuk beberapa chunk"""
+        rng = np.random.default_rng(7)
+        n_rows = 5000
+        self.df = pd.DataFrame({
+            'Name': [f"Kost_{i}" for i in range(n_rows)],
+            'Price': rng.integers(500, 2500, n_rows),
+            'Distance': rng.uniform(0.2, 8.0, n_rows).round(1),
+            'Size': rng.integers(6, 25, n_rows)
+        })
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.4, 'Distance': 0.3, 'Size': 0.3}
+    
+    def expected_top(self, df, k, tie_breakers=None):
+        _, _, yi_values = calculate_moora(df, self.criteria_type, self.weights)
+        return create_result_dataframe(df, yi_values, tie_breakers=tie_breakers).head(k)
+    
+    def test_reservoir_keeps_uniform_sample(self):
+        """Test: Reservoir sample berisi baris dari seluruh stream, bukan hanya chunk awal"""
+        sample = ReservoirSample(1000, 1, seed=0)
+        for start in range(0, 100_000, 10_000):
+            sample.update(np.arange(start, start + 10_000, dtype=float).reshape(-1, 1))
+        
+        self.assertEqual(sample.rows.shape, (1000, 1))
+        self.assertEqual(len(np.unique(sample.rows)), 1000)
+        self.assertAlmostEqual(sample.rows.mean() / 50_000, 1.0, delta=0.1)
+    
+    def test_norm_bounds_contain_exact_norm(self):
+        """Test: Interval estimasi norma memuat norma pasti"""
+        X = self.df[self.criteria_cols].to_numpy(dtype=float)
+        sample = ReservoirSample(500, 3, seed=0)
+        sample.update(X[:1000])
+        
+        norms, low, high = estimate_norms((X[:1000] ** 2).sum(axis=0), sample.rows, len(X) - 1000)
+        exact = np.sqrt((X ** 2).sum(axis=0))
+        
+        self.assertTrue(np.all(low <= exact) and np.all(exact <= high))
+        np.testing.assert_allclose(norms, exact, rtol=0.05)
+    
+    def test_progressive_results_end_exact(self):
+        """Test: Hasil sementara muncul per chunk dan hasil akhir sama dengan calculate_moora"""
+        ranking = ProgressiveRanking(self.df, self.criteria_cols, chunk_size=1000, sample_size=500, seed=0)
+        results = list(ranking.iter_results(self.criteria_type, self.weights, k=10, tie_breakers=[('Price', True)]))
+        expected = self.expected_top(self.df, 10, tie_breakers=[('Price', True)])
+        
+        self.assertEqual([r.exact for r in results], [False] * 5 + [True])
+        self.assertEqual([r.rows_seen for r in results[:5]], [1000, 2000, 3000, 4000, 5000])
+        self.assertEqual(results[-1].top['Name'].tolist(), expected['Name'].tolist())
+        self.assertEqual(results[-1].top['Ranking'].tolist(), expected['Ranking'].tolist())
+        np.testing.assert_allclose(results[-1].top['Yi (Score)'], expected['Yi (Score)'])
+    
+    def test_sorted_source_still_exact(self):
+        """Test: Data terurut (estimasi awal meleset) tetap menghasilkan ranking pasti"""
+        df = self.df.sort_values('Price', ascending=False).reset_index(drop=True)
+        ranking = ProgressiveRanking(df, self.criteria_cols, chunk_size=1000, sample_size=500, seed=0)
+        final = list(ranking.iter_results(self.criteria_type, self.weights, k=10))[-1]
+        
+        self.assertEqual(final.top['Name'].tolist(), self.expected_top(df, 10)['Name'].tolist())
+    
+    def test_csv_source(self):
+        """Test: Sumber CSV dibaca per chunk dengan jumlah baris dari file"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'kost.csv')
+            self.df.to_csv(path, index=False)
+            ranking = ProgressiveRanking(path, self.criteria_cols, chunk_size=2000)
+            first, *_, final = ranking.iter_results(self.criteria_type, self.weights, k=5)
+        
+        self.assertEqual((first.rows_seen, first.total_rows), (2000, 5000))
+        self.assertEqual(final.top['Name'].tolist(), self.expected_top(self.df, 5)['Name'].tolist())
+    
+    def test_known_sum_squares_give_exact_interim_results(self):
+        """Test: Dengan Σxij² pasti dari registry, setiap top-K sementara sudah pasti tanpa baca ulang"""
+        df = self.df.sort_values('Price', ascending=False).reset_index(drop=True)
+        sum_squares = (df[self.criteria_cols].to_numpy(dtype=float) ** 2).sum(axis=0)
+        ranking = ProgressiveRanking(df, self.criteria_cols, chunk_size=1000, sum_squares=sum_squares)
+        results = list(ranking.iter_results(self.criteria_type, self.weights, k=10))
+        
+        self.assertTrue(all(r.max_relative_error == 0 for r in results))
+        self.assertEqual(results[-2].top['Name'].tolist(), self.expected_top(df, 10)['Name'].tolist())
+        self.assertEqual(results[-1].top['Name'].tolist(), self.expected_top(df, 10)['Name'].tolist())
+        self.assertEqual(ranking.rescans, 0)
+    
+    def test_invalid_inputs(self):
+        """Test: k < 1, nilai nol, NaN, atau inf ditolak"""
+        ranking = ProgressiveRanking(self.df, self.criteria_cols)
+        with self.assertRaises(ValueError):
+            next(ranking.iter_results(self.criteria_type, self.weights, k=0))
+        
+        for value in (0, np.nan, np.inf):
+            with self.subTest(value=value):
+                ranking = ProgressiveRanking(self.df.assign(Size=self.df['Size'].where(self.df.index != 10, value)),
+                                             self.criteria_cols)
+                with self.assertRaises(ValueError):
+                    next(ranking.iter_results(self.criteria_type, self.weights))
+
+
+
+class TestPipeline(unittest.TestCase):
+    """Test suite untuk pipeline parsing dan rendering paralel"""
+    
+    def setUp(self):
+        """Setup isi file CSV dengan beberapa chunk"""
+        rng = np.random.default_rng(3)
+        n_rows = 1000
+        self.df = pd.DataFrame({
+            'Name': [f"Kost_{i}" for i in range(n_rows)],
+            'Price': rng.integers(500, 2500, n_rows),
+            'Distance': rng.uniform(0.2, 8.0, n_rows).round(1),
+            'Size': rng.integers(6, 25, n_rows)
+        })
+        self.data = self.df.to_csv(index=False).encode('utf-8')
+    
+    def test_parse_matches_sequential(self):
+        """Test: Hasil parsing per chunk sama dengan parsing sekaligus"""
+        with Pipeline() as pipeline:
+            parsed = parse_csv(self.data, pipeline, chunk_size=128)
+        sequential = DatasetRegistry().register_bytes(self.data)
+        
+        pd.testing.assert_frame_equal(parsed.frame, sequential.frame)
+        np.testing.assert_allclose(parsed.sum_squares, sequential.sum_squares)
+        np.testing.assert_array_equal(parsed.matrix, sequential.matrix)
+        self.assertTrue(parsed.report.ok)
+    
+    def test_report_merged_across_chunks(self):
+        """Test: Masalah di chunk berbeda digabung sama seperti validate_data"""
+        df = self.df.astype({'Size': object})
+        df.loc[10, 'Price'] = 0
+        df.loc[900, 'Distance'] = np.nan
+        df.loc[500, 'Size'] = 'besar'
+        data = df.to_csv(index=False).encode('utf-8')
+        
+        with Pipeline() as pipeline:
+            parsed = parse_csv(data, pipeline, chunk_size=128)
+        
+        self.assertEqual(parsed.report.codes(), validate_data(pd.read_csv(io.BytesIO(data))).codes())
+        self.assertEqual(parsed.report.codes(), ['non_numeric', 'nan', 'nonpositive'])
+    
+    def test_registry_pipeline_entry(self):
+        """Test: Dataset dari pipeline bisa langsung dihitung"""
+        with Pipeline() as pipeline:
+            entry = DatasetRegistry().register_bytes(self.data, pipeline=pipeline)
+        criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        weights = {'Price': 0.4, 'Distance': 0.3, 'Size': 0.3}
+        
+        _, _, yi_values = entry.calculate(criteria_type, weights)
+        _, _, yi_expected = calculate_moora(self.df, criteria_type, weights)
+        np.testing.assert_allclose(yi_values, yi_expected)
+        with self.assertRaises(ValueError):
+            entry.matrix[0, 0] = 1.0
+    
+    def test_header_only_file(self):
+        """Test: File yang hanya berisi header dilaporkan kosong"""
+        with Pipeline() as pipeline:
+            parsed = parse_csv(b"Name,Price\n", pipeline)
+        
+        self.assertEqual(parsed.report.codes(), ['empty'])
+    
+    def test_cancelled_pipeline_stops_parsing(self):
+        """Test: Pipeline yang dibatalkan tidak melanjutkan parsing"""
+        pipeline = Pipeline()
+        pipeline.cancel()
+        
+        with self.assertRaises(PipelineCancelled):
+            parse_csv(self.data, pipeline)
+        pipeline.close()
+    
+    def test_exception_cancels_pipeline(self):
+        """Test: Keluar dari blok karena exception (misalnya rerun Streamlit) membatalkan pipeline"""
+        with self.assertRaises(RuntimeError):
+            with Pipeline() as pipeline:
+                raise RuntimeError("rerun")
+        
+        self.assertTrue(pipeline.cancelled.is_set())
+    
+    def test_new_session_pipeline_cancels_previous(self):
+        """Test: Pipeline baru dalam sesi yang sama membatalkan pipeline sebelumnya"""
+        session = {}
+        first = Pipeline().bind_session(session)
+        second = Pipeline().bind_session(session)
+        
+        self.assertTrue(first.cancelled.is_set())
+        self.assertFalse(second.cancelled.is_set())
+        first.close()
+        second.close()
+    
+    def test_render_png_in_worker(self):
+        """Test: Figure dirender menjadi PNG di worker thread"""
+        from matplotlib.figure import Figure
+        
+        def build():
+            fig = Figure()
+            fig.subplots().bar(['A', 'B'], [0.2, 0.1])
+            return fig
+        
+        with Pipeline() as pipeline:
+            png = pipeline.submit(render_png, build).result()
+        
+        self.assertTrue(png.startswith(b'\x89PNG'))
+
+
+
+class TestResourceGovernor(unittest.TestCase):
+    """Test suite untuk governor budget memori dan waktu"""
+    
+    def governor(self, memory_mb, seconds, total_memory_mb=10_000):
+        return ResourceGovernor(Budget(memory_mb * 1024 * 1024, seconds), total_memory_bytes=total_memory_mb * 1024 * 1024)
+    
+    def test_estimates_scale_with_mode(self):
+        """Test: Mode lengkap paling mahal, streaming tidak membuat matrix antara"""
+        full, top_k, streaming = (estimate_cost(mode, 1_000_000, 5) for mode in ('full', 'top_k', 'streaming'))
+        
+        self.assertGreater(full.memory_bytes, top_k.memory_bytes)
+        self.assertGreater(top_k.memory_bytes, streaming.memory_bytes)
+        self.assertGreater(full.seconds, top_k.seconds)
+        self.assertGreater(estimate_cost('full', 2_000_000, 5).memory_bytes, full.memory_bytes)
+    
+    def test_small_dataset_full_mode(self):
+        """Test: Dataset kecil dihitung lengkap"""
+        decision = self.governor(512, 10).plan(30, 5)
+        
+        self.assertEqual(decision.mode, 'full')
+        self.assertFalse(decision.degraded)
+    
+    def test_fallback_ladder(self):
+        """Test: Mode turun bertahap sesuai budget memori dan waktu"""
+        self.assertEqual(self.governor(300, 10).plan(1_000_000, 5).mode, 'top_k')
+        self.assertEqual(self.governor(100, 10).plan(1_000_000, 5).mode, 'streaming')
+        self.assertEqual(self.governor(100, 0.1).plan(1_000_000, 5).mode, 'approximate')
+    
+    def test_refuse_with_message(self):
+        """Test: Dataset yang tidak muat di mode mana pun ditolak dengan pesan jelas"""
+        decision = self.governor(1, 10).plan(1_000_000, 5)
+        
+        self.assertEqual(decision.mode, 'refuse')
+        self.assertFalse(decision.allowed)
+        self.assertIn("1,000,000 baris", decision.reason)
+    
+    def test_fallback_metrics(self):
+        """Test: Metrik mencatat berapa kali setiap fallback terjadi"""
+        governor = self.governor(100, 10)
+        governor.plan(30, 5)
+        governor.plan(1_000_000, 5)
+        governor.plan(1_000_000, 5)
+        governor.plan(10_000_000, 500)
+        
+        stats = governor.stats()
+        self.assertEqual(stats['decisions']['full'], 1)
+        self.assertEqual(stats['decisions']['streaming'], 2)
+        self.assertEqual(stats['fallbacks'], 2)
+        self.assertEqual(stats['refusals'], 1)
+    
+    def test_reserve_shrinks_budget_under_load(self):
+        """Test: Memori perhitungan sesi lain mengurangi budget efektif"""
+        governor = self.governor(300, 10, total_memory_mb=300)
+        first = governor.plan(1_000_000, 5)
+        
+        with governor.reserve(first):
+            self.assertEqual(governor.plan(1_000_000, 5).mode, 'streaming')
+        self.assertEqual(governor.stats()['decisions']['full'], 0)
+        self.assertEqual(governor.stats()['in_flight_bytes'], 0)
+        self.assertEqual(governor.plan(1_000_000, 5).mode, 'top_k')
+    
+    def test_upload_refused_before_parsing(self):
+        """Test: File yang melebihi budget ditolak sebelum diparsing"""
+        data = b"Name,Price,Size\n" + b"Kost_A,900,12\n" * 100_000
+        
+        self.assertEqual(csv_shape(data), (100_000, 2))
+        self.assertTrue(self.governor(512, 10).plan_upload(data).allowed)
+        governor = self.governor(1, 10)
+        self.assertFalse(governor.plan_upload(data).allowed)
+        self.assertEqual(governor.stats()['upload_refusals'], 1)
+    
+    def test_streaming_scores_match_calculate(self):
+        """Test: Yi mode streaming sama dengan perhitungan lengkap"""
+        entry = DatasetRegistry().register_bytes(b"Name,Price,Size\nKost_A,900,12\nKost_B,1800,20\nKost_C,1200,15\n")
+        criteria_type = {'Price': 'cost', 'Size': 'benefit'}
+        weights = {'Price': 0.6, 'Size': 0.4}
+        
+        _, _, yi_expected = entry.calculate(criteria_type, weights)
+        np.testing.assert_allclose(entry.scores(criteria_type, weights), yi_expected)
+
+
+
+class TestDifferential(unittest.TestCase):
+    """Test suite untuk differential test semua jalur perhitungan"""
+    
+    def test_all_paths_match_reference(self):
+        """Test: Semua jalur perhitungan menghasilkan Yi dan ranking yang sama dengan referensi"""
+        results = run_differential(n_cases=15, seed=1000, max_rows=300)
+        
+        assert_agreement(results)
+        self.assertEqual(set(results['path']), {'reference'} | set(scoring_paths()))
+    
+    def test_generated_cases_are_valid(self):
+        """Test: Kasus acak selalu valid dan mencakup dataset kecil, nilai kembar, dan berbagai dtype"""
+        cases = [generate_case(seed, max_rows=200) for seed in range(40)]
+        
+        for case in cases:
+            self.assertTrue(validate_data(case.frame).ok, case)
+        self.assertIn(1, [case.n_rows for case in cases])
+        self.assertTrue(any(case.frame[case.criteria_cols].duplicated().any() for case in cases if case.n_rows > 1))
+        dtypes = {str(case.frame[col].dtype) for case in cases for col in case.criteria_cols}
+        self.assertEqual(dtypes, {'int64', 'int32', 'float64', 'float32'})
+    
+    def test_detects_wrong_path(self):
+        """Test: Jalur yang salah terdeteksi beserta seed kasusnya"""
+        def reversed_path(case):
+            _, _, yi_values = calculate_moora(case.frame, case.criteria_type, case.weights)
+            order = np.argsort(yi_values, kind='stable')
+            return order, yi_values[order], np.arange(1, case.n_rows + 1)
+        
+        results = pd.DataFrame(run_case(generate_case(3, n_rows=20), {'reversed': reversed_path}))
+        
+        self.assertFalse(results.set_index('path').loc['reversed', 'ok'])
+        with self.assertRaisesRegex(AssertionError, "seed=3"):
+            assert_agreement(results)
+    
+    def test_detects_kernel_regression(self):
+        """Test: Referensi tidak memakai kernel, sehingga kernel yang salah terdeteksi"""
+        def wrong_scores(X, coefficients, backend='auto'):
+            return np.asarray(X, dtype=float) @ (np.asarray(coefficients) * 1.01)
+        
+        with patch('calculate.row_scores', wrong_scores):
+            results = pd.DataFrame(run_case(generate_case(3, n_rows=20),
+                                            {'moora_from_matrix': scoring_paths()['moora_from_matrix']}))
+        
+        self.assertFalse(results.set_index('path').loc['moora_from_matrix', 'ok'])
+    
+    def test_near_ties_within_tolerance(self):
+        """Test: Urutan dan ranking alternatif yang Yi-nya hampir sama boleh berbeda"""
+        reference_yi = np.array([0.5, 0.5 + 1e-15, 0.2])
+        
+        _, problems = compare_ranking(reference_yi, np.array([0, 1, 2]), reference_yi[[0, 1, 2]], np.array([1, 1, 3]))
+        
+        self.assertEqual(problems, [])
+
+
+
+class TestWhatIf(unittest.TestCase):
+    """Test suite untuk what-if dengan perhitungan ulang inkremental"""
+    
+    def setUp(self):
+        self.entry = DatasetRegistry().register_bytes(
+            b"Name,Price,Wifi,Size\nKost_A,900,20,12\nKost_B,1800,50,20\nKost_C,1200,30,15\nKost_D,1500,30,15\n"
+        )
+        self.criteria_type = {'Price': 'cost', 'Wifi': 'benefit', 'Size': 'benefit'}
+        self.weights = {'Price': 0.5, 'Wifi': 0.3, 'Size': 0.2}
+        self.scorer = WhatIfScorer(self.entry.matrix, self.entry.criteria_cols, self.criteria_type, self.weights,
+                                   sum_squares=self.entry.sum_squares)
+    
+    def expected(self, edits):
+        df = self.entry.frame.astype({col: float for col in self.entry.criteria_cols})
+        for (row, col), value in edits.items():
+            df.loc[row, col] = value
+        _, _, yi_values = calculate_moora(df, self.criteria_type, self.weights)
+        return yi_values, pd.Series(yi_values).rank(ascending=False, method='min').astype(int).to_numpy()
+    
+    def test_edit_matches_full_recalculation(self):
+        """Test: Yi dan ranking setelah edit sama dengan calculate_moora pada dataset yang sudah diubah"""
+        edits = {(1, 'Price'): 700, (1, 'Wifi'): 100, (3, 'Size'): 40}
+        for (row, col), value in edits.items():
+            self.scorer.edit(row, col, value)
+        
+        yi_expected, rank_expected = self.expected(edits)
+        np.testing.assert_allclose(self.scorer.yi_values, yi_expected, atol=1e-12)
+        self.assertEqual([self.scorer.rank(row) for row in range(4)], rank_expected.tolist())
+    
+    def test_rank_before_and_after(self):
+        """Test: Ranking awal tetap tersedia setelah listing diubah"""
+        self.assertEqual(self.scorer.rank(3), 4)
+        
+        self.scorer.edit(3, 'Price', 500)
+        
+        self.assertEqual(self.scorer.original_rank(3), 4)
+        self.assertEqual(self.scorer.rank(3), 1)
+        self.assertEqual(self.scorer.rank(1), 4)
+        self.assertGreater(self.scorer.yi_values[3], self.scorer.original_yi(3))
+    
+    def test_random_edits_large_dataset(self):
+        """Test: Banyak edit acak tetap sesuai perhitungan penuh, termasuk saat Yi diurutkan ulang"""
+        case = generate_case(7, n_rows=2000)
+        X = case.frame[case.criteria_cols].to_numpy(dtype=float)
+        scorer = WhatIfScorer(X, case.criteria_cols, case.criteria_type, case.weights)
+        df = case.frame.astype({col: float for col in case.criteria_cols})
+        rng = np.random.default_rng(0)
+        
+        for _ in range(30):
+            row, col = int(rng.integers(len(df))), str(rng.choice(case.criteria_cols))
+            value = float(df[col].max() * rng.uniform(0.01, 5))
+            scorer.edit(row, col, value)
+            df.loc[row, col] = value
+            
+            _, _, yi_expected = calculate_moora(df, case.criteria_type, case.weights)
+            np.testing.assert_allclose(scorer.yi_values, yi_expected, atol=1e-12)
+            self.assertEqual(scorer.rank(row), int((yi_expected > yi_expected[row]).sum()) + 1)
+        self.assertGreater(scorer.rebases, 0)
+    
+    def test_extreme_edit_precision(self):
+        """Test: Mengubah nilai ke skala yang sangat berbeda tetap presisi"""
+        self.scorer.edit(0, 'Price', 1e12)
+        self.scorer.edit(0, 'Price', 1e-6)
+        
+        yi_expected, _ = self.expected({(0, 'Price'): 1e-6})
+        np.testing.assert_allclose(self.scorer.yi_values, yi_expected, atol=1e-12)
+    
+    def test_reset_row(self):
+        """Test: Reset mengembalikan nilai dan Yi asli tanpa mengubah matrix registry"""
+        original_yi = self.scorer.yi_values.copy()
+        self.scorer.set_row(2, {'Price': 600, 'Wifi': 80})
+        self.assertEqual(self.scorer.edited_rows(), [2])
+        
+        self.scorer.reset_row(2)
+        
+        self.assertEqual(self.scorer.edits, {})
+        np.testing.assert_allclose(self.scorer.yi_values, original_yi, atol=1e-12)
+        self.assertEqual(self.entry.matrix[2, 0], 1200)
+    
+    def test_invalid_edit(self):
+        """Test: Nilai nol, kosong, atau kriteria tidak dikenal ditolak tanpa mengubah skor"""
+        original_yi = self.scorer.yi_values.copy()
+        
+        for col, value in [('Price', 0), ('Wifi', None), ('Wifi', float('nan')), ('Jarak', 5)]:
+            with self.assertRaises(ValueError):
+                self.scorer.edit(0, col, value)
+        np.testing.assert_array_equal(self.scorer.yi_values, original_yi)
+
+
+class TestObservability(unittest.TestCase):
+    """Test suite untuk metrik dan log request"""
+    
+    def setUp(self):
+        """Setup file log sementara"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.tmp_dir.name, 'requests.jsonl')
+        self.logger = RequestLogger(self.log_path)
+    
+    def tearDown(self):
+        self.logger.close()
+        self.tmp_dir.cleanup()
+    
+    def read_log(self):
+        self.logger.close()
+        with open(self.log_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    
+    def test_histogram_quantile_and_exposition(self):
+        """Test: Kuantil diinterpolasi dari bucket dan format teks Prometheus lengkap"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram('demo_seconds', "Demo", ('stage',), buckets=(0.1, 1.0))
+        for value in [0.05] * 98 + [0.5, 0.5]:
+            histogram.observe(value, stage='parse')
+        
+        self.assertEqual(histogram.count(stage='parse'), 100)
+        self.assertLessEqual(histogram.quantile(0.5, stage='parse'), 0.1)
+        self.assertGreater(histogram.quantile(0.99, stage='parse'), 0.1)
+        
+        text = registry.render()
+        self.assertIn('# TYPE demo_seconds histogram', text)
+        self.assertIn('demo_seconds_bucket{stage="parse",le="0.1"} 98', text)
+        self.assertIn('demo_seconds_bucket{stage="parse",le="+Inf"} 100', text)
+        self.assertIn('demo_seconds_count{stage="parse"} 100', text)
+    
+    def test_request_log_records_stages(self):
+        """Test: Tahap dari calculate_moora tercatat di satu baris log JSON"""
+        df = pd.DataFrame({'Name': ['A', 'B', 'C'], 'Price': [900, 1800, 1200], 'Size': [12, 20, 15]})
+        
+        with observability.request('calculate', session='abc', logger=self.logger, rows=3):
+            calculate_moora(df, {'Price': 'cost', 'Size': 'benefit'}, {'Price': 0.6, 'Size': 0.4})
+            observability.annotate(mode='full')
+        
+        [record] = self.read_log()
+        self.assertEqual(record['kind'], 'calculate')
+        self.assertEqual(record['status'], 'ok')
+        self.assertEqual((record['session'], record['rows'], record['mode']), ('abc', 3, 'full'))
+        self.assertEqual(set(record['stages']), {'validate', 'moora'})
+        self.assertGreaterEqual(record['total_ms'], max(record['stages'].values()))
+    
+    def test_request_status_on_error_and_stop(self):
+        """Test: Error dicatat sebagai 'error', rerun/stop Streamlit sebagai 'stopped'"""
+        class Rerun(BaseException):
+            pass
+        
+        with self.assertRaises(ValueError):
+            with observability.request('export', logger=self.logger):
+                with timed('export'):
+                    raise ValueError("gagal")
+        with self.assertRaises(Rerun):
+            with observability.request('calculate', logger=self.logger):
+                raise Rerun()
+        
+        error, stopped = self.read_log()
+        self.assertEqual(error['status'], 'error')
+        self.assertIn('gagal', error['error'])
+        self.assertIn('export', error['stages'])
+        self.assertEqual(stopped['status'], 'stopped')
+    
+    def test_pipeline_stage_attached_to_request(self):
+        """Test: Tahap yang berjalan di worker Pipeline tercatat pada request pemanggil"""
+        def work():
+            with timed('render_chart'):
+                return 1
+        
+        with observability.request('calculate', logger=self.logger):
+            with Pipeline(max_workers=1) as pipeline:
+                pipeline.submit(work).result()
+        
+        [record] = self.read_log()
+        self.assertIn('render_chart', record['stages'])
+    
+    def test_cache_lookup_counted(self):
+        """Test: Hit dan miss ResultCache menambah counter cache"""
+        counter = observability.CACHE_REQUESTS
+        hits, misses = counter.value(cache='result', result='hit'), counter.value(cache='result', result='miss')
+        cache = ResultCache(os.path.join(self.tmp_dir.name, 'results'))
+        
+        cache.get('key')
+        cache.put('key', np.array([0.2, 0.1]), np.array([0, 1]))
+        cache.get('key')
+        
+        self.assertEqual(counter.value(cache='result', result='hit'), hits + 1)
+        self.assertEqual(counter.value(cache='result', result='miss'), misses + 1)
+    
+    def test_metrics_endpoint(self):
+        """Test: Endpoint /metrics menyajikan metrik dalam format teks"""
+        import urllib.request
+        registry = MetricsRegistry()
+        registry.counter('demo_total', "Demo").inc(3)
+        server = observability.start_http_server(0, registry=registry)
+        try:
+            host, port = server.server_address
+            with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                body = response.read().decode('utf-8')
+                content_type = response.headers['Content-Type']
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        self.assertTrue(content_type.startswith('text/plain'))
+        self.assertIn('demo_total 3', body)
+    
+    def test_summarize_log_orders_by_tail(self):
+        """Test: Ringkasan log menempatkan tahap dengan p99 terbesar di atas"""
+        for ms in [1, 2, 50]:
+            self.logger.write({'kind': 'calculate', 'stages': {'compute': 1.0, 'render_chart': ms},
+                               'status': 'ok', 'total_ms': ms + 1.0})
+        self.logger.close()
+        
+        summary = summarize_log(self.log_path)
+        
+        self.assertEqual(list(summary['stage'][:2]), ['total', 'render_chart'])
+        self.assertEqual(summary.set_index('stage').loc['compute', 'count'], 3)
+
+
+class TestInverseQuery(unittest.TestCase):
+    """Test suite untuk query terbalik (bobot agar listing menang)"""
+    
+    def setUp(self):
+        """Setup dataset kecil dengan satu alternatif yang didominasi"""
+        self.df = pd.DataFrame({
+            'Name': ['Kost_A', 'Kost_B', 'Kost_C', 'Kost_D', 'Kost_E'],
+            'Price': [900, 1800, 1200, 2000, 1000],
+            'Distance': [2.5, 1.0, 3.5, 0.5, 3.0],
+            'Size': [12, 20, 15, 18, 11],
+        })
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.5, 'Distance': 0.2, 'Size': 0.3}
+        self.query = InverseQuery(self.df[self.criteria_cols].to_numpy(dtype=float), self.criteria_cols,
+                                  self.criteria_type)
+    
+    def moora_rank(self, row, weights):
+        _, _, yi_values = calculate_moora(self.df, self.criteria_type, weights)
+        return int(np.count_nonzero(yi_values > yi_values[row])) + 1
+    
+    def test_nearest_weights_make_target_win(self):
+        """Test: Bobot yang disarankan membuat target peringkat 1 dan tidak ada bobot menang yang lebih dekat"""
+        row = 1
+        self.assertGreater(self.moora_rank(row, self.weights), 1)
+        
+        suggestion = self.query.nearest_weights(row, self.weights)
+        
+        self.assertEqual(suggestion.rank, 1)
+        self.assertEqual(self.moora_rank(row, suggestion.weights), 1)
+        self.assertAlmostEqual(sum(suggestion.weights.values()), 1.0)
+        
+        # Pembanding brute force: sampel bobot acak yang membuat target menang
+        samples = np.random.default_rng(0).dirichlet(np.ones(3), size=50_000)
+        yi_samples = samples @ self.query.signed.T
+        winning = (yi_samples <= yi_samples[:, [row]]).all(axis=1)
+        current = np.array([self.weights[col] for col in self.criteria_cols])
+        best_sample = np.linalg.norm(samples[winning] - current, axis=1).min()
+        self.assertLessEqual(suggestion.distance, best_sample + 1e-9)
+        self.assertTrue(suggestion.region.contains(suggestion.weights))
+        self.assertFalse(suggestion.region.contains(self.weights))
+    
+    def test_current_weights_kept_when_already_winning(self):
+        """Test: Target yang sudah peringkat 1 tidak perlu mengubah bobot"""
+        _, _, yi_values = calculate_moora(self.df, self.criteria_type, self.weights)
+        winner = int(np.argmax(yi_values))
+        
+        suggestion = self.query.nearest_weights(winner, self.weights)
+        
+        self.assertEqual(suggestion.rank, 1)
+        self.assertAlmostEqual(suggestion.distance, 0.0, places=9)
+    
+    def test_dominated_target_cannot_win(self):
+        """Test: Alternatif yang kalah di semua kriteria dari alternatif lain tidak punya bobot menang"""
+        # Kost_E (1000, 3.0, 11) kalah dari Kost_A (900, 2.5, 12) di semua kriteria
+        region = self.query.region(4)
+        
+        self.assertTrue(region.empty)
+        self.assertEqual(region.dominated_by.tolist(), [0])
+        self.assertEqual(region.share(), 0.0)
+        self.assertIsNone(self.query.nearest_weights(4, self.weights))
+    
+    def test_top_k(self):
+        """Test: Target top-K mengizinkan K-1 pesaing tetap di atas"""
+        suggestion = self.query.nearest_weights(4, self.weights, top_k=2)
+        
+        self.assertEqual(suggestion.excluded, [0])
+        self.assertLessEqual(self.moora_rank(4, suggestion.weights), 2)
+        self.assertIsNone(self.query.nearest_weights(4, self.weights, top_k=1))
+    
+    def test_pruning_keeps_only_pareto_competitors(self):
+        """Test: Pesaing yang didominasi pesaing lain tidak menambah kendala"""
+        points = np.array([[3.0, 1.0], [2.0, 2.0], [1.0, 1.0], [1.0, 3.0], [2.0, 2.0]])
+        
+        self.assertEqual(sorted(pareto_front(points).tolist()), [0, 1, 3])
+        
+        region = self.query.region(1)
+        self.assertLess(region.n_constraints, len(self.df) - 1)
+        self.assertNotIn(4, region.competitors.tolist())
+    
+    def test_projection_detects_infeasible_constraints(self):
+        """Test: Proyeksi ke polytope kosong mengembalikan None"""
+        normals = np.array([[1.0, 1.0], [1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, -1.0]])
+        
+        self.assertIsNone(project_onto_polytope(np.zeros(2), normals, np.array([1.0, 0.0, 0.0, -0.2, -0.2]),
+                                                n_equalities=1))
+        projected = project_onto_polytope(np.zeros(2), normals, np.array([1.0, 0.0, 0.0, -0.6, -0.6]),
+                                          n_equalities=1)
+        np.testing.assert_allclose(projected, [0.5, 0.5])
+
+
+class TestUploadBatch(unittest.TestCase):
+    """Test suite untuk upload beberapa file dengan worker pool"""
+    
+    def setUp(self):
+        """Setup tiga file region dan registry baru"""
+        rng = np.random.default_rng(5)
+        self.criteria_cols = ['Price', 'Distance', 'Size']
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.4, 'Distance': 0.35, 'Size': 0.25}
+        self.frames = [
+            pd.DataFrame({
+                'Name': [f"Kost_{region}_{i}" for i in range(n)],
+                'Price': rng.integers(500, 2500, n),
+                'Distance': rng.uniform(0.2, 8.0, n).round(1),
+                'Size': rng.integers(6, 25, n)
+            })
+            for region, n in [('A', 40), ('B', 7), ('C', 25)]
+        ]
+        # Urutan kolom file terakhir berbeda, tetapi kriterianya sama
+        self.files = [(f"region_{i}.csv", frame.to_csv(index=False).encode())
+                      for i, frame in enumerate(self.frames[:2])]
+        self.files.append(("region_2.csv", self.frames[2][['Name', 'Size', 'Price', 'Distance']].to_csv(index=False).encode()))
+        self.registry = DatasetRegistry()
+        # Log request dari worker tidak ditulis ke file
+        self.logger_patch = patch('observability.REQUEST_LOGGER', observability.RequestLogger(''))
+        self.logger_patch.start()
+    
+    def tearDown(self):
+        self.logger_patch.stop()
+    
+    def run_batch(self, files, top_n=10):
+        batch = UploadBatch(files, self.registry, top_n=top_n)
+        self.addCleanup(batch.close)
+        batch.configure(self.criteria_type, self.weights)
+        batch.wait()
+        return batch
+    
+    def test_per_file_and_combined_ranking(self):
+        """Test: Top-N per file memakai norma file sendiri, ranking gabungan memakai norma global"""
+        batch = self.run_batch(self.files)
+        
+        self.assertTrue(batch.finished)
+        self.assertEqual([job.status for job in batch.jobs], [STATUS_DONE] * 3)
+        for job, frame in zip(batch.jobs, self.frames):
+            _, _, yi_values = calculate_moora(frame, self.criteria_type, self.weights)
+            expected = create_result_dataframe(frame, yi_values).head(10)
+            self.assertEqual(job.top['Name'].tolist(), expected['Name'].tolist())
+            self.assertEqual(job.top['Ranking'].tolist(), expected['Ranking'].tolist())
+        
+        combined = pd.concat(self.frames, ignore_index=True)
+        _, _, yi_values = calculate_moora(combined, self.criteria_type, self.weights)
+        expected = create_result_dataframe(combined, yi_values).head(10)
+        result_df = batch.combined()
+        self.assertEqual(result_df['Name'].tolist(), expected['Name'].tolist())
+        np.testing.assert_allclose(result_df['Yi (Score)'], expected['Yi (Score)'], rtol=1e-12)
+        self.assertEqual(result_df['Ranking'].tolist(), expected['Ranking'].tolist())
+    
+    def test_failed_files_do_not_stop_others(self):
+        """Test: File kosong, tidak valid, atau berbeda kolom gagal tanpa menghentikan file lain"""
+        files = self.files[:1] + [
+            ('kosong.csv', b''),
+            ('negatif.csv', b'Name,Price,Distance,Size\nKost_X,-900,1.0,12\n'),
+            ('kolom.csv', b'Name,Price\nKost_Y,900\n'),
+        ]
+        batch = self.run_batch(files)
+        
+        self.assertEqual([job.status for job in batch.jobs], [STATUS_DONE] + [STATUS_ERROR] * 3)
+        self.assertIn('kosong', batch.jobs[1].error)
+        self.assertIn('positif', batch.jobs[2].error)
+        self.assertIn('berbeda', batch.jobs[3].error)
+        self.assertEqual(set(batch.combined()['File']), {'region_0.csv'})
+        self.assertEqual(batch.summary()['Status'].tolist(), ['Selesai', 'Gagal', 'Gagal', 'Gagal'])
+    
+    def test_reconfigure_rescores_without_reparsing(self):
+        """Test: Mengganti bobot menghitung ulang file tanpa parsing ulang"""
+        batch = self.run_batch(self.files)
+        entries = [job.entry for job in batch.jobs]
+        
+        weights = {'Price': 0.1, 'Distance': 0.1, 'Size': 0.8}
+        batch.configure(self.criteria_type, weights)
+        batch.wait()
+        
+        self.assertEqual([job.entry for job in batch.jobs], entries)
+        _, _, yi_values = calculate_moora(self.frames[0], self.criteria_type, weights)
+        self.assertEqual(batch.jobs[0].top['Name'].iloc[0], self.frames[0]['Name'].iloc[int(np.argmax(yi_values))])
+    
+    def test_waits_for_weights_and_releases_datasets(self):
+        """Test: Tanpa bobot file hanya diparsing, dan dataset dilepas saat batch ditutup"""
+        batch = UploadBatch(self.files, self.registry)
+        entry = batch.entry(0)
+        batch.wait()
+        
+        self.assertTrue(batch.finished)
+        self.assertIsNone(batch.combined())
+        self.assertEqual(self.registry.ref_count(entry.key), 1)
+        
+        batch.close()
+        self.assertEqual(self.registry.ref_count(entry.key), 0)
+    
+    def test_combined_cached_until_results_change(self):
+        """Test: Ranking gabungan tidak dihitung ulang di setiap polling selama hasilnya sama"""
+        batch = self.run_batch(self.files)
+        first = batch.combined()
+        
+        self.assertIs(batch.combined(), first)
+        
+        batch.configure(self.criteria_type, {'Price': 0.1, 'Distance': 0.1, 'Size': 0.8})
+        batch.wait()
+        self.assertIsNot(batch.combined(), first)
+    
+    def test_close_during_parse_releases_dataset(self):
+        """Test: File yang selesai diparsing setelah batch ditutup tidak menahan dataset"""
+        release = threading.Event()
+        register_bytes = self.registry.register_bytes
+        
+        def slow_register(data, label="", **kwargs):
+            release.wait(5)
+            return register_bytes(data, label=label)
+        
+        with patch.object(self.registry, 'register_bytes', side_effect=slow_register):
+            batch = UploadBatch(self.files[:1], self.registry)
+            batch.close()
+            release.set()
+            self.assertIsNone(batch.entry(0, timeout=5))
+        
+        key = content_hash(self.files[0][1])
+        self.assertEqual(self.registry.ref_count(key), 0)
+        self.assertEqual(batch.jobs[0].status, STATUS_CANCELLED)
+    
+    def test_parse_progress_reported_per_chunk(self):
+        """Test: Progres parsing dilaporkan setelah setiap chunk"""
+        progress = []
+        with Pipeline() as pipeline:
+            parse_csv(self.files[0][1], pipeline, chunk_size=15, progress=progress.append)
+        
+        self.assertEqual(progress, [15, 30, 40])
+
+
+class TestIngest(unittest.TestCase):
+    """Test suite untuk membaca dataset dari spreadsheet dengan cache konversi"""
+    
+    def setUp(self):
+        """Setup file .xls bawaan, file .xlsx dua sheet, dan cache di direktori sementara"""
+        with open('data/dataset_kost_mahasiswa.xls', 'rb') as f:
+            self.xls_data = f.read()
+        self.csv_frame = pd.read_csv('data/dataset_kost_mahasiswa.csv')
+        buffer = io.BytesIO()
+        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
+            pd.DataFrame({'Catatan': ['bukan dataset']}).to_excel(writer, sheet_name='info', index=False)
+            self.csv_frame.to_excel(writer, sheet_name='dataset_kost', index=False)
+        self.xlsx_data = buffer.getvalue()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(self.tmp_dir.name)
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def test_bundled_xls_matches_csv(self):
+        """Test: File .xls bawaan terbaca sama persis dengan file CSV-nya"""
+        frame = read_spreadsheet(self.xls_data, 'dataset_kost_mahasiswa.xls')
+        
+        pd.testing.assert_frame_equal(frame, self.csv_frame, check_dtype=False)
+        self.assertEqual(spreadsheet_shape(self.xls_data, 'dataset_kost_mahasiswa.xls'), (30, 5))
+    
+    def test_reads_selected_sheet_and_columns(self):
+        """Test: Hanya sheet dan kolom yang dipilih yang dibaca"""
+        frame = read_spreadsheet(self.xlsx_data, 'data.xlsx', sheet='dataset_kost', columns=['Price', 'Size'])
+        
+        self.assertEqual(list(frame.columns), ['Name', 'Price', 'Size'])
+        self.assertEqual(frame['Price'].tolist(), self.csv_frame['Price'].tolist())
+        self.assertEqual(spreadsheet_shape(self.xlsx_data, 'data.xlsx', sheet='dataset_kost'), (30, 5))
+    
+    def test_cache_hit_skips_spreadsheet_parsing(self):
+        """Test: Upload ulang file yang sama dimuat dari cache tanpa membuka spreadsheet"""
+        frame, from_cache = load_spreadsheet(self.xlsx_data, 'data.xlsx', sheet='dataset_kost', cache=self.cache)
+        self.assertFalse(from_cache)
+        
+        with patch('pandas.read_excel', side_effect=AssertionError("spreadsheet diparsing ulang")):
+            cached, from_cache = load_spreadsheet(self.xlsx_data, 'data.xlsx', sheet='dataset_kost', cache=self.cache)
+        
+        self.assertTrue(from_cache)
+        pd.testing.assert_frame_equal(cached, frame)
+        self.assertEqual(cached['Price'].dtype, frame['Price'].dtype)
+        # Sheet lain dari file yang sama memakai key yang berbeda
+        self.assertEqual(load_spreadsheet(self.xlsx_data, 'data.xlsx', sheet='info', cache=self.cache)[0].shape, (1, 1))
+    
+    def test_non_numeric_data_not_cached(self):
+        """Test: Data dengan teks di kolom kriteria tidak dicache dan tetap dilaporkan validasi"""
+        frame = self.csv_frame.copy()
+        frame['Price'] = frame['Price'].astype(object)
+        frame.loc[3, 'Price'] = 'mahal'
+        buffer = io.BytesIO()
+        frame.to_excel(buffer, index=False)
+        
+        self.assertFalse(self.cache.put_frame('invalid', frame))
+        entry = register_spreadsheet(DatasetRegistry(), buffer.getvalue(), 'invalid.xlsx', cache=self.cache)
+        
+        self.assertFalse(entry.report.ok)
+        self.assertFalse(load_spreadsheet(buffer.getvalue(), 'invalid.xlsx', cache=self.cache)[1])
+    
+    def test_registered_spreadsheet_scores_like_csv(self):
+        """Test: Dataset dari spreadsheet dihitung sama dengan CSV dan tidak didaftarkan dua kali"""
+        registry = DatasetRegistry()
+        entry = register_spreadsheet(registry, self.xls_data, 'dataset_kost_mahasiswa.xls', cache=self.cache)
+        again = register_spreadsheet(registry, self.xls_data, 'dataset_kost_mahasiswa.xls', cache=self.cache)
+        csv_entry = registry.register_file('data/dataset_kost_mahasiswa.csv')
+        
+        self.assertIs(entry, again)
+        self.assertTrue(entry.report.ok)
+        np.testing.assert_array_equal(entry.matrix, csv_entry.matrix)
+        np.testing.assert_allclose(entry.sum_squares, csv_entry.sum_squares)
+    
+    def test_upload_batch_accepts_spreadsheets(self):
+        """Test: Upload beberapa file bisa mencampur CSV dan spreadsheet"""
+        files = [('a.csv', self.csv_frame.to_csv(index=False).encode()), ('b.xls', self.xls_data)]
+        with patch('observability.REQUEST_LOGGER', observability.RequestLogger('')):
+            with UploadBatch(files, DatasetRegistry(), conversion_cache=self.cache) as batch:
+                batch.wait()
+                entries = [batch.entry(i) for i in range(2)]
+        
+        np.testing.assert_array_equal(entries[0].matrix, entries[1].matrix)
+
+
+class TestSnapshots(unittest.TestCase):
+    """Test suite untuk riwayat snapshot ranking dengan penyimpanan delta"""
+    
+    def setUp(self):
+        """Setup store di direktori sementara dan delapan minggu perubahan harga"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = SnapshotStore(self.tmp_dir.name, keyframe_interval=3, block_rows=7)
+        self.criteria_type = {'Price': 'cost', 'Distance': 'cost', 'Size': 'benefit'}
+        self.weights = {'Price': 0.5, 'Distance': 0.3, 'Size': 0.2}
+        rng = np.random.default_rng(11)
+        df = pd.DataFrame({
+            'Name': [f"Kost_{i}" for i in range(40)],
+            'Price': rng.integers(500, 2500, 40),
+            'Distance': rng.uniform(0.2, 8.0, 40).round(1),
+            'Size': rng.integers(6, 25, 40),
+        })
+        self.weeks = []
+        for week in range(8):
+            changed = rng.choice(len(df), 4, replace=False)
+            df.loc[changed, 'Price'] = df.loc[changed, 'Price'] + rng.integers(-200, 200, len(changed))
+            _, _, yi_values = calculate_moora(df, self.criteria_type, self.weights)
+            order, _ = rank_alternatives(yi_values, [(df['Price'].to_numpy(), True)])
+            self.weeks.append((df.copy(), yi_values, order))
+    
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+    
+    def add_weeks(self):
+        return [self.store.add(df['Name'], yi_values, order, label=f"minggu {week + 1}")
+                for week, (df, yi_values, order) in enumerate(self.weeks)]
+    
+    def test_reconstructs_every_snapshot_exactly(self):
+        """Test: Setiap snapshot (keyframe maupun delta) direkonstruksi persis sama dengan hasil aslinya"""
+        infos = self.add_weeks()
+        
+        self.assertEqual([info['kind'] for info in infos], ['key', 'delta', 'delta'] * 2 + ['key', 'delta'])
+        # Store baru membaca dari disk tanpa snapshot yang tersimpan di memori
+        store = SnapshotStore(self.tmp_dir.name)
+        for snapshot_id, (df, yi_values, order) in enumerate(self.weeks):
+            snapshot = store.load(snapshot_id)
+            np.testing.assert_array_equal(snapshot.yi_values, yi_values)
+            np.testing.assert_array_equal(snapshot.order, order)
+            expected = create_result_dataframe(df, yi_values, order=order)
+            pd.testing.assert_frame_equal(snapshot.to_frame(),
+                                          expected[['Name', 'Yi (Score)', 'Ranking']].reset_index(drop=True),
+                                          check_dtype=False)
+    
+    def test_history_matches_full_rankings(self):
+        """Test: Ranking satu listing dari waktu ke waktu sama dengan ranking di hasil lengkap"""
+        self.add_weeks()
+        
+        for name in ['Kost_0', 'Kost_17', 'Kost_39']:
+            history = SnapshotStore(self.tmp_dir.name).history(name)
+            expected = [create_result_dataframe(df, yi_values).set_index('Name').loc[name, 'Ranking']
+                        for df, yi_values, _ in self.weeks]
+            self.assertEqual(history['Ranking'].tolist(), expected)
+            self.assertEqual(history['Label'].tolist(), [f"minggu {week + 1}" for week in range(8)])
+        self.assertEqual(len(self.store.history('Kost_Tidak_Ada')), 0)
+    
+    def test_history_reads_only_one_block_per_snapshot(self):
+        """Test: Query riwayat hanya membuka blok yang memuat listing tersebut"""
+        self.add_weeks()
+        
+        with patch('snapshots._unpack', wraps=snapshots._unpack) as unpack:
+            self.store.history('Kost_20')
+        # Satu blok untuk setiap kolom (Yi, posisi, ties) di setiap snapshot
+        self.assertEqual(unpack.call_count, 3 * len(self.weeks))
+    
+    def test_changed_listings_start_new_keyframe(self):
+        """Test: Daftar listing yang berubah disimpan sebagai keyframe baru dan riwayat tetap bersambung"""
+        df, yi_values, order = self.weeks[0]
+        self.store.add(df['Name'], yi_values, order)
+        smaller = df.iloc[5:].reset_index(drop=True)
+        _, _, smaller_yi = calculate_moora(smaller, self.criteria_type, self.weights)
+        smaller_order, _ = rank_alternatives(smaller_yi)
+        info = self.store.add(smaller['Name'], smaller_yi, smaller_order)
+        
+        self.assertEqual(info['kind'], 'key')
+        self.assertEqual(len(self.store.history('Kost_10')), 2)
+        self.assertEqual(len(self.store.history('Kost_2')), 1)
+        np.testing.assert_array_equal(self.store.load(1).yi_values, smaller_yi)
+    
+    def test_delta_smaller_than_keyframe(self):
+        """Test: Snapshot delta dengan sedikit perubahan jauh lebih kecil dari keyframe"""
+        names = [f"Kost_{i}" for i in range(20_000)]
+        rng = np.random.default_rng(0)
+        yi_values = rng.random(20_000)
+        store = SnapshotStore(os.path.join(self.tmp_dir.name, 'besar'))
+        first = store.add(names, yi_values, np.argsort(-yi_values, kind='stable'))
+        yi_values[:100] = rng.random(100)
+        second = store.add(names, yi_values, np.argsort(-yi_values, kind='stable'))
+        
+        self.assertEqual(second['kind'], 'delta')
+        self.assertLess(second['bytes'] * 3, first['bytes'])
+    
+    def test_concurrent_queries_share_caches(self):
+        """Test: Query dari banyak sesi sekaligus pada store yang sama tidak saling merusak cache"""
+        self.store.keyframe_interval = 1
+        self.add_weeks()
+        errors = []
+        
+        def query(seed):
+            rng = np.random.default_rng(seed)
+            try:
+                for _ in range(30):
+                    snapshot_id = int(rng.integers(len(self.weeks)))
+                    np.testing.assert_array_equal(self.store.load(snapshot_id).yi_values, self.weeks[snapshot_id][1])
+                    self.store.history(f"Kost_{rng.integers(40)}")
+            except Exception as e:
+                errors.append(e)
+        
+        with patch('snapshots.NAMES_CACHE_SIZE', 1):
+            threads = [threading.Thread(target=query, args=(seed,)) for seed in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        self.assertEqual(errors, [])
+    
+    def test_mismatched_lengths_rejected(self):
+        """Test: Jumlah nama, Yi, dan urutan yang berbeda ditolak"""
+        with self.assertRaises(ValueError):
+            self.store.add(['A', 'B'], np.array([0.1, 0.2, 0.3]), np.array([2, 1, 0]))
+        with self.assertRaises(ValueError):
+            self.store.load(0)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,316 @@
+import numpy as np
+import pandas as pd
+
+
+# Tipe kriteria yang valid
+VALID_CRITERIA_TYPES = ('benefit', 'cost')
+
+# Toleransi relatif total bobot (0.0001 untuk skala 1.0, 0.01 untuk skala 100%)
+WEIGHT_RELATIVE_TOLERANCE = 1e-4
+
+
+class ValidationIssue:
+    """
+    Satu masalah hasil validasi.
+
+    Attributes:
+    -----------
+    code : str
+        Jenis masalah, misalnya 'nonpositive', 'nan', 'weight_total'
+    message : str
+        Pesan yang bisa langsung ditampilkan ke pengguna
+    column : str atau None
+        Kolom/kriteria yang bermasalah (None untuk masalah dataset secara umum)
+    """
+
+    def __init__(self, code, message, column=None):
+        self.code = code
+        self.message = message
+        self.column = column
+
+    def __repr__(self):
+        return f"ValidationIssue({self.code!r}, column={self.column!r})"
+
+
+class ValidationReport:
+    """
+    Kumpulan semua masalah dari data, bobot, dan tipe kriteria.
+
+    Examples:
+    ---------
+    >>> report = validate_inputs(pd.DataFrame({'Name': ['A'], 'Price': [0]}),
+    ...                          {'Price': 'cost'}, {'Price': 1.0})
+    >>> report.ok, report.codes()
+    (False, ['nonpositive'])
+    """
+
+    def __init__(self, issues=None):
+        self.issues = list(issues or [])
+
+    def add(self, code, message, column=None):
+        self.issues.append(ValidationIssue(code, message, column))
+
+    def extend(self, other):
+        self.issues.extend(other.issues)
+        return self
+
+    @property
+    def ok(self):
+        return not self.issues
+
+    def codes(self):
+        """Daftar kode masalah sesuai urutan ditemukan."""
+        return [issue.code for issue in self.issues]
+
+    def messages(self):
+        """Daftar pesan masalah sesuai urutan ditemukan."""
+        return [issue.message for issue in self.issues]
+
+    def columns_with(self, code):
+        """Kolom yang memiliki masalah dengan kode tertentu."""
+        return [issue.column for issue in self.issues if issue.code == code]
+
+    def raise_for_errors(self):
+        """
+        Raise ValueError berisi semua pesan jika ada masalah.
+
+        Raises:
+        -------
+        ValueError
+            Pesan setiap masalah dipisahkan baris baru
+        """
+        if self.issues:
+            raise ValueError("\n".join(self.messages()))
+
+
+def criteria_columns(df):
+    """Kolom kriteria dataset (semua kecuali 'Name')."""
+    return [col for col in df.columns if col != 'Name']
+
+
+def matrix_flags(X):
+    """
+    Menandai kolom yang mengandung NaN, inf, dan nilai nol/negatif.
+
+    Flag dari beberapa chunk bisa digabung dengan OR (lihat pipeline.py).
+
+    Returns:
+    --------
+    tuple
+        (nan_cols, inf_cols, nonpositive_cols) berupa array boolean per kolom
+    """
+    X = np.asarray(X, dtype=float)
+    # NaN dibandingkan selalu False, jadi hanya nilai nyata <= 0 yang terhitung
+    return np.isnan(X).any(axis=0), np.isinf(X).any(axis=0), (X <= 0).any(axis=0)
+
+
+def report_from_flags(criteria_cols, nan_cols, inf_cols, nonpositive_cols):
+    """Membuat ValidationReport dari flag per kolom hasil matrix_flags."""
+    report = ValidationReport()
+    for j in np.flatnonzero(nan_cols):
+        report.add('nan', f"Kolom '{criteria_cols[j]}' mengandung nilai kosong (NaN)!", criteria_cols[j])
+    for j in np.flatnonzero(inf_cols):
+        report.add('inf', f"Kolom '{criteria_cols[j]}' mengandung nilai tak hingga (inf)!", criteria_cols[j])
+    for j in np.flatnonzero(nonpositive_cols):
+        report.add('nonpositive',
+                   f"Kolom '{criteria_cols[j]}' mengandung nilai nol atau negatif! Semua nilai harus positif.",
+                   criteria_cols[j])
+    return report
+
+
+def validate_matrix(X, criteria_cols):
+    """
+    Memeriksa NaN, inf, serta nilai nol/negatif pada matrix numerik.
+
+    Setiap pemeriksaan dilakukan sekali untuk seluruh matrix (per kolom sekaligus).
+
+    Parameters:
+    -----------
+    X : numpy.ndarray
+        Matrix keputusan float
+    criteria_cols : list
+        Nama kolom sesuai urutan kolom X
+
+    Returns:
+    --------
+    ValidationReport
+    """
+    X = np.asarray(X, dtype=float)
+    if X.shape[0] == 0:
+        return ValidationReport()
+    return report_from_flags(criteria_cols, *matrix_flags(X))
+
+
+def numeric_columns(df, criteria_cols):
+    """
+    Menandai kolom kriteria bertipe numerik (kolom boolean dianggap non-numerik).
+
+    Returns:
+    --------
+    numpy.ndarray
+        Array boolean per kolom kriteria
+    """
+    dtypes = df[criteria_cols].dtypes
+    return (dtypes.map(pd.api.types.is_numeric_dtype).to_numpy(dtype=bool)
+            & ~dtypes.map(pd.api.types.is_bool_dtype).to_numpy(dtype=bool))
+
+
+def validate_data(df, criteria_cols=None, flags=None):
+    """
+    Memeriksa dataset: kosong, tanpa kriteria, kolom non-numerik, NaN, inf, dan nilai <= 0.
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame
+        Dataset dengan kolom 'Name' dan kriteria
+    criteria_cols : list, optional
+        Kolom kriteria (default: semua kolom kecuali 'Name')
+    flags : tuple, optional
+        Hasil matrix_flags untuk semua kolom kriteria yang sudah dihitung
+        sebelumnya (misalnya digabung per chunk), sehingga matrix tidak diperiksa ulang
+
+    Returns:
+    --------
+    ValidationReport
+    """
+    report = ValidationReport()
+    if df.empty:
+        report.add('empty', "Dataset tidak boleh kosong!")
+        return report
+
+    criteria_cols = criteria_columns(df) if criteria_cols is None else list(criteria_cols)
+    if not criteria_cols:
+        report.add('no_criteria', "Dataset harus memiliki minimal 1 kriteria selain kolom Name!")
+        return report
+
+    numeric = numeric_columns(df, criteria_cols)
+    for col in np.asarray(criteria_cols, dtype=object)[~numeric]:
+        report.add('non_numeric', f"Kolom '{col}' harus berisi angka!", col)
+
+    numeric_cols = [col for col, is_numeric in zip(criteria_cols, numeric) if is_numeric]
+    if flags is not None:
+        # Kolom non-numerik sudah dilaporkan, flag NaN hasil konversinya diabaikan
+        report.extend(report_from_flags(numeric_cols, *(np.asarray(flag)[numeric] for flag in flags)))
+    elif numeric_cols:
+        report.extend(validate_matrix(df[numeric_cols].to_numpy(dtype=float), numeric_cols))
+    return report
+
+
+def validate_weight_values(weights, criteria_cols, total=1.0, require_total=True):
+    """
+    Memeriksa kecocokan key bobot dengan kriteria, nilai bobot, dan total bobot.
+
+    Parameters:
+    -----------
+    weights : dict
+        Dictionary bobot per kriteria
+    criteria_cols : list
+        Kolom kriteria dataset
+    total : float
+        Total bobot yang diharapkan (1.0 untuk desimal, 100 untuk persen)
+    require_total : bool
+        False untuk melewati pemeriksaan total (misalnya saat bobot hanya dipakai
+        sebagai rasio)
+
+    Returns:
+    --------
+    ValidationReport
+    """
+    report = ValidationReport()
+    for col in criteria_cols:
+        if col not in weights:
+            report.add('weight_missing', f"Kriteria '{col}' belum memiliki bobot!", col)
+    for col in weights:
+        if col not in criteria_cols:
+            report.add('weight_unknown', f"Bobot '{col}' tidak sesuai dengan kolom dataset mana pun!", col)
+
+    if not weights:
+        return report
+    keys = list(weights)
+    values = pd.to_numeric(pd.Series(list(weights.values()), dtype=object), errors='coerce').to_numpy(dtype=float)
+    invalid = ~np.isfinite(values) | (values < 0)
+    for j in np.flatnonzero(invalid):
+        report.add('weight_invalid', f"Bobot '{keys[j]}' harus berupa angka >= 0!", keys[j])
+
+    if require_total and not invalid.any():
+        weight_total = values.sum()
+        if abs(weight_total - total) >= WEIGHT_RELATIVE_TOLERANCE * total:
+            report.add('weight_total', f"Total bobot harus = {total:g}, saat ini {weight_total:.4g}!")
+    return report
+
+
+def validate_criteria_types(criteria_type, criteria_cols):
+    """
+    Memeriksa kecocokan key tipe kriteria dengan kolom dan nilai 'benefit'/'cost'.
+
+    Returns:
+    --------
+    ValidationReport
+    """
+    report = ValidationReport()
+    for col in criteria_cols:
+        if col not in criteria_type:
+            report.add('type_missing', f"Kriteria '{col}' belum memiliki tipe (benefit/cost)!", col)
+    for col in criteria_type:
+        if col not in criteria_cols:
+            report.add('type_unknown', f"Tipe kriteria '{col}' tidak sesuai dengan kolom dataset mana pun!", col)
+
+    if criteria_type:
+        keys = np.asarray(list(criteria_type), dtype=object)
+        values = np.asarray(list(criteria_type.values()), dtype=object)
+        for col in keys[~np.isin(values, VALID_CRITERIA_TYPES)]:
+            report.add('type_invalid', f"Tipe kriteria '{col}' harus 'benefit' atau 'cost'!", col)
+    return report
+
+
+def validate_inputs(df=None, criteria_type=None, weights=None, criteria_cols=None,
+                    weight_total=1.0, require_weight_total=True, data_report=None):
+    """
+    Validasi data, bobot, dan tipe kriteria sekaligus.
+
+    Semua masalah dikumpulkan dalam satu laporan (tidak berhenti di masalah pertama).
+
+    Parameters:
+    -----------
+    df : pandas.DataFrame, optional
+        Dataset yang akan divalidasi
+    criteria_type : dict, optional
+        Dictionary tipe setiap kriteria
+    weights : dict, optional
+        Dictionary bobot setiap kriteria
+    criteria_cols : list, optional
+        Kolom kriteria (default: dari df)
+    weight_total : float
+        Total bobot yang diharapkan (1.0 atau 100)
+    require_weight_total : bool
+        False untuk melewati pemeriksaan total bobot
+    data_report : ValidationReport, optional
+        Hasil validate_data yang sudah dihitung sebelumnya (data tidak diperiksa ulang)
+
+    Returns:
+    --------
+    ValidationReport
+
+    Examples:
+    ---------
+    >>> df = pd.DataFrame({'Name': ['A', 'B'], 'Price': [900, 1800], 'Size': [12, 15]})
+    >>> report = validate_inputs(df, {'Price': 'cost', 'Size': 'luas'}, {'Price': 0.7, 'Wifi': 0.3})
+    >>> report.codes()
+    ['weight_missing', 'weight_unknown', 'type_invalid']
+    """
+    report = ValidationReport()
+    if data_report is not None:
+        report.extend(data_report)
+    elif df is not None:
+        report.extend(validate_data(df, criteria_cols))
+
+    if criteria_cols is None:
+        criteria_cols = criteria_columns(df) if df is not None else []
+    if report.codes() and report.codes()[0] in ('empty', 'no_criteria'):
+        return report
+
+    if weights is not None:
+        report.extend(validate_weight_values(weights, criteria_cols, weight_total, require_weight_total))
+    if criteria_type is not None:
+        report.extend(validate_criteria_types(criteria_type, criteria_cols))
+    return report
@@ -0,0 +1,215 @@
+import numpy as np
+
+from calculate import column_sum_squares, criteria_signs, weight_vector
+
+
+# Batas jumlah listing yang dipilih lewat selectbox (dataset lebih besar dicari berdasarkan nama)
+WHATIF_SELECT_LIMIT = 10_000
+
+# Sort ulang Yi jika lebih dari fraksi ini alternatif harus diperiksa satu per satu saat mencari ranking
+REBASE_BAND_FRACTION = 0.05
+
+# Kelonggaran batas pergeseran Yi untuk selisih pembulatan pembaruan inkremental
+DRIFT_TOLERANCE = 1e-12
+
+# Σxij² dihitung ulang penuh jika pembaruan inkremental menyisakan kurang dari fraksi ini
+# (pengurangan dua angka besar yang hampir sama kehilangan presisi)
+CANCELLATION_RATIO = 1e-4
+
+
+class WhatIfScorer:
+    """
+    Skor MOORA yang diperbarui secara inkremental saat nilai satu listing diubah.
+
+    Mengubah satu sel (baris i, kolom j) hanya mengubah Σxij² kolom j, sehingga
+    koefisien kolom j (tanda × bobot / norma) bergeser sebesar Δc dan setiap
+    Yi dikoreksi dengan X[:, j] × Δc (koreksi rank-1, O(N)) tanpa menghitung
+    ulang seluruh matrix.
+
+    Ranking dicari dengan binary search pada array Yi yang diurutkan sekali
+    di awal. Karena norma ikut berubah, semua Yi bergeser sejak pengurutan
+    terakhir; pergeseran itu dibatasi oleh min/max kolom × Δc, sehingga hanya
+    alternatif di dalam pita batas tersebut yang dibandingkan satu per satu.
+    Jika pitanya terlalu lebar, Yi diurutkan ulang.
+
+    Parameters:
+    -----------
+    matrix : numpy.ndarray
+        Matrix keputusan asli (tidak pernah diubah, boleh read-only)
+    criteria_cols : list
+        Urutan kolom kriteria sesuai kolom matrix
+    criteria_type : dict
+        Dictionary tipe setiap kriteria ('benefit' atau 'cost')
+    weights : dict
+        Dictionary bobot setiap kriteria dalam bentuk desimal
+    sum_squares : numpy.ndarray, optional
+        Σxij² per kolom yang sudah dihitung sebelumnya (misalnya dari registry)
+
+    Examples:
+    ---------
+    >>> X = np.array([[900.0, 12.0], [1800.0, 20.0], [1200.0, 15.0]])
+    >>> scorer = WhatIfScorer(X, ['Price', 'Size'], {'Price': 'cost', 'Size': 'benefit'},
+    ...                       {'Price': 0.6, 'Size': 0.4})
+    >>> scorer.rank(1)
+    3
+    >>> scorer.edit(1, 'Price', 700)
+    >>> scorer.rank(1), scorer.original_rank(1)
+    (1, 3)
+    """
+
+    def __init__(self, matrix, criteria_cols, criteria_type, weights, sum_squares=None):
+        self.matrix = matrix
+        self.criteria_cols = list(criteria_cols)
+        self._col_index = {col: j for j, col in enumerate(self.criteria_cols)}
+        self._signed_weights = criteria_signs(self.criteria_cols, criteria_type) * weight_vector(self.criteria_cols, weights)
+        self.sum_squares = np.array(column_sum_squares(matrix) if sum_squares is None else sum_squares, dtype=float)
+        self.coefficients = self._signed_weights / np.sqrt(self.sum_squares)
+        self.yi_values = np.asarray(matrix, dtype=float) @ self.coefficients
+        self.edits = {}
+        self.rebases = 0
+
+        # Kolom yang sudah diubah disalin saat pertama kali diedit (copy-on-write)
+        self._columns = {}
+        # Batas nilai setiap kolom, hanya melebar saat diedit (tetap batas yang aman)
+        self._column_min = np.min(matrix, axis=0).astype(float) if len(matrix) else np.zeros(len(self.criteria_cols))
+        self._column_max = np.max(matrix, axis=0).astype(float) if len(matrix) else np.zeros(len(self.criteria_cols))
+        self._rebase()
+        self._original_sorted = self._sorted_yi
+        self._original_yi = self.yi_values.copy()
+
+    @property
+    def n_rows(self):
+        return self.yi_values.shape[0]
+
+    def _rebase(self):
+        """Mengurutkan Yi saat ini; pergeseran Yi berikutnya dihitung relatif terhadap titik ini."""
+        self._order = np.argsort(self.yi_values, kind='stable')
+        self._sorted_yi = self.yi_values[self._order]
+        self._position = np.empty_like(self._order)
+        self._position[self._order] = np.arange(self.n_rows)
+        self._base_coefficients = self.coefficients.copy()
+        # Baris yang nilainya sendiri berubah sejak pengurutan terakhir
+        self._dirty_rows = set()
+
+    def _column(self, j):
+        column = self._columns.get(j)
+        return self.matrix[:, j] if column is None else column
+
+    def value(self, row, col):
+        """Nilai sel saat ini (termasuk hasil edit)."""
+        return float(self._column(self._col_index[col])[row])
+
+    def edit(self, row, col, value):
+        """
+        Mengubah satu nilai lalu memperbarui Σxij², koefisien, dan semua Yi secara inkremental.
+
+        Parameters:
+        -----------
+        row : int
+            Indeks baris listing
+        col : str
+            Nama kolom kriteria
+        value : float
+            Nilai baru (harus positif)
+
+        Raises:
+        -------
+        ValueError
+            - Jika kolom tidak dikenal atau nilai bukan angka positif
+        """
+        if col not in self._col_index:
+            raise ValueError(f"Kriteria '{col}' tidak ditemukan!")
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f"Nilai '{col}' harus berupa angka!")
+        if not np.isfinite(value) or value <= 0:
+            raise ValueError(f"Nilai '{col}' harus berupa angka positif!")
+
+        j = self._col_index[col]
+        column = self._column(j)
+        old = float(column[row])
+        if value == old:
+            return
+
+        sum_squares = self.sum_squares[j] + value * value - old * old
+        if sum_squares < CANCELLATION_RATIO * self.sum_squares[j]:
+            sum_squares = (np.dot(column[:row], column[:row]) + np.dot(column[row + 1:], column[row + 1:])
+                           + value * value)
+        coefficient = self._signed_weights[j] / np.sqrt(sum_squares)
+
+        # Koreksi rank-1: semua Yi bergeser karena norma kolom j berubah. Kontribusi
+        # baris yang diedit diganti langsung (bukan dua koreksi besar yang saling
+        # menghapus) agar tetap presisi saat skala nilainya berubah jauh
+        edited_yi = self.yi_values[row] + value * coefficient - old * self.coefficients[j]
+        self.yi_values += column * (coefficient - self.coefficients[j])
+        self.yi_values[row] = edited_yi
+
+        if j not in self._columns:
+            column = self._columns[j] = np.array(column, dtype=float)
+        column[row] = value
+        self.sum_squares[j] = sum_squares
+        self.coefficients[j] = coefficient
+        self._column_min[j] = min(self._column_min[j], value)
+        self._column_max[j] = max(self._column_max[j], value)
+        self._dirty_rows.add(row)
+
+        if value == float(self.matrix[row, j]):
+            self.edits.pop((row, col), None)
+        else:
+            self.edits[(row, col)] = value
+
+    def set_row(self, row, values):
+        """Mengubah beberapa kolom satu listing sekaligus (dictionary kolom -> nilai)."""
+        for col, value in values.items():
+            self.edit(row, col, value)
+
+    def reset_row(self, row):
+        """Mengembalikan semua nilai listing ke nilai aslinya."""
+        for edited_row, col in list(self.edits):
+            if edited_row == row:
+                self.edit(row, col, self.matrix[row, self._col_index[col]])
+
+    def edited_rows(self):
+        """Baris yang memiliki nilai berbeda dari dataset asli."""
+        return sorted({row for row, _ in self.edits})
+
+    def rank(self, row):
+        """
+        Ranking metode 'min' listing saat ini (1 + jumlah Yi yang lebih besar).
+
+        Returns:
+        --------
+        int
+        """
+        threshold = self.yi_values[row]
+        delta = self.coefficients - self._base_coefficients
+        # Pergeseran Yi setiap baris sejak pengurutan terakhir berada di [low, high]
+        low = np.minimum(self._column_min * delta, self._column_max * delta).sum() - DRIFT_TOLERANCE
+        high = np.maximum(self._column_min * delta, self._column_max * delta).sum() + DRIFT_TOLERANCE
+
+        # Yi lama > threshold - low pasti masih lebih besar; Yi lama <= threshold - high pasti tidak
+        above = np.searchsorted(self._sorted_yi, threshold - low, side='right')
+        band_start = np.searchsorted(self._sorted_yi, threshold - high, side='right')
+        if above - band_start > REBASE_BAND_FRACTION * self.n_rows and delta.any():
+            self.rebases += 1
+            self._rebase()
+            return self.rank(row)
+
+        count = (self.n_rows - above) + np.count_nonzero(self.yi_values[self._order[band_start:above]] > threshold)
+        if self._dirty_rows:
+            # Baris yang nilainya sendiri berubah tidak terikat batas di atas: hitung ulang posisinya
+            dirty = np.fromiter(self._dirty_rows, dtype=np.intp)
+            positions = self._position[dirty]
+            greater = self.yi_values[dirty] > threshold
+            count += np.count_nonzero(greater[positions < band_start])
+            count -= np.count_nonzero(~greater[positions >= above])
+        return int(count) + 1
+
+    def original_yi(self, row):
+        """Yi listing sebelum ada edit."""
+        return float(self._original_yi[row])
+
+    def original_rank(self, row):
+        """Ranking metode 'min' listing sebelum ada edit."""
+        return int(self.n_rows - np.searchsorted(self._original_sorted, self._original_yi[row], side='right')) + 1